@@ -0,0 +1,276 @@
+# log_correlator.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Sliding-window event correlation over collected device logs.
+# Rules in utils/log_correlations.yaml describe multi-event failure chains
+# (e.g. kernel panic -> wlan down -> wlan up within 60 s). All log files of a
+# folder are merged into one time-ordered line stream and every rule is
+# evaluated in a single pass:
+#   - a line matching a rule's trigger opens a candidate incident
+#   - later lines advance it through the steps (in order, unless ordered: false)
+#   - lines matching steps already seen are kept as members of the incident
+#   - once the window since the first event has passed, a candidate with every
+#     required step is emitted as an incident, an incomplete one is dropped
+# Memory is bounded by max_active open candidates per rule and max_members
+# member lines per incident.
+#
+# Rule format:
+#   <rule>:
+#     description: "..."
+#     category: "<root cause>"     # defaults to the rule name
+#     window_sec: 60
+#     ordered: true
+#     steps:
+#       - name: "panic"
+#         match: "<regex, case-insensitive>"
+#         optional: false
+
+import csv
+import heapq
+import os
+import re
+from datetime import datetime
+
+import yaml
+
+from utils.log_analyzer import LOG_EXTENSIONS
+from utils.log_index import iter_timed_lines, window_epochs
+from utils.tracing import traced
+
+DEFAULT_RULES_PATH = "utils/log_correlations.yaml"
+DEFAULT_WINDOW_SEC = 60
+DEFAULT_MAX_ACTIVE = 16
+DEFAULT_MAX_MEMBERS = 50
+
+
+def load_correlation_rules(yaml_path=DEFAULT_RULES_PATH):
+    with open(yaml_path, 'r') as f:
+        return yaml.safe_load(f) or {}
+
+
+class CorrelationRule:
+    def __init__(self, name, config):
+        self.name = name
+        self.category = config.get("category", name)
+        self.description = config.get("description", "")
+        self.window_sec = config.get("window_sec", DEFAULT_WINDOW_SEC)
+        self.ordered = config.get("ordered", True)
+        self.steps = []
+        for idx, step in enumerate(config.get("steps") or []):
+            self.steps.append({
+                "name": step.get("name", f"step_{idx + 1}"),
+                "regex": re.compile(step["match"], re.IGNORECASE),
+                "optional": bool(step.get("optional", False)),
+            })
+        if not any(not step["optional"] for step in self.steps):
+            raise ValueError(f"❌ Correlation rule '{name}' needs at least one required step")
+        self.required = {idx for idx, step in enumerate(self.steps) if not step["optional"]}
+
+    def matching_steps(self, line):
+        return [idx for idx, step in enumerate(self.steps) if step["regex"].search(line)]
+
+    def trigger_steps(self):
+        # Ordered rules start at the first step or any optional step leading up to a required one
+        if not self.ordered:
+            return set(range(len(self.steps)))
+        triggers = set()
+        for idx, step in enumerate(self.steps):
+            triggers.add(idx)
+            if not step["optional"]:
+                break
+        return triggers
+
+
+class Candidate:
+    def __init__(self, rule, epoch):
+        self.rule = rule
+        self.first = epoch
+        self.last = epoch
+        self.satisfied = set()
+        self.position = 0
+        self.members = []
+        self.dropped_members = 0
+
+    @property
+    def complete(self):
+        return self.rule.required <= self.satisfied
+
+    def _reachable(self, idx):
+        # In order: every step between the current position and idx must be optional
+        return idx >= self.position and all(
+            self.rule.steps[j]["optional"] for j in range(self.position, idx)
+        )
+
+    def offer(self, steps, epoch, source, line, max_members):
+        """
+        Try to consume a line matching steps. Returns True if the line was taken.
+        """
+        advanced = None
+        if self.rule.ordered:
+            advanced = next((idx for idx in steps if self._reachable(idx)), None)
+        else:
+            advanced = next((idx for idx in steps if idx not in self.satisfied), None)
+        if advanced is not None:
+            self.satisfied.add(advanced)
+            if self.rule.ordered:
+                self.position = advanced + 1
+        elif not any(idx in self.satisfied for idx in steps):
+            return False
+        self.last = epoch
+        if len(self.members) < max_members:
+            self.members.append((epoch, source, line))
+        else:
+            self.dropped_members += 1
+        return True
+
+    def to_incident(self):
+        return {
+            "rule": self.rule.name,
+            "category": self.rule.category,
+            "description": self.rule.description,
+            "first_ts": datetime.fromtimestamp(self.first),
+            "last_ts": datetime.fromtimestamp(self.last),
+            "duration_sec": self.last - self.first,
+            "steps": [self.rule.steps[idx]["name"] for idx in sorted(self.satisfied)],
+            "members": [
+                {"ts": datetime.fromtimestamp(epoch), "source": source, "line": line}
+                for epoch, source, line in self.members
+            ],
+            "dropped_members": self.dropped_members,
+        }
+
+
+class CorrelationEngine:
+    def __init__(self, rules, max_active=DEFAULT_MAX_ACTIVE, max_members=DEFAULT_MAX_MEMBERS):
+        """
+        rules: dict as loaded from log_correlations.yaml.
+        """
+        self.rules = [CorrelationRule(name, config) for name, config in (rules or {}).items()]
+        self.max_active = max_active
+        self.max_members = max_members
+        self._active = {rule.name: [] for rule in self.rules}
+        self._triggers = {rule.name: rule.trigger_steps() for rule in self.rules}
+
+    def _expire(self, rule, epoch):
+        closed = []
+        still_open = []
+        for candidate in self._active[rule.name]:
+            if epoch - candidate.first > rule.window_sec:
+                if candidate.complete:
+                    closed.append(candidate.to_incident())
+            else:
+                still_open.append(candidate)
+        self._active[rule.name] = still_open
+        return closed
+
+    def feed(self, epoch, line, source=""):
+        """
+        Consume one line (lines must arrive in time order).
+        Returns the incidents closed by this line's timestamp.
+        """
+        incidents = []
+        line = line.strip()
+        for rule in self.rules:
+            incidents.extend(self._expire(rule, epoch))
+            steps = rule.matching_steps(line)
+            if not steps:
+                continue
+            active = self._active[rule.name]
+            if any(c.offer(steps, epoch, source, line, self.max_members) for c in active):
+                continue
+            if any(idx in self._triggers[rule.name] for idx in steps):
+                candidate = Candidate(rule, epoch)
+                candidate.offer(steps, epoch, source, line, self.max_members)
+                active.append(candidate)
+                if len(active) > self.max_active:
+                    # Bounded memory: close the oldest candidate early (emitted if already complete)
+                    victim = active.pop(0)
+                    if victim.complete:
+                        incidents.append(victim.to_incident())
+        return incidents
+
+    def flush(self):
+        """
+        Close every open candidate at end of stream.
+        """
+        incidents = []
+        for rule in self.rules:
+            incidents.extend(c.to_incident() for c in self._active[rule.name] if c.complete)
+            self._active[rule.name] = []
+        return incidents
+
+    def run(self, events):
+        """
+        events: iterable of (epoch, line, source) in time order. Yields incidents.
+        """
+        for epoch, line, source in events:
+            yield from self.feed(epoch, line, source)
+        yield from self.flush()
+
+
+def _file_events(log_dir, file, start_epoch, end_epoch):
+    for epoch, line in iter_timed_lines(os.path.join(log_dir, file), start_epoch, end_epoch):
+        yield epoch, line, file
+
+
+def merged_log_events(log_dir, start_epoch=None, end_epoch=None):
+    """
+    One time-ordered (epoch, line, source) stream over every log file in log_dir.
+    """
+    files = sorted(f for f in os.listdir(log_dir) if f.endswith(LOG_EXTENSIONS))
+    streams = [_file_events(log_dir, file, start_epoch, end_epoch) for file in files]
+    return heapq.merge(*streams, key=lambda event: event[0])
+
+
+def write_incidents_to_csv(incidents, output_path):
+    with open(output_path, 'w', newline='') as csvfile:
+        fieldnames = ["rule", "category", "first_ts", "last_ts", "duration_sec", "steps", "member_count", "members"]
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        for incident in incidents:
+            writer.writerow({
+                "rule": incident["rule"],
+                "category": incident["category"],
+                "first_ts": incident["first_ts"].strftime("%Y-%m-%d %H:%M:%S"),
+                "last_ts": incident["last_ts"].strftime("%Y-%m-%d %H:%M:%S"),
+                "duration_sec": incident["duration_sec"],
+                "steps": ";".join(incident["steps"]),
+                "member_count": len(incident["members"]) + incident["dropped_members"],
+                "members": " | ".join(f"[{m['source']}] {m['line']}" for m in incident["members"]),
+            })
+
+
+@traced("log_correlation")
+def run_log_correlation(log_dir, rules_yaml=DEFAULT_RULES_PATH, start_time=None, end_time=None,
+                        margin_sec=0, time_offset_sec=0):
+    """
+    Correlate every log in log_dir (optionally only the test window) and write
+    log_incidents_<timestamp>.csv into it. Returns (incidents, csv_path).
+    """
+    print(f"🧩 Correlating events in {log_dir} using {rules_yaml}...")
+    engine = CorrelationEngine(load_correlation_rules(rules_yaml))
+    window = (None, None)
+    if start_time is not None and end_time is not None:
+        window = window_epochs(start_time, end_time, margin_sec, time_offset_sec)
+
+    incidents = sorted(engine.run(merged_log_events(log_dir, *window)), key=lambda i: (i["first_ts"], i["rule"]))
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_csv = os.path.join(log_dir, f"log_incidents_{timestamp}.csv")
+    write_incidents_to_csv(incidents, output_csv)
+    for incident in incidents:
+        print(f"🚨 {incident['category']}: {incident['first_ts']} -> {incident['last_ts']} "
+              f"({len(incident['members'])} line(s): {', '.join(incident['steps'])})")
+    print(f"✅ {len(incidents)} incident(s) written to {output_csv}")
+    return incidents, output_csv
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Correlate log events into incidents")
+    parser.add_argument("log_dir", help="Folder of collected logs, e.g. run_logs/logs_ap_20250411_171530")
+    parser.add_argument("--rules", default=DEFAULT_RULES_PATH, help="Correlation rules YAML")
+    args = parser.parse_args()
+
+    run_log_correlation(args.log_dir, args.rules)
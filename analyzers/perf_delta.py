@@ -0,0 +1,222 @@
+# perf_delta.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Before/after counter delta engine for the 'performance' stat.
+# Pairs the before_test and after_test snapshots of a run per client MAC and
+# computes per-client and aggregate goodput (Mbps over the measured window),
+# Tx retry % and the shift of the Tx MCS distribution during the test.
+#
+# Counters are laid out column-wise (one int64 array per counter, one slot per
+# client) and deltas are computed a whole column at a time. A counter that went
+# backwards is treated as a wrap of its width (COUNTER_BITS) when the old value
+# was in the top half of that range, otherwise as a reset (client re-associated /
+# AP reloaded), in which case the after value is the delta. The byte counters
+# are 64-bit and never wrap in practice, so for them a decrease is always a reset.
+
+import csv
+import glob
+import os
+from array import array
+from datetime import datetime
+
+from parsers.perstats_parser import clients_by_mac, parse_perstats_file
+from utils.blob_store import open_text
+from utils.tracing import traced
+
+COUNTERS = ("TxBytes", "RxBytes", "TxData", "RxData", "TxCumRetries", "TxFail", "TxDcrd", "RxErr")
+WRAP_32 = 2 ** 32
+# Counter widths in bits; counters not listed are 32-bit
+COUNTER_BITS = {"TxBytes": 64, "RxBytes": 64}
+DEFAULT_COUNTER_BITS = 32
+TIMESTAMP_HEADER = "# Timestamp:"
+
+
+def counter_deltas(before, after, bits=DEFAULT_COUNTER_BITS):
+    """
+    Column-wise delta of two int64 arrays of a counter that is bits wide.
+    Returns (deltas, events) where events holds '' / 'wrap' / 'reset' per slot.
+    """
+    # 64-bit counters would need centuries to wrap (and don't fit int64 past it): any decrease is a reset
+    wrap = 2 ** bits if bits < 64 else None
+    deltas = array("q", (a - b for b, a in zip(before, after)))
+    events = [""] * len(deltas)
+    for idx in (i for i, d in enumerate(deltas) if d < 0):
+        b, a = before[idx], after[idx]
+        if wrap and wrap // 2 <= b < wrap:
+            deltas[idx] = a + wrap - b
+            events[idx] = "wrap"
+        else:
+            deltas[idx] = a
+            events[idx] = "reset"
+    return deltas, events
+
+
+def _mcs_mean(hist):
+    total = sum(hist)
+    if not total:
+        return None
+    return sum(idx * count for idx, count in enumerate(hist)) / total
+
+
+def _mcs_delta(before_hist, after_hist):
+    size = max(len(before_hist), len(after_hist))
+    b = list(before_hist) + [0] * (size - len(before_hist))
+    a = list(after_hist) + [0] * (size - len(after_hist))
+    delta = [x - y for x, y in zip(a, b)]
+    # A reset makes the cumulative histogram go backwards; fall back to the after snapshot
+    return a if any(d < 0 for d in delta) else delta
+
+
+def snapshot_time(path):
+    """
+    Snapshot time from the '# Timestamp:' header written by collect_stat_block,
+    falling back to the file modification time (mock snapshots).
+    """
+    with open_text(path) as f:
+        first = f.readline()
+    if first.startswith(TIMESTAMP_HEADER):
+        try:
+            return datetime.strptime(first[len(TIMESTAMP_HEADER):].strip(), "%Y%m%d_%H%M%S")
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(os.path.getmtime(path))
+
+
+def find_phase_snapshots(perf_dir):
+    """
+    Return (before_path, after_path) for the newest before_test/after_test
+    performance snapshots in a stat folder, or (None, None).
+    """
+    files = sorted(glob.glob(os.path.join(perf_dir, "*.txt")), key=os.path.getmtime)
+    before = [f for f in files if "before_test" in os.path.basename(f)]
+    after = [f for f in files if "after_test" in os.path.basename(f)]
+    if before and after:
+        return before[-1], after[-1]
+    return None, None
+
+
+def compute_perf_delta(before_path, after_path, window_sec=None):
+    """
+    Pair two performance snapshots per client MAC.
+    window_sec defaults to the time between the two snapshots.
+    Returns {"window_sec", "clients": [rows], "aggregate": row}.
+    """
+    before = clients_by_mac(parse_perstats_file(before_path))
+    after = clients_by_mac(parse_perstats_file(after_path))
+    if window_sec is None:
+        window_sec = (snapshot_time(after_path) - snapshot_time(before_path)).total_seconds()
+    window_sec = max(float(window_sec), 1e-9)
+
+    macs = sorted(set(before) | set(after))
+    status = []
+    for mac in macs:
+        if mac in before and mac in after:
+            status.append("present")
+        elif mac in after:
+            status.append("appeared")
+        else:
+            status.append("disappeared")
+
+    def column(snapshot, counter):
+        return array("q", (
+            int(snapshot[mac].accumulated.get(counter, 0) or 0) if mac in snapshot else 0
+            for mac in macs
+        ))
+
+    deltas = {}
+    events = {}
+    for counter in COUNTERS:
+        deltas[counter], events[counter] = counter_deltas(column(before, counter), column(after, counter),
+                                                          COUNTER_BITS.get(counter, DEFAULT_COUNTER_BITS))
+
+    rows = []
+    for idx, mac in enumerate(macs):
+        if status[idx] == "disappeared":
+            # No after snapshot: nothing measurable for this client
+            for counter in COUNTERS:
+                deltas[counter][idx] = 0
+        tx_data = deltas["TxData"][idx]
+        retries = deltas["TxCumRetries"][idx]
+        b_hist = before[mac].mcs_distribution("tx", "msdu") if mac in before else []
+        a_hist = after[mac].mcs_distribution("tx", "msdu") if mac in after else []
+        test_hist = _mcs_delta(b_hist, a_hist) if mac in after else []
+        mcs_before = _mcs_mean(b_hist)
+        mcs_test = _mcs_mean(test_hist)
+        rows.append({
+            "mac": mac,
+            "status": status[idx],
+            "counter_events": ";".join(f"{c}:{events[c][idx]}" for c in COUNTERS if events[c][idx]),
+            **{f"d_{counter}": deltas[counter][idx] for counter in COUNTERS},
+            "tx_mbps": round(deltas["TxBytes"][idx] * 8 / window_sec / 1e6, 3),
+            "rx_mbps": round(deltas["RxBytes"][idx] * 8 / window_sec / 1e6, 3),
+            "tx_retry_pct": round(100.0 * retries / (tx_data + retries), 3) if tx_data + retries else 0.0,
+            "mcs_mean_before": round(mcs_before, 3) if mcs_before is not None else "",
+            "mcs_mean_test": round(mcs_test, 3) if mcs_test is not None else "",
+            "mcs_shift": round(mcs_test - mcs_before, 3) if mcs_test is not None and mcs_before is not None else "",
+            "tx_rate_after": after[mac].accumulated.get("TxRt(Mbps)", "") if mac in after else "",
+        })
+
+    total_tx = sum(deltas["TxBytes"])
+    total_rx = sum(deltas["RxBytes"])
+    total_data = sum(deltas["TxData"])
+    total_retries = sum(deltas["TxCumRetries"])
+    aggregate = {
+        "mac": "ALL",
+        "status": f"{len(macs)} client(s)",
+        "counter_events": "",
+        **{f"d_{counter}": sum(deltas[counter]) for counter in COUNTERS},
+        "tx_mbps": round(total_tx * 8 / window_sec / 1e6, 3),
+        "rx_mbps": round(total_rx * 8 / window_sec / 1e6, 3),
+        "tx_retry_pct": round(100.0 * total_retries / (total_data + total_retries), 3) if total_data + total_retries else 0.0,
+        "mcs_mean_before": "",
+        "mcs_mean_test": "",
+        "mcs_shift": "",
+        "tx_rate_after": "",
+    }
+    return {"window_sec": window_sec, "clients": rows, "aggregate": aggregate}
+
+
+def write_perf_delta_csv(result, output_path):
+    rows = result["clients"] + [result["aggregate"]]
+    with open(output_path, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    return output_path
+
+
+@traced("perf_delta")
+def run_perf_delta(stats_dir, window_sec=None):
+    """
+    Compute deltas for a run's stats folder (run_logs/<timestamp_dir>), including
+    per-device subfolders written by fan-out collection. Returns the CSV paths written.
+    """
+    perf_dirs = sorted(
+        {os.path.dirname(p) for p in glob.glob(os.path.join(stats_dir, "**", "performance", "*.txt"), recursive=True)}
+    )
+    outputs = []
+    for perf_dir in perf_dirs:
+        before_path, after_path = find_phase_snapshots(perf_dir)
+        if not before_path:
+            print(f"⚠️ No before/after performance snapshot pair in {perf_dir}. Skipping.")
+            continue
+        result = compute_perf_delta(before_path, after_path, window_sec)
+        output_csv = os.path.join(perf_dir, f"perf_delta_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+        write_perf_delta_csv(result, output_csv)
+        agg = result["aggregate"]
+        print(f"📊 {perf_dir}: {agg['status']} over {result['window_sec']:.0f}s | "
+              f"Tx {agg['tx_mbps']} Mbps | Rx {agg['rx_mbps']} Mbps | retry {agg['tx_retry_pct']}%")
+        print(f"✅ Delta written to {output_csv}")
+        outputs.append(output_csv)
+    return outputs
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Compute before/after performance deltas for a run")
+    parser.add_argument("stats_dir", help="Run stats folder, e.g. run_logs/ap_stats_20250411_171530")
+    parser.add_argument("--window", type=float, default=None, help="Test window in seconds (default: snapshot span)")
+    args = parser.parse_args()
+
+    run_perf_delta(args.stats_dir, args.window)
@@ -0,0 +1,276 @@
+# series_store.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Compact columnar store for collected CPU/memory time series.
+# A SeriesBuffer keeps an int64 epoch column plus fixed-dtype float64 value
+# columns in typed arrays. It saves to a binary layout that loads back
+# zero-copy through mmap:
+#
+#   b"APSERIES1\n" | uint32 header length | JSON header | padding to 8 bytes |
+#   epoch (int64 x rows) | column 0 (float64 x rows) | column 1 ...
+#
+# Summaries (min/max/mean/percentiles) and bucket resampling work on whole
+# column slices located by binary search on the epoch column, never row by row.
+#
+# The columns are stdlib array/mmap rather than numpy arrays, so the store adds
+# no dependency. A buffer loaded through mmap reads the file in place; its
+# first append() copies the columns into arrays, after which it is an ordinary
+# in-memory buffer (the file itself is only changed by save()).
+#
+# The run catalog reads its cpu/memory metrics through load_series(), so the
+# first scan of a run leaves a .series file next to each CSV and later scans
+# map that instead of parsing the CSV again.
+
+import csv
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+
+from utils.stats_math import percentile
+
+MAGIC = b"APSERIES1\n"
+SERIES_EXTENSION = ".series"
+CSV_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+EPOCH_TYPECODE = "q"
+VALUE_TYPECODE = "d"
+
+
+class SeriesBuffer:
+    def __init__(self, columns, epoch=None, values=None):
+        self.columns = list(columns)
+        self.epoch = epoch if epoch is not None else array(EPOCH_TYPECODE)
+        self.values = values if values is not None else {c: array(VALUE_TYPECODE) for c in self.columns}
+        self._mmap = None
+
+    def __len__(self):
+        return len(self.epoch)
+
+    def append(self, epoch, values):
+        """
+        values: sequence in column order or dict keyed by column; missing values become NaN.
+        """
+        if isinstance(values, dict):
+            values = [values.get(c) for c in self.columns]
+        if self._mmap is not None:
+            self._detach()
+        self.epoch.append(int(epoch))
+        for column, value in zip(self.columns, values):
+            self.values[column].append(math.nan if value in (None, "") else float(value))
+
+    def _detach(self):
+        # mmap-loaded columns are read-only views of the file; copy them before the first write
+        epoch = array(EPOCH_TYPECODE)
+        epoch.frombytes(self.epoch.cast("B"))
+        values = {}
+        for c in self.columns:
+            values[c] = array(VALUE_TYPECODE)
+            values[c].frombytes(self.values[c].cast("B"))
+        self.epoch, self.values, self._mmap = epoch, values, None
+
+    def column(self, name):
+        return self.values[name]
+
+    def index_range(self, start_epoch=None, end_epoch=None):
+        # Epochs are appended in time order, so a window is one contiguous slice
+        lo = 0 if start_epoch is None else bisect_left(self.epoch, start_epoch)
+        hi = len(self.epoch) if end_epoch is None else bisect_left(self.epoch, end_epoch + 1)
+        return lo, hi
+
+    def window(self, start_epoch=None, end_epoch=None):
+        lo, hi = self.index_range(start_epoch, end_epoch)
+        return SeriesBuffer(
+            self.columns,
+            array(EPOCH_TYPECODE, self.epoch[lo:hi]),
+            {c: array(VALUE_TYPECODE, self.values[c][lo:hi]) for c in self.columns},
+        )
+
+    def save(self, path):
+        header = json.dumps({
+            "columns": self.columns,
+            "rows": len(self.epoch),
+            "epoch_typecode": EPOCH_TYPECODE,
+            "value_typecode": VALUE_TYPECODE,
+            "byteorder": sys.byteorder,
+        }).encode()
+        prefix_len = len(MAGIC) + 4 + len(header)
+        padding = b" " * (-prefix_len % 8)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(header) + len(padding)))
+            f.write(header + padding)
+            f.write(array(EPOCH_TYPECODE, self.epoch).tobytes())
+            for c in self.columns:
+                f.write(array(VALUE_TYPECODE, self.values[c]).tobytes())
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path, use_mmap=True):
+        """
+        Load a .series file. With use_mmap the columns are memoryviews over the
+        mapped file (zero-copy) until the first append(); otherwise they are
+        copied into arrays.
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"❌ Not a series file: {path}")
+            (header_len,) = struct.unpack("<I", f.read(4))
+            meta = json.loads(f.read(header_len).decode())
+            offset = len(MAGIC) + 4 + header_len
+            rows = meta["rows"]
+            if meta["byteorder"] != sys.byteorder:
+                use_mmap = False
+
+            if use_mmap and rows:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                view = memoryview(mm)
+                epoch = view[offset:offset + rows * 8].cast(EPOCH_TYPECODE)
+                offset += rows * 8
+                values = {}
+                for c in meta["columns"]:
+                    values[c] = view[offset:offset + rows * 8].cast(VALUE_TYPECODE)
+                    offset += rows * 8
+                buf = cls(meta["columns"], epoch, values)
+                buf._mmap = mm
+                return buf
+
+            f.seek(offset)
+            epoch = array(EPOCH_TYPECODE)
+            epoch.fromfile(f, rows)
+            values = {}
+            for c in meta["columns"]:
+                values[c] = array(VALUE_TYPECODE)
+                values[c].fromfile(f, rows)
+            if meta["byteorder"] != sys.byteorder:
+                epoch.byteswap()
+                for col in values.values():
+                    col.byteswap()
+            return cls(meta["columns"], epoch, values)
+
+    @classmethod
+    def from_csv(cls, path, timestamp_format=CSV_TIMESTAMP_FORMAT):
+        with open(path, newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header:
+                return cls([])
+            buf = cls(header[1:])
+            for row in reader:
+                if len(row) != len(header):
+                    continue
+                epoch = int(datetime.strptime(row[0], timestamp_format).timestamp())
+                buf.append(epoch, row[1:])
+        return buf
+
+
+def load_series(path, cache=True):
+    """
+    Load a series from a .series file or a collected CSV. For CSVs a sibling
+    .series file is written on first load and reused while it is newer than the CSV.
+    """
+    if path.endswith(SERIES_EXTENSION):
+        return SeriesBuffer.load(path)
+    cached = os.path.splitext(path)[0] + SERIES_EXTENSION
+    if cache and os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(path):
+        return SeriesBuffer.load(cached)
+    buf = SeriesBuffer.from_csv(path)
+    if cache:
+        try:
+            buf.save(cached)
+        except OSError as e:
+            print(f"⚠️ Could not cache {path} as {SERIES_EXTENSION}: {e}")
+    return buf
+
+
+def _finite(values):
+    # sum() is a C loop; only fall back to filtering when a NaN is present
+    if not math.isnan(sum(values)):
+        return values
+    return array(VALUE_TYPECODE, [v for v in values if v == v])
+
+
+def summarize_column(values, percentiles=(50, 95, 99)):
+    values = _finite(values)
+    if not len(values):
+        return {"count": 0, "min": None, "max": None, "mean": None,
+                **{f"p{q}": None for q in percentiles}}
+    ordered = sorted(values)
+    return {
+        "count": len(values),
+        "min": ordered[0],
+        "max": ordered[-1],
+        "mean": math.fsum(values) / len(values),
+        **{f"p{q}": percentile(ordered, q) for q in percentiles},
+    }
+
+
+def summarize(buf, start_epoch=None, end_epoch=None, percentiles=(50, 95, 99)):
+    """
+    Per-column summary over an optional [start_epoch, end_epoch] window.
+    """
+    lo, hi = buf.index_range(start_epoch, end_epoch)
+    return {c: summarize_column(buf.values[c][lo:hi], percentiles) for c in buf.columns}
+
+
+def resample(buf, bucket_sec, how="mean"):
+    """
+    Downsample into fixed buckets aligned to multiples of bucket_sec.
+    how: mean | min | max | last
+    """
+    out = SeriesBuffer(buf.columns)
+    if not len(buf):
+        return out
+    reducers = {
+        "mean": lambda v: math.fsum(v) / len(v),
+        "min": min,
+        "max": max,
+        "last": lambda v: v[-1],
+    }
+    reduce = reducers[how]
+    bucket_start = buf.epoch[0] - buf.epoch[0] % bucket_sec
+    last_epoch = buf.epoch[-1]
+    lo = 0
+    while bucket_start <= last_epoch:
+        hi = bisect_left(buf.epoch, bucket_start + bucket_sec, lo)
+        if hi > lo:
+            row = []
+            for c in buf.columns:
+                values = _finite(buf.values[c][lo:hi])
+                row.append(reduce(values) if len(values) else math.nan)
+            out.append(bucket_start, row)
+            lo = hi
+            bucket_start += bucket_sec
+        else:
+            # Jump straight to the bucket holding the next sample
+            next_epoch = buf.epoch[lo]
+            bucket_start = next_epoch - next_epoch % bucket_sec
+    return out
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Convert and summarize collected CPU/memory series")
+    parser.add_argument("paths", nargs='+', help="cpu_usage.csv / memory_usage.csv or .series files")
+    parser.add_argument("--resample", type=int, default=0, help="Print a resampled series with this bucket size (s)")
+    args = parser.parse_args()
+
+    for path in args.paths:
+        buf = load_series(path)
+        print(f"\n📈 {path} ({len(buf)} samples)")
+        for column, stats in summarize(buf).items():
+            print(f"  - {column}: " + ", ".join(
+                f"{k}={round(v, 2) if isinstance(v, float) else v}" for k, v in stats.items()))
+        if args.resample:
+            res = resample(buf, args.resample)
+            for i in range(len(res)):
+                ts = datetime.fromtimestamp(res.epoch[i]).strftime(CSV_TIMESTAMP_FORMAT)
+                print(f"    {ts} " + " ".join(f"{res.values[c][i]:.1f}" for c in res.columns))
@@ -0,0 +1,418 @@
+# bench.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Benchmark suite for the analyzers and collectors at production scale.
+# Workloads come from benchmarks/workloads.py (seeded, so every run measures the
+# same data). Each benchmark is timed over several rounds after a warmup, and
+# peak Python allocations are taken in a separate traced round so tracing does
+# not skew the timings. Results are saved as JSON under run_logs/benchmarks/
+# and two result files can be compared to flag regressions.
+#
+# Usage:
+#   python -m benchmarks.bench run --scale smoke
+#   python -m benchmarks.bench run --scale large --only analyze_log_file run_log_analysis
+#   python -m benchmarks.bench run --only fleet_stats_collection   (simulated APs, needs pyATS)
+#   python -m benchmarks.bench compare baseline.json current.json --tolerance 0.15
+
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from threading import Event, Timer
+
+import yaml
+
+from benchmarks.workloads import (
+    ap_names,
+    generate_catalog_workload,
+    generate_log_workload,
+    generate_perstats_workload,
+    generate_series_workload,
+    write_bench_testbed,
+)
+
+RESULTS_DIR = os.path.join("run_logs", "benchmarks")
+DEFAULT_TOLERANCE = 0.10
+# Stat commands the simulated APs (simulator/sim_commands.yaml) answer from mock_samples
+BENCH_COMMANDS = {
+    "version": "show version",
+    "performance": "sh interfaces dot11Radio 3 mumimo client BE:43:ED:D3:B7:30",
+    "cpu": "sh processes cpu {}",
+    "memory": "sh memory summary",
+}
+SCALES = {
+    "smoke": {"aps": 2, "log_bytes": 512 * 1024, "dumps": 5, "clients": 4, "days": 0.25,
+              "during_sec": 3, "repeat": 3, "warmup": 1, "runs": 2000},
+    "default": {"aps": 4, "log_bytes": 64 * 1024 * 1024, "dumps": 250, "clients": 16, "days": 7,
+                "during_sec": 10, "repeat": 5, "warmup": 1, "runs": 20000},
+    "large": {"aps": 16, "log_bytes": 1024 * 1024 * 1024, "dumps": 1000, "clients": 64, "days": 30,
+              "during_sec": 30, "repeat": 3, "warmup": 1, "runs": 100000},
+}
+
+
+def _max_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def measure(fn, *args, repeat=5, warmup=1, track_memory=True, **kwargs):
+    """
+    Time fn(*args, **kwargs) over 'repeat' rounds after 'warmup' untimed rounds.
+    Returns timing stats in seconds, plus the peak traced allocation of one
+    extra round when track_memory is set.
+    """
+    for _ in range(warmup):
+        fn(*args, **kwargs)
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args, **kwargs)
+        timings.append(time.perf_counter() - t0)
+
+    result = {
+        "rounds": repeat,
+        "min": min(timings),
+        "max": max(timings),
+        "mean": statistics.fmean(timings),
+        "median": statistics.median(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+    if track_memory:
+        tracemalloc.start()
+        try:
+            fn(*args, **kwargs)
+            result["peak_alloc_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        finally:
+            tracemalloc.stop()
+    result["max_rss_mb"] = _max_rss_mb()
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Workload preparation
+# ---------------------------------------------------------------------------
+
+def prepare_workloads(data_dir, scale, seed=1):
+    """
+    Generate (or reuse) the workloads of a scale preset under data_dir.
+    A marker file records the parameters so a matching set is not rebuilt.
+    """
+    params = {k: scale[k] for k in ("aps", "log_bytes", "dumps", "clients", "days")}
+    marker = os.path.join(data_dir, "workload.json")
+    if os.path.exists(marker):
+        with open(marker, 'r') as f:
+            if json.load(f) == {"seed": seed, **params}:
+                print(f"♻️ Reusing workloads in {data_dir}")
+                return data_dir
+        shutil.rmtree(data_dir)
+
+    print(f"🏗️ Generating workloads in {data_dir} ({params})...")
+    os.makedirs(data_dir, exist_ok=True)
+    generate_log_workload(os.path.join(data_dir, "logs"), num_aps=params["aps"],
+                          bytes_per_ap=params["log_bytes"], seed=seed)
+    generate_perstats_workload(os.path.join(data_dir, "stats"), num_aps=params["aps"],
+                               dumps_per_ap=params["dumps"], clients_per_dump=params["clients"], seed=seed)
+    generate_series_workload(os.path.join(data_dir, "stats"), num_aps=params["aps"], days=params["days"], seed=seed)
+    with open(marker, 'w') as f:
+        json.dump({"seed": seed, **params}, f)
+    return data_dir
+
+
+def _first_log(data_dir):
+    log_dir = os.path.join(data_dir, "logs", f"logs_{ap_names(1)[0]}")
+    return log_dir, os.path.join(log_dir, sorted(os.listdir(log_dir))[0])
+
+
+def _clear_analysis_outputs(log_dir):
+    for file in os.listdir(log_dir):
+        if file.startswith("log_analysis_summary_"):
+            os.remove(os.path.join(log_dir, file))
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks: each returns (callable, args, info) for measure()
+# ---------------------------------------------------------------------------
+
+def bench_analyze_log_file(data_dir, scale):
+    from utils.log_analyzer import get_matcher, load_patterns, analyze_log_file
+    _, path = _first_log(data_dir)
+    matcher = get_matcher(load_patterns())
+    return analyze_log_file, (path, matcher), {"bytes": os.path.getsize(path)}
+
+
+def bench_analyze_log_window(data_dir, scale):
+    from utils.log_analyzer import get_matcher, load_patterns, analyze_log_file
+    from utils.log_index import get_index
+    _, path = _first_log(data_dir)
+    index = get_index(path)
+    # A 5-minute test window in the middle of the capture
+    mid = index.epochs[len(index) // 2]
+    matcher = get_matcher(load_patterns())
+    return (lambda: analyze_log_file(path, matcher, (mid - 150, mid + 150))), (), {"bytes": os.path.getsize(path)}
+
+
+def bench_run_log_analysis(data_dir, scale):
+    from utils.log_analyzer import run_log_analysis
+    log_dir, _ = _first_log(data_dir)
+
+    def run():
+        run_log_analysis(log_dir)
+        _clear_analysis_outputs(log_dir)
+    size = sum(os.path.getsize(os.path.join(log_dir, f)) for f in os.listdir(log_dir))
+    return run, (), {"bytes": size}
+
+
+def bench_parse_perstats(data_dir, scale):
+    from parsers.perstats_parser import parse_perstats_file
+    perf_dir = os.path.join(data_dir, "stats", ap_names(1)[0], "performance")
+    paths = [os.path.join(perf_dir, f) for f in sorted(os.listdir(perf_dir))]
+
+    def run():
+        for path in paths:
+            parse_perstats_file(path)
+    return run, (), {"files": len(paths), "clients_per_file": scale["clients"]}
+
+
+def bench_series_summary(data_dir, scale):
+    from analyzers.series_store import SeriesBuffer, summarize
+    from collectors.timeseries_writer import SERIES_FILENAMES
+    path = os.path.join(data_dir, "stats", ap_names(1)[0], "cpu", SERIES_FILENAMES["cpu"])
+
+    def run():
+        summarize(SeriesBuffer.from_csv(path))
+    return run, (), {"days": scale["days"]}
+
+
+def bench_run_catalog_query(data_dir, scale):
+    from utils.run_catalog import RunCatalog
+    db_path = os.path.join(data_dir, f"run_catalog_{scale['runs']}.sqlite")
+    if not os.path.exists(db_path):
+        print(f"🏗️ Building a {scale['runs']}-run catalog in {db_path}...")
+        generate_catalog_workload(db_path, scale["runs"])
+    catalog = RunCatalog(db_path, root=data_dir)
+    # "6G 80MHz UDP DL runs on one AP over a month", a metric threshold, and the newest runs
+    month_start = datetime(2025, 5, 1).timestamp()
+    queries = [
+        {"params": [("radio_band", "=", "6G"), ("bandwidth", "=", "80MHz"), ("traffic_type", "=", "UDP"),
+                    ("direction", "=", "DL")], "devices": [ap_names(1)[0]],
+         "since": month_start, "until": month_start + 30 * 86400},
+        {"params": [("nss", ">=", "2")], "metrics": [("tx_mbps", ">", "2000")], "limit": 50},
+        {"limit": 100},
+    ]
+
+    def run():
+        for query in queries:
+            catalog.query(**query)
+    return run, (), {"runs": scale["runs"], "queries": len(queries), "cleanup": catalog.close}
+
+
+def _bench_testbed(data_dir, scale):
+    return write_bench_testbed(os.path.join(data_dir, "testbed.yaml"), scale["aps"])
+
+
+def _prime_commands(device_names):
+    # Pre-fill command lists so the collectors never prompt
+    from collectors.stats_collector import STAT_COMMAND_CACHE
+    from collectors.stats_runner import load_stats_schema
+    for device_name in device_names:
+        for stat_name, config in load_stats_schema().items():
+            STAT_COMMAND_CACHE[f"{device_name}_{stat_name}"] = [
+                BENCH_COMMANDS.get(stat_name, f"show {stat_name}").format(i) for i in range(config.get("cmd_num", 1))
+            ]
+
+
+def bench_run_stats_collection(data_dir, scale):
+    from collectors.stats_runner import run_stats_collection
+    testbed = _bench_testbed(data_dir, scale)
+    device = ap_names(1)[0]
+    _prime_commands([device])
+    out_dir = os.path.join("benchmarks", f"collect_{os.getpid()}")
+
+    def run():
+        run_stats_collection("before_test", testbed_path=testbed, device_name=device, mock=True,
+                             timestamp_dir=out_dir)
+    return run, (), {"devices": 1}
+
+
+def bench_run_during_test_stats(data_dir, scale):
+    import collectors.stats_runner as stats_runner
+    testbed = _bench_testbed(data_dir, scale)
+    device = ap_names(1)[0]
+    _prime_commands([device])
+    out_dir = os.path.join("benchmarks", f"during_{os.getpid()}")
+
+    # Same schema, but 1 s ticks so a short run still takes many samples
+    schema = stats_runner.load_stats_schema()
+    for config in schema.values():
+        during = config.get("collection", {}).get("during_test", {})
+        if during.get("enabled"):
+            during["interval_sec"] = 1
+    schema_path = os.path.join(data_dir, "stats_schema_bench.yaml")
+    with open(schema_path, 'w') as f:
+        yaml.safe_dump(schema, f)
+
+    def run():
+        original = stats_runner.STATS_SCHEMA_PATH
+        stats_runner.STATS_SCHEMA_PATH = schema_path
+        stop_event = Event()
+        timer = Timer(scale["during_sec"], stop_event.set)
+        timer.start()
+        try:
+            report = stats_runner.run_during_test_stats(datetime.now(), stop_event, testbed_path=testbed,
+                                                        device_name=device, mock=True, timestamp_dir=out_dir)
+        finally:
+            timer.cancel()
+            stats_runner.STATS_SCHEMA_PATH = original
+        return report
+    return run, (), {"duration_sec": scale["during_sec"], "interval_sec": 1}
+
+
+def bench_fleet_stats_collection(data_dir, scale):
+    # Real connect/execute path against simulated APs on localhost (needs pyATS)
+    from collection.session_pool import SESSION_POOL
+    from collectors.stats_runner import run_stats_collection_fanout
+    from simulator.fleet import SimulatedFleet
+    fleet = SimulatedFleet(scale["aps"], {"latency_ms": 20, "jitter_ms": 10}).start()
+    testbed = fleet.write_testbed(os.path.join(data_dir, "fleet_testbed.yaml"))
+    _prime_commands(ap_names(scale["aps"]))
+    out_dir = os.path.join("benchmarks", f"fleet_{os.getpid()}")
+
+    def run():
+        run_stats_collection_fanout("before_test", testbed_path=testbed, mock=False, timestamp_dir=out_dir)
+    return run, (), {"devices": scale["aps"], "cleanup": lambda: (SESSION_POOL.close_all(), fleet.stop())}
+
+
+BENCHMARKS = {
+    "analyze_log_file": bench_analyze_log_file,
+    "analyze_log_window": bench_analyze_log_window,
+    "run_log_analysis": bench_run_log_analysis,
+    "parse_perstats": bench_parse_perstats,
+    "series_summary": bench_series_summary,
+    "run_catalog_query": bench_run_catalog_query,
+    "run_stats_collection": bench_run_stats_collection,
+    "run_during_test_stats": bench_run_during_test_stats,
+    "fleet_stats_collection": bench_fleet_stats_collection,
+}
+# Only run when asked for with --only
+OPTIONAL = {"fleet_stats_collection"}
+# Wall-clock bound by the schedule, not by the code: one round is enough
+SINGLE_ROUND = {"run_during_test_stats"}
+
+
+def run_benchmarks(scale_name="smoke", only=None, seed=1, data_dir=None, output_path=None):
+    """
+    Run the selected benchmarks on the workloads of a scale preset and save the
+    results JSON. Returns (results, output_path).
+    """
+    scale = SCALES[scale_name]
+    data_dir = data_dir or os.path.join(RESULTS_DIR, f"data_{scale_name}")
+    prepare_workloads(data_dir, scale, seed)
+
+    results = {
+        "scale": scale_name,
+        "seed": seed,
+        "started": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": {},
+    }
+    for name, setup in BENCHMARKS.items():
+        if (only and name not in only) or (not only and name in OPTIONAL):
+            continue
+        print(f"\n⏱️ Benchmark: {name}")
+        fn, args, info = setup(data_dir, scale)
+        cleanup = info.pop("cleanup", None)
+        try:
+            if name in SINGLE_ROUND:
+                stats = measure(fn, *args, repeat=1, warmup=0, track_memory=False)
+            else:
+                stats = measure(fn, *args, repeat=scale["repeat"], warmup=scale["warmup"])
+        finally:
+            if cleanup:
+                cleanup()
+        if "bytes" in info:
+            stats["mb_per_sec"] = round(info["bytes"] / (1024 * 1024) / stats["median"], 2)
+        results["benchmarks"][name] = {**info, **stats}
+        print(f"✅ {name}: median {stats['median']:.4f}s (min {stats['min']:.4f}s, "
+              f"peak {stats.get('peak_alloc_mb', '-')} MB)")
+
+    if output_path is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path = os.path.join(RESULTS_DIR, f"bench_{scale_name}_{timestamp}.json")
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📄 Benchmark results saved to {output_path}")
+    return results, output_path
+
+
+def compare_results(baseline, current, tolerance=DEFAULT_TOLERANCE, metric="median"):
+    """
+    Compare two results dicts benchmark by benchmark.
+    Returns rows of (name, baseline, current, ratio, status) where status is
+    'regression' / 'improved' / 'ok' / 'missing'.
+    """
+    rows = []
+    for name, base in baseline.get("benchmarks", {}).items():
+        cur = current.get("benchmarks", {}).get(name)
+        if cur is None:
+            rows.append((name, base[metric], None, None, "missing"))
+            continue
+        ratio = cur[metric] / base[metric] if base[metric] else float("inf")
+        if ratio > 1 + tolerance:
+            status = "regression"
+        elif ratio < 1 - tolerance:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append((name, base[metric], cur[metric], ratio, status))
+    return rows
+
+
+def print_comparison(rows):
+    icons = {"regression": "❌", "improved": "🚀", "ok": "✅", "missing": "⚠️"}
+    print("\n📊 Benchmark comparison:")
+    for name, base, cur, ratio, status in rows:
+        if cur is None:
+            print(f"  {icons[status]} {name}: missing from current results")
+        else:
+            print(f"  {icons[status]} {name}: {base:.4f}s -> {cur:.4f}s ({ratio:.2f}x)")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark analyzers and collectors on synthetic workloads")
+    sub = parser.add_subparsers(dest="action", required=True)
+
+    run_parser = sub.add_parser("run", help="Run benchmarks and save results JSON")
+    run_parser.add_argument("--scale", choices=sorted(SCALES), default="smoke")
+    run_parser.add_argument("--only", nargs='+', choices=sorted(BENCHMARKS), help="Benchmarks to run")
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("--data-dir", default=None, help="Workload folder (reused if it matches)")
+    run_parser.add_argument("--output", default=None, help="Results JSON path")
+
+    cmp_parser = sub.add_parser("compare", help="Compare two results JSON files")
+    cmp_parser.add_argument("baseline")
+    cmp_parser.add_argument("current")
+    cmp_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                            help="Allowed slowdown ratio before flagging a regression")
+    args = parser.parse_args()
+
+    if args.action == "run":
+        run_benchmarks(args.scale, args.only, args.seed, args.data_dir, args.output)
+    else:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        with open(args.current, 'r') as f:
+            current = json.load(f)
+        rows = compare_results(baseline, current, args.tolerance)
+        print_comparison(rows)
+        sys.exit(1 if any(row[4] == "regression" for row in rows) else 0)
@@ -0,0 +1,244 @@
+# workloads.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Seeded, reproducible synthetic workloads at production scale, built on the
+# mock generators (utils/log_generator, collectors/stats_generator and the
+# mock_samples files):
+#   - syslog files of any size (multi-GB) for N simulated APs, mostly routine
+#     chatter with the correlated failure chains injected at a given rate
+#   - per-client perstats dumps (N clients per dump, counters growing per dump)
+#   - multi-day CPU/memory series in the collectors' CSV layout
+#   - run catalogs with tens of thousands of indexed runs (utils/run_catalog)
+# Everything is streamed to disk, so memory stays flat whatever the size.
+# The same seed always produces byte-identical output.
+
+import csv
+import os
+import random
+import re
+from datetime import datetime, timedelta
+
+from collectors.stats_generator import SAMPLE_DIR
+from collectors.timeseries_writer import SERIES_FIELDS, SERIES_FILENAMES
+from utils.log_generator import LOG_TEMPLATES
+from utils.log_store import LogWriter, log_filename
+from utils.test_schemas import TEST_SCHEMAS
+
+DEFAULT_START = datetime(2025, 4, 11, 0, 0, 0)
+WRITE_BATCH_LINES = 10000
+ROUTINE_MESSAGES = [
+    "ap-dot11: Client {mac} associated on wlan{radio} (rssi -{rssi})",
+    "ap-dot11: Client {mac} disassociated from wlan{radio}, reason 8",
+    "ap-dhcp: Lease renewed for {mac}",
+    "ap-capwap: Echo response received from controller",
+    "ap-radio: wlan{radio} channel utilization {util}%",
+    "ap-auth: WPA3 SAE handshake completed for {mac}",
+    "ap-rrm: Tx power for wlan{radio} set to {util} dBm",
+]
+ACCUMULATED_HEADER = "Client Accumulated Stats:"
+CATALOG_CHOICES = {
+    "radio_band": ["2.4G", "5G", "6G"],
+    "bandwidth": ["20MHz", "40MHz", "80MHz", "160MHz"],
+    "traffic_type": ["UDP", "TCP"],
+    "direction": ["DL", "UL", "BIDIR"],
+    "nss": [1, 2, 4],
+    "wifi_standard": ["11ac", "11ax", "11be"],
+    "client_type": ["windows_intel", "android_qca", "macos_broadcom"],
+}
+
+
+def ap_names(num_aps):
+    return [f"ap{i + 1:03d}" for i in range(num_aps)]
+
+
+def _random_mac(rng):
+    return ":".join(f"{rng.randrange(256):02X}" for _ in range(6))
+
+
+def _routine_line(rng, macs):
+    template = rng.choice(ROUTINE_MESSAGES)
+    return template.format(mac=rng.choice(macs), radio=rng.randrange(3), rssi=rng.randint(30, 80),
+                           util=rng.randint(1, 99))
+
+
+def generate_log_workload(output_dir, num_aps=1, bytes_per_ap=64 * 1024 * 1024, files_per_ap=1, seed=1,
+                          start_time=DEFAULT_START, lines_per_sec=20, incident_rate=0.0005, compression=None):
+    """
+    Write time-ordered syslog files under output_dir/logs_<ap>/ until each AP
+    holds about bytes_per_ap. Returns {ap: [paths]}.
+    incident_rate: probability per line of injecting one correlated failure chain.
+    """
+    rng = random.Random(seed)
+    macs = [_random_mac(rng) for _ in range(64)]
+    chains = list(LOG_TEMPLATES.values())
+    outputs = {}
+    for ap in ap_names(num_aps):
+        log_dir = os.path.join(output_dir, f"logs_{ap}")
+        os.makedirs(log_dir, exist_ok=True)
+        outputs[ap] = []
+        for file_idx in range(files_per_ap):
+            writer = LogWriter(log_filename(log_dir, file_idx + 1, "show logging"), compression=compression)
+            target = bytes_per_ap // files_per_ap
+            line_no = 0
+            stamp_sec = -1
+            stamp = ""
+            batch = []
+            while writer.text_bytes < target:
+                sec = line_no // lines_per_sec
+                if sec != stamp_sec:
+                    stamp_sec = sec
+                    stamp = (start_time + timedelta(seconds=sec)).strftime("%b %d %H:%M:%S")
+                if rng.random() < incident_rate:
+                    batch.extend(f"{stamp} {message}" for message in rng.choice(chains))
+                else:
+                    batch.append(f"{stamp} {_routine_line(rng, macs)}")
+                line_no += 1
+                if len(batch) >= WRITE_BATCH_LINES:
+                    writer.write("\n".join(batch) + "\n")
+                    batch = []
+            if batch:
+                writer.write("\n".join(batch) + "\n")
+            outputs[ap].append(writer.close())
+    return outputs
+
+
+def _perstats_template():
+    with open(os.path.join(SAMPLE_DIR, "perstats.txt"), 'r') as f:
+        text = f.read()
+    mac = re.search(r"mumimo client (\S+)", text).group(1)
+    return text, mac
+
+
+def _scale_accumulated(text, mac, factor):
+    # Grow every integer counter on the accumulated row so before/after deltas stay positive
+    lines = text.split("\n")
+    for i, line in enumerate(lines):
+        if line.startswith(ACCUMULATED_HEADER):
+            for j in range(i + 1, min(i + 4, len(lines))):
+                if lines[j].strip().startswith(mac):
+                    lines[j] = re.sub(
+                        r"(?<=\s)(\d{2,})(?=\s)",
+                        lambda m: str(int(int(m.group(1)) * factor)),
+                        lines[j],
+                    )
+                    break
+            break
+    return "\n".join(lines)
+
+
+def generate_perstats_workload(output_dir, num_aps=1, dumps_per_ap=100, clients_per_dump=8, seed=1,
+                               start_time=DEFAULT_START, interval_sec=60):
+    """
+    Write performance dumps under output_dir/<ap>/performance/, each holding
+    clients_per_dump client blocks from mock_samples/perstats.txt with their own
+    MACs and counters that grow from dump to dump. Returns {ap: [paths]}.
+    """
+    rng = random.Random(seed)
+    template, template_mac = _perstats_template()
+    outputs = {}
+    for ap in ap_names(num_aps):
+        perf_dir = os.path.join(output_dir, ap, "performance")
+        os.makedirs(perf_dir, exist_ok=True)
+        macs = [_random_mac(rng) for _ in range(clients_per_dump)]
+        growth = [1.0] * clients_per_dump
+        outputs[ap] = []
+        for dump in range(dumps_per_ap):
+            stamp = (start_time + timedelta(seconds=dump * interval_sec)).strftime("%Y%m%d_%H%M%S")
+            blocks = []
+            for c, mac in enumerate(macs):
+                growth[c] += rng.uniform(0.001, 0.02)
+                block = _scale_accumulated(template, template_mac, growth[c]) if dump else template
+                blocks.append(block.replace(template_mac, mac))
+            path = os.path.join(perf_dir, f"performance_stats_{dump:05d}_{stamp}.txt")
+            with open(path, 'w') as f:
+                f.write(f"# Timestamp: {stamp}\n\n" + "\n".join(blocks))
+            outputs[ap].append(path)
+    return outputs
+
+
+def generate_series_workload(output_dir, num_aps=1, days=1.0, interval_sec=60, seed=1, start_time=DEFAULT_START):
+    """
+    Write cpu_usage.csv / memory_usage.csv under output_dir/<ap>/<stat>/ covering
+    'days' of samples as a bounded random walk. Returns {ap: {stat: path}}.
+    """
+    rng = random.Random(seed)
+    samples = int(days * 86400 // interval_sec)
+    outputs = {}
+    for ap in ap_names(num_aps):
+        outputs[ap] = {}
+        for stat, fields in SERIES_FIELDS.items():
+            stat_dir = os.path.join(output_dir, ap, stat)
+            os.makedirs(stat_dir, exist_ok=True)
+            path = os.path.join(stat_dir, SERIES_FILENAMES[stat])
+            values = [rng.uniform(20, 60) if stat == "cpu" else rng.uniform(300, 800) for _ in fields[1:]]
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(fields)
+                for i in range(samples):
+                    ts = (start_time + timedelta(seconds=i * interval_sec)).strftime("%Y-%m-%d %H:%M:%S")
+                    if stat == "cpu":
+                        values = [min(100.0, max(0.0, v + rng.gauss(0, 5))) for v in values]
+                        writer.writerow([ts] + [round(v) for v in values])
+                    else:
+                        free = min(900.0, max(50.0, values[0] + rng.gauss(0, 10)))
+                        values = [free, free + rng.uniform(100, 300)]
+                        writer.writerow([ts] + [int(v) for v in values])
+            outputs[ap][stat] = path
+    return outputs
+
+
+def generate_catalog_workload(db_path, num_runs=20000, num_aps=16, seed=1, start_time=DEFAULT_START,
+                              runs_per_day=200):
+    """
+    Fill a run catalog with num_runs performance runs spread over time, random
+    TEST_SCHEMAS parameters, 1-3 devices and headline metrics. No run folders
+    are written; the catalog only holds the index rows. Returns db_path.
+    """
+    from utils.run_catalog import RunCatalog
+    rng = random.Random(seed)
+    aps = ap_names(num_aps)
+    spacing = 86400 / runs_per_day
+    with RunCatalog(db_path, root=os.path.dirname(db_path) or ".") as catalog:
+        for i in range(num_runs):
+            started = start_time.timestamp() + i * spacing
+            run_id = f"ap_stats_{datetime.fromtimestamp(started).strftime('%Y%m%d_%H%M%S')}_{i}"
+            config = {**TEST_SCHEMAS["performance"], **{k: rng.choice(v) for k, v in CATALOG_CHOICES.items()}}
+            devices = rng.sample(aps, rng.choice((1, 1, 1, 2, 3)))
+            metrics = [("", "duration_sec", config["duration"])]
+            for device in devices:
+                metrics += [
+                    (device, "tx_mbps", round(rng.uniform(50, 2400), 3)),
+                    (device, "rx_mbps", round(rng.uniform(1, 100), 3)),
+                    (device, "tx_retry_pct", round(rng.uniform(0, 20), 3)),
+                    (device, "incidents", rng.choice((0, 0, 0, 1, 2))),
+                ]
+            catalog.record_run({
+                "run_id": run_id, "test_type": "performance", "status": "completed", "started_at": started,
+                "ended_at": started + config["duration"], "mock": True, "devices": devices, "config": config,
+                "source": "scan",
+            }, files=[], metrics=metrics, commit=False)
+        catalog.conn.commit()
+    return db_path
+
+
+def write_bench_testbed(path, num_aps, ip="127.0.0.1", port=1):
+    """
+    Testbed with num_aps access points on an unreachable endpoint, so every
+    collector takes its mock path without touching the network.
+    """
+    lines = ["devices:"]
+    for ap in ap_names(num_aps):
+        lines += [
+            f"  {ap}:",
+            "    os: iosxe",
+            "    type: access_point",
+            "    connections:",
+            "      cli:",
+            "        protocol: ssh",
+            f"        ip: {ip}",
+            f"        port: {port}",
+        ]
+    with open(path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+    return path
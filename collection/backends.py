@@ -0,0 +1,85 @@
+# backends.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Device backends behind the session pool.
+#   pyats - genie testbed loading and unicon connections for real devices.
+#           genie/pyATS is imported on first use only, so importing the
+#           collectors, runners and analyzers stays cheap.
+#   mock  - the testbed YAML read with PyYAML into plain device objects that
+#           expose what the collectors look at (name, os, type, custom fields,
+#           connections). Used by --mock runs and offline tools; these devices
+#           cannot connect, so mock runs never pay the pyATS import cost.
+
+import os
+
+import yaml
+
+DEFAULT_BACKEND = "pyats"
+
+
+class MockBackendError(Exception):
+    pass
+
+
+class MockDevice:
+    def __init__(self, name, config):
+        self.name = name
+        self.os = None
+        self.type = None
+        for key, value in config.items():
+            if key not in ("connections", "credentials"):
+                setattr(self, key, value)
+        self.credentials = config.get("credentials") or {}
+        self.connections = {
+            conn_name: dict(conn or {}) for conn_name, conn in (config.get("connections") or {}).items()
+        }
+
+    def is_connected(self):
+        return False
+
+    def connect(self, *args, **kwargs):
+        raise MockBackendError(f"❌ Device '{self.name}' was loaded by the mock backend and cannot connect")
+
+    def disconnect(self):
+        pass
+
+
+class MockTestbed:
+    def __init__(self, data):
+        data = data or {}
+        self.name = (data.get("testbed") or {}).get("name", "testbed")
+        self.devices = {name: MockDevice(name, config or {}) for name, config in (data.get("devices") or {}).items()}
+
+
+class PyATSBackend:
+    name = "pyats"
+
+    def load_testbed(self, testbed_path):
+        # Deferred: pulls in pyATS/unicon (seconds of startup, hundreds of MB)
+        from genie.testbed import load
+        return load(testbed_path)
+
+
+class MockBackend:
+    name = "mock"
+
+    def load_testbed(self, testbed_path):
+        with open(testbed_path, 'r') as f:
+            return MockTestbed(yaml.safe_load(f))
+
+
+BACKENDS = {
+    PyATSBackend.name: PyATSBackend,
+    MockBackend.name: MockBackend,
+}
+
+
+def get_backend(name=None):
+    """
+    Backend instance by name (default: $AP_DEVICE_BACKEND, else pyats).
+    """
+    name = name or os.environ.get("AP_DEVICE_BACKEND", DEFAULT_BACKEND)
+    if name not in BACKENDS:
+        raise ValueError(f"❌ Unknown device backend '{name}'. Expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]()
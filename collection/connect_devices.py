@@ -41,14 +41,14 @@ for wireless and network device testing. Contributions welcome.
 Copyright © 2025 Wai Man Cheng
 """
 
-from pyats.topology import loader
-from unicon.core.errors import ConnectionError
-
 class DeviceConnector:
     def __init__(self, testbed_path: str):
         """
         Load the testbed YAML file and initialize the testbed.
+        pyATS is imported here rather than at module load, so importing this
+        module stays cheap for mock runs.
         """
+        from pyats.topology import loader
         self.testbed = loader.load(testbed_path)
         self.devices = {}
 
@@ -56,6 +56,7 @@ class DeviceConnector:
         """
         Attempt SSH connection to each device in device_names.
         """
+        from unicon.core.errors import ConnectionError
         for name in device_names:
             if name in self.testbed.devices:
                 dev = self.testbed.devices[name]
@@ -0,0 +1,171 @@
+# health_probe.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Shared device reachability service used by every collector.
+# TCP probes run concurrently across devices, results are cached for a short
+# TTL, and a device that keeps failing is put behind a circuit breaker with
+# exponential backoff so collectors skip it instantly instead of paying a
+# connect timeout on every stat and every tick. Concurrent callers asking
+# about the same endpoint wait for one probe instead of each opening a socket.
+
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from collection.session_pool import SESSION_POOL
+from utils.tracing import TRACER
+
+DEFAULT_TTL_SEC = 15
+DEFAULT_PROBE_TIMEOUT = 3
+DEFAULT_BASE_BACKOFF_SEC = 10
+DEFAULT_MAX_BACKOFF_SEC = 300
+DEFAULT_PORT = 22
+CONNECTION_PREFERENCE = ("cli", "ssh")
+
+
+def tcp_probe(ip, port=DEFAULT_PORT, timeout=DEFAULT_PROBE_TIMEOUT):
+    try:
+        with socket.create_connection((ip, port), timeout=timeout):
+            return True
+    except Exception:
+        return False
+
+
+def device_endpoint(device):
+    """
+    (ip, port) of a testbed device, preferring the 'cli' then 'ssh' connection.
+    Returns (None, None) if no connection defines an ip.
+    """
+    connections = device.connections
+    names = [n for n in CONNECTION_PREFERENCE if n in connections]
+    names += [n for n in connections if n not in names and n != "defaults"]
+    for name in names:
+        conn = connections.get(name) or {}
+        ip = conn.get("ip")
+        if ip:
+            return str(ip), int(conn.get("port") or DEFAULT_PORT)
+    return None, None
+
+
+class EndpointHealth:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reachable = None
+        self.checked_at = 0.0
+        self.failures = 0
+        self.retry_at = 0.0
+
+
+class HealthProbe:
+    def __init__(self, ttl_sec=DEFAULT_TTL_SEC, timeout=DEFAULT_PROBE_TIMEOUT,
+                 base_backoff_sec=DEFAULT_BASE_BACKOFF_SEC, max_backoff_sec=DEFAULT_MAX_BACKOFF_SEC,
+                 max_workers=16):
+        """
+        ttl_sec: how long a probe result is reused.
+        timeout: TCP connect timeout per probe.
+        base_backoff_sec / max_backoff_sec: circuit-breaker delay after consecutive
+        failures (base * 2^(failures-1), capped).
+        """
+        self.ttl_sec = ttl_sec
+        self.timeout = timeout
+        self.base_backoff_sec = base_backoff_sec
+        self.max_backoff_sec = max_backoff_sec
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def _health(self, ip, port):
+        with self._lock:
+            return self._endpoints.setdefault((ip, port), EndpointHealth())
+
+    def _cached(self, health, now):
+        if health.reachable is not None and now - health.checked_at < self.ttl_sec:
+            return health.reachable
+        if health.failures and now < health.retry_at:
+            # Circuit open: don't touch the network until the backoff expires
+            return False
+        return None
+
+    def is_reachable(self, ip, port=DEFAULT_PORT, force=False):
+        """
+        Cached reachability of ip:port. Probes only when the cached result has
+        expired and the endpoint is not in backoff (or force is set).
+        """
+        health = self._health(ip, port)
+        if not force:
+            cached = self._cached(health, time.monotonic())
+            if cached is not None:
+                return cached
+        with health.lock:
+            # Another thread may have probed while we waited for the lock
+            if not force:
+                cached = self._cached(health, time.monotonic())
+                if cached is not None:
+                    return cached
+            with TRACER.span("probe", endpoint=f"{ip}:{port}"):
+                reachable = tcp_probe(ip, port, self.timeout)
+            now = time.monotonic()
+            health.reachable = reachable
+            health.checked_at = now
+            if reachable:
+                if health.failures:
+                    print(f"💚 {ip}:{port} reachable again after {health.failures} failed probe(s).")
+                health.failures = 0
+                health.retry_at = 0.0
+            else:
+                health.failures += 1
+                backoff = min(self.base_backoff_sec * 2 ** (health.failures - 1), self.max_backoff_sec)
+                health.retry_at = now + backoff
+                print(f"💔 {ip}:{port} unreachable ({health.failures} in a row). Next probe in {backoff:.0f}s.")
+            return reachable
+
+    def is_device_reachable(self, testbed_path, device_name):
+        ip, port = device_endpoint(SESSION_POOL.get_device(testbed_path, device_name))
+        return bool(ip) and self.is_reachable(ip, port)
+
+    def probe_devices(self, testbed_path, device_names=None, force=False):
+        """
+        Probe testbed devices concurrently. Returns {device_name: reachable}.
+        """
+        testbed = SESSION_POOL.load_testbed(testbed_path)
+        names = list(device_names) if device_names is not None else sorted(testbed.devices)
+        endpoints = {name: device_endpoint(testbed.devices[name]) for name in names}
+        results = {name: False for name, (ip, _) in endpoints.items() if not ip}
+        targets = {name: ep for name, ep in endpoints.items() if ep[0]}
+        if targets:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(targets))) as pool:
+                futures = {name: pool.submit(self.is_reachable, ip, port, force) for name, (ip, port) in targets.items()}
+            results.update({name: future.result() for name, future in futures.items()})
+        return results
+
+    def status(self):
+        """
+        Snapshot of every known endpoint: {(ip, port): {...}}.
+        """
+        now = time.monotonic()
+        with self._lock:
+            items = list(self._endpoints.items())
+        return {
+            endpoint: {
+                "reachable": h.reachable,
+                "age_sec": round(now - h.checked_at, 1) if h.checked_at else None,
+                "failures": h.failures,
+                "backoff_remaining_sec": round(max(0.0, h.retry_at - now), 1),
+            }
+            for endpoint, h in items
+        }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+def print_probe_summary(results):
+    up = sorted(name for name, ok in results.items() if ok)
+    down = sorted(name for name, ok in results.items() if not ok)
+    print(f"🩺 Reachability: {len(up)} up, {len(down)} down" + (f" ({', '.join(down)})" if down else ""))
+
+
+# Shared probe used by all collectors in this process
+HEALTH_PROBE = HealthProbe()
@@ -0,0 +1,466 @@
+# session_pool.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Persistent per-device SSH session pool shared by the stats and log collectors.
+# Sessions are keyed by (testbed path, device name), loaded testbeds are cached,
+# dead sessions are reconnected on demand, idle sessions are closed after a
+# timeout, and close_all() tears everything down at the end of a run.
+#
+# run_commands() executes a command list in one of three modes:
+#   sequential - one execute() per command, each waiting for its own prompt
+#   batch      - the whole list is sent in one exchange and the output is split
+#                per command on prompt boundaries
+#   pipeline   - commands are spread across two sessions to the same device
+#                (a second 'pipeline' connection alias) and run concurrently
+# batch/pipeline fall back to sequential when the exchange cannot be split, and
+# a device that failed a mode once stays on sequential for the rest of the run.
+# Batch and streamed exchanges split output on the prompt the live connection
+# actually shows (learned once per connection from an empty line), since the
+# testbed name ('ap') often differs from the device prompt ('AP1815I_Cloud_5E10#').
+#
+# Testbeds are loaded through a device backend (collection/backends.py): pyATS
+# for real sessions, imported only when first needed, and a light YAML-only
+# backend for mock runs, which never open a session.
+
+import atexit
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from collection.backends import MockBackend, get_backend
+from utils.tracing import TRACER
+
+DEFAULT_IDLE_TIMEOUT = 300
+DEFAULT_CONNECT_KWARGS = {"log_stdout": False, "learn_hostname": True}
+EXEC_MODES = ("sequential", "batch", "pipeline")
+DEFAULT_BATCH_TIMEOUT = 60
+DEFAULT_STREAM_IDLE_TIMEOUT = 120
+PROMPT_LEARN_TIMEOUT = 10
+PIPELINE_ALIAS = "pipeline"
+
+
+class BatchSplitError(Exception):
+    pass
+
+
+def prompt_regex(hostname):
+    """
+    Regex for an exec prompt line of the given host, e.g. 'AP1#' or 'AP1(config)#'.
+    """
+    return re.compile(rf"^[^\S\n]*{re.escape(hostname)}(?:\([^)\n]*\))?[#>][^\S\n]*", re.MULTILINE)
+
+
+def hostname_from_prompt(text):
+    """
+    Hostname in the last prompt line of text (e.g. 'AP1815I_Cloud_5E10#' or
+    'AP1(config)#'), or None if the last line is not a prompt.
+    """
+    lines = [line for line in text.replace("\r", "\n").split("\n") if line.strip()]
+    match = lines and re.fullmatch(r"\s*([^\s#>()]+)(?:\([^)\n]*\))?[#>]\s*", lines[-1])
+    return match.group(1) if match else None
+
+
+def _command_prompts(raw, prompt_re):
+    """
+    Return (start, prompts): where the first echo begins and the prompt lines that
+    close each command's output.
+    """
+    prompts = list(prompt_re.finditer(raw))
+    if prompts and not raw[:prompts[0].start()].strip():
+        # Leading prompt in front of the first echo
+        return prompts[0].end(), prompts[1:]
+    return 0, prompts
+
+
+def split_batched_output(raw, cmds, prompt_re):
+    """
+    Split the raw transcript of one batched exchange into per-command outputs.
+    The device echoes each command after its prompt (the first one without, since
+    that prompt was consumed by the previous exchange) and prints a final prompt
+    after the last output. Raises BatchSplitError if the transcript does not line up.
+    """
+    raw = raw.replace("\r\n", "\n").replace("\r", "\n")
+    pos, prompts = _command_prompts(raw, prompt_re)
+    if len(prompts) != len(cmds):
+        raise BatchSplitError(f"expected {len(cmds)} prompt(s) in batched output, found {len(prompts)}")
+
+    outputs = []
+    for cmd, prompt in zip(cmds, prompts):
+        end = prompt.start()
+        echo_end = raw.find("\n", pos, end)
+        echo = raw[pos:end if echo_end < 0 else echo_end].strip()
+        if echo != cmd.strip():
+            raise BatchSplitError(f"command echo mismatch for '{cmd}': '{echo}'")
+        body = "" if echo_end < 0 else raw[echo_end + 1:end]
+        outputs.append(body.rstrip("\n"))
+        pos = prompt.end()
+    return outputs
+
+
+class DeviceSession:
+    def __init__(self, device):
+        self.device = device
+        self.lock = threading.RLock()
+        self.last_used = time.monotonic()
+        self.connected = False
+        self.pipeline_connected = False
+        # Prompt regex learned on the current connection; modes that failed on this device
+        self.prompt_re = None
+        self.failed_modes = set()
+
+    def touch(self):
+        self.last_used = time.monotonic()
+
+
+class SessionPool:
+    def __init__(self, idle_timeout=DEFAULT_IDLE_TIMEOUT, max_retries=1, health_check_cmd=None,
+                 exec_mode="sequential", batch_timeout=DEFAULT_BATCH_TIMEOUT, backend=None):
+        """
+        idle_timeout: seconds a session may sit unused before it is disconnected.
+        max_retries: how many times a failed execute is retried after a reconnect.
+        health_check_cmd: optional cheap command run to verify a reused session.
+        exec_mode: default run_commands() mode (sequential | batch | pipeline).
+        batch_timeout: seconds to wait for a whole batched exchange to complete.
+        backend: device backend name for real sessions (default: pyats).
+        """
+        if exec_mode not in EXEC_MODES:
+            raise ValueError(f"❌ Unknown exec mode '{exec_mode}'. Expected one of {EXEC_MODES}")
+        self.idle_timeout = idle_timeout
+        self.max_retries = max_retries
+        self.health_check_cmd = health_check_cmd
+        self.exec_mode = exec_mode
+        self.batch_timeout = batch_timeout
+        self.backend = get_backend(backend)
+        self._mock_backend = MockBackend()
+        self._lock = threading.Lock()
+        self._testbeds = {}
+        self._sessions = {}
+
+    @staticmethod
+    def _key(testbed_path, device_name):
+        return (os.path.abspath(testbed_path), device_name)
+
+    def load_testbed(self, testbed_path, mock=False):
+        """
+        Load a testbed once per path and backend; reload only when the file changes
+        on disk. mock=True uses the YAML-only backend (no pyATS import).
+        """
+        backend = self._mock_backend if mock else self.backend
+        path = os.path.abspath(testbed_path)
+        mtime = os.path.getmtime(path)
+        key = (path, backend.name)
+        with self._lock:
+            cached = self._testbeds.get(key)
+            if cached and cached[0] == mtime:
+                return cached[1]
+        with TRACER.span("testbed_load", backend=backend.name):
+            testbed = backend.load_testbed(path)
+        with self._lock:
+            self._testbeds[key] = (mtime, testbed)
+        return testbed
+
+    def get_device(self, testbed_path, device_name, mock=False):
+        """
+        Testbed device for a pooled session, or with mock=True a lightweight device
+        description (name, type, connections) that cannot connect.
+        """
+        if mock:
+            return self.load_testbed(testbed_path, mock=True).devices[device_name]
+        return self._get_session(testbed_path, device_name).device
+
+    def _get_session(self, testbed_path, device_name):
+        key = self._key(testbed_path, device_name)
+        with self._lock:
+            session = self._sessions.get(key)
+        if session:
+            return session
+        device = self.load_testbed(testbed_path).devices[device_name]
+        with self._lock:
+            return self._sessions.setdefault(key, DeviceSession(device))
+
+    def _is_healthy(self, session):
+        device = session.device
+        try:
+            if not device.is_connected():
+                return False
+            if self.health_check_cmd:
+                device.execute(self.health_check_cmd)
+            return True
+        except Exception:
+            return False
+
+    def _disconnect(self, session):
+        if session.pipeline_connected:
+            try:
+                getattr(session.device, PIPELINE_ALIAS).disconnect()
+            except Exception:
+                pass
+            session.pipeline_connected = False
+        try:
+            session.device.disconnect()
+        except Exception:
+            pass
+        session.connected = False
+        session.prompt_re = None
+
+    def _ensure_connected(self, session, device_name, **connect_kwargs):
+        if session.connected and self._is_healthy(session):
+            return
+        if session.connected:
+            print(f"♻️ Session to {device_name} is stale. Reconnecting...")
+            self._disconnect(session)
+        kwargs = {**DEFAULT_CONNECT_KWARGS, **connect_kwargs}
+        with TRACER.span("connect", device=device_name):
+            session.device.connect(**kwargs)
+        session.connected = True
+        print(f"🔌 Opened pooled session to {device_name}.")
+
+    @contextmanager
+    def session(self, testbed_path, device_name, **connect_kwargs):
+        """
+        Yield a connected device, holding its session lock for the duration.
+        """
+        self.reap_idle()
+        session = self._get_session(testbed_path, device_name)
+        with session.lock:
+            self._ensure_connected(session, device_name, **connect_kwargs)
+            try:
+                yield session.device
+            finally:
+                session.touch()
+
+    def execute(self, testbed_path, device_name, cmd, **connect_kwargs):
+        """
+        Run a command on the pooled session, reconnecting and retrying on failure.
+        """
+        session = self._get_session(testbed_path, device_name)
+        attempt = 0
+        while True:
+            with self.session(testbed_path, device_name, **connect_kwargs) as device:
+                try:
+                    with TRACER.span("execute", device=device_name, cmd=cmd):
+                        return device.execute(cmd)
+                except Exception as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    attempt += 1
+                    print(f"⚠️ '{cmd}' failed on {device_name} ({e}). Reconnecting (retry {attempt})...")
+                    self._disconnect(session)
+
+    def _execute_sequential(self, testbed_path, device_name, cmds, on_error=None, **connect_kwargs):
+        outputs = []
+        for cmd in cmds:
+            try:
+                outputs.append(self.execute(testbed_path, device_name, cmd, **connect_kwargs))
+            except Exception as e:
+                if on_error is None:
+                    raise
+                outputs.append(on_error(cmd, e))
+        return outputs
+
+    def _session_prompt(self, session):
+        """
+        Prompt regex of the live connection, learned once per connection from the
+        device's answer to an empty line; the testbed hostname/name if that fails.
+        """
+        if session.prompt_re is None:
+            device = session.device
+            hostname = None
+            try:
+                device.transmit("\r")
+                if device.receive(r"[#>][^\S\n]*$", timeout=PROMPT_LEARN_TIMEOUT):
+                    hostname = hostname_from_prompt(device.receive_buffer())
+            except Exception:
+                pass
+            session.prompt_re = prompt_regex(hostname or getattr(device, "hostname", None) or device.name)
+        return session.prompt_re
+
+    def _execute_batch(self, session, cmds):
+        """
+        Send all commands in one write and read until one prompt per command has
+        come back, then split the transcript. Uses unicon's transmit/receive.
+        """
+        device = session.device
+        prompt_re = self._session_prompt(session)
+        with TRACER.span("execute_batch", device=device.name, cmds=len(cmds)):
+            raw = self._exchange_batch(device, cmds, prompt_re)
+        return split_batched_output(raw, cmds, prompt_re)
+
+    def _exchange_batch(self, device, cmds, prompt_re):
+        device.transmit("\r".join(cmds) + "\r")
+        raw = ""
+        deadline = time.monotonic() + self.batch_timeout
+        while len(_command_prompts(raw.replace("\r", ""), prompt_re)[1]) < len(cmds):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not device.receive(r"[#>]\s*$", timeout=remaining):
+                raise TimeoutError(f"batched exchange did not complete within {self.batch_timeout}s")
+            raw += device.receive_buffer()
+        return raw
+
+    def _ensure_pipeline(self, session, device_name, **connect_kwargs):
+        device = session.device
+        if session.pipeline_connected:
+            try:
+                if getattr(device, PIPELINE_ALIAS).is_connected():
+                    return getattr(device, PIPELINE_ALIAS)
+            except Exception:
+                pass
+        via = next((name for name in device.connections if name != "defaults"), None)
+        kwargs = {**DEFAULT_CONNECT_KWARGS, **connect_kwargs}
+        device.connect(alias=PIPELINE_ALIAS, via=via, **kwargs)
+        session.pipeline_connected = True
+        print(f"🔌 Opened second pipeline session to {device_name}.")
+        return getattr(device, PIPELINE_ALIAS)
+
+    def _execute_pipeline(self, session, device_name, cmds, **connect_kwargs):
+        """
+        Alternate commands between the primary and the pipeline connection and run
+        both halves concurrently; outputs are returned in the original order.
+        """
+        second = self._ensure_pipeline(session, device_name, **connect_kwargs)
+        lanes = [(session.device, list(range(0, len(cmds), 2))), (second, list(range(1, len(cmds), 2)))]
+        outputs = [None] * len(cmds)
+
+        def run_lane(conn, indexes):
+            for idx in indexes:
+                outputs[idx] = conn.execute(cmds[idx])
+
+        with TRACER.span("execute_pipeline", device=device_name, cmds=len(cmds)):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                for future in [executor.submit(run_lane, conn, idx) for conn, idx in lanes if idx]:
+                    future.result()
+        return outputs
+
+    def run_commands(self, testbed_path, device_name, cmds, mode=None, on_error=None, **connect_kwargs):
+        """
+        Run a command list on the pooled session and return the outputs in order.
+        mode: sequential | batch | pipeline (default: the pool's exec_mode).
+        on_error(cmd, exc): optional, turns a per-command failure into its output
+        in sequential mode instead of raising.
+        """
+        mode = mode or self.exec_mode
+        if mode not in EXEC_MODES:
+            raise ValueError(f"❌ Unknown exec mode '{mode}'. Expected one of {EXEC_MODES}")
+        if mode == "sequential" or len(cmds) < 2:
+            return self._execute_sequential(testbed_path, device_name, cmds, on_error, **connect_kwargs)
+
+        session = self._get_session(testbed_path, device_name)
+        if mode in session.failed_modes:
+            return self._execute_sequential(testbed_path, device_name, cmds, on_error, **connect_kwargs)
+        try:
+            with self.session(testbed_path, device_name, **connect_kwargs):
+                if mode == "batch":
+                    return self._execute_batch(session, cmds)
+                return self._execute_pipeline(session, device_name, cmds, **connect_kwargs)
+        except Exception as e:
+            print(f"⚠️ {mode.capitalize()} execution failed on {device_name} ({e}). "
+                  f"Using sequential for this device from now on.")
+            # The transcript state is unknown after a failed exchange; start clean
+            with session.lock:
+                session.failed_modes.add(mode)
+                self._disconnect(session)
+        return self._execute_sequential(testbed_path, device_name, cmds, on_error, **connect_kwargs)
+
+    def stream_command(self, testbed_path, device_name, cmd, write, idle_timeout=DEFAULT_STREAM_IDLE_TIMEOUT,
+                       **connect_kwargs):
+        """
+        Run one command and hand its output to write(text) chunk by chunk as it
+        arrives, so large outputs (show tech, show log) never sit in memory whole.
+        The echoed command and the closing prompt are stripped. Devices without
+        unicon's transmit/receive fall back to a single execute().
+        Returns the number of characters written.
+        """
+        session = self._get_session(testbed_path, device_name)
+        with self.session(testbed_path, device_name, **connect_kwargs) as device:
+            if not hasattr(device, "transmit"):
+                output = device.execute(cmd)
+                write(output)
+                return len(output)
+            try:
+                prompt_re = self._session_prompt(session)
+                with TRACER.span("stream", device=device_name, cmd=cmd):
+                    return self._stream_output(device, cmd, write, prompt_re, idle_timeout)
+            except Exception:
+                # Unknown transcript state; the next use reconnects
+                self._disconnect(session)
+                raise
+
+    def _stream_output(self, device, cmd, write, prompt_re, idle_timeout):
+        device.transmit(cmd + "\r")
+        written = 0
+        pending = ""
+        carry = ""
+        echo_seen = False
+        while True:
+            if not device.receive(r"[\s\S]+", timeout=idle_timeout):
+                raise TimeoutError(f"no output from '{cmd}' for {idle_timeout}s")
+            chunk = carry + device.receive_buffer()
+            # A '\r\n' may be split across reads; keep a trailing '\r' for the next one
+            carry = "\r" if chunk.endswith("\r") else ""
+            chunk = chunk[:len(chunk) - len(carry)]
+            pending += chunk.replace("\r\n", "\n").replace("\r", "\n")
+            if not echo_seen:
+                if "\n" not in pending:
+                    continue
+                pending = pending.split("\n", 1)[1]
+                echo_seen = True
+            # Hold back the last partial line: it may be the closing prompt
+            cut = pending.rfind("\n") + 1
+            tail = pending[cut:]
+            if tail and prompt_re.fullmatch(tail):
+                body = pending[:cut]
+                write(body)
+                return written + len(body)
+            if cut:
+                write(pending[:cut])
+                written += cut
+                pending = tail
+
+    def reap_idle(self):
+        """
+        Disconnect sessions that have been idle longer than idle_timeout.
+        """
+        now = time.monotonic()
+        with self._lock:
+            sessions = list(self._sessions.items())
+        for (_, device_name), session in sessions:
+            if not session.connected or now - session.last_used < self.idle_timeout:
+                continue
+            if session.lock.acquire(blocking=False):
+                try:
+                    print(f"💤 Closing idle session to {device_name}.")
+                    self._disconnect(session)
+                finally:
+                    session.lock.release()
+
+    def release(self, testbed_path, device_name):
+        key = self._key(testbed_path, device_name)
+        with self._lock:
+            session = self._sessions.pop(key, None)
+        if session:
+            with session.lock:
+                self._disconnect(session)
+
+    def close_all(self):
+        """
+        Disconnect every pooled session. Called at the end of a run.
+        """
+        with self._lock:
+            sessions = list(self._sessions.items())
+            self._sessions.clear()
+        closed = 0
+        for (_, device_name), session in sessions:
+            with session.lock:
+                if session.connected:
+                    self._disconnect(session)
+                    closed += 1
+        if closed:
+            print(f"🔒 Closed {closed} pooled device session(s).")
+
+
+# Shared pool used by all collectors in this process
+SESSION_POOL = SessionPool()
+atexit.register(SESSION_POOL.close_all)
@@ -0,0 +1,221 @@
+# static_stat_cache.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Per-device cache for static stats (e.g. 'version') marked cacheable in
+# configs/stats_schema.yaml:
+#
+#   version:
+#     cache:
+#       enabled: true
+#       ttl_sec: 86400
+#       fingerprint_cmd: "show version | include Last reload time|Running Image"
+#       fingerprint_pattern: ""      (optional regex; keep only matching lines)
+#
+# Before the full collection a cheap fingerprint command runs on the device.
+# If its output (after the optional pattern) hashes to the value stored with
+# the last full output, the commands are unchanged and the entry is younger
+# than ttl_sec, the stored output is reused and the full commands are skipped.
+# Any other outcome runs the full collection and refreshes the entry. An empty
+# fingerprint, a CLI error ('% Invalid input ...') or one the pattern filters
+# down to nothing can't tell a reload apart, so it is a miss and is never stored.
+#
+# Entries live in run_logs/static_stat_cache.json as {device: {stat: entry}}.
+# Reads are re-parsed whenever the file changed on disk; every store/invalidate
+# re-reads the file under an exclusive lock on a sidecar <cache>.lock file
+# (fcntl, where available), changes only its own device/stat and replaces the
+# file atomically, so concurrent runners never overwrite each other's entries.
+# Disable with AP_STATIC_STAT_CACHE=0.
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.tracing import TRACER
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_CACHE_PATH = os.path.join("run_logs", "static_stat_cache.json")
+DEFAULT_TTL_SEC = 86400
+LOCK_SUFFIX = ".lock"
+
+
+def fingerprint_digest(output, pattern=None):
+    """
+    SHA-256 of the fingerprint output with whitespace normalised; with a pattern,
+    only the matching lines count. None if nothing usable is left (empty output
+    or a CLI error).
+    """
+    text = (output or "").strip()
+    if not text or text.startswith("%"):
+        return None
+    lines = [line.strip() for line in text.replace("\r", "").split("\n") if line.strip()]
+    if pattern:
+        regex = re.compile(pattern)
+        lines = [line for line in lines if regex.search(line)]
+    if not lines:
+        return None
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def _commands_digest(cmds):
+    return hashlib.sha256("\n".join(cmds).encode("utf-8")).hexdigest()
+
+
+def _file_key(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class StaticStatCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, enabled=True):
+        self.path = path
+        self.enabled = enabled
+        self._lock = threading.RLock()
+        self._key = None
+        self._entries = {}
+        self.counters = {"hits": 0, "misses": 0}
+
+    def _parse(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        if not isinstance(data, dict):
+            return {}
+        # Entries of the old flat '<device>_<stat>' layout are dropped and simply refill
+        return {
+            device: stats for device, stats in data.items()
+            if isinstance(stats, dict) and all(isinstance(entry, dict) for entry in stats.values())
+        }
+
+    def _load(self):
+        """
+        The entries on disk, re-read only if the file changed since the last read.
+        """
+        with self._lock:
+            key = _file_key(self.path)
+            if key is None:
+                self._key, self._entries = None, {}
+            elif key != self._key:
+                entries = self._parse()
+                # A writer may have replaced the file while it was parsed; keep the key of what was read
+                self._key, self._entries = (key if _file_key(self.path) == key else None), entries
+            return self._entries
+
+    @contextmanager
+    def _file_lock(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path + LOCK_SUFFIX, 'a') as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _save(self, entries):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entries, f, indent=1)
+        os.replace(tmp_path, self.path)
+        self._key, self._entries = _file_key(self.path), entries
+
+    def _update(self, change):
+        """
+        Apply change(entries) to the latest on-disk entries under the lock and
+        write them back atomically.
+        """
+        with self._file_lock():
+            entries = json.loads(json.dumps(self._load()))
+            change(entries)
+            self._save(entries)
+
+    def lookup(self, device_name, stat_name, cmds, fingerprint, ttl_sec=DEFAULT_TTL_SEC, now=None):
+        """
+        The cached outputs for this device/stat if the fingerprint and commands
+        match and the entry is within ttl_sec, else None.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._load().get(device_name, {}).get(stat_name)
+        if (
+            entry is None
+            or entry.get("fingerprint") != fingerprint
+            or entry.get("commands") != _commands_digest(cmds)
+            or now - entry.get("collected_at", 0) > ttl_sec
+        ):
+            return None
+        return entry["outputs"]
+
+    def store(self, device_name, stat_name, cmds, fingerprint, outputs, now=None):
+        def change(entries):
+            entries.setdefault(device_name, {})[stat_name] = {
+                "fingerprint": fingerprint,
+                "commands": _commands_digest(cmds),
+                "collected_at": time.time() if now is None else now,
+                "outputs": list(outputs),
+            }
+        self._update(change)
+
+    def invalidate(self, device_name=None, stat_name=None):
+        """
+        Drop the entries of one device/stat, one device, or everything.
+        """
+        def change(entries):
+            if device_name is None:
+                entries.clear()
+            elif stat_name is None:
+                entries.pop(device_name, None)
+            else:
+                stats = entries.get(device_name, {})
+                stats.pop(stat_name, None)
+                if not stats:
+                    entries.pop(device_name, None)
+        self._update(change)
+
+    def run_commands(self, pool, testbed_path, device_name, stat_name, cmds, cache_config, mode=None):
+        """
+        Outputs of cmds on device_name via pool, reused from the cache while the
+        device fingerprint is unchanged. Returns (outputs, reused).
+        """
+        fingerprint_cmd = cache_config.get("fingerprint_cmd")
+        if not self.enabled or not cache_config.get("enabled") or not fingerprint_cmd:
+            return pool.run_commands(testbed_path, device_name, cmds, mode=mode), False
+
+        with TRACER.span("fingerprint", device=device_name, stat=stat_name):
+            fingerprint = fingerprint_digest(pool.execute(testbed_path, device_name, fingerprint_cmd),
+                                             cache_config.get("fingerprint_pattern"))
+        if fingerprint is None:
+            print(f"⚠️ Fingerprint for {device_name}/{stat_name} is empty or an error. Collecting without the cache.")
+            with self._lock:
+                self.counters["misses"] += 1
+            return pool.run_commands(testbed_path, device_name, cmds, mode=mode), False
+        cached = self.lookup(device_name, stat_name, cmds, fingerprint, cache_config.get("ttl_sec", DEFAULT_TTL_SEC))
+        with self._lock:
+            self.counters["hits" if cached is not None else "misses"] += 1
+        if cached is not None:
+            return cached, True
+
+        outputs = pool.run_commands(testbed_path, device_name, cmds, mode=mode)
+        self.store(device_name, stat_name, cmds, fingerprint, outputs)
+        return outputs, False
+
+
+# Shared cache used by the stats collector
+STATIC_STAT_CACHE = StaticStatCache(enabled=os.environ.get("AP_STATIC_STAT_CACHE", "1") != "0")
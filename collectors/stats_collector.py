@@ -5,17 +5,24 @@
 # Supports real or mock collection and persistent command management
 
 import os
-import socket
 import yaml
 from datetime import datetime
-from genie.testbed import load
+from collection.health_probe import HEALTH_PROBE, device_endpoint
+from collection.session_pool import SESSION_POOL
+from collectors.static_stat_cache import STATIC_STAT_CACHE
 from collectors.stats_generator import (
     generate_ap_version_stats,
     generate_performance_stats,
-    generate_cpu_stats,
-    generate_memory_stats,
+    generate_cpu_sample,
+    generate_memory_sample,
     generate_clear_stats
 )
+from collectors.timeseries_writer import SERIES_FIELDS, SERIES_FILENAMES, get_series_writer
+from parsers.cpu_parser import parse_cpu_usage
+from parsers.memory_parser import parse_memory_usage
+from utils.blob_store import BLOB_STORE
+from utils.command_registry import STATS_REGISTRY_FILE, get_registry
+from utils.tracing import TRACER, traced
 
 # Global cache to prevent reloading commands more than once
 STAT_COMMAND_CACHE = {}
@@ -27,29 +34,27 @@ def load_stat_schema(stat_name, schema_path="configs/stats_schema.yaml"):
         schema = yaml.safe_load(f)
     return schema.get(stat_name, {})
 
-def is_port_open(ip, port=22, timeout=5):
-    try:
-        with socket.create_connection((ip, port), timeout=timeout):
-            return True
-    except Exception:
-        return False
-
-def load_stat_commands(name, device_name, num_cmds, registry_file="collectors/stats_command_registry.yaml"):
-    existing_cmds = {}
-    if os.path.exists(registry_file):
-        with open(registry_file, 'r') as f:
-            existing_cmds = yaml.safe_load(f) or {}
-
+def load_stat_commands(name, device_name, num_cmds, registry_file=STATS_REGISTRY_FILE, interactive=True):
+    """
+    Saved commands for this device/stat, confirmed or re-entered at the prompt.
+    interactive=False returns the saved commands (or none) without prompting.
+    """
+    registry = get_registry(registry_file)
     key = f"{device_name}_{name}"
-    if key in existing_cmds and existing_cmds[key]:
+    saved = registry.get(key)
+    if not interactive:
+        if not saved:
+            print(f"⚠️ No saved {name} command(s) for {device_name}.")
+        return saved or []
+    deleted = False
+    if saved:
         print(f"\n📘 Found saved {name} command(s) for {device_name}:")
-        for i, cmd in enumerate(existing_cmds[key], 1):
+        for i, cmd in enumerate(saved, 1):
             print(f"  {i}. {cmd}")
         choice = input("Do you want to (K)eep, (E)dit, or (D)elete these commands? [K/e/d]: ").strip().lower()
         if choice == 'k' or choice == '':
-            return existing_cmds[key]
-        elif choice == 'd':
-            del existing_cmds[key]
+            return saved
+        deleted = choice == 'd'
 
     new_cmds = []
     for i in range(num_cmds):
@@ -57,60 +62,108 @@ def load_stat_commands(name, device_name, num_cmds, registry_file="collectors/st
         if cmd:
             new_cmds.append(cmd)
 
+    # Only this key is rewritten, so other runners' edits to the registry are kept
     if new_cmds:
-        existing_cmds[key] = new_cmds
-        with open(registry_file, 'w') as f:
-            yaml.safe_dump(existing_cmds, f)
+        registry.set(key, new_cmds)
+    elif deleted:
+        registry.delete(key)
     return new_cmds
 
+def load_device_stat_commands(device_name, stat_names, registry_file=STATS_REGISTRY_FILE):
+    """
+    Saved commands of every listed stat for a device, from one registry read,
+    into the process cache. Returns {stat_name: [cmds]} (stats without saved
+    commands map to []).
+    """
+    found = get_registry(registry_file).device_stat_commands(device_name, stat_names)
+    for name in stat_names:
+        STAT_COMMAND_CACHE.setdefault(f"{device_name}_{name}", found.get(name, []))
+    return {name: STAT_COMMAND_CACHE[f"{device_name}_{name}"] for name in stat_names}
+
+def get_stat_commands(name, device_name, num_cmds=None, interactive=True):
+    # Resolve commands once per device/stat; later calls (and worker threads) hit the cache
+    key = f"{device_name}_{name}"
+    if key not in STAT_COMMAND_CACHE:
+        if num_cmds is None:
+            num_cmds = load_stat_schema(name).get("cmd_num", 1)
+        STAT_COMMAND_CACHE[key] = load_stat_commands(name, device_name, num_cmds, interactive=interactive)
+    return STAT_COMMAND_CACHE[key]
+
+def set_stat_commands(name, device_name, cmds):
+    # Commands given up front (e.g. by a campaign file) for this process only; the registry is untouched
+    STAT_COMMAND_CACHE[f"{device_name}_{name}"] = list(cmds)
+
+@traced("write_series")
+def _append_series_sample(save_dir, name, sample_time, values):
+    path = os.path.join(save_dir, SERIES_FILENAMES[name])
+    writer = get_series_writer(path, SERIES_FIELDS[name])
+    if isinstance(values, dict):
+        writer.append({"timestamp": sample_time, **values})
+    else:
+        writer.append([sample_time] + list(values))
+    print(f"📄 Appended {name} sample to {path}")
+    return path
+
+@traced("parse")
+def _parse_series_sample(name, outputs):
+    if name == "cpu":
+        return parse_cpu_usage(outputs, num_cores=len(SERIES_FIELDS["cpu"]) - 1)
+    if name == "memory":
+        return parse_memory_usage(outputs)
+    return None
+
 def collect_stat_block(name, testbed_path="testbed.yaml", device_name="ap", mock=False,
                        start_time=None, end_time=None, interval_sec=60, prompt_only=False,
-                       timestamp_dir=None):
-    schema = load_stat_schema(name)
-    num_cmds = schema.get("cmd_num", 1)
+                       timestamp_dir=None, phase=None):
     if prompt_only:
-        load_stat_commands(name, device_name, num_cmds)
+        load_stat_commands(name, device_name, load_stat_schema(name).get("cmd_num", 1))
         return None
+    return _collect_stat_block(name, testbed_path, device_name, mock, start_time, end_time, interval_sec,
+                               timestamp_dir, phase)
+
+# Prompting stays outside the span so interactive think time never shows up in the timings
+@traced("collect_stat", stat="name", device="device_name", phase="phase")
+def _collect_stat_block(name, testbed_path, device_name, mock, start_time, end_time, interval_sec,
+                        timestamp_dir, phase):
+    schema = load_stat_schema(name)
+    num_cmds = schema.get("cmd_num", 1)
 
     print(f"\n🔍 Collecting AP {name} stats (Mock: {mock})")
     #cmds = load_stat_commands(name, device_name, num_cmds)
-    key = f"{device_name}_{name}"
-    if key not in STAT_COMMAND_CACHE:
-        cmds = load_stat_commands(name, device_name, num_cmds)
-        STAT_COMMAND_CACHE[key] = cmds
-    else:
-        cmds = STAT_COMMAND_CACHE[key]
+    cmds = get_stat_commands(name, device_name, num_cmds)
     if not cmds:
         print("⚠️ No commands provided. Skipping.")
         return None
 
     try:
-        tb = load(testbed_path)
-        device = tb.devices[device_name]
+        device = SESSION_POOL.get_device(testbed_path, device_name, mock=mock)
     except Exception as e:
         print(f"❌ Failed to load testbed or device '{device_name}': {e}")
         return None
 
-    ip = device.connections.get("cli", {}).get("ip")
-    if not mock and ip and not is_port_open(ip):
-        print(f"⚠️ SSH port not reachable on {ip}. Switching to MOCK mode.")
+    ip, port = device_endpoint(device)
+    if not mock and ip and not HEALTH_PROBE.is_reachable(ip, port):
+        print(f"⚠️ SSH port not reachable on {ip}:{port}. Switching to MOCK mode.")
         mock = True
 
     folder = timestamp_dir or "ap_stats"
     save_dir = os.path.join("run_logs", folder, name)
     os.makedirs(save_dir, exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = os.path.join(save_dir, f"{name}_stats_{timestamp}.txt")
+    phase_tag = f"{phase}_" if phase else ""
+    filename = os.path.join(save_dir, f"{name}_stats_{phase_tag}{timestamp}.txt")
+    # During-test cpu/memory ticks append one sample to a single series file per device
+    is_series = name in SERIES_FIELDS and bool(start_time and end_time and interval_sec)
 
     if mock:
         print(f"⚠️ MOCK mode enabled. Generating mock {name} output...")
         if name == "version":
             return generate_ap_version_stats(save_dir)
         elif name == "performance":
-            return generate_performance_stats(save_dir)
+            return generate_performance_stats(save_dir, phase=phase)
         elif name == "cpu":
-            if start_time and end_time and interval_sec:
-                return generate_cpu_stats(save_dir, start_time, end_time, interval_sec)
+            if is_series:
+                return _append_series_sample(save_dir, name, end_time, generate_cpu_sample())
             else:
                 snapshot_file = os.path.join(save_dir, f"cpu_snapshot_{timestamp}.txt")
                 with open(snapshot_file, "w") as f:
@@ -118,8 +171,8 @@ def collect_stat_block(name, testbed_path="testbed.yaml", device_name="ap", mock
                 print(f"📄 [MOCK] Saved CPU snapshot to {snapshot_file}")
                 return snapshot_file
         elif name == "memory":
-            if start_time and end_time and interval_sec:
-                return generate_memory_stats(save_dir, start_time, end_time, interval_sec)
+            if is_series:
+                return _append_series_sample(save_dir, name, end_time, generate_memory_sample())
             else:
                 snapshot_file = os.path.join(save_dir, f"memory_snapshot_{timestamp}.txt")
                 with open(snapshot_file, "w") as f:
@@ -134,15 +187,32 @@ def collect_stat_block(name, testbed_path="testbed.yaml", device_name="ap", mock
             return filename
     else:
         try:
-            device.connect(log_stdout=False)
-            print(f"✅ Connected to {device_name}. Running {name} command(s)...")
-            output = "\n\n".join([f"# {cmd}\n" + device.execute(cmd) for cmd in cmds])
+            print(f"✅ Using pooled session to {device_name}. Running {name} command(s)...")
+            if is_series or not schema.get("cache"):
+                outputs = SESSION_POOL.run_commands(testbed_path, device_name, cmds, mode=schema.get("exec_mode"))
+            else:
+                outputs, reused = STATIC_STAT_CACHE.run_commands(SESSION_POOL, testbed_path, device_name, name, cmds,
+                                                                 schema["cache"], mode=schema.get("exec_mode"))
+                if reused:
+                    print(f"♻️ {device_name} fingerprint unchanged. Reusing cached {name} output.")
+            output = "\n\n".join([f"# {cmd}\n" + out for cmd, out in zip(cmds, outputs)])
         except Exception as e:
             print(f"❌ Error connecting or executing on device: {e}")
             return None
 
-    with open(filename, "w") as f:
-        f.write(f"# Timestamp: {timestamp}\n\n{output}\n")
+    if is_series:
+        raw_file = os.path.join(save_dir, f"{name}_raw.txt")
+        with TRACER.span("write"), open(raw_file, "a") as f:
+            f.write(f"# Timestamp: {timestamp}\n\n{output}\n\n")
+        sample = _parse_series_sample(name, outputs)
+        if sample is None:
+            print(f"⚠️ Could not parse {name} sample. Raw output appended to {raw_file}")
+            return raw_file
+        return _append_series_sample(save_dir, name, end_time, sample)
+
+    # The timestamp header stays in the per-run file so identical outputs share one blob
+    with TRACER.span("write"):
+        BLOB_STORE.write_text(filename, f"{output}\n", prefix=f"# Timestamp: {timestamp}\n\n")
 
     print(f"📄 Saved {name} stats to {filename}")
     return filename
@@ -10,6 +10,7 @@ import random
 import time
 from datetime import datetime, timedelta
 
+from utils.blob_store import BLOB_STORE
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # resolves to collectors/
 SAMPLE_DIR = os.path.normpath(os.path.join(BASE_DIR, "..", "mock_samples"))  # resolves to root
@@ -29,16 +30,16 @@ def generate_ap_version_stats(output_dir):
     print("generate ap version")
     content = _load_sample("version.txt")
     output_path = os.path.join(output_dir, "version.txt")
-    with open(output_path, 'w') as f:
-        f.write(content)
+    BLOB_STORE.write_text(output_path, content)
     print(f"📄 [MOCK] Saved AP version stats to {output_path}")
     return output_path
 
-def generate_performance_stats(output_dir):
+def generate_performance_stats(output_dir, phase=None):
     content = _load_sample("perstats.txt")
-    output_path = os.path.join(output_dir, "performance_stats.txt")
-    with open(output_path, 'w') as f:
-        f.write(content)
+    # Phase-tagged names keep before/after snapshots apart for delta computation
+    filename = f"performance_stats_{phase}.txt" if phase else "performance_stats.txt"
+    output_path = os.path.join(output_dir, filename)
+    BLOB_STORE.write_text(output_path, content)
     print(f"📄 [MOCK] Saved performance stats to {output_path}")
     return output_path
 
@@ -69,11 +70,19 @@ def generate_memory_stats(output_dir, start_time, end_time, interval_sec=60):
     print(f"📄 [MOCK] Saved memory usage stats to {output_path}")
     return output_path
 
+def generate_cpu_sample():
+    # One during-test CPU sample (cpu_0..cpu_3), same distribution as generate_cpu_stats
+    return [random.randint(70, 100) for _ in range(4)]
+
+def generate_memory_sample():
+    free = random.randint(300, 500)
+    available = free + random.randint(100, 300)
+    return {"free_mb": free, "available_mb": available}
+
 def generate_clear_stats(output_dir):
     content = _load_sample("clearcounters.txt")
     output_path = os.path.join(output_dir, "clear_stats.txt")
-    with open(output_path, 'w') as f:
-        f.write(content)
+    BLOB_STORE.write_text(output_path, content)
     print(f"📄 [MOCK] Saved clear stats to {output_path}")
     return output_path
 
@@ -6,9 +6,16 @@
 
 import time
 from datetime import datetime, timedelta
+import os
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from threading import Event
-from collectors.stats_collector import collect_stat_block
+from collection.health_probe import HEALTH_PROBE, print_probe_summary
+from collection.session_pool import SESSION_POOL
+from collectors.stats_collector import collect_stat_block, get_stat_commands, load_device_stat_commands, set_stat_commands
+from collectors.stats_scheduler import StatScheduler, print_schedule_report
+from collectors.timeseries_writer import close_series_writers
+from utils.tracing import TRACER, traced
 
 STATS_SCHEMA_PATH = "configs/stats_schema.yaml"
 
@@ -16,24 +23,39 @@ def load_stats_schema():
     with open(STATS_SCHEMA_PATH, 'r') as f:
         return yaml.safe_load(f)
 
-def gather_all_stat_commands(testbed_path="testbed.yaml", device_name="ap"):
+def gather_all_stat_commands(testbed_path="testbed.yaml", device_name="ap", interactive=True, commands=None):
+    """
+    Resolve the commands of every scheduled stat before the run starts.
+    commands: optional {stat_name: [cmds]} used as given; interactive=False
+    takes the rest from the registry without prompting.
+    """
     schema = load_stats_schema()
-    for stat_name, config in schema.items():
-        collection = config.get("collection", {})
-        if (
-            collection.get("before_test", False)
-            or collection.get("after_test", False)
-            or collection.get("during_test", {}).get("enabled", False)
-        ):
-            print(f"📘 Prompting for stat: {stat_name}")
-            collect_stat_block(
-                name=stat_name,
-                testbed_path=testbed_path,
-                device_name=device_name,
-                mock=False,
-                prompt_only=True
-            )
+    scheduled = [
+        stat_name for stat_name, config in schema.items()
+        if config.get("collection", {}).get("before_test", False)
+        or config.get("collection", {}).get("after_test", False)
+        or config.get("collection", {}).get("during_test", {}).get("enabled", False)
+    ]
+    for stat_name in list(scheduled):
+        if commands and stat_name in commands:
+            set_stat_commands(stat_name, device_name, commands[stat_name])
+            scheduled.remove(stat_name)
+    if not interactive:
+        for stat_name, cmds in load_device_stat_commands(device_name, scheduled).items():
+            if not cmds:
+                print(f"⚠️ No saved {stat_name} command(s) for {device_name}.")
+        return
+    for stat_name in scheduled:
+        print(f"📘 Prompting for stat: {stat_name}")
+        collect_stat_block(
+            name=stat_name,
+            testbed_path=testbed_path,
+            device_name=device_name,
+            mock=False,
+            prompt_only=True
+        )
 
+@traced("stats_phase", phase="phase", device="device_name")
 def run_stats_collection(phase, testbed_path="testbed.yaml", device_name="ap", mock=False, timestamp_dir=None):
     schema = load_stats_schema()
     collected_files = []
@@ -47,46 +69,156 @@ def run_stats_collection(phase, testbed_path="testbed.yaml", device_name="ap", m
                 testbed_path=testbed_path,
                 device_name=device_name,
                 mock=mock,
-                timestamp_dir=timestamp_dir
+                timestamp_dir=timestamp_dir,
+                phase=phase
             )
             if result_file:
                 collected_files.append(result_file)
     return collected_files
 
-def run_during_test_stats(start_time, stop_event: Event, testbed_path="testbed.yaml", device_name="ap", mock=False, timestamp_dir=None):
-    schema = load_stats_schema()
-    print(f"\n📈 Starting 'during_test' stats from {start_time}...")
-
-    next_run_time = {
-        name: start_time
+def _during_test_intervals(schema):
+    return {
+        name: cfg["collection"]["during_test"].get("interval_sec", 60)
         for name, cfg in schema.items()
         if cfg.get("collection", {}).get("during_test", {}).get("enabled", False)
     }
 
-    while not stop_event.is_set():
-        now = datetime.now()
-        for stat_name, config in schema.items():
-            during_cfg = config.get("collection", {}).get("during_test", {})
-            if not during_cfg.get("enabled", False):
-                continue
-
-            interval = during_cfg.get("interval_sec", 60)
-            if now >= next_run_time[stat_name]:
-                collect_stat_block(
-                    name=stat_name,
-                    testbed_path=testbed_path,
-                    device_name=device_name,
-                    mock=mock,
-                    start_time=start_time,
-                    end_time=now,
-                    interval_sec=interval,
-                    timestamp_dir=timestamp_dir
-                )
-                next_run_time[stat_name] = now + timedelta(seconds=interval)
-
-        stop_event.wait(timeout=1)
+def _scheduled_collection(stat_name, start_time, interval, **collect_kwargs):
+    # Each tick is stamped with its anchored due time so cpu/memory samples line up
+    def run(due_time, tick):
+        # Scheduler workers start with an empty span stack; tag the tick's spans here
+        with TRACER.span("during_tick", stat=stat_name, phase="during_test", device=collect_kwargs.get("device_name")):
+            collect_stat_block(
+                name=stat_name,
+                start_time=start_time,
+                end_time=due_time,
+                interval_sec=interval,
+                **collect_kwargs
+            )
+    return run
 
+@traced("during_test_stats", device="device_name")
+def run_during_test_stats(start_time, stop_event: Event, testbed_path="testbed.yaml", device_name="ap", mock=False,
+                          timestamp_dir=None, missed_tick_policy="skip"):
+    schema = load_stats_schema()
+    print(f"\n📈 Starting 'during_test' stats from {start_time}...")
+
+    intervals = _during_test_intervals(schema)
+    scheduler = StatScheduler(start_time, stop_event, missed_tick_policy=missed_tick_policy,
+                              max_workers=max(1, len(intervals)))
+    for stat_name, interval in intervals.items():
+        scheduler.add(stat_name, interval, _scheduled_collection(
+            stat_name, start_time, interval,
+            testbed_path=testbed_path,
+            device_name=device_name,
+            mock=mock,
+            timestamp_dir=timestamp_dir
+        ))
+
+    report = scheduler.run()
+    close_series_writers(os.path.join("run_logs", timestamp_dir or "ap_stats"))
+    print_schedule_report(report)
     print("✅ Completed 'during_test' periodic stats collection.")
+    return report
+
+def select_devices(testbed_path="testbed.yaml", selector=None, mock=False):
+    """
+    Return the testbed device names matching every attribute in selector,
+    e.g. {"type": "access_point"}. No selector selects every device.
+    """
+    testbed = SESSION_POOL.load_testbed(testbed_path, mock=mock)
+    selected = []
+    for name, device in testbed.devices.items():
+        if all(str(getattr(device, attr, None)) == str(value) for attr, value in (selector or {}).items()):
+            selected.append(name)
+    return sorted(selected)
+
+def _resolve_fanout_targets(testbed_path, device_names, selector, timestamp_dir, mock=False):
+    if device_names is None:
+        device_names = select_devices(testbed_path, selector, mock)
+    timestamp_dir = timestamp_dir or datetime.now().strftime("ap_stats_%Y%m%d_%H%M%S")
+    return list(device_names), timestamp_dir
+
+def _prime_stat_commands(stat_names, device_names):
+    # Command prompts are interactive, so resolve them serially before fanning out
+    for device_name in device_names:
+        for stat_name in stat_names:
+            get_stat_commands(stat_name, device_name)
+
+def run_stats_collection_fanout(phase, testbed_path="testbed.yaml", device_names=None, selector=None,
+                                mock=False, timestamp_dir=None, max_workers=8):
+    """
+    Collect the same phase from many devices concurrently.
+    Each device writes under run_logs/<timestamp_dir>/<device_name>/.
+    Returns {device_name: [collected files]}.
+    """
+    device_names, timestamp_dir = _resolve_fanout_targets(testbed_path, device_names, selector, timestamp_dir, mock)
+    if not device_names:
+        print("⚠️ No devices matched for fan-out collection.")
+        return {}
+
+    schema = load_stats_schema()
+    stat_names = [name for name, cfg in schema.items() if cfg.get("collection", {}).get(phase, False)]
+    _prime_stat_commands(stat_names, device_names)
+
+    if not mock:
+        # One concurrent probe round up front; collectors then hit the cached results
+        print_probe_summary(HEALTH_PROBE.probe_devices(testbed_path, device_names))
+    print(f"\n📊 Running '{phase}' stats collection on {len(device_names)} device(s) "
+          f"with {min(max_workers, len(device_names))} worker(s)...")
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            name: pool.submit(
+                run_stats_collection,
+                phase,
+                testbed_path=testbed_path,
+                device_name=name,
+                mock=mock,
+                timestamp_dir=os.path.join(timestamp_dir, name)
+            )
+            for name in device_names
+        }
+
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            print(f"❌ '{phase}' collection failed on {name}: {e}")
+            results[name] = []
+    return results
+
+def run_during_test_stats_fanout(start_time, stop_event: Event, testbed_path="testbed.yaml", device_names=None,
+                                 selector=None, mock=False, timestamp_dir=None, max_workers=8,
+                                 missed_tick_policy="skip"):
+    """
+    Periodic 'during_test' collection across many devices sharing one bounded worker pool.
+    Every device/stat pair is scheduled on the same start-anchored tick grid.
+    """
+    device_names, timestamp_dir = _resolve_fanout_targets(testbed_path, device_names, selector, timestamp_dir, mock)
+    schema = load_stats_schema()
+    intervals = _during_test_intervals(schema)
+    _prime_stat_commands(intervals, device_names)
+    print(f"\n📈 Starting 'during_test' stats on {len(device_names)} device(s) from {start_time}...")
+    if not mock:
+        print_probe_summary(HEALTH_PROBE.probe_devices(testbed_path, device_names))
+
+    scheduler = StatScheduler(start_time, stop_event, missed_tick_policy=missed_tick_policy, max_workers=max_workers)
+    for device_name in device_names:
+        for stat_name, interval in intervals.items():
+            scheduler.add((device_name, stat_name), interval, _scheduled_collection(
+                stat_name, start_time, interval,
+                testbed_path=testbed_path,
+                device_name=device_name,
+                mock=mock,
+                timestamp_dir=os.path.join(timestamp_dir, device_name)
+            ))
+
+    report = scheduler.run()
+    close_series_writers(os.path.join("run_logs", timestamp_dir))
+    print_schedule_report(report)
+    print("✅ Completed 'during_test' periodic stats collection on all devices.")
+    return report
 
 if __name__ == "__main__":
     from datetime import datetime, timedelta
@@ -121,3 +253,5 @@ if __name__ == "__main__":
         mock=True,
         timestamp_dir=ts_dir
     )
+
+    SESSION_POOL.close_all()
@@ -0,0 +1,133 @@
+# stats_scheduler.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Drift-free periodic scheduler for 'during_test' stats collection.
+# Ticks are anchored to the test start time (tick N is due at start + N*interval),
+# kept in a priority queue keyed by due time, and dispatched to a worker pool so
+# stats whose due times coincide run concurrently. A stat never overlaps itself;
+# when a run overruns its next tick the missed-tick policy decides what happens:
+#   skip     - jump to the next tick that is still in the future
+#   catch_up - run every missed tick back to back until caught up
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+MISSED_TICK_POLICIES = ("skip", "catch_up")
+MAX_IDLE_WAIT_SEC = 0.5
+
+
+class StatScheduler:
+    def __init__(self, start_time, stop_event, missed_tick_policy="skip", max_workers=4):
+        if missed_tick_policy not in MISSED_TICK_POLICIES:
+            raise ValueError(f"❌ Unknown missed tick policy '{missed_tick_policy}'. Use one of {MISSED_TICK_POLICIES}.")
+        self.start_time = start_time
+        self.stop_event = stop_event
+        self.missed_tick_policy = missed_tick_policy
+        self.max_workers = max_workers
+        # Anchor the wall-clock start time to the monotonic clock once
+        elapsed = max(0.0, (datetime.now(start_time.tzinfo) - start_time).total_seconds())
+        self._start_mono = time.monotonic() - elapsed
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._jobs = {}
+        self._stats = {}
+
+    def add(self, key, interval_sec, fn):
+        """
+        Register a periodic job. fn(due_time, tick) is called for every tick,
+        where due_time is the anchored datetime start_time + tick*interval_sec.
+        """
+        if interval_sec <= 0:
+            raise ValueError(f"❌ Interval for {key} must be positive, got {interval_sec}.")
+        self._jobs[key] = (interval_sec, fn)
+        self._stats[key] = {"runs": 0, "skipped": 0, "errors": 0, "jitter": []}
+        self._push(key, 0)
+
+    def _due_mono(self, key, tick):
+        return self._start_mono + tick * self._jobs[key][0]
+
+    def _push(self, key, tick):
+        with self._cond:
+            heapq.heappush(self._heap, (self._due_mono(key, tick), next(self._seq), key, tick))
+            self._cond.notify()
+
+    def _run_tick(self, key, tick, due_mono):
+        interval, fn = self._jobs[key]
+        stats = self._stats[key]
+        stats["jitter"].append(time.monotonic() - due_mono)
+        try:
+            fn(self.start_time + timedelta(seconds=tick * interval), tick)
+            stats["runs"] += 1
+        except Exception as e:
+            stats["errors"] += 1
+            print(f"❌ Scheduled collection {key} tick {tick} failed: {e}")
+        finally:
+            self._schedule_next(key, tick)
+
+    def _schedule_next(self, key, tick):
+        if self.stop_event.is_set():
+            return
+        interval = self._jobs[key][0]
+        next_tick = tick + 1
+        if self.missed_tick_policy == "skip":
+            elapsed = time.monotonic() - self._start_mono
+            current_tick = math.floor(elapsed / interval) + 1
+            if current_tick > next_tick:
+                self._stats[key]["skipped"] += current_tick - next_tick
+                next_tick = current_tick
+        self._push(key, next_tick)
+
+    def run(self):
+        """
+        Dispatch ticks until stop_event is set, then wait for in-flight runs.
+        Returns the per-job report (see report()).
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while not self.stop_event.is_set():
+                ready = []
+                with self._cond:
+                    if not self._heap:
+                        self._cond.wait(MAX_IDLE_WAIT_SEC)
+                        continue
+                    delay = self._heap[0][0] - time.monotonic()
+                    if delay > 0:
+                        self._cond.wait(min(delay, MAX_IDLE_WAIT_SEC))
+                        continue
+                    now = time.monotonic()
+                    while self._heap and self._heap[0][0] <= now:
+                        ready.append(heapq.heappop(self._heap))
+                for due_mono, _, key, tick in ready:
+                    pool.submit(self._run_tick, key, tick, due_mono)
+        return self.report()
+
+    def report(self):
+        """
+        Per-job summary: runs, skipped ticks, errors and start jitter (seconds).
+        """
+        report = {}
+        for key, stats in self._stats.items():
+            jitter = sorted(stats["jitter"])
+            report[key] = {
+                "runs": stats["runs"],
+                "skipped": stats["skipped"],
+                "errors": stats["errors"],
+                "jitter_mean_sec": round(sum(jitter) / len(jitter), 4) if jitter else None,
+                "jitter_p95_sec": round(jitter[min(len(jitter) - 1, int(0.95 * len(jitter)))], 4) if jitter else None,
+                "jitter_max_sec": round(jitter[-1], 4) if jitter else None,
+            }
+        return report
+
+
+def print_schedule_report(report):
+    print("\n⏱️ During-test schedule report:")
+    for key, row in report.items():
+        label = "/".join(key) if isinstance(key, tuple) else key
+        print(f"  - {label}: runs={row['runs']} skipped={row['skipped']} errors={row['errors']} "
+              f"jitter mean={row['jitter_mean_sec']}s p95={row['jitter_p95_sec']}s max={row['jitter_max_sec']}s")
@@ -0,0 +1,121 @@
+# timeseries_writer.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Append-only CSV time-series sink for 'during_test' stats.
+# Each tick appends one parsed sample to a single growing series file per stat
+# per device. Rows are written whole and flushed immediately; fsync is batched
+# (every N rows or T seconds). On reopen, a torn trailing row left by a crash is
+# truncated away so the series always ends on a complete row.
+
+import os
+import threading
+import time
+
+SERIES_FIELDS = {
+    "cpu": ["timestamp", "cpu_0", "cpu_1", "cpu_2", "cpu_3"],
+    "memory": ["timestamp", "free_mb", "available_mb"],
+}
+SERIES_FILENAMES = {
+    "cpu": "cpu_usage.csv",
+    "memory": "memory_usage.csv",
+}
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _repair_partial_row(path):
+    # Drop anything after the last newline (a row torn by a crash mid-write)
+    size = os.path.getsize(path)
+    if size == 0:
+        return 0
+    with open(path, 'rb+') as f:
+        block = 4096
+        pos = size
+        while pos > 0:
+            start = max(0, pos - block)
+            f.seek(start)
+            chunk = f.read(pos - start)
+            if pos == size and chunk.endswith(b"\n"):
+                return size
+            idx = chunk.rfind(b"\n")
+            if idx != -1:
+                f.truncate(start + idx + 1)
+                return start + idx + 1
+            pos = start
+        f.truncate(0)
+        return 0
+
+
+class TimeSeriesWriter:
+    def __init__(self, path, fieldnames, fsync_every=10, fsync_interval_sec=30):
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        self.fsync_every = fsync_every
+        self.fsync_interval_sec = fsync_interval_sec
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_fsync = time.monotonic()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        size = _repair_partial_row(path) if os.path.exists(path) else 0
+        self._file = open(path, 'a', newline='')
+        if size == 0:
+            self._file.write(",".join(self.fieldnames) + "\n")
+            self._sync()
+
+    def append(self, row):
+        """
+        Append one sample. row is a dict keyed by fieldnames or a sequence in field order;
+        a datetime in the timestamp column is formatted as TIMESTAMP_FORMAT.
+        """
+        values = [row.get(field, "") for field in self.fieldnames] if isinstance(row, dict) else list(row)
+        if len(values) != len(self.fieldnames):
+            raise ValueError(f"❌ Expected {len(self.fieldnames)} values for {self.path}, got {len(values)}.")
+        if hasattr(values[0], "strftime"):
+            values[0] = values[0].strftime(TIMESTAMP_FORMAT)
+        line = ",".join(str(v) for v in values) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._pending += 1
+            if self._pending >= self.fsync_every or time.monotonic() - self._last_fsync >= self.fsync_interval_sec:
+                self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_fsync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+
+_WRITERS = {}
+_WRITERS_LOCK = threading.Lock()
+
+def get_series_writer(path, fieldnames):
+    """
+    Return the open writer for path, opening (and repairing) it on first use.
+    """
+    key = os.path.abspath(path)
+    with _WRITERS_LOCK:
+        writer = _WRITERS.get(key)
+        if writer is None:
+            writer = _WRITERS[key] = TimeSeriesWriter(path, fieldnames)
+        return writer
+
+def close_series_writers(root=None):
+    """
+    Close the writers of the series files under root (e.g. run_logs/<run folder>),
+    leaving other runs' writers open; without root, close every writer.
+    """
+    prefix = None if root is None else os.path.join(os.path.abspath(root), "")
+    with _WRITERS_LOCK:
+        keys = [key for key in _WRITERS if prefix is None or key.startswith(prefix)]
+        writers = [_WRITERS.pop(key) for key in keys]
+    for writer in writers:
+        writer.close()
@@ -0,0 +1,36 @@
+# cpu_parser.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Extracts per-core CPU busy percentages from AP 'show processes cpu' output
+# (busybox top style: "CPU:   0% usr   2% sys ...  97% idle ...").
+# Busy % is reported as 100 - idle.
+
+import re
+
+CPU_LINE_RE = re.compile(r"^\s*CPU(\d*)\s*:.*?(\d+(?:\.\d+)?)%\s*idle", re.MULTILINE)
+
+
+def parse_cpu_busy(output):
+    """
+    Return the busy % for every CPU line in one command output, in order.
+    """
+    busy = [100 - float(idle) for _, idle in CPU_LINE_RE.findall(output or "")]
+    return [int(value) if value.is_integer() else round(value, 1) for value in busy]
+
+
+def parse_cpu_usage(outputs, num_cores=4):
+    """
+    outputs: list of per-command outputs (one 'sh processes cpu N' per core),
+    or a single output listing several CPUn lines.
+    Returns [cpu_0, ..., cpu_{num_cores-1}] or None if nothing was parsed.
+    """
+    if isinstance(outputs, str):
+        outputs = [outputs]
+    values = []
+    for output in outputs:
+        values.extend(parse_cpu_busy(output))
+    if not values:
+        return None
+    values = values[:num_cores]
+    return values + [""] * (num_cores - len(values))
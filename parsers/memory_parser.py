@@ -0,0 +1,44 @@
+# memory_parser.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Extracts free/available memory (MB) from AP memory commands.
+# Supports 'sh memory summary' (free-style table in kB) and
+# 'sh memory detail' (/proc/meminfo style MemFree/MemAvailable lines).
+
+import re
+
+SUMMARY_HEADER_RE = re.compile(r"^\s*total\s+used\s+free.*available", re.MULTILINE)
+SUMMARY_MEM_RE = re.compile(r"^\s*Mem:\s+([\d\s]+)$", re.MULTILINE)
+MEMINFO_RE = re.compile(r"^(MemFree|MemAvailable):\s+(\d+)\s*kB", re.MULTILINE)
+
+
+def parse_memory_usage(outputs):
+    """
+    outputs: list of per-command outputs or a single output.
+    Returns {"free_mb": ..., "available_mb": ...} or None if nothing was parsed.
+    """
+    if isinstance(outputs, str):
+        outputs = [outputs]
+    text = "\n".join(o or "" for o in outputs)
+
+    header = SUMMARY_HEADER_RE.search(text)
+    mem = SUMMARY_MEM_RE.search(text, header.end()) if header else None
+    if header and mem:
+        columns = header.group(0).split()
+        values = mem.group(1).split()
+        row = dict(zip(columns, values))
+        if "free" in row and "available" in row:
+            return {
+                "free_mb": int(row["free"]) // 1024,
+                "available_mb": int(row["available"]) // 1024,
+            }
+
+    meminfo = dict(MEMINFO_RE.findall(text))
+    if "MemFree" in meminfo:
+        free_kb = int(meminfo["MemFree"])
+        return {
+            "free_mb": free_kb // 1024,
+            "available_mb": int(meminfo.get("MemAvailable", free_kb)) // 1024,
+        }
+    return None
@@ -0,0 +1,384 @@
+# perstats_parser.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Parses per-client 'show interfaces dot11Radio N mumimo client <MAC>' output
+# (the 'performance' stat, see mock_samples/perstats.txt) into typed structures:
+#   - client summary row, configured rates, accumulated Tx/Rx counters
+#   - SU/MU slot tables and Rate-Index tables (numeric arrays)
+#   - per-direction (Node Tx / Node Rx) counters, HT/VHT/HE/EHT MCS histograms,
+#     NSS and GI distributions, BW counts, RU and REO queue stats
+# Everything is built in a single linear pass over the lines, and one capture
+# may hold many client dumps back to back.
+
+import re
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from utils.blob_store import read_text
+from utils.tracing import traced
+
+COUNT_TYPECODE = "q"
+
+COMMAND_RE = re.compile(r"dot11Radio\s*(\d+)\s+mumimo\s+client\s+(\S+)", re.IGNORECASE)
+MCS_RE = re.compile(r"^(HT|VHT|HE|EHT)((?: [A-Z][A-Z-]*)*) MCS (\d+)\b.*=\s*(\d+)$")
+VALUE_TOKEN_RE = re.compile(r"[^\s(]+ \(\d+\)|\S+")
+PAIR_RE = re.compile(r"(\S+)\s+(\d+)")
+EQ_PAIR_RE = re.compile(r"([A-Za-z][\w' ]*?)\s*=\s*(\d+)")
+RATE_TABLE_COLUMNS = ("rate_index", "rx_pkts", "tx_pkts", "tx_retries")
+
+
+def _to_number(value):
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+
+def _set_histogram(histograms, key, index, value):
+    hist = histograms.get(key)
+    if hist is None:
+        hist = histograms[key] = array(COUNT_TYPECODE)
+    if index >= len(hist):
+        hist.extend([0] * (index + 1 - len(hist)))
+    hist[index] = value
+
+
+@dataclass
+class RateTable:
+    rate_index: array = field(default_factory=lambda: array(COUNT_TYPECODE))
+    rx_pkts: array = field(default_factory=lambda: array(COUNT_TYPECODE))
+    tx_pkts: array = field(default_factory=lambda: array(COUNT_TYPECODE))
+    tx_retries: array = field(default_factory=lambda: array(COUNT_TYPECODE))
+
+    def __len__(self):
+        return len(self.rate_index)
+
+
+@dataclass
+class DirectionStats:
+    counters: Dict[str, int] = field(default_factory=dict)
+    # "<msdu|ppdu>/<family>" -> counts indexed by MCS, e.g. "msdu/EHT", "ppdu/HE MU-MIMO"
+    mcs: Dict[str, array] = field(default_factory=dict)
+    # "<msdu|ppdu>[/<mode>]" -> counts for NSS 1..8, e.g. "msdu", "ppdu/SU"
+    nss: Dict[str, array] = field(default_factory=dict)
+    gi: Dict[str, int] = field(default_factory=dict)
+    bw: Dict[str, int] = field(default_factory=dict)
+    punctured_bw: Dict[str, int] = field(default_factory=dict)
+    legacy: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    distributions: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    mpdu: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    ru: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+
+@dataclass
+class ClientPerfStats:
+    mac: str
+    radio: Optional[int] = None
+    info: Dict[str, str] = field(default_factory=dict)
+    configured_rates: Dict[str, str] = field(default_factory=dict)
+    accumulated: Dict[str, object] = field(default_factory=dict)
+    slots: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    su_rates: RateTable = field(default_factory=RateTable)
+    mu_rates: RateTable = field(default_factory=RateTable)
+    tx: DirectionStats = field(default_factory=DirectionStats)
+    rx: DirectionStats = field(default_factory=DirectionStats)
+    reo: Dict[int, Dict[str, object]] = field(default_factory=dict)
+
+    def mcs_distribution(self, direction="tx", section="msdu"):
+        """
+        Sum the MCS histograms of one direction/section across PHY families.
+        """
+        stats = self.tx if direction == "tx" else self.rx
+        total = array(COUNT_TYPECODE)
+        for key, hist in stats.mcs.items():
+            if key.split("/", 1)[0] != section:
+                continue
+            if len(hist) > len(total):
+                total.extend([0] * (len(hist) - len(total)))
+            for idx, value in enumerate(hist):
+                total[idx] += value
+        return total
+
+
+class _ParserState:
+    def __init__(self):
+        self.clients = []
+        self.client = None
+        self.pending_radio = None
+        self.pending_mac = None
+        self.mode = None          # client header parsing mode
+        self.header = None
+        self.direction = None
+        self.section = None       # "msdu" | "ppdu"
+        self.tx_mode = None       # Transmit Type / reception mode block
+        self.block = None
+        self.reo_tid = None
+
+    def start_client(self, mac):
+        self.client = ClientPerfStats(mac=mac, radio=self.pending_radio)
+        self.clients.append(self.client)
+        self.pending_radio = None
+        self.pending_mac = None
+        self.mode = None
+        self.header = None
+        self.direction = None
+        self.section = None
+        self.tx_mode = None
+        self.block = None
+        self.reo_tid = None
+
+
+def _parse_client_line(state, stripped):
+    client = state.client
+    mode = state.mode
+    if mode == "info":
+        values = stripped.split()
+        client.info = dict(zip(state.header, values))
+        state.mode = None
+        return True
+    if mode == "accumulated_header":
+        state.header = stripped.split()
+        state.mode = "accumulated"
+        return True
+    if mode == "accumulated":
+        values = VALUE_TOKEN_RE.findall(stripped)
+        client.accumulated = {k: _to_number(v) for k, v in zip(state.header, values)}
+        state.mode = None
+        return True
+    if mode == "slots":
+        values = stripped.split()
+        if len(values) == len(state.header) and values[0].isdigit():
+            row = {k: _to_number(v) for k, v in zip(state.header, values)}
+            client.slots[row.pop("Type")] = row
+            return True
+        state.mode = None
+        return False
+    if mode in ("su_rates", "mu_rates"):
+        values = stripped.split()
+        if stripped.startswith("Rate-Index"):
+            return True
+        if len(values) == 4 and values[0].isdigit():
+            table = client.su_rates if mode == "su_rates" else client.mu_rates
+            for column, value in zip(RATE_TABLE_COLUMNS, values):
+                getattr(table, column).append(int(value))
+            return True
+        state.mode = None
+        return False
+    if mode == "configured":
+        if ":" in stripped and "Rates" in stripped:
+            key, _, value = stripped.partition(":")
+            client.configured_rates[key.strip()] = value.strip()
+            return True
+        state.mode = None
+        return False
+    return False
+
+
+def _parse_direction_line(state, line, stripped):
+    stats = state.client.tx if state.direction == "tx" else state.client.rx
+    indented = line[0] in " \t"
+
+    if stripped == "MSDU Count" or stripped == "PPDU Count":
+        state.section = "msdu" if stripped[0] == "M" else "ppdu"
+        if not indented:
+            state.tx_mode = None
+            state.block = stripped
+        return
+
+    if stripped.startswith(("Transmit Type ", "reception mode ")) and not stripped.endswith(":"):
+        state.tx_mode = stripped.split(" ", 2)[2]
+        state.block = None
+        return
+
+    if "=" in stripped:
+        if stripped[0] in "HVE" and " MCS " in stripped:
+            m = MCS_RE.match(stripped)
+            if m:
+                family = m.group(1) + m.group(2)
+                _set_histogram(stats.mcs, f"{state.section}/{family}", int(m.group(3)), int(m.group(4)))
+                return
+        key, _, value = stripped.partition("=")
+        key = key.strip()
+        value = value.strip()
+
+        if key.startswith("NSS("):
+            nss_key = state.section if state.tx_mode is None else f"{state.section}/{state.tx_mode}"
+            stats.nss[nss_key] = array(COUNT_TYPECODE, (int(v) for v in value.split()))
+            return
+        if key == "SGI":
+            stats.gi = {k: int(v) for k, v in PAIR_RE.findall(value)}
+            return
+        if key == "BW Counts":
+            stats.bw = {k: int(v) for k, v in PAIR_RE.findall(value)}
+            return
+        if key == "Punctured BW Counts":
+            stats.punctured_bw = {k: int(v) for k, v in PAIR_RE.findall(value)}
+            return
+        if key == "MPDU OK":
+            stats.mpdu[state.tx_mode or state.section] = {k.strip(): int(v) for k, v in EQ_PAIR_RE.findall(stripped)}
+            return
+        if stripped.startswith("RU_"):
+            name, _, rest = stripped.partition(":")
+            stats.ru[name] = {k.strip(): int(v) for k, v in EQ_PAIR_RE.findall(rest)}
+            return
+        if key == "Ring Id":
+            state.block = f"Ring {value}"
+            return
+        if not value.isdigit():
+            return
+        if not indented:
+            state.tx_mode = None
+            state.block = None
+            stats.counters[key] = int(value)
+        elif key.startswith(("OFDM ", "CCK ")) and state.block in ("MSDU Count", "PPDU Count"):
+            stats.legacy.setdefault(state.section, {})[key] = int(value)
+        elif state.block:
+            stats.counters[f"{state.block}/{key}"] = int(value)
+        else:
+            stats.counters[key] = int(value)
+        return
+
+    if stripped.startswith(("MSDUs Success:", "MPDUs Success:", "MPDUs Tried:")):
+        key, _, rest = stripped.partition(":")
+        stats.distributions[key] = {k: int(v) for k, v in PAIR_RE.findall(rest.replace(",", " "))}
+        return
+
+    if not indented:
+        state.tx_mode = None
+        pairs = PAIR_RE.findall(stripped)
+        if pairs and state.block and " ".join(f"{k} {v}" for k, v in pairs) == " ".join(stripped.split()):
+            # e.g. "MSDU Reception Type" followed by "SU 3203 MU_MIMO 0 ..."
+            stats.distributions[state.block] = {k: int(v) for k, v in pairs}
+            return
+        state.block = stripped.rstrip(":").strip()
+
+
+def _parse_reo_line(state, stripped):
+    key, sep, value = stripped.partition(":")
+    if not sep:
+        return False
+    key = key.strip()
+    value = value.strip()
+    if value.isdigit() and not key.startswith(("pn_", "rx_bitmap", "last_rx")):
+        value = int(value)
+    state.client.reo[state.reo_tid][key] = value
+    return True
+
+
+def parse_perstats(text):
+    """
+    Parse one or more client dumps. Returns a list of ClientPerfStats in file order.
+    """
+    state = _ParserState()
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+
+        if "mumimo client" in stripped:
+            m = COMMAND_RE.search(stripped)
+            if m:
+                state.pending_radio = int(m.group(1))
+                state.pending_mac = m.group(2)
+                state.client = None
+                continue
+
+        if stripped.startswith("MAC AID"):
+            header = stripped.split()
+            state.header = header
+            state.mode = "info"
+            if state.client is None or state.client.info:
+                state.start_client(state.pending_mac or "")
+                state.header = header
+                state.mode = "info"
+            continue
+
+        if state.client is None:
+            continue
+        client = state.client
+
+        if state.mode and _parse_client_line(state, stripped):
+            if not client.mac:
+                client.mac = client.info.get("MAC", "")
+            continue
+
+        if stripped.startswith("REO queue stats (TID:"):
+            state.reo_tid = int(stripped.split("TID:")[1].split(")")[0])
+            client.reo[state.reo_tid] = {}
+            continue
+        if state.reo_tid is not None and _parse_reo_line(state, stripped):
+            continue
+
+        if state.direction is None:
+            if stripped == "Configured rates for client:":
+                state.mode = "configured"
+            elif stripped == "Client Accumulated Stats:":
+                state.mode = "accumulated_header"
+            elif stripped.startswith("Slot Type"):
+                state.header = stripped.split()
+                state.mode = "slots"
+            elif stripped == "SU Rate Statistics:":
+                state.mode = "su_rates"
+            elif stripped == "MU Rate Statistics:":
+                state.mode = "mu_rates"
+            elif stripped == "Node Tx Stats:":
+                state.direction = "tx"
+            continue
+
+        if stripped == "Node Rx Stats:":
+            state.direction = "rx"
+            state.section = None
+            state.tx_mode = None
+            state.block = None
+            continue
+        if stripped[0] == "[":
+            continue
+        _parse_direction_line(state, line, stripped)
+
+    for client in state.clients:
+        if not client.mac:
+            client.mac = client.info.get("MAC", "")
+    return state.clients
+
+
+@traced("parse_perstats")
+def parse_perstats_file(path):
+    return parse_perstats(read_text(path))
+
+
+def clients_by_mac(clients):
+    return {client.mac.upper(): client for client in clients}
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Parse per-client dot11Radio performance output")
+    parser.add_argument("path", nargs="?", default="mock_samples/perstats.txt", help="Captured performance output")
+    parser.add_argument("--repeat", type=int, default=0, help="Parse N times and report parse rate")
+    args = parser.parse_args()
+
+    clients = parse_perstats_file(args.path)
+    for client in clients:
+        print(f"\n📶 Client {client.mac} (radio {client.radio}, RSSI {client.info.get('RSSI')})")
+        print(f"  - TxBytes={client.accumulated.get('TxBytes')} RxBytes={client.accumulated.get('RxBytes')} "
+              f"TxCumRetries={client.accumulated.get('TxCumRetries')}")
+        print(f"  - Tx rate: {client.accumulated.get('TxRt(Mbps)')} | Rx rate: {client.accumulated.get('RxRt(Mbps)')}")
+        print(f"  - SU rate indexes: {list(client.su_rates.rate_index)}")
+        print(f"  - Tx MSDU MCS: {list(client.mcs_distribution('tx', 'msdu'))}")
+        print(f"  - Tx GI: {client.tx.gi} | Tx NSS: {list(client.tx.nss.get('msdu', []))}")
+
+    if args.repeat:
+        with open(args.path) as f:
+            text = f.read()
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            parse_perstats(text)
+        elapsed = time.perf_counter() - start
+        print(f"\n⏱️ Parsed {args.repeat} dump(s) in {elapsed:.3f}s ({args.repeat / elapsed:.0f}/s)")
@@ -0,0 +1,262 @@
+# campaign_runner.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Headless test campaigns: a YAML file gives a parameter matrix over a
+# TEST_SCHEMAS test type, the matrix is expanded into runs and the runs are
+# executed without any prompt, back to back or concurrently on disjoint APs
+# (each AP runs one test at a time). Every run is a normal performance test
+# with headless=True: commands come from the campaign file or the saved
+# registries, and the test window is 'duration' seconds.
+#
+#   name: udp_sweep
+#   test_type: performance
+#   devices: [ap1, ap2]              # one lane per AP
+#   testbed_path: testbed.yaml
+#   mock: false
+#   target_runs_per_hour: 12         # optional; checked against the plan
+#   overhead_sec: 90                 # optional; pre/post time per run for the plan
+#   repeat: 1
+#   base: {duration: 120, ssid: ssid_wpa3_sae}
+#   matrix:
+#     radio_band: [6G, 5G]
+#     bandwidth: [80MHz, 160MHz]
+#     nss: [1, 2]
+#     direction: [DL, UL]
+#     traffic_type: [UDP, TCP]
+#   exclude:
+#     - {radio_band: 5G, bandwidth: 160MHz}
+#   log_commands: ["show logging"]   # optional; default: saved per device
+#   stat_commands: {version: ["show version"]}
+#
+# Each run executes in a fresh worker process that exits after the run, so
+# tracing, command caches, probe/breaker state and sessions never carry over
+# from one run to the next. Console output goes to
+# run_logs/campaigns/<name>_<timestamp>/run_<n>.log, next to summary.csv.
+#
+# Usage:
+#   python -m runners.campaign_runner configs/campaign.yaml
+#   python -m runners.campaign_runner configs/campaign.yaml --dry-run
+
+import csv
+import itertools
+import math
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import datetime
+
+import yaml
+
+from utils.test_schemas import TEST_SCHEMAS
+
+CAMPAIGN_ROOT = os.path.join("run_logs", "campaigns")
+DEFAULT_OVERHEAD_SEC = 60
+SUMMARY_FIELDS = ["run", "device", "status", "run_id", "started", "elapsed_sec", "params", "error"]
+
+
+class CampaignError(Exception):
+    pass
+
+
+def load_campaign(path):
+    with open(path, 'r') as f:
+        campaign = yaml.safe_load(f) or {}
+    campaign.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+    return campaign
+
+
+def _coerce(key, value, schema):
+    if key not in schema:
+        raise CampaignError(f"❌ Unknown parameter '{key}' (expected one of {list(schema)})")
+    default = schema[key]
+    return value if isinstance(value, type(default)) else type(default)(value)
+
+
+def expand_matrix(campaign):
+    """
+    Test configs for every combination of the matrix values (first key varies
+    slowest), minus excluded combinations, times repeat.
+    """
+    test_type = campaign.get("test_type", "performance")
+    schema = TEST_SCHEMAS.get(test_type)
+    if schema is None:
+        raise CampaignError(f"❌ Unknown test type '{test_type}'")
+    base = {**schema, **{k: _coerce(k, v, schema) for k, v in (campaign.get("base") or {}).items()}}
+    matrix = campaign.get("matrix") or {}
+    keys = list(matrix)
+    values = [[_coerce(key, v, schema) for v in (matrix[key] if isinstance(matrix[key], list) else [matrix[key]])]
+              for key in keys]
+    excludes = [{k: _coerce(k, v, schema) for k, v in rule.items()} for rule in campaign.get("exclude") or []]
+
+    configs = []
+    for combo in itertools.product(*values):
+        params = dict(zip(keys, combo))
+        if any(all(params.get(k) == v for k, v in rule.items()) for rule in excludes):
+            continue
+        configs.append({"test_type": test_type, **base, **params})
+    return [dict(config) for config in configs for _ in range(campaign.get("repeat", 1))]
+
+
+def plan_campaign(runs, devices, target_runs_per_hour=None, overhead_sec=DEFAULT_OVERHEAD_SEC):
+    """
+    Lanes (concurrent APs) needed for the target and the projected rate.
+    Without a target every AP gets a lane.
+    """
+    if not runs or not devices:
+        return {"runs": len(runs), "lanes": 0, "run_sec": 0, "runs_per_hour": 0, "hours": 0, "meets_target": False}
+    run_sec = sum(config.get("duration", 0) for config in runs) / len(runs) + overhead_sec
+    lanes = len(devices)
+    if target_runs_per_hour:
+        lanes = min(len(devices), max(1, math.ceil(target_runs_per_hour * run_sec / 3600)))
+    lanes = min(lanes, len(runs))
+    rate = lanes * 3600 / run_sec
+    return {
+        "runs": len(runs),
+        "lanes": lanes,
+        "run_sec": run_sec,
+        "runs_per_hour": rate,
+        "hours": len(runs) / rate,
+        "meets_target": not target_runs_per_hour or rate >= target_runs_per_hour,
+    }
+
+
+def _execute_run(config, log_path):
+    """
+    One headless test in a worker process; console output goes to log_path.
+    """
+    # Imported here so the parent process never loads the collectors
+    from tests.performance_test_runner import run_performance_test
+    from utils.config_loader import save_config_file
+
+    with open(log_path, 'w', buffering=1) as log, redirect_stdout(log), redirect_stderr(log):
+        try:
+            config["config_file"] = save_config_file(config, folder=os.path.join("run_logs", config["stats_dir"]))
+            run = run_performance_test(config) or {}
+            return {"status": run.get("status", "unknown"), "run_id": run.get("run_id"), "error": ""}
+        except Exception as e:
+            traceback.print_exc()
+            return {"status": "error", "run_id": config["stats_dir"], "error": str(e)}
+
+
+def _params_text(config, keys):
+    return " ".join(f"{key}={config[key]}" for key in keys)
+
+
+def run_campaign(campaign, dry_run=False):
+    """
+    Expand and execute a campaign. Returns the summary rows.
+    """
+    runs = expand_matrix(campaign)
+    devices = list(campaign.get("devices") or [])
+    if not devices:
+        raise CampaignError("❌ Campaign lists no devices")
+    target = campaign.get("target_runs_per_hour")
+    plan = plan_campaign(runs, devices, target, campaign.get("overhead_sec", DEFAULT_OVERHEAD_SEC))
+    matrix_keys = list(campaign.get("matrix") or {})
+
+    print(f"\n🧪 Campaign '{campaign['name']}': {plan['runs']} run(s) on {plan['lanes']} of {len(devices)} AP(s), "
+          f"~{plan['run_sec']:.0f}s per run -> {plan['runs_per_hour']:.1f} runs/hour, ~{plan['hours']:.1f}h")
+    if target and not plan["meets_target"]:
+        print(f"⚠️ Target of {target} runs/hour needs more APs or shorter runs "
+              f"({math.ceil(target * plan['run_sec'] / 3600)} lanes at this run time).")
+    if dry_run:
+        for idx, config in enumerate(runs, 1):
+            print(f"  {idx:>4}. {_params_text(config, matrix_keys)}")
+        return []
+
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    campaign_dir = os.path.join(CAMPAIGN_ROOT, f"{campaign['name']}_{stamp}")
+    os.makedirs(campaign_dir, exist_ok=True)
+    pending = queue.Queue()
+    for idx, config in enumerate(runs, 1):
+        pending.put((idx, config))
+
+    rows = []
+    lock = threading.Lock()
+    started = time.time()
+    shared = {key: campaign[key] for key in ("log_commands", "stat_commands", "log_compression",
+                                             "dedup_outputs", "metrics_textfile_dir") if key in campaign}
+
+    def lane(device, pool):
+        while True:
+            try:
+                idx, config = pending.get_nowait()
+            except queue.Empty:
+                return
+            config = {
+                **config,
+                **shared,
+                "mock": campaign.get("mock", False),
+                "headless": True,
+                "device_id": device,
+                "testbed_path": campaign.get("testbed_path", "testbed.yaml"),
+                "stats_dir": f"ap_stats_{stamp}_{campaign['name']}_{idx:04d}",
+            }
+            print(f"▶️ [{idx}/{len(runs)}] {device}: {_params_text(config, matrix_keys)}")
+            run_start = time.time()
+            try:
+                result = pool.submit(_execute_run, config, os.path.join(campaign_dir, f"run_{idx:04d}.log")).result()
+            except Exception as e:
+                result = {"status": "error", "run_id": config["stats_dir"], "error": str(e)}
+            row = {
+                "run": idx,
+                "device": device,
+                "started": datetime.fromtimestamp(run_start).strftime("%Y-%m-%d %H:%M:%S"),
+                "elapsed_sec": round(time.time() - run_start, 1),
+                "params": _params_text(config, matrix_keys),
+                **result,
+            }
+            with lock:
+                rows.append(row)
+                done = len(rows)
+                rate = done * 3600 / max(time.time() - started, 1e-6)
+            eta = (len(runs) - done) * 3600 / rate
+            print(f"{'✅' if row['status'] == 'completed' else '❌'} [{idx}/{len(runs)}] {device}: {row['status']} "
+                  f"in {row['elapsed_sec']}s | {done}/{len(runs)} done, {rate:.1f} runs/hour, ETA {eta / 60:.0f} min")
+
+    # spawn: worker processes start clean instead of inheriting the parent's threads;
+    # one run per worker: module-level state (TRACER, caches, HEALTH_PROBE, SESSION_POOL) dies with it
+    with ProcessPoolExecutor(max_workers=plan["lanes"], mp_context=multiprocessing.get_context("spawn"),
+                             max_tasks_per_child=1) as pool:
+        lanes = [threading.Thread(target=lane, args=(device, pool), name=f"lane-{device}")
+                 for device in devices[:plan["lanes"]]]
+        for thread in lanes:
+            thread.start()
+        for thread in lanes:
+            thread.join()
+
+    rows.sort(key=lambda row: row["run"])
+    summary_csv = os.path.join(campaign_dir, "summary.csv")
+    with open(summary_csv, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    elapsed = time.time() - started
+    completed = sum(1 for row in rows if row["status"] == "completed")
+    print(f"\n🏁 Campaign '{campaign['name']}': {completed}/{len(rows)} completed in {elapsed / 60:.1f} min "
+          f"({len(rows) * 3600 / max(elapsed, 1e-6):.1f} runs/hour)")
+    print(f"📄 Summary written to {summary_csv}")
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Run a headless test campaign from a YAML matrix")
+    parser.add_argument("campaign", help="Campaign YAML file")
+    parser.add_argument("--dry-run", action="store_true", help="Print the expanded runs and the plan only")
+    parser.add_argument("--devices", nargs="+", default=None, help="Override the campaign's AP list")
+    parser.add_argument("--target", type=float, default=None, help="Override target_runs_per_hour")
+    args = parser.parse_args()
+
+    campaign = load_campaign(args.campaign)
+    if args.devices:
+        campaign["devices"] = args.devices
+    if args.target:
+        campaign["target_runs_per_hour"] = args.target
+    run_campaign(campaign, dry_run=args.dry_run)
@@ -0,0 +1,216 @@
+# dag_executor.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Small dependency-graph executor for the phases of a test run.
+# Tasks are plain function calls; a task starts on a worker thread as soon as
+# every task it depends on has finished:
+#
+#   graph = TaskGraph("post_test", device="ap1")
+#   graph.add("after_test_stats", run_stats_collection, "after_test", ...)
+#   graph.add("perf_delta", run_perf_delta, run_path, after=["after_test_stats"])
+#   graph.add("collect_logs", collect_logs_from_testbed, ...)
+#   graph.add("correlation", run_log_correlation, Result("collect_logs"))
+#   results = graph.run()
+#
+# Result("name") in the arguments is replaced by that task's return value and
+# implies the dependency. Tasks can also be added while the graph runs, e.g.
+# one analysis task per log file as the collector saves it; such tasks go into
+# a group (graph.group("log_files"), add(..., group="log_files")), and
+# Result("log_files") is the list of the group's results in the order they
+# were added. A task waiting on a group must also wait on the task that adds
+# its members, so the group is complete once that task has finished.
+#
+# A task that raises is reported as failed and everything depending on it is
+# skipped; independent branches carry on. Every task runs inside a tracing
+# span named "task" carrying the graph's attributes (device, phase).
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.tracing import TRACER
+
+DEFAULT_MAX_WORKERS = 4
+DONE_STATES = ("completed", "failed", "skipped")
+
+
+class Result:
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f"Result({self.name!r})"
+
+
+class Task:
+    def __init__(self, name, fn, args, kwargs, after, group):
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.after = after
+        self.group = group
+        self.status = "pending"
+        self.result = None
+        self.error = None
+        self.started = None
+        self.duration = None
+
+
+def _refs(values):
+    return [value.name for value in values if isinstance(value, Result)]
+
+
+class TaskGraph:
+    def __init__(self, name="graph", max_workers=DEFAULT_MAX_WORKERS, **span_attrs):
+        self.name = name
+        self.max_workers = max_workers
+        self.span_attrs = span_attrs
+        self.tasks = {}
+        self.groups = {}
+        self._cond = threading.Condition()
+        self.started = None
+        self.wall_time = None
+
+    def group(self, name):
+        """
+        Declare a (possibly still empty) group other tasks can depend on.
+        """
+        with self._cond:
+            if name in self.tasks:
+                raise ValueError(f"❌ '{name}' is already a task")
+            self.groups.setdefault(name, [])
+        return name
+
+    def add(self, name, fn, *args, after=(), group=None, **kwargs):
+        """
+        Add a task calling fn(*args, **kwargs) once its dependencies (after plus
+        every Result in the arguments) are done. Safe to call from a running task.
+        """
+        deps = list(dict.fromkeys(list(after) + _refs(args) + _refs(kwargs.values())))
+        with self._cond:
+            if name in self.tasks or name in self.groups:
+                raise ValueError(f"❌ Duplicate task name '{name}' in {self.name}")
+            unknown = [dep for dep in deps if dep not in self.tasks and dep not in self.groups]
+            if unknown:
+                raise ValueError(f"❌ Task '{name}' depends on unknown task(s) {unknown}")
+            if group is not None:
+                self.groups.setdefault(group, []).append(name)
+            self.tasks[name] = Task(name, fn, args, kwargs, deps, group)
+            self._cond.notify_all()
+        return name
+
+    def _dep_tasks(self, task):
+        names = []
+        for dep in task.after:
+            names.extend(self.groups[dep] if dep in self.groups else [dep])
+        return [self.tasks[name] for name in names]
+
+    def _resolve(self, value):
+        if not isinstance(value, Result):
+            return value
+        if value.name in self.groups:
+            return [self.tasks[name].result for name in self.groups[value.name]]
+        return self.tasks[value.name].result
+
+    def _ready(self, task):
+        """
+        'run', 'skip' or None (still waiting). Groups count only once the
+        plain tasks this one waits on are done, as they may still add members.
+        """
+        plain = [self.tasks[dep] for dep in task.after if dep not in self.groups]
+        if any(dep.status not in DONE_STATES for dep in plain):
+            return None
+        deps = self._dep_tasks(task)
+        if any(dep.status in ("failed", "skipped") for dep in deps):
+            return "skip"
+        if all(dep.status == "completed" for dep in deps):
+            return "run"
+        return None
+
+    def _run_task(self, task):
+        task.started = time.time()
+        start = time.perf_counter()
+        try:
+            args = [self._resolve(arg) for arg in task.args]
+            kwargs = {key: self._resolve(value) for key, value in task.kwargs.items()}
+            with TRACER.span("task", task=task.name, graph=self.name, **self.span_attrs):
+                result = task.fn(*args, **kwargs)
+            status, error = "completed", None
+        except Exception as e:
+            print(f"❌ Task '{task.name}' failed: {e}")
+            result, status, error = None, "failed", e
+        with self._cond:
+            task.duration = time.perf_counter() - start
+            task.result, task.status, task.error = result, status, error
+            self._cond.notify_all()
+
+    def run(self):
+        """
+        Run every task (including ones added on the way) and return {name: result}.
+        """
+        self.started = time.time()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name) as pool:
+            with self._cond:
+                while True:
+                    running = False
+                    progressed = False
+                    for task in list(self.tasks.values()):
+                        if task.status == "running":
+                            running = True
+                        if task.status != "pending":
+                            continue
+                        state = self._ready(task)
+                        if state == "skip":
+                            task.status = "skipped"
+                            progressed = True
+                        elif state == "run":
+                            task.status = "running"
+                            running = True
+                            pool.submit(self._run_task, task)
+                    if progressed:
+                        continue
+                    if not running:
+                        break
+                    self._cond.wait()
+            stalled = [task for task in self.tasks.values() if task.status == "pending"]
+            for task in stalled:
+                # Only reachable through a group that waits on its own members
+                task.status = "skipped"
+                print(f"⚠️ Task '{task.name}' could never start (waiting on {task.after}). Skipped.")
+        self.wall_time = time.perf_counter() - start
+        return {name: task.result for name, task in self.tasks.items()}
+
+    @property
+    def failed(self):
+        return [task.name for task in self.tasks.values() if task.status in ("failed", "skipped")]
+
+    def report(self):
+        """
+        Per-task status, start offset and duration, in start order.
+        """
+        tasks = sorted(self.tasks.values(), key=lambda t: (t.started is None, t.started or 0))
+        return [{
+            "task": task.name,
+            "status": task.status,
+            "start_sec": None if task.started is None else task.started - self.started,
+            "duration_sec": task.duration,
+            "error": None if task.error is None else str(task.error),
+        } for task in tasks]
+
+
+def print_dag_report(graph):
+    rows = graph.report()
+    if not rows:
+        return
+    busy = sum(row["duration_sec"] or 0 for row in rows)
+    print(f"\n🧭 {graph.name}: {len(rows)} task(s) in {graph.wall_time:.2f}s wall "
+          f"({busy:.2f}s of task time, {len(graph.failed)} failed/skipped)")
+    for row in rows:
+        start = "-" if row["start_sec"] is None else f"+{row['start_sec']:.2f}s"
+        duration = "-" if row["duration_sec"] is None else f"{row['duration_sec']:.2f}s"
+        print(f"  {row['task']:<36} {row['status']:<10} {start:>9} {duration:>9}")
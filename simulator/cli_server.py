@@ -0,0 +1,455 @@
+# cli_server.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Stand-in AP for offline load testing of the real (non-mock) collector path.
+# A small asyncio telnet CLI server that behaves enough like an IOS-style device
+# for pyATS/unicon to connect, initialize and execute against it:
+#   - optional Username/Password login and enable secret ('>' vs '#' prompt)
+#   - config mode prompts for unicon's init commands, 'terminal length' paging
+#     with --More--, and '| include/exclude/begin' output filters
+#   - commands answered from mock_samples/*.txt per simulator/sim_commands.yaml,
+#     'show log' served from a rolling per-AP log buffer that grows over time
+#   - configurable latency, jitter and throughput, plus failure injection
+#     (error output, dropped connection, hung command, refused connection)
+# Input is line buffered and each command is echoed when it is processed, so
+# typed-ahead (batched) commands come back as prompt/echo/output blocks.
+
+import asyncio
+import os
+import random
+import re
+from collections import deque
+from datetime import datetime, timedelta
+
+import yaml
+
+from collectors.stats_generator import SAMPLE_DIR
+from utils.log_generator import LOG_TEMPLATES
+
+DEFAULT_COMMANDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sim_commands.yaml")
+DEFAULT_PROFILE = {
+    "hostname": None,             # defaults to the AP name
+    "login": True,
+    "username": "admin",
+    "password": "admin",
+    "enable_secret": None,        # set to start in user exec ('>') and require 'enable'
+    "banner": "",
+    "latency_ms": 20,             # per command, before the output
+    "jitter_ms": 10,
+    "bytes_per_sec": 0,           # output throughput limit, 0 = unlimited
+    "page_lines": 24,             # paging until 'terminal length 0'
+    "error_rate": 0.0,            # command answers with an error
+    "drop_rate": 0.0,             # connection dropped after the echo
+    "hang_rate": 0.0,             # command stalls for hang_sec before answering
+    "hang_sec": 30,
+    "refuse_rate": 0.0,           # connection closed right after accept
+    "log_lines_per_min": 60,
+    "log_buffer_lines": 2000,
+    "log_backfill_sec": 600,      # log history present at first 'show log'
+}
+SIM_ERROR = "% Error: command failed (simulated)"
+INVALID_INPUT = "% Invalid input detected at '^' marker."
+MORE_PROMPT = " --More-- "
+SEND_CHUNK = 4096
+
+# Telnet protocol bytes
+IAC, DONT, DO, WONT, WILL, SB, SE = 255, 254, 253, 252, 251, 250, 240
+OPT_ECHO, OPT_SGA = 1, 3
+
+_SAMPLE_CACHE = {}
+_PROMPT_LINE_RE = re.compile(r"^\S+[#>](.*)$")
+_CONFIG_RE = re.compile(r"^conf(ig(ure)?)?(\s+t(erm(inal)?)?)?$")
+_TERM_LENGTH_RE = re.compile(r"^term(inal)?\s+length\s+(\d+)$")
+_FILTER_RE = re.compile(r"^(include|exclude|begin|i|e|b)\s+(.*)$")
+_LOG_MESSAGES = [message for group in LOG_TEMPLATES.values() for message in group]
+
+
+def load_command_map(path=DEFAULT_COMMANDS_PATH):
+    with open(path, 'r') as f:
+        entries = yaml.safe_load(f) or []
+    return [(re.compile(entry["match"], re.IGNORECASE), entry) for entry in entries]
+
+
+def sample_sections(file_name):
+    """
+    Captured outputs of a mock_samples file as [(command, body)]. A file may
+    hold several captures, each starting at a '<host>#<command>' line; a bare
+    trailing prompt is dropped.
+    """
+    if file_name not in _SAMPLE_CACHE:
+        with open(os.path.join(SAMPLE_DIR, file_name), 'r') as f:
+            lines = f.read().splitlines()
+        sections = []
+        command, body = "", []
+        for line in lines:
+            m = _PROMPT_LINE_RE.match(line)
+            if m:
+                if body or command:
+                    sections.append((command, body))
+                command, body = m.group(1).strip(), []
+            else:
+                body.append(line)
+        if body or command:
+            sections.append((command, body))
+        cleaned = []
+        for command, body in sections:
+            while body and not body[-1].strip():
+                body.pop()
+            if command or body:
+                cleaned.append((command, "\n".join(body)))
+        _SAMPLE_CACHE[file_name] = cleaned
+    return _SAMPLE_CACHE[file_name]
+
+
+def sample_body(file_name, section=None):
+    """
+    Output of a mock_samples file as the device would print it: the capture
+    whose command contains 'section', else the first one.
+    """
+    sections = sample_sections(file_name)
+    if not sections:
+        return ""
+    if section:
+        for command, body in sections:
+            if section in command and body:
+                return body
+    return next((body for _, body in sections if body), "")
+
+
+def apply_filter(output, spec):
+    """
+    Apply an IOS style output filter ('include X', 'exclude X', 'begin X').
+    """
+    m = _FILTER_RE.match(spec.strip())
+    if not m:
+        return INVALID_INPUT
+    kind, regex = m.group(1)[0], re.compile(m.group(2))
+    lines = output.split("\n")
+    if kind == "i":
+        return "\n".join(line for line in lines if regex.search(line))
+    if kind == "e":
+        return "\n".join(line for line in lines if not regex.search(line))
+    for i, line in enumerate(lines):
+        if regex.search(line):
+            return "\n".join(lines[i:])
+    return ""
+
+
+class TelnetLineReader:
+    def __init__(self, reader):
+        self.reader = reader
+        self.buf = bytearray()
+        self._raw = bytearray()
+        self._skip_lf = False
+
+    def _strip_iac(self):
+        # Drop telnet option negotiation; keep an incomplete sequence for the next read
+        raw = self._raw
+        out = bytearray()
+        i = 0
+        while i < len(raw):
+            if raw[i] != IAC:
+                out.append(raw[i])
+                i += 1
+                continue
+            if i + 1 >= len(raw):
+                break
+            cmd = raw[i + 1]
+            if cmd == IAC:
+                out.append(IAC)
+                i += 2
+            elif cmd in (DO, DONT, WILL, WONT):
+                if i + 2 >= len(raw):
+                    break
+                i += 3
+            elif cmd == SB:
+                end = raw.find(bytes([IAC, SE]), i + 2)
+                if end < 0:
+                    break
+                i = end + 2
+            else:
+                i += 2
+        self._raw = raw[i:]
+        return out
+
+    async def _fill(self):
+        data = await self.reader.read(4096)
+        if not data:
+            return False
+        self._raw += data
+        self.buf += self._strip_iac()
+        return True
+
+    def _drop_line_feed(self):
+        # A '\r' terminator may be followed by '\n' or '\0'
+        if self._skip_lf and self.buf:
+            if self.buf[0] in (0x0a, 0x00):
+                del self.buf[0]
+            self._skip_lf = False
+
+    async def readline(self):
+        """
+        Next input line without its terminator, or None at EOF.
+        """
+        while True:
+            self._drop_line_feed()
+            m = re.search(rb"[\r\n]", self.buf)
+            if m:
+                pos = m.start()
+                raw = bytes(self.buf[:pos])
+                self._skip_lf = self.buf[pos] == 0x0d
+                del self.buf[:pos + 1]
+                line = []
+                for ch in raw.decode("utf-8", errors="replace"):
+                    if ch in "\x08\x7f":
+                        if line:
+                            line.pop()
+                    else:
+                        line.append(ch)
+                return "".join(line)
+            if not await self._fill():
+                return None
+
+    async def read_key(self):
+        while True:
+            self._drop_line_feed()
+            if self.buf:
+                key = chr(self.buf[0])
+                del self.buf[0]
+                if key == "\r":
+                    self._skip_lf = True
+                return key
+            if not await self._fill():
+                return None
+
+
+class SimulatedAP:
+    def __init__(self, name, profile=None, command_map=None, seed=None):
+        self.name = name
+        self.profile = {**DEFAULT_PROFILE, **(profile or {})}
+        self.hostname = self.profile["hostname"] or name
+        self.commands = command_map if command_map is not None else load_command_map()
+        self.rng = random.Random(seed)
+        self.stats = {"connections": 0, "active": 0, "refused": 0, "login_failures": 0, "commands": 0,
+                      "bytes_sent": 0, "errors": 0, "drops": 0, "hangs": 0}
+        self.server = None
+        self.port = None
+        self._tasks = set()
+        self._log_buffer = deque(maxlen=self.profile["log_buffer_lines"])
+        self._log_clock = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        self.server = await asyncio.start_server(self._handle, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        if self.server is None:
+            return
+        self.server.close()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.server.wait_closed()
+        self.server = None
+
+    def _roll(self, key):
+        rate = self.profile[key]
+        return rate > 0 and self.rng.random() < rate
+
+    def _latency_sec(self):
+        jitter = self.profile["jitter_ms"]
+        delay = self.profile["latency_ms"] + (self.rng.uniform(-jitter, jitter) if jitter else 0)
+        return max(0.0, delay / 1000.0)
+
+    def _prompt(self, session):
+        if session["mode"] == "config":
+            return f"{self.hostname}(config)#"
+        if session["mode"] == "config-line":
+            return f"{self.hostname}(config-line)#"
+        return f"{self.hostname}{'#' if session['enabled'] else '>'}"
+
+    async def _send(self, writer, text):
+        data = text.encode("utf-8", errors="replace")
+        bps = self.profile["bytes_per_sec"]
+        chunk_size = SEND_CHUNK if bps else max(len(data), 1)
+        for i in range(0, len(data), chunk_size):
+            chunk = data[i:i + chunk_size]
+            writer.write(chunk)
+            self.stats["bytes_sent"] += len(chunk)
+            await writer.drain()
+            if bps:
+                await asyncio.sleep(len(chunk) / bps)
+
+    async def _handle(self, reader, writer):
+        self.stats["connections"] += 1
+        if self._roll("refuse_rate"):
+            self.stats["refused"] += 1
+            writer.close()
+            return
+        self._tasks.add(asyncio.current_task())
+        self.stats["active"] += 1
+        lines = TelnetLineReader(reader)
+        session = {
+            "mode": "exec",
+            "enabled": not self.profile["enable_secret"],
+            "page_lines": self.profile["page_lines"],
+        }
+        try:
+            writer.write(bytes([IAC, WILL, OPT_ECHO, IAC, WILL, OPT_SGA]))
+            if self.profile["banner"]:
+                await self._send(writer, self.profile["banner"].replace("\n", "\r\n") + "\r\n")
+            if not await self._login(lines, writer):
+                return
+            while True:
+                await self._send(writer, self._prompt(session))
+                line = await lines.readline()
+                if line is None:
+                    break
+                await self._send(writer, line + "\r\n")
+                if not await self._run_command(line.strip(), session, lines, writer):
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._tasks.discard(asyncio.current_task())
+            self.stats["active"] -= 1
+            writer.close()
+
+    async def _login(self, lines, writer):
+        if not self.profile["login"]:
+            return True
+        for _ in range(3):
+            await self._send(writer, "Username: ")
+            username = await lines.readline()
+            if username is None:
+                return False
+            await self._send(writer, username + "\r\nPassword: ")
+            password = await lines.readline()
+            if password is None:
+                return False
+            await self._send(writer, "\r\n")
+            if username.strip() == self.profile["username"] and password == self.profile["password"]:
+                return True
+            self.stats["login_failures"] += 1
+            await self._send(writer, "% Authentication failed\r\n\r\n")
+        return False
+
+    def _config_command(self, cmd, session):
+        low = cmd.lower()
+        if low in ("end", "\x1a"):
+            session["mode"] = "exec"
+        elif low == "exit":
+            session["mode"] = "exec" if session["mode"] == "config" else "config"
+        elif low.startswith("line "):
+            session["mode"] = "config-line"
+        return True
+
+    async def _enable(self, session, lines, writer):
+        secret = self.profile["enable_secret"]
+        if session["enabled"]:
+            return
+        await self._send(writer, "Password: ")
+        password = await lines.readline()
+        await self._send(writer, "\r\n")
+        if password == secret:
+            session["enabled"] = True
+        else:
+            await self._send(writer, "% Access denied\r\n")
+
+    async def _run_command(self, cmd, session, lines, writer):
+        """
+        Handle one command line. Returns False when the connection should close.
+        """
+        if not cmd:
+            return True
+        self.stats["commands"] += 1
+        if session["mode"] != "exec":
+            return self._config_command(cmd, session)
+
+        low = cmd.lower()
+        if low in ("exit", "logout", "quit"):
+            return False
+        if low == "enable":
+            await self._enable(session, lines, writer)
+            return True
+        if low == "disable":
+            session["enabled"] = not self.profile["enable_secret"]
+            return True
+        if _CONFIG_RE.match(low):
+            if not session["enabled"]:
+                await self._send(writer, INVALID_INPUT + "\r\n")
+            else:
+                session["mode"] = "config"
+                await self._send(writer, "Enter configuration commands, one per line.  End with CNTL/Z.\r\n")
+            return True
+        m = _TERM_LENGTH_RE.match(low)
+        if m:
+            session["page_lines"] = int(m.group(2))
+
+        if self._roll("drop_rate"):
+            self.stats["drops"] += 1
+            return False
+        if self._roll("hang_rate"):
+            self.stats["hangs"] += 1
+            await asyncio.sleep(self.profile["hang_sec"])
+        await asyncio.sleep(self._latency_sec())
+
+        if self._roll("error_rate"):
+            self.stats["errors"] += 1
+            output = SIM_ERROR
+        else:
+            base, _, filter_spec = cmd.partition("|")
+            output = self._respond(base.strip())
+            if filter_spec and output != INVALID_INPUT:
+                output = apply_filter(output, filter_spec)
+        await self._write_output(output, session, lines, writer)
+        return True
+
+    def _respond(self, cmd):
+        for regex, entry in self.commands:
+            if not regex.search(cmd):
+                continue
+            if "sample" in entry:
+                return sample_body(entry["sample"], entry.get("section"))
+            if entry.get("generator") == "logs":
+                return self._log_output()
+            if entry.get("generator") == "clock":
+                now = datetime.now()
+                return f"*{now.strftime('%H:%M:%S')}.{now.microsecond // 1000:03d} UTC {now.strftime('%a %b %d %Y')}"
+            return entry.get("output", "")
+        return INVALID_INPUT
+
+    def _log_output(self):
+        # Grow the rolling buffer by the lines logged since the last fetch
+        now = datetime.now()
+        rate = self.profile["log_lines_per_min"]
+        if self._log_clock is None:
+            self._log_clock = now - timedelta(seconds=self.profile["log_backfill_sec"])
+        step = 60.0 / rate if rate else 0
+        count = int((now - self._log_clock).total_seconds() / step) if step else 0
+        for i in range(count):
+            ts = self._log_clock + timedelta(seconds=step * (i + 1))
+            self._log_buffer.append(f"{ts.strftime('%b %d %H:%M:%S')} {self.rng.choice(_LOG_MESSAGES)}")
+        self._log_clock += timedelta(seconds=step * count)
+        return "\n".join(self._log_buffer)
+
+    async def _write_output(self, output, session, lines, writer):
+        if not output:
+            return
+        out_lines = output.split("\n")
+        page = session["page_lines"]
+        if not page or len(out_lines) <= page:
+            await self._send(writer, "\r\n".join(out_lines) + "\r\n")
+            return
+        for start in range(0, len(out_lines), page):
+            await self._send(writer, "\r\n".join(out_lines[start:start + page]) + "\r\n")
+            if start + page >= len(out_lines):
+                break
+            await self._send(writer, MORE_PROMPT)
+            key = await lines.read_key()
+            await self._send(writer, "\r" + " " * len(MORE_PROMPT) + "\r")
+            if key is None or key.lower() == "q":
+                break
@@ -0,0 +1,154 @@
+# fleet.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Runs a fleet of simulated APs (simulator/cli_server.py) on localhost and
+# writes a matching pyATS testbed.yaml, so the real connect/execute path of the
+# collectors (session pool, batching, pipelining, fan-out) can be load tested
+# offline. All servers share one asyncio event loop on a background thread.
+#
+# Usage:
+#   python -m simulator.fleet --count 24 --testbed run_logs/simulator/testbed.yaml \
+#       --latency-ms 50 --jitter-ms 20 --error-rate 0.01
+#   python manual_test_runner.py ... (pointing at the generated testbed)
+
+import asyncio
+import os
+import threading
+
+import yaml
+
+from simulator.cli_server import DEFAULT_COMMANDS_PATH, DEFAULT_PROFILE, SimulatedAP, load_command_map
+
+DEFAULT_TESTBED_PATH = os.path.join("run_logs", "simulator", "testbed.yaml")
+
+
+class SimulatedFleet:
+    def __init__(self, count=1, profile=None, overrides=None, host="127.0.0.1", base_port=0, name_prefix="ap",
+                 commands_path=DEFAULT_COMMANDS_PATH, seed=1, os_name="iosxe"):
+        """
+        profile: settings shared by every AP (see cli_server.DEFAULT_PROFILE).
+        overrides: {ap_name: {setting: value}} for individual APs.
+        base_port: first port of a consecutive range, 0 = ephemeral ports.
+        """
+        self.host = host
+        self.base_port = base_port
+        self.os_name = os_name
+        command_map = load_command_map(commands_path)
+        self.aps = [
+            SimulatedAP(name, {**(profile or {}), **(overrides or {}).get(name, {})}, command_map,
+                        seed=None if seed is None else seed + i)
+            for i, name in enumerate(f"{name_prefix}{i + 1:03d}" for i in range(count))
+        ]
+        self._loop = None
+        self._thread = None
+
+    def start(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="sim-fleet", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start_all(), self._loop).result()
+        ports = [ap.port for ap in self.aps]
+        print(f"🛰️ Started {len(self.aps)} simulated AP(s) on {self.host} (ports {min(ports)}-{max(ports)})")
+        return self
+
+    async def _start_all(self):
+        for i, ap in enumerate(self.aps):
+            await ap.start(self.host, self.base_port + i if self.base_port else 0)
+
+    async def _stop_all(self):
+        for ap in self.aps:
+            await ap.stop()
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._stop_all(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+        print(f"🛑 Stopped {len(self.aps)} simulated AP(s).")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def endpoints(self):
+        return {ap.name: (self.host, ap.port) for ap in self.aps}
+
+    def stats(self):
+        return {ap.name: dict(ap.stats) for ap in self.aps}
+
+    def testbed_dict(self):
+        devices = {}
+        for ap in self.aps:
+            credentials = {"default": {"username": ap.profile["username"], "password": ap.profile["password"]}}
+            if ap.profile["enable_secret"]:
+                credentials["enable"] = {"password": ap.profile["enable_secret"]}
+            devices[ap.name] = {
+                "os": self.os_name,
+                "type": "access_point",
+                "credentials": credentials,
+                "connections": {
+                    "cli": {"protocol": "telnet", "ip": self.host, "port": ap.port},
+                },
+            }
+        return {"testbed": {"name": "simulated_fleet"}, "devices": devices}
+
+    def write_testbed(self, path=DEFAULT_TESTBED_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w') as f:
+            yaml.safe_dump(self.testbed_dict(), f, sort_keys=False)
+        print(f"📄 Simulated fleet testbed written to {path}")
+        return path
+
+
+def print_fleet_stats(stats):
+    totals = {}
+    for ap_stats in stats.values():
+        for key, value in ap_stats.items():
+            totals[key] = totals.get(key, 0) + value
+    print(f"\n🛰️ Simulated fleet: {len(stats)} AP(s)")
+    for key, value in totals.items():
+        if key != "active":
+            print(f"  - {key}: {value}")
+
+
+if __name__ == "__main__":
+    import argparse
+    from threading import Event
+
+    parser = argparse.ArgumentParser(description="Run a local fleet of simulated APs")
+    parser.add_argument("--count", type=int, default=4, help="Number of simulated APs")
+    parser.add_argument("--testbed", default=DEFAULT_TESTBED_PATH, help="Testbed YAML to generate")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--base-port", type=int, default=0, help="First port (default: ephemeral ports)")
+    parser.add_argument("--commands", default=DEFAULT_COMMANDS_PATH, help="Command -> response map YAML")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-login", action="store_true", help="Skip the Username/Password prompts")
+    parser.add_argument("--enable-secret", default=None, help="Start in user exec and require this enable secret")
+    for key in ("latency_ms", "jitter_ms", "bytes_per_sec", "page_lines", "hang_sec", "log_lines_per_min"):
+        parser.add_argument(f"--{key.replace('_', '-')}", type=int, default=DEFAULT_PROFILE[key])
+    for key in ("error_rate", "drop_rate", "hang_rate", "refuse_rate"):
+        parser.add_argument(f"--{key.replace('_', '-')}", type=float, default=DEFAULT_PROFILE[key])
+    args = parser.parse_args()
+
+    profile = {key: getattr(args, key) for key in (
+        "latency_ms", "jitter_ms", "bytes_per_sec", "page_lines", "hang_sec", "log_lines_per_min",
+        "error_rate", "drop_rate", "hang_rate", "refuse_rate")}
+    profile["login"] = not args.no_login
+    profile["enable_secret"] = args.enable_secret
+
+    fleet = SimulatedFleet(args.count, profile, host=args.host, base_port=args.base_port,
+                           commands_path=args.commands, seed=args.seed)
+    with fleet:
+        fleet.write_testbed(args.testbed)
+        print("⏳ Serving. Press Ctrl+C to stop.")
+        try:
+            Event().wait()
+        except KeyboardInterrupt:
+            pass
+        print_fleet_stats(fleet.stats())
@@ -0,0 +1,81 @@
+# test_benchmarks.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for benchmarks/: reproducible workloads and mock logs, result schema and regression comparison
+
+import filecmp
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+from analyzers.series_store import SeriesBuffer
+from benchmarks.bench import compare_results, measure
+from benchmarks.workloads import generate_log_workload, generate_perstats_workload, generate_series_workload
+from parsers.perstats_parser import parse_perstats_file
+from utils.log_analyzer import analyze_log_file, load_patterns
+from utils.log_generator import generate_mock_logs
+
+def test_log_workload_is_reproducible():
+    with tempfile.TemporaryDirectory() as tmp:
+        a = generate_log_workload(os.path.join(tmp, "a"), num_aps=2, bytes_per_ap=200_000, seed=7,
+                                  incident_rate=0.01)
+        b = generate_log_workload(os.path.join(tmp, "b"), num_aps=2, bytes_per_ap=200_000, seed=7,
+                                  incident_rate=0.01)
+        for ap in a:
+            assert filecmp.cmp(a[ap][0], b[ap][0], shallow=False)
+            assert os.path.getsize(a[ap][0]) >= 200_000
+        # Injected failure chains are picked up by the analyzer
+        summary = analyze_log_file(a["ap001"][0], load_patterns())
+        assert summary["matches"]
+
+def test_perstats_workload_parses():
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = generate_perstats_workload(tmp, dumps_per_ap=3, clients_per_dump=5, seed=3)["ap001"]
+        first = parse_perstats_file(paths[0])
+        last = parse_perstats_file(paths[-1])
+        assert len(first) == len(last) == 5
+        assert len({client.mac for client in first}) == 5
+        for before, after in zip(first, last):
+            assert after.accumulated["TxBytes"] > before.accumulated["TxBytes"]
+
+def test_series_workload_covers_days():
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = generate_series_workload(tmp, days=0.5, interval_sec=60, seed=1)["ap001"]
+        buf = SeriesBuffer.from_csv(paths["cpu"])
+        assert len(buf) == 720
+        assert buf.epoch[-1] - buf.epoch[0] == 719 * 60
+
+def test_measure_and_compare():
+    stats = measure(sum, range(1000), repeat=3, warmup=1)
+    for key in ("rounds", "min", "max", "mean", "median", "stdev", "peak_alloc_mb", "max_rss_mb"):
+        assert key in stats
+    assert stats["min"] <= stats["median"] <= stats["max"]
+
+    baseline = {"benchmarks": {"a": {"median": 1.0}, "b": {"median": 1.0}, "c": {"median": 1.0}}}
+    current = {"benchmarks": {"a": {"median": 1.5}, "b": {"median": 0.5}}}
+    status = {row[0]: row[4] for row in compare_results(baseline, current, tolerance=0.1)}
+    assert status == {"a": "regression", "b": "improved", "c": "missing"}
+
+def test_seeded_mock_logs_leave_global_random_alone():
+    start = datetime(2025, 3, 1, 12, 0, 0)
+    with tempfile.TemporaryDirectory() as tmp:
+        random.seed(123)
+        expected = [random.random() for _ in range(3)]
+        random.seed(123)
+        a = generate_mock_logs(os.path.join(tmp, "a"), ["show logging", "show trace"], start,
+                               start + timedelta(minutes=5), seed=7)
+        # The caller's random sequence carries on as if nothing had been drawn
+        assert [random.random() for _ in range(3)] == expected
+        b = generate_mock_logs(os.path.join(tmp, "b"), ["show logging", "show trace"], start,
+                               start + timedelta(minutes=5), seed=7)
+        assert all(filecmp.cmp(x, y, shallow=False) for x, y in zip(a, b))
+        c = generate_mock_logs(os.path.join(tmp, "c"), ["show logging"], start, start + timedelta(minutes=5), seed=8)
+        assert not filecmp.cmp(a[0], c[0], shallow=False)
+
+if __name__ == "__main__":
+    test_log_workload_is_reproducible()
+    test_perstats_workload_parses()
+    test_series_workload_covers_days()
+    test_measure_and_compare()
+    test_seeded_mock_logs_leave_global_random_alone()
+    print("✅ benchmarks checks passed")
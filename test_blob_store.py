@@ -0,0 +1,183 @@
+# test_blob_store.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for utils/blob_store.py: dedup, skipped rewrites, transparent readers, pack, gc and its grace period,
+# and dedup_outputs staying within its run, leaving appended-to logs plain and tolerating malformed references
+
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+from collectors.stats_generator import SAMPLE_DIR
+from parsers.perstats_parser import parse_perstats_file
+from utils.blob_store import BlobStore, open_binary, read_reference, read_text
+from utils.log_generator import generate_mock_log_lines
+from utils.log_cursor import LogCursor, save_cursors
+from utils.log_index import iter_window_lines
+from utils.log_store import LogWriter, log_filename, open_log_text
+
+def sample(name):
+    with open(os.path.join(SAMPLE_DIR, name), 'r') as f:
+        return f.read()
+
+def test_duplicates_share_one_blob():
+    tmp = tempfile.mkdtemp()
+    try:
+        store = BlobStore(root=os.path.join(tmp, "blobs"), enabled=True)
+        version = sample("version.txt")
+        paths = []
+        for run in ("run1", "run2"):
+            os.makedirs(os.path.join(tmp, run))
+            paths.append(store.write_text(os.path.join(tmp, run, "version.txt"), version,
+                                          prefix=f"# Timestamp: {run}\n\n"))
+        assert store.stats()["blobs"] == 1 and store.counters["blob_hits"] == 1
+        assert read_reference(paths[0])["sha256"] == read_reference(paths[1])["sha256"]
+        assert read_text(paths[1]) == f"# Timestamp: run2\n\n{version}"
+
+        mtime = os.path.getmtime(paths[0])
+        os.utime(paths[0], (mtime - 100, mtime - 100))
+        store.write_text(paths[0], version, prefix="# Timestamp: run1\n\n")
+        assert store.counters["unchanged"] == 1 and os.path.getmtime(paths[0]) == mtime - 100
+
+        small = store.write_text(os.path.join(tmp, "run1", "small.txt"), "tiny\n")
+        assert read_reference(small) is None and read_text(small) == "tiny\n"
+    finally:
+        shutil.rmtree(tmp)
+
+def test_readers_follow_references():
+    tmp = tempfile.mkdtemp()
+    try:
+        store = BlobStore(root=os.path.join(tmp, "blobs"), enabled=True)
+        perf = store.write_text(os.path.join(tmp, "perf.txt"), sample("perstats.txt"))
+        assert len(parse_perstats_file(perf)) == len(parse_perstats_file(os.path.join(SAMPLE_DIR, "perstats.txt")))
+
+        # Syslog lines carry no year; the index takes it from the file time
+        start = datetime.now().replace(microsecond=0) - timedelta(minutes=10)
+        lines = generate_mock_log_lines(start, start + timedelta(minutes=10), total_lines=200)
+        log = store.write_text(os.path.join(tmp, "log_1_show_log.txt"), "\n".join(lines) + "\n")
+        assert read_reference(log) is not None
+        with open_log_text(log) as f:
+            assert f.read().splitlines() == lines
+        window = (int((start + timedelta(minutes=2)).timestamp()), int((start + timedelta(minutes=4)).timestamp()))
+        assert list(iter_window_lines(log, *window))
+    finally:
+        shutil.rmtree(tmp)
+
+def test_pack_and_gc():
+    tmp = tempfile.mkdtemp()
+    try:
+        runs = os.path.join(tmp, "run_logs")
+        store = BlobStore(root=os.path.join(runs, "blobs"))
+        for run in ("a", "b"):
+            os.makedirs(os.path.join(runs, run))
+            shutil.copy(os.path.join(SAMPLE_DIR, "version.txt"), os.path.join(runs, run, "version.txt"))
+        assert all(store.pack_file(os.path.join(runs, run, "version.txt")) for run in ("a", "b"))
+        assert store.stats()["blobs"] == 1
+        assert read_text(os.path.join(runs, "a", "version.txt")) == sample("version.txt")
+
+        shutil.rmtree(os.path.join(runs, "a"))
+        assert store.gc(runs)[0] == 0
+        shutil.rmtree(os.path.join(runs, "b"))
+        assert store.gc(runs, grace_sec=0)[0] == 1 and store.stats()["blobs"] == 0
+    finally:
+        shutil.rmtree(tmp)
+
+def test_pack_leaves_appended_logs_plain():
+    tmp = tempfile.mkdtemp()
+    try:
+        store = BlobStore(root=os.path.join(tmp, "blobs"))
+        lines = [f"*Jul 25 03:13:{i % 60:02d}.000: %SYS-5-CONFIG_I: Configured from console line {i}" for i in range(50)]
+        # An incremental pull: logs_<device>/log_N_*.txt appended to in place, tracked by cursors.json
+        log_dir = os.path.join(tmp, "run", "logs_ap")
+        os.makedirs(log_dir)
+        path = log_filename(log_dir, 1, "show logging")
+        for chunk in (lines[:25], lines[25:]):
+            with LogWriter(path, append=True) as writer:
+                writer.write("\n".join(chunk) + "\n")
+        cursor = LogCursor()
+        cursor.advance(lines, fetched=len(lines))
+        save_cursors(log_dir, {"show logging": cursor})
+        assert not store.pack_file(path)
+
+        # The same content outside a logs_ folder packs, unless an index or cursor sidecar sits next to it
+        other = os.path.join(tmp, "run", "show_logging.txt")
+        shutil.copy(path, other)
+        with open(other + ".idx", 'w') as f:
+            f.write("{}")
+        assert not store.pack_file(other)
+        os.remove(other + ".idx")
+        assert store.pack_file(other)
+        with open(path, 'r') as f:
+            assert f.read().splitlines() == lines
+    finally:
+        shutil.rmtree(tmp)
+
+def test_malformed_reference_reads_as_plain():
+    tmp = tempfile.mkdtemp()
+    try:
+        for name, content in [("truncated.txt", b'#APBLOB1 {"sha256": "ab'), ("no_blob.txt", b'#APBLOB1 {"sha256": "ab"}\n'),
+                              ("binary.txt", b"#APBLOB1 \xff\xfe\n")]:
+            path = os.path.join(tmp, name)
+            with open(path, 'wb') as f:
+                f.write(content)
+            assert read_reference(path) is None
+            with open_binary(path) as f:
+                assert f.read() == content
+    finally:
+        shutil.rmtree(tmp)
+
+def test_gc_keeps_blobs_in_grace_period():
+    tmp = tempfile.mkdtemp()
+    try:
+        runs = os.path.join(tmp, "run_logs")
+        store = BlobStore(root=os.path.join(runs, "blobs"), enabled=True)
+        # put() has stored the blob but the collector has not written the reference yet
+        _, blob = store.put(sample("version.txt").encode())
+        assert store.gc(runs) == (0, 0) and os.path.exists(blob)
+
+        # An old orphan goes; reusing it through put() makes it young again
+        os.utime(blob, (1000, 1000))
+        store.put(sample("version.txt").encode())
+        assert store.gc(runs)[0] == 0
+        os.utime(blob, (1000, 1000))
+        assert store.gc(runs)[0] == 1 and not os.path.exists(blob)
+    finally:
+        shutil.rmtree(tmp)
+
+def test_dedup_outputs_is_per_run():
+    from tests import performance_test_runner
+    from utils.blob_store import BLOB_STORE
+
+    seen = []
+    def fake_run(config):
+        seen.append(BLOB_STORE.enabled)
+        if config.get("fail"):
+            raise RuntimeError("collector crashed")
+        return {"status": "completed"}
+
+    real_run, was_enabled = performance_test_runner._run_performance_test, BLOB_STORE.enabled
+    performance_test_runner._run_performance_test = fake_run
+    try:
+        BLOB_STORE.enabled = False
+        assert performance_test_runner.run_performance_test({"dedup_outputs": True}) == {"status": "completed"}
+        assert BLOB_STORE.enabled is False
+        try:
+            performance_test_runner.run_performance_test({"dedup_outputs": True, "fail": True})
+        except RuntimeError:
+            pass
+        assert BLOB_STORE.enabled is False
+        performance_test_runner.run_performance_test({})
+        assert seen == [True, True, False]
+    finally:
+        performance_test_runner._run_performance_test = real_run
+        BLOB_STORE.enabled = was_enabled
+
+if __name__ == "__main__":
+    test_duplicates_share_one_blob()
+    test_readers_follow_references()
+    test_pack_and_gc()
+    test_pack_leaves_appended_logs_plain()
+    test_malformed_reference_reads_as_plain()
+    test_gc_keeps_blobs_in_grace_period()
+    test_dedup_outputs_is_per_run()
+    print("✅ blob store checks passed")
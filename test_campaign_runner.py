@@ -0,0 +1,101 @@
+# test_campaign_runner.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for runners/campaign_runner.py: matrix expansion, exclusions, type coercion, run-rate planning
+# and per-run isolation of back-to-back runs on one lane
+
+import json
+import os
+import shutil
+import tempfile
+from collections import Counter
+
+from runners.campaign_runner import CampaignError, expand_matrix, plan_campaign, run_campaign
+
+CAMPAIGN = {
+    "test_type": "performance",
+    "base": {"duration": "60", "ssid": "lab"},
+    "matrix": {
+        "radio_band": ["6G", "5G"],
+        "bandwidth": ["80MHz", "160MHz"],
+        "nss": ["1", 2],
+        "direction": ["DL", "UL"],
+        "traffic_type": "UDP",
+    },
+    "exclude": [{"radio_band": "5G", "bandwidth": "160MHz"}],
+}
+
+def test_expand_matrix():
+    runs = expand_matrix(CAMPAIGN)
+    assert len(runs) == 2 * 2 * 2 * 2 - 4
+    assert runs[0] == {**runs[0], "radio_band": "6G", "bandwidth": "80MHz", "nss": 1, "direction": "DL",
+                       "traffic_type": "UDP", "duration": 60, "ssid": "lab", "client_type": "windows_intel"}
+    assert not any(r["radio_band"] == "5G" and r["bandwidth"] == "160MHz" for r in runs)
+    assert len(expand_matrix({**CAMPAIGN, "repeat": 3})) == 3 * len(runs)
+    repeated = expand_matrix({**CAMPAIGN, "repeat": 2})
+    repeated[0]["nss"] = 4
+    assert repeated[1]["nss"] == 1
+    try:
+        expand_matrix({**CAMPAIGN, "matrix": {"channel": [36]}})
+        assert False, "unknown parameter accepted"
+    except CampaignError:
+        pass
+
+def test_plan_meets_target_with_fewest_lanes():
+    runs = expand_matrix(CAMPAIGN)
+    plan = plan_campaign(runs, ["ap1", "ap2", "ap3"], target_runs_per_hour=40, overhead_sec=30)
+    # 90s per run: one AP gives 40 runs/hour
+    assert plan["lanes"] == 1 and plan["runs_per_hour"] == 40 and plan["meets_target"]
+    plan = plan_campaign(runs, ["ap1", "ap2"], target_runs_per_hour=100, overhead_sec=30)
+    assert plan["lanes"] == 2 and not plan["meets_target"]
+    assert plan_campaign(runs, ["ap1", "ap2", "ap3"])["lanes"] == 3
+
+def test_runs_on_one_lane_do_not_share_state():
+    before = set(os.listdir("run_logs")) if os.path.isdir("run_logs") else None
+    tmp = tempfile.mkdtemp()
+    rows = []
+    try:
+        testbed = os.path.join(tmp, "testbed.yaml")
+        with open(testbed, 'w') as f:
+            f.write("devices:\n  ap:\n    os: iosxe\n    type: access_point\n"
+                    "    connections: {cli: {protocol: ssh, ip: 127.0.0.1, port: 1}}\n")
+        rows = run_campaign({
+            "name": f"isolation_{os.getpid()}",
+            "devices": ["ap"],
+            "testbed_path": testbed,
+            "mock": True,
+            "base": {"duration": 1},
+            "matrix": {"direction": ["DL", "UL"]},
+            "log_commands": ["show logging"],
+            "stat_commands": {"version": ["v"], "performance": ["p"], "cpu": ["c"], "memory": ["m"]},
+        })
+        assert [row["status"] for row in rows] == ["completed", "completed"]
+
+        traces = []
+        for row in rows:
+            with open(os.path.join("run_logs", row["run_id"], "trace.json")) as f:
+                events = [e for e in json.load(f)["traceEvents"] if e["ph"] == "X"]
+            traces.append(events)
+        # Each trace holds exactly one run: one before_test and one after_test phase, from its own process
+        for events in traces:
+            phases = Counter(e["args"].get("phase") for e in events if e["name"] == "stats_phase")
+            assert phases == {"before_test": 1, "after_test": 1}
+        assert {e["pid"] for e in traces[0]}.isdisjoint({e["pid"] for e in traces[1]})
+    finally:
+        shutil.rmtree(tmp)
+        # Drop only what this campaign wrote: run folders, log folders, its campaign folder
+        if before is None:
+            shutil.rmtree("run_logs", ignore_errors=True)
+        else:
+            for name in set(os.listdir("run_logs")) - before:
+                path = os.path.join("run_logs", name)
+                shutil.rmtree(path) if os.path.isdir(path) else os.remove(path)
+            campaigns = os.path.join("run_logs", "campaigns")
+            for name in os.listdir(campaigns) if os.path.isdir(campaigns) else []:
+                if name.startswith(f"isolation_{os.getpid()}_"):
+                    shutil.rmtree(os.path.join(campaigns, name))
+
+if __name__ == "__main__":
+    test_expand_matrix()
+    test_plan_meets_target_with_fewest_lanes()
+    test_runs_on_one_lane_do_not_share_state()
+    print("✅ campaign runner checks passed")
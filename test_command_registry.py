@@ -0,0 +1,58 @@
+# test_command_registry.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for utils/command_registry.py: no lost writes across processes and threads, mtime cache, bulk lookup
+
+import multiprocessing
+import os
+import tempfile
+import threading
+
+import yaml
+
+from utils.command_registry import CommandRegistry
+
+def add_keys(path, prefix, count):
+    registry = CommandRegistry(path)
+    for i in range(count):
+        registry.set(f"{prefix}_{i}", [f"show {prefix} {i}"])
+
+def test_concurrent_writers_keep_every_key():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stats_command_registry.yaml")
+        ctx = multiprocessing.get_context("spawn")
+        procs = [ctx.Process(target=add_keys, args=(path, f"ap{n}", 20)) for n in range(3)]
+        threads = [threading.Thread(target=add_keys, args=(path, f"t{n}", 20)) for n in range(2)]
+        for worker in procs + threads:
+            worker.start()
+        for worker in procs + threads:
+            worker.join()
+        with open(path, 'r') as f:
+            data = yaml.safe_load(f)
+        assert len(data) == 5 * 20 and data["ap2_19"] == ["show ap2 19"]
+
+def test_cache_follows_file_and_bulk_lookup():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stats_command_registry.yaml")
+        registry = CommandRegistry(path)
+        assert registry.read() == {}
+        registry.set("ap1_version", ["show version"])
+        registry.set("ap1_cpu", ["show processes cpu"])
+        registry.set("ap2_cpu", ["show proc cpu"])
+        assert registry.device_stat_commands("ap1", ["version", "cpu", "memory"]) == {
+            "version": ["show version"], "cpu": ["show processes cpu"]}
+
+        # An edit by another process (or by hand) is picked up on the next lookup
+        other = CommandRegistry(path)
+        other.set("ap1_memory", ["show memory summary"])
+        assert registry.get("ap1_memory") == ["show memory summary"]
+        assert registry.delete("ap1_cpu") and not other.delete("ap1_cpu")
+        assert "ap1_cpu" not in other.read() and other.get("ap2_cpu") == ["show proc cpu"]
+
+        # Callers get copies; the cached registry is not changed through them
+        registry.get("ap2_cpu").append("x")
+        assert registry.get("ap2_cpu") == ["show proc cpu"]
+
+if __name__ == "__main__":
+    test_concurrent_writers_keep_every_key()
+    test_cache_follows_file_and_bulk_lookup()
+    print("✅ command registry checks passed")
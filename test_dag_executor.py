@@ -0,0 +1,63 @@
+# test_dag_executor.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for runners/dag_executor.py: overlap of independent tasks, results, dynamic groups and failure handling
+
+import threading
+import time
+
+from runners.dag_executor import Result, TaskGraph
+
+def slow(value, delay=0.2):
+    time.sleep(delay)
+    return value
+
+def test_independent_tasks_overlap():
+    graph = TaskGraph("post_test")
+    graph.add("stats", slow, "stats")
+    graph.add("logs", slow, "logs")
+    graph.add("delta", lambda stats: stats + "_delta", Result("stats"))
+    results = graph.run()
+    assert results == {"stats": "stats", "logs": "logs", "delta": "stats_delta"}
+    # Two 0.2s branches side by side, not back to back
+    assert graph.wall_time < 0.35
+    report = {row["task"]: row for row in graph.report()}
+    assert report["delta"]["start_sec"] >= report["stats"]["duration_sec"] - 0.01
+
+def test_group_members_start_while_producer_runs():
+    graph = TaskGraph("post_test")
+    files = graph.group("files")
+    landed = threading.Event()
+
+    def collect():
+        for name in ("log_1", "log_2", "log_3"):
+            graph.add(f"analyze:{name}", lambda n=name: (landed.set(), n.upper())[1], group=files)
+            time.sleep(0.05)
+        # The first file is analyzed before collection is over
+        assert landed.wait(1)
+        return "log_dir"
+
+    graph.add("collect", collect)
+    graph.add("summary", lambda log_dir, found: (log_dir, found), Result("collect"), Result(files))
+    assert graph.run()["summary"] == ("log_dir", ["LOG_1", "LOG_2", "LOG_3"])
+    assert not graph.failed
+
+def test_failures_skip_dependents_only():
+    graph = TaskGraph("post_test")
+    graph.add("stats", lambda: 1 / 0)
+    graph.add("delta", slow, Result("stats"), 0)
+    graph.add("logs", slow, "logs", 0)
+    results = graph.run()
+    assert results["logs"] == "logs"
+    assert {row["task"]: row["status"] for row in graph.report()} == {
+        "stats": "failed", "delta": "skipped", "logs": "completed"}
+    try:
+        graph.add("bad", slow, Result("missing"))
+        assert False, "unknown dependency accepted"
+    except ValueError:
+        pass
+
+if __name__ == "__main__":
+    test_independent_tasks_overlap()
+    test_group_members_start_while_producer_runs()
+    test_failures_skip_dependents_only()
+    print("✅ dag executor checks passed")
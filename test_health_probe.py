@@ -0,0 +1,108 @@
+# test_health_probe.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for collection/health_probe.py: circuit breaker open/half-open/closed states and the backoff cap
+
+import threading
+import time
+
+from collection import health_probe
+from collection.health_probe import HealthProbe
+
+class FakeNetwork:
+    # Replaces tcp_probe and the monotonic clock; counts probes per endpoint
+    def __init__(self):
+        self.now = 1000.0
+        self.up = False
+        self.probes = 0
+        self.gate = None
+
+    def probe(self, ip, port, timeout):
+        self.probes += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        return self.up
+
+    def __enter__(self):
+        self._saved = (health_probe.tcp_probe, health_probe.time.monotonic)
+        health_probe.tcp_probe = self.probe
+        health_probe.time.monotonic = lambda: self.now
+        return self
+
+    def __exit__(self, *exc):
+        health_probe.tcp_probe, health_probe.time.monotonic = self._saved
+
+def backoff(probe, ip="10.0.0.1", port=22):
+    return probe.status()[(ip, port)]["backoff_remaining_sec"]
+
+def test_breaker_opens_and_backs_off_to_cap():
+    with FakeNetwork() as net:
+        probe = HealthProbe(ttl_sec=5, base_backoff_sec=10, max_backoff_sec=60)
+        assert probe.is_reachable("10.0.0.1") is False
+        assert net.probes == 1 and backoff(probe) == 10
+
+        # Open: every caller is answered from the breaker without touching the network
+        net.now += 9
+        assert probe.is_reachable("10.0.0.1") is False
+        assert net.probes == 1
+
+        # Each further failure doubles the delay: 20, 40, then capped at 60
+        for expected in (20, 40, 60, 60):
+            net.now += backoff(probe)
+            assert probe.is_reachable("10.0.0.1") is False
+            assert backoff(probe) == expected
+        assert net.probes == 5
+        assert probe.status()[("10.0.0.1", 22)]["failures"] == 5
+
+        # force bypasses an open breaker
+        assert probe.is_reachable("10.0.0.1", force=True) is False
+        assert net.probes == 6
+
+def test_half_open_probe_closes_breaker():
+    with FakeNetwork() as net:
+        probe = HealthProbe(ttl_sec=5, base_backoff_sec=10, max_backoff_sec=60)
+        probe.is_reachable("10.0.0.1")
+        net.now += 10
+        net.up = True
+        net.gate = threading.Event()
+
+        # Half-open: once the backoff expires, concurrent callers share a single trial probe
+        results = []
+        callers = [threading.Thread(target=lambda: results.append(probe.is_reachable("10.0.0.1"))) for _ in range(4)]
+        for caller in callers:
+            caller.start()
+        deadline = time.time() + 5
+        while net.probes < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        net.gate.set()
+        for caller in callers:
+            caller.join()
+        assert results == [True] * 4
+        assert net.probes == 2
+
+        # Closed: failures and backoff reset, results cached for the TTL
+        status = probe.status()[("10.0.0.1", 22)]
+        assert status["failures"] == 0 and status["backoff_remaining_sec"] == 0
+        net.now += 4
+        assert probe.is_reachable("10.0.0.1") is True and net.probes == 2
+        net.now += 1
+        net.up = False
+        assert probe.is_reachable("10.0.0.1") is False and net.probes == 3
+        # A fresh run of failures starts from the base delay again
+        assert backoff(probe) == 10
+
+def test_endpoints_are_independent():
+    with FakeNetwork() as net:
+        probe = HealthProbe(base_backoff_sec=10)
+        probe.is_reachable("10.0.0.1")
+        net.up = True
+        assert probe.is_reachable("10.0.0.2") is True
+        assert probe.is_reachable("10.0.0.1", port=830) is True
+        assert probe.is_reachable("10.0.0.1") is False
+        assert net.probes == 3
+
+
+if __name__ == "__main__":
+    test_breaker_opens_and_backs_off_to_cap()
+    test_half_open_probe_closes_breaker()
+    test_endpoints_are_independent()
+    print("✅ Health probe checks passed")
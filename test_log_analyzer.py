@@ -0,0 +1,101 @@
+# test_log_analyzer.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for utils/log_analyzer.py: parallel (chunked) and serial analysis find identical matches
+
+import csv
+import os
+import shutil
+import tempfile
+from collections import defaultdict
+
+from utils.log_analyzer import (analyze_log_file, load_patterns, run_log_analysis, run_log_analysis_parallel,
+                                split_file_ranges)
+
+CHUNK = 4096
+
+def build_log(straddle_at=CHUNK):
+    """
+    Log text with matches spread through it and one long matching line that
+    starts before byte straddle_at and ends after it.
+    """
+    lines = []
+    size = 0
+    n = 0
+    while size < straddle_at - 100:
+        if n % 7 == 0:
+            line = f"Mar 01 12:{n % 60:02d}:00 wlan0 link down (event {n})\n"
+        elif n % 11 == 0:
+            line = f"Mar 01 12:{n % 60:02d}:01 radio1 high memory usage {n}%\r\n"
+        else:
+            line = f"Mar 01 12:{n % 60:02d}:02 dot11 client {n} associated\n"
+        lines.append(line)
+        size += len(line)
+        n += 1
+    long_line = "Mar 01 12:30:00 kernel panic - not syncing: " + "x" * 300 + " end\n"
+    lines.append(long_line)
+    lines += [f"Mar 01 12:31:{n % 60:02d} Interface Gi0 changed state to up {n}\n" for n in range(200)]
+    return "".join(lines), size, long_line
+
+def read_rows(path, skip_columns=0):
+    by_file = defaultdict(list)
+    with open(path, newline='') as f:
+        for row in list(csv.reader(f))[1:]:
+            row = row[skip_columns:]
+            by_file[row[0]].append(tuple(row[1:]))
+    return dict(by_file)
+
+def test_ranges_start_on_lines():
+    with tempfile.TemporaryDirectory() as tmp:
+        text, straddle_start, long_line = build_log()
+        path = os.path.join(tmp, "log_1_show_logging.txt")
+        with open(path, 'w', newline='') as f:
+            f.write(text)
+        ranges = split_file_ranges(path, CHUNK)
+        assert len(ranges) > 1
+        assert ranges[0][0] == 0 and ranges[-1][1] == os.path.getsize(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        for (_, end), (next_start, _) in zip(ranges, ranges[1:]):
+            # Contiguous, and every cut sits right after a line break
+            assert end == next_start and data[end - 1:end] == b"\n"
+        # The boundary that falls inside the long line moves past its end
+        assert straddle_start < CHUNK < straddle_start + len(long_line)
+        assert ranges[0][1] == straddle_start + len(long_line)
+
+def test_parallel_matches_serial():
+    patterns = load_patterns()
+    with tempfile.TemporaryDirectory() as tmp:
+        serial_dir = os.path.join(tmp, "serial", "logs_ap")
+        os.makedirs(serial_dir)
+        text, _, long_line = build_log()
+        with open(os.path.join(serial_dir, "log_1_show_logging.txt"), 'w', newline='') as f:
+            f.write(text)
+        text2, _, _ = build_log(straddle_at=3 * CHUNK + 500)
+        with open(os.path.join(serial_dir, "log_2_show_trace.log"), 'w', newline='') as f:
+            f.write(text2)
+        parallel_dir = os.path.join(tmp, "parallel", "logs_ap")
+        shutil.copytree(serial_dir, parallel_dir)
+
+        serial = read_rows(run_log_analysis(serial_dir))
+        result = run_log_analysis_parallel([parallel_dir], workers=2, chunk_bytes=CHUNK,
+                                           output_dir=os.path.join(tmp, "merged"))
+        assert read_rows(result["per_dir"][parallel_dir]) == serial
+        assert read_rows(result["merged"], skip_columns=1) == serial
+
+        # Both files were split, and the straddling line is matched exactly once per pattern
+        assert all(len(split_file_ranges(os.path.join(parallel_dir, name), CHUNK)) > 1 for name in serial)
+        panic = [row for row in serial["log_1_show_logging.txt"] if row[0] == "kernel_crash"]
+        assert [row[1] for row in panic] == ["kernel panic", "not syncing"]
+        assert all(row[2] == long_line.strip() for row in panic)
+
+        # CRLF lines are matched with the same text either way
+        memory = [row[2] for row in serial["log_1_show_logging.txt"] if row[1] == "high memory usage"]
+        assert memory and not any("\r" in line for line in memory)
+        expected = analyze_log_file(os.path.join(serial_dir, "log_1_show_logging.txt"), patterns)
+        assert len(expected["matches"]) == len(serial["log_1_show_logging.txt"])
+
+
+if __name__ == "__main__":
+    test_ranges_start_on_lines()
+    test_parallel_matches_serial()
+    print("✅ Log analyzer checks passed")
@@ -0,0 +1,48 @@
+# test_log_collector.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for utils/log_collector.py: one pooled session carries the whole collection, and a failed connect ends it
+
+import os
+import shutil
+
+from test_session_pool import FakeDevice, make_pool
+from utils import log_collector
+
+CMDS = ["show logging", "show clock"]
+
+class LoggingDevice(FakeDevice):
+    connections = {"cli": {"protocol": "ssh", "ip": "192.0.2.10", "port": 22}}
+
+class UnreachableDevice(LoggingDevice):
+    def connect(self, **kwargs):
+        self.connects += 1
+        raise ConnectionRefusedError("connection refused")
+
+def collect(device):
+    real_pool = log_collector.SESSION_POOL
+    log_collector.SESSION_POOL = make_pool(device)
+    created_run_logs = not os.path.exists("run_logs")
+    try:
+        log_dir = log_collector.collect_logs_from_testbed("tb.yaml", device.name, CMDS)
+        files = sorted(os.listdir(log_dir))
+        shutil.rmtree(log_dir)
+        return files
+    finally:
+        log_collector.SESSION_POOL = real_pool
+        if created_run_logs:
+            shutil.rmtree("run_logs", ignore_errors=True)
+
+def test_collection_reuses_the_held_session():
+    device = LoggingDevice("")
+    assert collect(device) == ["log_1_show_logging.txt", "log_2_show_clock.txt"]
+    assert device.connects == 1 and device.executed == CMDS
+
+def test_failed_connect_ends_collection():
+    device = UnreachableDevice("")
+    assert collect(device) == []
+    assert device.connects == 1 and device.executed == []
+
+if __name__ == "__main__":
+    test_collection_reuses_the_held_session()
+    test_failed_connect_ends_collection()
+    print("✅ log collector checks passed")
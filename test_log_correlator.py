@@ -0,0 +1,101 @@
+# test_log_correlator.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for analyzers/log_correlator.py: windowed multi-step incidents, ordering, optional steps and merged files
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from analyzers.log_correlator import CorrelationEngine, load_correlation_rules, run_log_correlation
+
+RULES = load_correlation_rules()
+T0 = 1_740_830_400  # 2025-03-01 12:00:00 UTC
+
+def incidents(events, rules=RULES, **kwargs):
+    engine = CorrelationEngine(rules, **kwargs)
+    return list(engine.run((T0 + offset, line, "log") for offset, line in events))
+
+def test_ordered_chain_within_window():
+    found = incidents([
+        (0, "kernel panic - not syncing"),
+        (5, "dot11 client associated"),
+        (10, "wlan0 changed state to down"),
+        (12, "wlan1 changed state to down"),
+        (30, "wlan0 changed state to up"),
+    ])
+    assert len(found) == 1
+    incident = found[0]
+    assert incident["rule"] == "kernel_crash" and incident["steps"] == ["panic", "radio_down", "radio_up"]
+    assert incident["duration_sec"] == 30
+    # A second line for a step already seen is kept as a member
+    assert [m["line"] for m in incident["members"]] == [
+        "kernel panic - not syncing", "wlan0 changed state to down",
+        "wlan1 changed state to down", "wlan0 changed state to up",
+    ]
+
+def test_optional_step_and_window():
+    # radio_up is optional: panic + down alone is an incident once the window closes
+    assert [i["steps"] for i in incidents([(0, "kernel panic"), (20, "wlan0 changed state to down"),
+                                           (200, "unrelated")])] == [["panic", "radio_down"]]
+    # The down arrives after the 60 s window: no incident
+    assert incidents([(0, "kernel panic"), (61, "wlan0 changed state to down")]) == []
+    # Out of order for an ordered rule: the down before the panic does not count
+    assert incidents([(0, "wlan0 changed state to down"), (5, "kernel panic")]) == []
+
+def test_unordered_rule():
+    found = incidents([
+        (0, "eth0 changed state to down"),
+        (40, "cpu core 1 usage: 97%"),
+        (100, "high memory usage detected"),
+    ])
+    assert [i["rule"] for i in found] == ["memory_cpu_issue"]
+    assert found[0]["steps"] == ["high_memory", "cpu_spike", "uplink_bounce"]
+    # An 80% spike does not match the cpu step
+    assert incidents([(0, "eth0 changed state to down"), (1, "cpu core 1 usage: 80%"),
+                      (2, "high memory usage")]) == []
+
+def test_members_are_bounded():
+    # Repeated panics join the open candidate instead of opening new ones
+    events = [(n, f"kernel panic {n}") for n in range(5)] + [(10, "wlan0 changed state to down")]
+    found = incidents(events)
+    assert len(found) == 1 and len(found[0]["members"]) == 6
+    events = [(0, "kernel panic")] + [(n, f"wlan0 changed state to down {n}") for n in range(1, 10)]
+    found = incidents(events, max_members=3)
+    assert len(found[0]["members"]) == 3 and found[0]["dropped_members"] == 7
+
+# Syslog stamps carry no year; keep the test inside the current one
+BASE = datetime.now().replace(month=1, day=2, hour=12, minute=0, second=0, microsecond=0)
+
+def stamp(offset):
+    return (BASE + timedelta(seconds=offset)).strftime("%b %d %H:%M:%S")
+
+def test_run_merges_files_by_time():
+    with tempfile.TemporaryDirectory() as tmp:
+        # The crash and the radio events sit in different captures
+        with open(os.path.join(tmp, "log_1_show_logging.txt"), 'w') as f:
+            f.write(f"{stamp(0)} hostapd: process 'hostapd' crashed\n"
+                    f"{stamp(30)} kernel: restarting wireless driver\n")
+        with open(os.path.join(tmp, "log_2_show_trace.txt"), 'w') as f:
+            f.write(f"{stamp(10)} Interface wlan0 changed state to down\n"
+                    f"{stamp(500)} Interface wlan0 changed state to up\n")
+        found, output_csv = run_log_correlation(tmp)
+        assert [i["rule"] for i in found] == ["hostapd_crash"]
+        assert [m["source"] for m in found[0]["members"]] == [
+            "log_1_show_logging.txt", "log_2_show_trace.txt", "log_1_show_logging.txt"]
+        with open(output_csv) as f:
+            rows = f.read().splitlines()
+        assert len(rows) == 2 and rows[1].startswith("hostapd_crash,hostapd_crash,")
+
+        # Restricted to a window after the crash, nothing correlates
+        found, _ = run_log_correlation(tmp, start_time=BASE + timedelta(minutes=5),
+                                       end_time=BASE + timedelta(minutes=10))
+        assert found == []
+
+
+if __name__ == "__main__":
+    test_ordered_chain_within_window()
+    test_optional_step_and_window()
+    test_unordered_rule()
+    test_members_are_bounded()
+    test_run_merges_files_by_time()
+    print("✅ Log correlation checks passed")
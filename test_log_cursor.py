@@ -0,0 +1,64 @@
+# test_log_cursor.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for utils/log_cursor.py: incremental pulls over a growing, wrapping and year-crossing log buffer
+
+from datetime import datetime, timedelta
+
+from utils.log_cursor import LogCursor
+
+START = datetime(2024, 12, 31, 23, 50, 0)
+
+def syslog(i, start=START, text=None):
+    ts = start + timedelta(seconds=10 * i)
+    return f"{ts.strftime('%b %d %H:%M:%S')} %LINK-3-UPDOWN: event {i if text is None else text}"
+
+def pull(cursor, buffer, reference):
+    new = cursor.new_lines(buffer, reference)
+    cursor.advance(new, fetched=len(buffer), reference=reference)
+    return new
+
+def test_growing_buffer_and_repeated_tail():
+    ref = START + timedelta(hours=1)
+    cursor = LogCursor()
+    buffer = [syslog(i) for i in range(10)] + ["  retry"] * 8
+    assert pull(cursor, buffer, ref) == buffer
+    assert pull(cursor, buffer, ref) == []
+    # Untimestamped lines identical to the stored tail are new lines, not the old tail
+    grown = buffer + ["  retry"] * 8 + [syslog(10)]
+    assert pull(cursor, grown, ref) == ["  retry"] * 8 + [syslog(10)]
+
+def test_buffer_wrap():
+    ref = START + timedelta(hours=1)
+    cursor = LogCursor()
+    pull(cursor, [syslog(i) for i in range(20)], ref)
+    # The device dropped the oldest lines; the tail is still in the buffer
+    assert pull(cursor, [syslog(i) for i in range(10, 30)], ref) == [syslog(i) for i in range(20, 30)]
+    # Wrapped past the tail: only the time cutoff is left
+    assert pull(cursor, [syslog(i) for i in range(35, 50)], ref) == [syslog(i) for i in range(35, 50)]
+
+def test_year_rollover_and_same_second_duplicates():
+    cursor = LogCursor()
+    pull(cursor, [syslog(i) for i in range(6)] + [syslog(5, text="dup")], START + timedelta(minutes=5))
+    # Pulled after New Year with the tail wrapped out: Jan 01 lines are newer than Dec 31 ones
+    buffer = [syslog(5, text="dup"), syslog(5, text="dup")] + [syslog(i) for i in range(60, 70)]
+    new = pull(cursor, buffer, START + timedelta(hours=1))
+    assert new == [syslog(5, text="dup")] + [syslog(i) for i in range(60, 70)]
+    assert "Jan 01" in new[-1]
+    assert datetime.fromtimestamp(cursor.last_time).year == 2025
+
+def test_saved_cursor_round_trip_and_legacy_format():
+    ref = datetime.now()
+    cursor = LogCursor()
+    pull(cursor, [syslog(i, start=ref - timedelta(minutes=5)) for i in range(5)], ref)
+    restored = LogCursor.from_dict(cursor.to_dict())
+    assert restored.new_lines([syslog(i, start=ref - timedelta(minutes=5)) for i in range(6)], ref) == [
+        syslog(5, start=ref - timedelta(minutes=5))]
+    legacy = LogCursor.from_dict({"last_time": [ref.month, ref.day, ref.strftime("%H:%M:%S")]})
+    assert abs(legacy.last_time - ref.replace(microsecond=0).timestamp()) < 1
+
+if __name__ == "__main__":
+    test_growing_buffer_and_repeated_tail()
+    test_buffer_wrap()
+    test_year_rollover_and_same_second_duplicates()
+    test_saved_cursor_round_trip_and_legacy_format()
+    print("✅ log cursor checks passed")
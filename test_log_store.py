@@ -0,0 +1,86 @@
+# test_log_store.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for utils/log_store.py: multi-member gzip logs written in pieces and read back by text range
+
+import gzip
+import os
+import tempfile
+
+from utils.log_store import (INDEX_EXTENSION, LogWriter, iter_range_lines, iter_text_range, member_ranges,
+                             open_log_text, read_index)
+
+LINES = [f"Mar 01 12:{n // 60 % 60:02d}:{n % 60:02d} capwapd: event {n} {'x' * (n % 37)}\n" for n in range(600)]
+TEXT = "".join(LINES)
+
+def write_gz(folder, member_bytes=2048, piece=500):
+    writer = LogWriter(os.path.join(folder, "log_1_show_logging.txt"), compression="gzip", member_bytes=member_bytes)
+    # Output arrives in pieces that do not respect line boundaries
+    for pos in range(0, len(TEXT), piece):
+        writer.write(TEXT[pos:pos + piece])
+    return writer.close()
+
+def line_offsets():
+    offsets = [0]
+    for line in LINES:
+        offsets.append(offsets[-1] + len(line.encode()))
+    return offsets
+
+def test_members_and_index():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_gz(tmp)
+        assert path.endswith(".txt.gz")
+        index = read_index(path)
+        assert index["format"] == "gzip" and len(index["members"]) > 5
+        assert index["text_bytes"] == len(TEXT.encode()) and index["lines"] == len(LINES)
+        # Every member starts on a line: its text offset is a line offset and first_line matches it
+        offsets = line_offsets()
+        for _, text_offset, first_line in index["members"]:
+            assert offsets[first_line] == text_offset
+        # Standard gzip readers see one stream of concatenated members
+        with gzip.open(path, 'rt') as f:
+            assert f.read() == TEXT
+        with open_log_text(path) as f:
+            assert f.read() == TEXT
+
+def test_iter_text_range():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_gz(tmp)
+        offsets = line_offsets()
+        members = [text_offset for _, text_offset, _ in read_index(path)["members"]]
+        # Ranges starting at, inside and across member boundaries
+        for first, last in [(0, 10), (3, 4), (100, 250), (599, 600), (0, 600)]:
+            assert list(iter_text_range(path, offsets[first], offsets[last])) == LINES[first:last]
+        inside = next(i for i, offset in enumerate(offsets) if offset > members[2])
+        assert list(iter_text_range(path, offsets[inside], offsets[inside + 3])) == LINES[inside:inside + 3]
+        assert list(iter_text_range(path, offsets[-1], offsets[-1] + 100)) == []
+
+        # Without the index the range is found by decompressing from the start
+        os.remove(path + INDEX_EXTENSION)
+        assert list(iter_text_range(path, offsets[200], offsets[205])) == LINES[200:205]
+
+def test_member_ranges_cover_the_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_gz(tmp)
+        ranges = member_ranges(path, 8192)
+        assert len(ranges) > 1 and ranges[-1][1] == os.path.getsize(path)
+        assert "".join(line for start, end in ranges for line in iter_range_lines(path, start, end)) == TEXT
+
+def test_append_adds_members():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_gz(tmp)
+        before = len(read_index(path)["members"])
+        with LogWriter(os.path.join(tmp, "log_1_show_logging.txt"), compression="gzip", member_bytes=2048,
+                       append=True) as writer:
+            writer.write("Mar 01 13:00:00 capwapd: appended\n")
+        index = read_index(path)
+        assert len(index["members"]) == before + 1 and index["lines"] == len(LINES) + 1
+        start = index["members"][-1][1]
+        assert list(iter_text_range(path, start, index["text_bytes"])) == ["Mar 01 13:00:00 capwapd: appended\n"]
+
+
+if __name__ == "__main__":
+    test_members_and_index()
+    test_iter_text_range()
+    test_member_ranges_cover_the_file()
+    test_append_adds_members()
+    print("✅ Log store checks passed")
@@ -0,0 +1,59 @@
+# test_log_window.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for windowed log analysis (utils/log_index.py): untimestamped files and continuation lines
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from utils.log_analyzer import analyze_log_file, load_patterns, run_log_analysis_parallel
+from utils.log_index import iter_window_lines, window_epochs
+
+CRASH = """Crash dump for slot 0
+Exception: kernel panic - not syncing: Fatal exception in interrupt
+Call trace:
+  ath11k_dp_rx_process+0x1c4
+"""
+
+def write(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+    return path
+
+def stamp(ts):
+    return ts.strftime("%b %d %H:%M:%S")
+
+def test_untimestamped_file_is_scanned_whole():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write(os.path.join(tmp, "log_3_show_platform_crash.txt"), CRASH)
+        now = datetime.now()
+        window = window_epochs(now - timedelta(minutes=5), now)
+        summary = analyze_log_file(path, load_patterns(), window)
+        assert {m["category"] for m in summary["matches"]} == {"kernel_crash"}
+        assert list(iter_window_lines(path, *window)) == CRASH.splitlines(keepends=True)
+
+        merged = run_log_analysis_parallel([tmp], workers=1, output_dir=tmp,
+                                           start_time=now - timedelta(minutes=5), end_time=now)
+        with open(merged["merged"], 'r') as f:
+            assert "kernel panic" in f.read()
+
+def test_continuation_lines_follow_their_record():
+    with tempfile.TemporaryDirectory() as tmp:
+        base = datetime.now().replace(microsecond=0) - timedelta(minutes=30)
+        lines = [
+            "Crash log header without a timestamp\n",
+            f"{stamp(base)} radio 1 reset\n",
+            "  kernel panic continuation of the first record\n",
+            f"{stamp(base + timedelta(minutes=10))} interface changed state to down\n",
+            "  fatal exception continuation of the second record\n",
+            f"{stamp(base + timedelta(minutes=20))} link up\n",
+        ]
+        path = write(os.path.join(tmp, "log_1_show_log.txt"), "".join(lines))
+        start = int(base.timestamp())
+        assert list(iter_window_lines(path, start, start + 60)) == lines[:3]
+        assert list(iter_window_lines(path, start + 500, start + 700)) == lines[3:5]
+
+if __name__ == "__main__":
+    test_untimestamped_file_is_scanned_whole()
+    test_continuation_lines_follow_their_record()
+    print("✅ log window checks passed")
@@ -0,0 +1,85 @@
+# test_pattern_matcher.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks that the single-pass PatternMatcher (utils/log_analyzer.py) writes the same CSV as the original
+# per-pattern rescans, including overlapping patterns, regex metacharacters and non-ASCII lines
+
+import filecmp
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta
+
+from utils.log_analyzer import analyze_log_file, load_patterns, write_summary_to_csv
+from utils.log_generator import generate_mock_logs
+
+# Overlapping literals, metacharacters, alternation, backreferences and a non-ASCII literal
+EXTRA_PATTERNS = {
+    "overlap": ["link", "link down", "changed state to (down|up)", "state"],
+    "special": [r"wlan\d \((2\.4|5|6)G\)", r"signal 1[01]", r"\d+%", r"C\+\+", "a.b", r"(\w+) \1",
+                r"^\S+ \d+ \d\d:\d\d:\d\d ap-cpu", r"\bcore [0-9]+\b"],
+    "unicode": ["température", "kelvin"],
+    "empty": [],
+}
+
+HANDWRITTEN = """Mar 01 12:00:00 ap-interface: wlan0 (2.4G) changed state to down
+Mar 01 12:00:01 ap-interface: wlan1 (5G) changed state to up
+Mar 01 12:00:02 ap-daemon: Process 'hostapd' crashed due to signal 11
+Mar 01 12:00:03 ap-debug: C++ exception in axb handler
+Mar 01 12:00:04 ap-debug: retry retry loop detected
+Mar 01 12:00:05 ap-env: Température élevée 95%
+Mar 01 12:00:06 ap-env: sensor in \u212aelvin out of range
+Mar 01 12:00:07 ap-cpu: CPU core 12 usage: 99%
+Mar 01 12:00:08 ap-link: LINK DOWN on eth0\r
+Mar 01 12:00:09 ap-kernel: Kernel panic - not syncing: Fatal exception
+"""
+
+def per_pattern_analysis(filepath, patterns):
+    # The original algorithm: every pattern rescans every line of the file
+    summary = {"filename": os.path.basename(filepath), "matches": []}
+    with open(filepath, 'r') as f:
+        lines = f.readlines()
+    for category, regex_list in patterns.items():
+        for regex in regex_list or []:
+            pattern = re.compile(regex, re.IGNORECASE)
+            for line in lines:
+                if pattern.search(line):
+                    summary["matches"].append({"category": category, "pattern": regex, "line": line.strip()})
+    return summary
+
+def compare(log_paths, patterns, folder):
+    old_csv = os.path.join(folder, "per_pattern.csv")
+    new_csv = os.path.join(folder, "single_pass.csv")
+    write_summary_to_csv([per_pattern_analysis(path, patterns) for path in log_paths], old_csv)
+    write_summary_to_csv([analyze_log_file(path, patterns) for path in log_paths], new_csv)
+    assert filecmp.cmp(old_csv, new_csv, shallow=False)
+    with open(new_csv) as f:
+        return len(f.read().splitlines()) - 1
+
+def sample_logs(folder):
+    start = datetime(2025, 3, 1, 12, 0, 0)
+    paths = generate_mock_logs(os.path.join(folder, "logs"), ["show logging", "show trace", "show crash"],
+                               start, start + timedelta(minutes=10), total_lines=300, seed=3)
+    handwritten = os.path.join(folder, "logs", "log_4_handwritten.txt")
+    with open(handwritten, 'w', encoding="utf-8", newline='') as f:
+        f.write(HANDWRITTEN)
+    return paths + [handwritten]
+
+def test_repo_patterns_match_per_pattern_csv():
+    with tempfile.TemporaryDirectory() as tmp:
+        assert compare(sample_logs(tmp), load_patterns(), tmp) > 300
+
+def test_overlapping_and_special_patterns_match_per_pattern_csv():
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = sample_logs(tmp)
+        patterns = {**load_patterns(), **EXTRA_PATTERNS}
+        rows = compare(paths, patterns, tmp)
+        assert rows > 300
+        # The handwritten file alone exercises every extra category
+        found = {m["category"] for m in analyze_log_file(paths[-1], patterns)["matches"]}
+        assert {"overlap", "special", "unicode"} <= found
+
+
+if __name__ == "__main__":
+    test_repo_patterns_match_per_pattern_csv()
+    test_overlapping_and_special_patterns_match_per_pattern_csv()
+    print("✅ Pattern matcher equivalence checks passed")
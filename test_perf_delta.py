@@ -0,0 +1,120 @@
+# test_perf_delta.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for analyzers/perf_delta.py: counter wraps and resets (per counter width), per-client pairing and goodput
+# over the window
+
+import os
+import tempfile
+from array import array
+
+from analyzers.perf_delta import WRAP_32, compute_perf_delta, counter_deltas, run_perf_delta
+
+SAMPLE = "mock_samples/perstats.txt"
+MAC = "BE:43:ED:D3:B7:30"
+NEW_MAC = "AA:BB:CC:00:00:01"
+# Accumulated stats row of the sample: TxData 30747053, TxBytes 46681227167, TxFail 0, TxCumRetries 2398384, RxBytes 2425662
+AFTER_ROW = ("BE:43:ED:D3:B7:30    3 mld0v0 30747053      1 30747053 46681227167      0      0      2398384   "
+             "3178      1 2425662     0")
+BEFORE_ROW = (f"BE:43:ED:D3:B7:30    3 mld0v0 30000000      1 30000000 46556227167 {WRAP_32 - 10}      0      2315378   "
+              "3000      1 9000000     0")
+
+def sample():
+    with open(SAMPLE, 'r') as f:
+        return f.read()
+
+def write(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+    return path
+
+def test_counter_deltas():
+    before = array("q", [100, WRAP_32 - 5, 5000, 0])
+    after = array("q", [250, 20, 40, 0])
+    deltas, events = counter_deltas(before, after)
+    # Plain increase, 32-bit wrap (old value in the top half), reset (after value counts), idle
+    assert list(deltas) == [150, 25, 40, 0]
+    assert events == ["", "wrap", "reset", ""]
+
+def test_64bit_counter_reset_is_not_a_wrap():
+    # A byte counter in the top half of the 32-bit range that drops back: a reset, not a 32-bit wrap
+    before = array("q", [WRAP_32 - 5, 2 ** 40])
+    after = array("q", [20, 300])
+    deltas, events = counter_deltas(before, after, bits=64)
+    assert list(deltas) == [20, 300] and events == ["reset", "reset"]
+    assert counter_deltas(before, after)[1] == ["wrap", "reset"]
+
+    text = sample()
+    with tempfile.TemporaryDirectory() as tmp:
+        # TxBytes 4294967290 before (just under 2^32), 46681227167 after; then a drop to a small value
+        before = write(os.path.join(tmp, "before.txt"), text.replace("46681227167", str(WRAP_32 - 6)))
+        after = write(os.path.join(tmp, "after.txt"), text.replace("46681227167", "1000"))
+        client = compute_perf_delta(before, after, window_sec=10)["clients"][0]
+    assert client["d_TxBytes"] == 1000 and client["counter_events"] == "TxBytes:reset"
+
+def test_compute_perf_delta():
+    text = sample()
+    assert AFTER_ROW in text
+    with tempfile.TemporaryDirectory() as tmp:
+        before = write(os.path.join(tmp, "before.txt"), text.replace(AFTER_ROW, BEFORE_ROW))
+        # A second client associates during the test
+        after = write(os.path.join(tmp, "after.txt"), text + "\n" + text.replace(MAC, NEW_MAC))
+        result = compute_perf_delta(before, after, window_sec=10)
+
+    rows = {row["mac"]: row for row in result["clients"]}
+    assert [row["mac"] for row in result["clients"]] == sorted([MAC, NEW_MAC])
+    client = rows[MAC]
+    assert client["status"] == "present"
+    assert client["d_TxBytes"] == 125_000_000 and client["tx_mbps"] == 100.0
+    assert client["d_TxData"] == 747053 and client["d_TxCumRetries"] == 83006
+    assert client["tx_retry_pct"] == round(100.0 * 83006 / (747053 + 83006), 3)
+    assert client["d_TxFail"] == 10 and client["d_RxBytes"] == 2425662
+    assert client["counter_events"] == "RxBytes:reset;TxFail:wrap"
+
+    # A client that appeared counts from zero: its whole after snapshot is the delta
+    new = rows[NEW_MAC]
+    assert new["status"] == "appeared" and new["d_TxBytes"] == 46681227167
+    agg = result["aggregate"]
+    assert agg["status"] == "2 client(s)"
+    assert agg["d_TxBytes"] == 125_000_000 + 46681227167
+    assert agg["tx_mbps"] == round((125_000_000 + 46681227167) * 8 / 10 / 1e6, 3)
+
+def test_disappeared_client_counts_nothing():
+    text = sample()
+    with tempfile.TemporaryDirectory() as tmp:
+        before = write(os.path.join(tmp, "before.txt"), text + "\n" + text.replace(MAC, NEW_MAC))
+        after = write(os.path.join(tmp, "after.txt"), text)
+        result = compute_perf_delta(before, after, window_sec=60)
+    rows = {row["mac"]: row for row in result["clients"]}
+    assert rows[NEW_MAC]["status"] == "disappeared"
+    assert rows[NEW_MAC]["d_TxBytes"] == 0 and rows[NEW_MAC]["tx_mbps"] == 0
+    assert result["aggregate"]["d_TxBytes"] == 0
+
+def test_run_perf_delta_pairs_phase_snapshots():
+    text = sample()
+    with tempfile.TemporaryDirectory() as tmp:
+        perf_dir = os.path.join(tmp, "ap", "performance")
+        os.makedirs(perf_dir)
+        before = write(os.path.join(perf_dir, "performance_stats_before_test_20250301_120000.txt"),
+                       "# Timestamp: 20250301_120000\n" + text.replace(AFTER_ROW, BEFORE_ROW))
+        after = write(os.path.join(perf_dir, "performance_stats_after_test_20250301_120010.txt"),
+                      "# Timestamp: 20250301_120010\n" + text)
+        os.utime(before, (1, 1))
+        os.utime(after, (2, 2))
+        outputs = run_perf_delta(tmp)
+        assert len(outputs) == 1 and os.path.dirname(outputs[0]) == perf_dir
+        with open(outputs[0]) as f:
+            lines = f.read().splitlines()
+        # The window comes from the snapshot headers: 10 s -> 100 Mbps
+        assert lines[0].startswith("mac,status,counter_events,d_TxBytes")
+        assert lines[1].startswith(f"{MAC},present,RxBytes:reset;TxFail:wrap,125000000,")
+        assert ",100.0," in lines[1]
+        assert lines[-1].startswith("ALL,1 client(s)")
+
+
+if __name__ == "__main__":
+    test_counter_deltas()
+    test_64bit_counter_reset_is_not_a_wrap()
+    test_compute_perf_delta()
+    test_disappeared_client_counts_nothing()
+    test_run_perf_delta_pairs_phase_snapshots()
+    print("✅ Perf delta checks passed")
@@ -0,0 +1,56 @@
+# test_perstats_parser.py
+# Author: Wai Man Cheng & ChatGPT
+# Regression check for parsers/perstats_parser.py against mock_samples/perstats.txt
+
+from parsers.perstats_parser import parse_perstats, parse_perstats_file
+
+SAMPLE = "mock_samples/perstats.txt"
+
+def test_client_summary():
+    clients = parse_perstats_file(SAMPLE)
+    assert len(clients) == 1
+    client = clients[0]
+    assert client.mac == "BE:43:ED:D3:B7:30"
+    assert client.radio == 3
+    assert client.info["RSSI"] == "-34"
+    assert client.accumulated["TxBytes"] == 46681227167
+    assert client.accumulated["RxBytes"] == 2425662
+    assert client.accumulated["TxCumRetries"] == 2398384
+    assert client.accumulated["TxRt(Mbps)"] == "EHT-160,2SS,MCS12,GI0.8 (2594)"
+    assert client.slots["SU"]["Tx-Bytes"] == 46681227449
+
+def test_rate_tables_and_histograms():
+    client = parse_perstats_file(SAMPLE)[0]
+    assert list(client.su_rates.rate_index) == [0, 2, 4, 6, 7, 8, 9, 10, 11, 12, 13]
+    assert client.su_rates.tx_retries[-1] == 1390914
+    assert len(client.mu_rates) == 0
+    assert client.tx.mcs["msdu/EHT"][13] == 17528174
+    assert client.rx.mcs["ppdu/EHT"][12] == 329
+    assert list(client.tx.nss["msdu"][:2]) == [41, 30747236]
+    assert list(client.rx.nss["ppdu/SU"][:2]) == [1024, 721]
+    assert client.tx.gi["0.8us"] == 30747277
+    assert client.rx.gi["1.6us"] == 729
+    assert client.rx.mpdu["SU"] == {"MPDU OK": 2382, "MPDU Fail": 32}
+
+def test_counters_and_reo():
+    client = parse_perstats_file(SAMPLE)[0]
+    assert client.tx.counters["Success Bytes"] == 46179998934
+    assert client.tx.counters["Packet Retries"] == 348613
+    assert client.rx.counters["Bytes Sent To Stack"] == 2216864
+    assert client.rx.counters["Ring 3/Bytes Received"] == 611515
+    assert sorted(client.reo) == [0, 6, 7, 16]
+    assert client.reo[0]["total_byte_cnt"] == 2316228
+
+def test_multiple_dumps_in_one_capture():
+    with open(SAMPLE) as f:
+        text = f.read()
+    clients = parse_perstats(text + "\n" + text.replace("BE:43:ED:D3:B7:30", "AA:BB:CC:DD:EE:FF"))
+    assert [c.mac for c in clients] == ["BE:43:ED:D3:B7:30", "AA:BB:CC:DD:EE:FF"]
+    assert clients[1].tx.counters["Success Bytes"] == 46179998934
+
+if __name__ == "__main__":
+    test_client_summary()
+    test_rate_tables_and_histograms()
+    test_counters_and_reo()
+    test_multiple_dumps_in_one_capture()
+    print("✅ perstats parser regression checks passed.")
@@ -0,0 +1,84 @@
+# test_run_catalog.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for utils/run_catalog.py: manifest runs, timestamp pairing of older runs, queries, rescans and series metrics
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+from utils.run_catalog import RunCatalog, finish_run, parse_filter, start_run
+from utils.test_schemas import TEST_SCHEMAS
+
+PERF_DELTA = "mac,status,tx_mbps,rx_mbps,tx_retry_pct\nAA:BB:CC:DD:EE:01,present,812.5,20.1,3.2\nALL,1 client(s),812.5,20.1,3.2\n"
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+def make_legacy_run(root, stamp, device, config):
+    write(os.path.join(root, f"performance_config_{stamp[:-2]}00.json"), json.dumps(config))
+    write(os.path.join(root, f"ap_stats_{stamp}", "performance", "performance_stats_before_test.txt"), "x")
+    write(os.path.join(root, f"ap_stats_{stamp}", "performance", f"perf_delta_{stamp}.csv"), PERF_DELTA)
+    write(os.path.join(root, f"logs_{device}_{stamp[:-4]}5959", "log_1_show_log.txt"), "x")
+    write(os.path.join(root, f"logs_{device}_{stamp[:-4]}5959", f"log_incidents_{stamp}.csv"), "rule\nkernel_crash\n")
+
+def test_scan_pairs_older_runs_and_queries():
+    root = tempfile.mkdtemp()
+    try:
+        make_legacy_run(root, "20250411_171530", "ap1", {**TEST_SCHEMAS["performance"], "mock": True})
+        make_legacy_run(root, "20250412_091530", "ap2", {**TEST_SCHEMAS["performance"], "radio_band": "5G", "nss": 4})
+        with RunCatalog(root=root) as catalog:
+            assert catalog.scan()["indexed"] == 2
+            runs = catalog.query(params=[parse_filter("radio_band=6g"), parse_filter("bandwidth=80MHz")])
+            assert [r["run_id"] for r in runs] == ["ap_stats_20250411_171530"]
+            run = runs[0]
+            assert run["devices"] == ["ap1"] and run["status"] == "completed"
+            assert run["metrics"]["tx_mbps"] == 812.5 and run["metrics"]["incidents"] == 1
+            assert run["log_dir"] == os.path.join(root, "logs_ap1_20250411_175959")
+
+            assert [r["run_id"] for r in catalog.query(params=[("nss", ">", "2")])] == ["ap_stats_20250412_091530"]
+            assert [r["run_id"] for r in catalog.query(devices=["ap2"], since="2025-04-12")] == ["ap_stats_20250412_091530"]
+            assert catalog.query(metrics=[("tx_mbps", ">", "900")]) == []
+
+            kinds = {f["kind"] for f in catalog.get_run("ap_stats_20250411_171530")["files"]}
+            assert kinds == {"performance", "perf_delta", "log", "incidents"}
+
+            assert catalog.scan() == {"indexed": 0, "skipped": 2, "removed": 0}
+            shutil.rmtree(os.path.join(root, "ap_stats_20250412_091530"))
+            catalog.scan()
+            # The leftover config and log folder are kept as runs of their own
+            assert sorted(r["run_id"] for r in catalog.query()) == [
+                "ap_stats_20250411_171530", "logs_ap2_20250412_095959", "performance_config_20250412_091500"]
+    finally:
+        shutil.rmtree(root)
+
+def test_runner_manifest_is_recorded():
+    root = tempfile.mkdtemp()
+    try:
+        stats_dir = os.path.join(root, "ap_stats_20250501_100000")
+        config = {"test_type": "performance", **TEST_SCHEMAS["performance"], "log_commands": ["show log"]}
+        run = start_run(stats_dir, config, "ap7", started_at=datetime(2025, 5, 1, 10, 0, 0))
+        write(os.path.join(stats_dir, "performance", "perf_delta_20250501_100500.csv"), PERF_DELTA)
+        write(os.path.join(stats_dir, "cpu", "cpu_usage.csv"), "timestamp,cpu_0,cpu_1\n"
+              "2025-05-01 10:01:00,3,40\n2025-05-01 10:02:00,5,60\n")
+        finish_run(stats_dir, run, ended_at=datetime(2025, 5, 1, 10, 5, 0), root=root)
+        with RunCatalog(root=root) as catalog:
+            recorded = catalog.get_run("ap_stats_20250501_100000")
+            assert recorded["source"] == "manifest" and recorded["status"] == "completed"
+            assert recorded["metrics"]["duration_sec"] == 300 and recorded["params"]["traffic_type"] == "UDP"
+            # cpu metrics go through the series store, which leaves a .series file for later scans
+            assert recorded["metrics"]["cpu_max"] == 60
+            assert os.path.exists(os.path.join(stats_dir, "cpu", "cpu_usage.series"))
+            # A rebuild from disk gives the same run back
+            catalog.scan(rebuild=True)
+            assert catalog.get_run("ap_stats_20250501_100000")["metrics"] == recorded["metrics"]
+    finally:
+        shutil.rmtree(root)
+
+if __name__ == "__main__":
+    test_scan_pairs_older_runs_and_queries()
+    test_runner_manifest_is_recorded()
+    print("✅ run catalog checks passed")
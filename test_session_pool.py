@@ -0,0 +1,207 @@
+# test_session_pool.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for collection/session_pool.py: session reuse and reconnects, splitting batched output on prompts
+# and the fallback to sequential, learning the live prompt and remembering a failed batch per device
+
+from collection.session_pool import (BatchSplitError, DeviceSession, SessionPool, hostname_from_prompt, prompt_regex,
+                                     split_batched_output)
+
+CMDS = ["show version", "show clock"]
+
+def expect_split_error(raw, cmds, prompt_re):
+    try:
+        split_batched_output(raw, cmds, prompt_re)
+    except BatchSplitError:
+        return
+    raise AssertionError("BatchSplitError not raised")
+
+def test_prompt_variants():
+    prompt_re = prompt_regex("AP1")
+    for line in ["AP1#", "AP1>", "AP1(config)#", "  AP1# ", "AP1#show clock"]:
+        assert prompt_re.match(line), line
+    # Other hosts, hostnames containing regex characters and mid-line text are not prompts
+    for line in ["AP10#", "xAP1#", "Router#", "AP1 uptime is 3 days"]:
+        assert not prompt_re.match(line), line
+    assert prompt_regex("AP.1").match("AP.1#")
+    assert not prompt_regex("AP.1").match("APX1#")
+
+def test_split_with_echoes():
+    prompt_re = prompt_regex("AP1")
+    # The first echo has no prompt (it was consumed by the previous exchange)
+    raw = "show version\r\nCisco AP Software\r\nuptime 3 days\r\nAP1#show clock\r\n*12:00:00.000 UTC\r\nAP1#"
+    assert split_batched_output(raw, CMDS, prompt_re) == ["Cisco AP Software\nuptime 3 days", "*12:00:00.000 UTC"]
+
+    # A leading prompt, a config-mode prompt and a command with no output
+    raw = "AP1#show version\nCisco AP Software\nAP1(config)#show clock\nAP1#"
+    assert split_batched_output(raw, CMDS, prompt_re) == ["Cisco AP Software", ""]
+
+    # Blank lines inside an output are kept; trailing ones are dropped
+    raw = "show version\nline 1\n\nline 3\n\nAP1>show clock\nnow\nAP1>"
+    assert split_batched_output(raw, CMDS, prompt_re) == ["line 1\n\nline 3", "now"]
+
+def test_split_errors():
+    prompt_re = prompt_regex("AP1")
+    # Output still arriving: one prompt short
+    expect_split_error("show version\nCisco AP Software\nAP1#show clock\nnow\n", CMDS, prompt_re)
+    # The device echoed something other than the command sent
+    expect_split_error("show version\nCisco\nAP1#show logging\nnow\nAP1#", CMDS, prompt_re)
+    # Prompts of another host never line up
+    expect_split_error("show version\nCisco\nAP2#show clock\nnow\nAP2#", CMDS, prompt_re)
+
+class FakeDevice:
+    # Answers execute() per command; the batched exchange returns a transcript missing a prompt
+    name = "ap1"
+    hostname = "AP1"
+
+    def __init__(self, transcript):
+        self.transcript = transcript
+        self.connected = False
+        self.executed = []
+        self.connects = 0
+        self.disconnects = 0
+        self.failures = 0
+        self._buffer = ""
+
+    def is_connected(self):
+        return self.connected
+
+    def connect(self, **kwargs):
+        self.connected = True
+        self.connects += 1
+
+    def disconnect(self):
+        self.connected = False
+        self.disconnects += 1
+
+    def execute(self, cmd):
+        if self.failures:
+            self.failures -= 1
+            raise EOFError("connection reset")
+        self.executed.append(cmd)
+        return f"output of {cmd}"
+
+    def transmit(self, data):
+        self._buffer = self.transcript
+
+    def receive(self, pattern, timeout=None):
+        return bool(self._buffer)
+
+    def receive_buffer(self):
+        data, self._buffer = self._buffer, ""
+        return data
+
+def make_pool(device, **kwargs):
+    pool = SessionPool(batch_timeout=1, **kwargs)
+    pool._sessions[pool._key("tb.yaml", device.name)] = DeviceSession(device)
+    return pool
+
+def test_session_is_reused_and_reconnected():
+    device = FakeDevice("")
+    pool = make_pool(device)
+    assert pool.run_commands("tb.yaml", "ap1", CMDS) == ["output of show version", "output of show clock"]
+    assert pool.execute("tb.yaml", "ap1", "show clock") == "output of show clock"
+    assert device.connects == 1
+
+    # A session dropped behind the pool's back is reopened on next use
+    device.connected = False
+    pool.execute("tb.yaml", "ap1", "show clock")
+    assert device.connects == 2
+
+    # A failed command reconnects and retries up to max_retries times
+    device.failures = 1
+    assert pool.execute("tb.yaml", "ap1", "show version") == "output of show version"
+    assert device.connects == 3 and device.disconnects == 2
+    device.failures = 2
+    try:
+        pool.execute("tb.yaml", "ap1", "show version")
+    except EOFError:
+        pass
+    else:
+        raise AssertionError("EOFError not raised")
+
+    # on_error turns a failure into that command's output in sequential mode
+    device.failures = 2
+    outputs = pool.run_commands("tb.yaml", "ap1", CMDS, on_error=lambda cmd, e: f"error: {e}")
+    assert outputs == ["error: connection reset", "output of show clock"]
+
+def test_idle_sessions_are_reaped_and_closed():
+    device = FakeDevice("")
+    pool = make_pool(device, idle_timeout=60)
+    pool.execute("tb.yaml", "ap1", "show clock")
+    session = pool._sessions[pool._key("tb.yaml", "ap1")]
+    pool.reap_idle()
+    assert device.connected
+
+    session.last_used -= 61
+    pool.reap_idle()
+    assert not device.connected and not session.connected
+    pool.execute("tb.yaml", "ap1", "show clock")
+    assert device.connects == 2
+
+    pool.close_all()
+    assert not device.connected and pool._sessions == {}
+
+def test_batch_mode():
+    device = FakeDevice("show version\nCisco\nAP1#show clock\nnow\nAP1#")
+    pool = make_pool(device)
+    assert pool.run_commands("tb.yaml", "ap1", CMDS, mode="batch") == ["Cisco", "now"]
+    assert device.executed == [] and device.disconnects == 0
+
+def test_batch_falls_back_to_sequential():
+    # Echo mismatch -> BatchSplitError -> reconnect and run the commands one by one
+    device = FakeDevice("show version\nCisco\nAP1#show logging\nnow\nAP1#")
+    pool = make_pool(device)
+    assert pool.run_commands("tb.yaml", "ap1", CMDS, mode="batch") == ["output of show version", "output of show clock"]
+    assert device.executed == CMDS
+    assert device.disconnects == 1
+
+    # A transcript that never completes times out and falls back the same way
+    device = FakeDevice("show version\nCisco\n")
+    pool = make_pool(device)
+    assert pool.run_commands("tb.yaml", "ap1", CMDS, mode="batch") == ["output of show version", "output of show clock"]
+
+class RenamedDevice(FakeDevice):
+    # Testbed name 'ap' with no hostname; the live prompt is the device's own hostname
+    name = "ap"
+    hostname = None
+
+    def __init__(self, transcript):
+        super().__init__(transcript)
+        self.transmits = []
+
+    def transmit(self, data):
+        self.transmits.append(data)
+        self._buffer = "\r\nAP1815I_Cloud_5E10#" if data == "\r" else self.transcript
+
+def test_batch_uses_the_live_prompt():
+    assert hostname_from_prompt("\r\nAP1815I_Cloud_5E10#") == "AP1815I_Cloud_5E10"
+    assert hostname_from_prompt("AP1(config)#  ") == "AP1"
+    assert hostname_from_prompt("show version\nCisco\n") is None
+
+    device = RenamedDevice("show version\nCisco\nAP1815I_Cloud_5E10#show clock\nnow\nAP1815I_Cloud_5E10#")
+    pool = make_pool(device)
+    for _ in range(2):
+        assert pool.run_commands("tb.yaml", "ap", CMDS, mode="batch") == ["Cisco", "now"]
+    # The prompt is learned once per connection; nothing fell back
+    assert device.transmits.count("\r") == 1 and device.executed == [] and device.disconnects == 0
+
+def test_failed_batch_is_not_retried():
+    device = RenamedDevice("show version\nCisco\nAP1#show clock\nnow\nAP1#")
+    pool = make_pool(device)
+    for _ in range(3):
+        assert pool.run_commands("tb.yaml", "ap", CMDS, mode="batch") == ["output of show version",
+                                                                          "output of show clock"]
+    # One batched attempt, then sequential without another exchange or reconnect
+    assert len(device.transmits) == 2 and device.disconnects == 1 and device.executed == CMDS * 3
+
+if __name__ == "__main__":
+    test_session_is_reused_and_reconnected()
+    test_idle_sessions_are_reaped_and_closed()
+    test_prompt_variants()
+    test_split_with_echoes()
+    test_split_errors()
+    test_batch_mode()
+    test_batch_falls_back_to_sequential()
+    test_batch_uses_the_live_prompt()
+    test_failed_batch_is_not_retried()
+    print("✅ Session pool checks passed")
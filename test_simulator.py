@@ -0,0 +1,91 @@
+# test_simulator.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for simulator/: login, command responses, paging, typed-ahead commands and failure injection
+
+import os
+import re
+import socket
+import tempfile
+
+import yaml
+
+from simulator.cli_server import sample_body
+from simulator.fleet import SimulatedFleet
+
+FAST = {"latency_ms": 0, "jitter_ms": 0}
+
+def read_until(sock, pattern, timeout=5):
+    sock.settimeout(timeout)
+    buf = b""
+    while not re.search(pattern, buf):
+        data = sock.recv(4096)
+        if not data:
+            break
+        buf += data
+    return buf.decode("utf-8", errors="replace")
+
+def login(endpoint, hostname):
+    sock = socket.create_connection(endpoint)
+    read_until(sock, rb"Username: ")
+    sock.sendall(b"admin\r\n")
+    read_until(sock, rb"Password: ")
+    sock.sendall(b"admin\r\0")
+    read_until(sock, rf"{hostname}#".encode())
+    return sock
+
+def test_login_and_commands():
+    with SimulatedFleet(2, FAST) as fleet:
+        sock = login(fleet.endpoints()["ap002"], "ap002")
+        sock.sendall(b"terminal length 0\r\n")
+        read_until(sock, rb"ap002#$")
+        sock.sendall(b"sh memory summary\r\n")
+        out = read_until(sock, rb"ap002#$")
+        assert sample_body("memory.txt", "memory summary").split("\n")[1] in out.replace("\r\n", "\n")
+        sock.sendall(b"sh ver | include U-Boot\r\n")
+        out = read_until(sock, rb"ap002#$")
+        assert "U-Boot" in out and "Restricted Rights" not in out
+        sock.close()
+
+def test_typed_ahead_commands_come_back_in_order():
+    with SimulatedFleet(1, {**FAST, "login": False}) as fleet:
+        sock = socket.create_connection(fleet.endpoints()["ap001"])
+        read_until(sock, rb"ap001#")
+        sock.sendall(b"terminal length 0\rshow clock\rshow bogus\r")
+        out = read_until(sock, rb"Invalid[^\n]*\r\nap001#").replace("\r\n", "\n")
+        assert re.search(r"terminal length 0\nap001#show clock\n\*\d\d:\d\d:\d\d\.\d{3} UTC .*\n"
+                         r"ap001#show bogus\n% Invalid input", out)
+        sock.close()
+
+def test_paging_and_failures():
+    with SimulatedFleet(1, FAST, overrides={"ap001": {"page_lines": 5}}) as fleet:
+        sock = login(fleet.endpoints()["ap001"], "ap001")
+        sock.sendall(b"sh memory detail\r\n")
+        assert "--More--" in read_until(sock, rb"--More-- ")
+        sock.sendall(b"q")
+        read_until(sock, rb"ap001#$")
+        sock.close()
+
+    with SimulatedFleet(1, {**FAST, "login": False, "drop_rate": 1.0}) as fleet:
+        sock = socket.create_connection(fleet.endpoints()["ap001"])
+        read_until(sock, rb"ap001#")
+        sock.sendall(b"show version\r\n")
+        read_until(sock, rb"(?!)")
+        assert fleet.stats()["ap001"]["drops"] == 1
+        sock.close()
+
+def test_testbed_matches_endpoints():
+    with SimulatedFleet(3, FAST, name_prefix="sim") as fleet, tempfile.TemporaryDirectory() as tmp:
+        path = fleet.write_testbed(os.path.join(tmp, "testbed.yaml"))
+        with open(path, 'r') as f:
+            devices = yaml.safe_load(f)["devices"]
+        assert sorted(devices) == ["sim001", "sim002", "sim003"]
+        for name, (host, port) in fleet.endpoints().items():
+            cli = devices[name]["connections"]["cli"]
+            assert (cli["protocol"], cli["ip"], cli["port"]) == ("telnet", host, port)
+
+if __name__ == "__main__":
+    test_login_and_commands()
+    test_typed_ahead_commands_come_back_in_order()
+    test_paging_and_failures()
+    test_testbed_matches_endpoints()
+    print("✅ simulator checks passed")
@@ -0,0 +1,131 @@
+# test_static_stat_cache.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for collectors/static_stat_cache.py: reuse while the fingerprint holds, refresh on reload, TTL and command
+# changes, unusable fingerprints, per-device invalidation and concurrent writers on one file
+
+import os
+import tempfile
+
+from collectors.static_stat_cache import StaticStatCache, fingerprint_digest
+from collectors.stats_generator import SAMPLE_DIR
+
+CACHE = {"enabled": True, "ttl_sec": 3600, "fingerprint_cmd": "show version | include Last reload time|Running Image"}
+
+class RecordingPool:
+    # Answers the fingerprint from the version sample and counts full collections
+    def __init__(self):
+        with open(os.path.join(SAMPLE_DIR, "version.txt"), 'r') as f:
+            self.version = f.read()
+        self.full_runs = 0
+
+    def execute(self, testbed_path, device_name, cmd):
+        return "\n".join(line for line in self.version.split("\n") if "Last reload time" in line or "Running Image" in line)
+
+    def run_commands(self, testbed_path, device_name, cmds, mode=None):
+        self.full_runs += 1
+        return [self.version for _ in cmds]
+
+def test_reuse_until_fingerprint_changes():
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = RecordingPool()
+        cache = StaticStatCache(path=os.path.join(tmp, "cache.json"))
+        cmds = ["show version"]
+        assert cache.run_commands(pool, "tb.yaml", "ap1", "version", cmds, CACHE)[1] is False
+        outputs, reused = cache.run_commands(pool, "tb.yaml", "ap1", "version", cmds, CACHE)
+        assert reused and outputs == [pool.version] and pool.full_runs == 1
+
+        # Other devices, other commands and a fresh process keep separate, persisted entries
+        assert cache.run_commands(pool, "tb.yaml", "ap2", "version", cmds, CACHE)[1] is False
+        assert cache.run_commands(pool, "tb.yaml", "ap1", "version", cmds + ["show inventory"], CACHE)[1] is False
+        reloaded = StaticStatCache(path=cache.path)
+        assert reloaded.run_commands(pool, "tb.yaml", "ap2", "version", cmds, CACHE)[1] is True
+
+        # A reload changes the fingerprint and forces a full collection
+        pool.version = pool.version.replace("Thu Jul 25 03:13:05", "Fri Jul 26 08:00:00")
+        assert reloaded.run_commands(pool, "tb.yaml", "ap2", "version", cmds, CACHE)[1] is False
+        assert pool.full_runs == 4 and reloaded.counters == {"hits": 1, "misses": 1}
+
+def test_ttl_pattern_and_disable():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = StaticStatCache(path=os.path.join(tmp, "cache.json"))
+        fingerprint = fingerprint_digest("uptime is 1 days\nAP Running Image : 17.15\n", pattern="Running Image")
+        assert fingerprint == fingerprint_digest("uptime is 2 days\r\n  AP Running Image : 17.15", pattern="Running Image")
+        cache.store("ap1", "version", ["show version"], fingerprint, ["out"], now=1000)
+        assert cache.lookup("ap1", "version", ["show version"], fingerprint, ttl_sec=60, now=1050) == ["out"]
+        assert cache.lookup("ap1", "version", ["show version"], fingerprint, ttl_sec=60, now=1100) is None
+        cache.invalidate("ap1")
+        assert cache.lookup("ap1", "version", ["show version"], fingerprint, now=1000) is None
+
+        pool = RecordingPool()
+        disabled = StaticStatCache(path=cache.path, enabled=False)
+        for _ in range(2):
+            assert disabled.run_commands(pool, "tb.yaml", "ap1", "version", ["show version"], CACHE)[1] is False
+        assert pool.full_runs == 2
+
+def test_unusable_fingerprint_is_a_miss():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = StaticStatCache(path=os.path.join(tmp, "cache.json"))
+        cmds = ["show version"]
+        for answer in ["", "  \r\n", "% Invalid input detected at '^' marker.", "uptime is 2 days"]:
+            pool = RecordingPool()
+            pool.execute = lambda testbed_path, device_name, cmd, answer=answer: answer
+            pattern = {"fingerprint_pattern": "Running Image"} if answer.startswith("uptime") else {}
+            for _ in range(2):
+                outputs, reused = cache.run_commands(pool, "tb.yaml", "ap1", "version", cmds, {**CACHE, **pattern})
+                assert not reused and outputs == [pool.version]
+            assert pool.full_runs == 2
+        # Nothing was stored for any of them
+        assert not os.path.exists(cache.path) and cache.counters == {"hits": 0, "misses": 8}
+        assert fingerprint_digest("% Ambiguous command") is None
+
+def test_invalidate_matches_device_exactly():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = StaticStatCache(path=os.path.join(tmp, "cache.json"))
+        for device in ("ap", "ap_1", "ap_1_lab"):
+            for stat in ("version", "inventory"):
+                cache.store(device, stat, ["show version"], "fp", [f"{device} {stat}"], now=1000)
+        # 'ap' must not drop 'ap_1', nor 'ap_1'/'version' drop 'ap'/'1_version'
+        cache.invalidate("ap")
+        assert cache.lookup("ap", "version", ["show version"], "fp", now=1000) is None
+        assert cache.lookup("ap_1", "version", ["show version"], "fp", now=1000) == ["ap_1 version"]
+        cache.invalidate("ap_1", "version")
+        assert cache.lookup("ap_1", "version", ["show version"], "fp", now=1000) is None
+        assert cache.lookup("ap_1", "inventory", ["show version"], "fp", now=1000) == ["ap_1 inventory"]
+        assert cache.lookup("ap_1_lab", "version", ["show version"], "fp", now=1000) == ["ap_1_lab version"]
+
+        # The structured layout persists; a file in the old flat layout is ignored
+        reloaded = StaticStatCache(path=cache.path)
+        assert reloaded.lookup("ap_1_lab", "inventory", ["show version"], "fp", now=1000) == ["ap_1_lab inventory"]
+        with open(cache.path, 'w') as f:
+            f.write('{"ap_version": {"fingerprint": "fp", "commands": "x", "collected_at": 1000, "outputs": ["old"]}}')
+        assert StaticStatCache(path=cache.path).lookup("ap", "version", ["show version"], "fp", now=1000) is None
+
+def test_instances_sharing_a_file_keep_each_others_entries():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.json")
+        first, second = StaticStatCache(path=path), StaticStatCache(path=path)
+        # Both have read the (empty) file before either writes
+        assert first.lookup("ap1", "version", ["v"], "f1") is None
+        assert second.lookup("ap2", "version", ["v"], "f2") is None
+
+        first.store("ap1", "version", ["v"], "f1", ["out1"], now=1000)
+        second.store("ap2", "version", ["v"], "f2", ["out2"], now=1000)
+        second.store("ap1", "inventory", ["i"], "f3", ["out3"], now=1000)
+        first.invalidate("ap2", "missing")
+        for cache in (first, second, StaticStatCache(path=path)):
+            assert cache.lookup("ap1", "version", ["v"], "f1", now=1000) == ["out1"]
+            assert cache.lookup("ap2", "version", ["v"], "f2", now=1000) == ["out2"]
+            assert cache.lookup("ap1", "inventory", ["i"], "f3", now=1000) == ["out3"]
+
+        # Invalidating one stat through one instance leaves the other's entries alone
+        second.invalidate("ap1", "version")
+        assert first.lookup("ap1", "version", ["v"], "f1", now=1000) is None
+        assert first.lookup("ap1", "inventory", ["i"], "f3", now=1000) == ["out3"]
+
+if __name__ == "__main__":
+    test_reuse_until_fingerprint_changes()
+    test_ttl_pattern_and_disable()
+    test_unusable_fingerprint_is_a_miss()
+    test_invalidate_matches_device_exactly()
+    test_instances_sharing_a_file_keep_each_others_entries()
+    print("✅ static stat cache checks passed")
@@ -0,0 +1,86 @@
+# test_stats_fanout.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for collectors/stats_runner.py fan-out: device selection, concurrent per-device collection,
+# per-device folders and failure isolation
+
+import os
+import shutil
+import tempfile
+import threading
+
+from collectors import stats_runner
+from collectors.stats_collector import set_stat_commands
+from collectors.stats_runner import load_stats_schema, run_stats_collection_fanout, select_devices
+
+TESTBED = """devices:
+  ap1: {os: iosxe, type: access_point, connections: {cli: {protocol: ssh, ip: 127.0.0.1, port: 1}}}
+  ap2: {os: iosxe, type: access_point, connections: {cli: {protocol: ssh, ip: 127.0.0.1, port: 1}}}
+  sw1: {os: iosxe, type: switch, connections: {cli: {protocol: ssh, ip: 127.0.0.1, port: 1}}}
+"""
+
+def write_testbed(folder):
+    path = os.path.join(folder, "testbed.yaml")
+    with open(path, 'w') as f:
+        f.write(TESTBED)
+    return path
+
+def prime_commands(devices):
+    # Commands given up front, so nothing is prompted
+    for device in devices:
+        for stat_name in load_stats_schema():
+            set_stat_commands(stat_name, device, ["show clock"])
+
+def test_select_devices():
+    with tempfile.TemporaryDirectory() as tmp:
+        testbed = write_testbed(tmp)
+        assert select_devices(testbed, mock=True) == ["ap1", "ap2", "sw1"]
+        assert select_devices(testbed, {"type": "access_point"}, mock=True) == ["ap1", "ap2"]
+        assert select_devices(testbed, {"type": "access_point", "os": "nxos"}, mock=True) == []
+
+def test_devices_run_concurrently_and_fail_alone():
+    prime_commands(["ap1", "ap2"])
+    barrier = threading.Barrier(2, timeout=5)
+    calls = []
+
+    def fake_collection(phase, testbed_path, device_name, mock, timestamp_dir):
+        calls.append((device_name, timestamp_dir))
+        # Both devices must be in flight at once to get past the barrier
+        barrier.wait()
+        if device_name == "ap2":
+            raise RuntimeError("session dropped")
+        return [os.path.join(timestamp_dir, "version.txt")]
+
+    real = stats_runner.run_stats_collection
+    stats_runner.run_stats_collection = fake_collection
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = run_stats_collection_fanout("before_test", write_testbed(tmp), selector={"type": "access_point"},
+                                                  mock=True, timestamp_dir="ap_stats_fanout")
+    finally:
+        stats_runner.run_stats_collection = real
+    assert sorted(calls) == [("ap1", os.path.join("ap_stats_fanout", "ap1")),
+                             ("ap2", os.path.join("ap_stats_fanout", "ap2"))]
+    assert results == {"ap1": [os.path.join("ap_stats_fanout", "ap1", "version.txt")], "ap2": []}
+
+def test_mock_fanout_writes_per_device_folders():
+    prime_commands(["ap1", "ap2"])
+    stats_dir = "ap_stats_fanout_test_%d" % os.getpid()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = run_stats_collection_fanout("before_test", write_testbed(tmp), device_names=["ap1", "ap2"],
+                                                  mock=True, timestamp_dir=stats_dir, max_workers=2)
+        for device in ("ap1", "ap2"):
+            assert results[device]
+            device_dir = os.path.join("run_logs", stats_dir, device)
+            assert all(os.path.abspath(path).startswith(os.path.abspath(device_dir)) for path in results[device])
+            assert os.path.isdir(os.path.join(device_dir, "version"))
+        assert run_stats_collection_fanout("before_test", "unused.yaml", device_names=[], mock=True) == {}
+    finally:
+        shutil.rmtree(os.path.join("run_logs", stats_dir), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_select_devices()
+    test_devices_run_concurrently_and_fail_alone()
+    test_mock_fanout_writes_per_device_folders()
+    print("✅ Stats fan-out checks passed")
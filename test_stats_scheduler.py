@@ -0,0 +1,121 @@
+# test_stats_scheduler.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for collectors/stats_scheduler.py: anchored ticks, the skip / catch_up missed-tick policies and
+# concurrent dispatch
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+from collectors.stats_scheduler import StatScheduler
+
+INTERVAL = 0.1
+OVERRUN = 0.35
+
+def run_schedule(policy, duration=0.8):
+    """
+    One job whose first tick overruns three intervals. Returns (ticks, report)
+    with ticks as (tick, due_time, start offset) in run order.
+    """
+    start_time = datetime.now()
+    stop = threading.Event()
+    scheduler = StatScheduler(start_time, stop, missed_tick_policy=policy)
+    ticks = []
+    began = time.monotonic()
+
+    def job(due_time, tick):
+        ticks.append((tick, due_time, time.monotonic() - began))
+        if tick == 0:
+            time.sleep(OVERRUN)
+
+    scheduler.add("cpu", INTERVAL, job)
+    timer = threading.Timer(duration, stop.set)
+    timer.start()
+    report = scheduler.run()
+    timer.cancel()
+    return start_time, ticks, report["cpu"]
+
+def test_due_times_are_anchored():
+    start_time, ticks, _ = run_schedule("skip")
+    for tick, due_time, _ in ticks:
+        assert due_time == start_time + timedelta(seconds=tick * INTERVAL)
+
+def test_skip_jumps_past_missed_ticks():
+    _, ticks, report = run_schedule("skip")
+    numbers = [tick for tick, _, _ in ticks]
+    # Ticks 1-3 fell inside the overrun; the next run is the first tick still ahead
+    assert numbers[0] == 0 and numbers[1] >= 4
+    assert numbers[1:] == list(range(numbers[1], numbers[1] + len(numbers) - 1))
+    assert report["skipped"] == numbers[1] - 1
+    assert report["runs"] == len(numbers) and report["errors"] == 0
+    # After the jump, each tick starts on its own due time, not right away
+    assert ticks[1][2] >= numbers[1] * INTERVAL - 0.02
+
+def test_catch_up_runs_every_missed_tick():
+    _, ticks, report = run_schedule("catch_up")
+    numbers = [tick for tick, _, _ in ticks]
+    assert numbers == list(range(len(numbers))) and len(numbers) >= 5
+    assert report["skipped"] == 0 and report["runs"] == len(numbers)
+    # The missed ticks 1-3 run back to back as soon as tick 0 returns
+    catch_up = [offset for tick, _, offset in ticks if 1 <= tick <= 3]
+    assert catch_up[0] >= OVERRUN - 0.02
+    assert catch_up[-1] - catch_up[0] < INTERVAL
+
+def test_errors_do_not_stop_the_schedule():
+    stop = threading.Event()
+    scheduler = StatScheduler(datetime.now(), stop)
+    calls = []
+
+    def job(due_time, tick):
+        calls.append(tick)
+        if tick == 1:
+            raise RuntimeError("device busy")
+
+    scheduler.add("memory", INTERVAL, job)
+    threading.Timer(0.45, stop.set).start()
+    report = scheduler.run()["memory"]
+    assert report["errors"] == 1 and 2 in calls
+    assert report["runs"] == len(calls) - 1
+
+def test_coinciding_jobs_run_concurrently_without_self_overlap():
+    stop = threading.Event()
+    scheduler = StatScheduler(datetime.now(), stop, missed_tick_policy="catch_up", max_workers=4)
+    lock = threading.Lock()
+    running = {"cpu": 0, "memory": 0}
+    peaks = {"cpu": 0, "memory": 0, "total": 0}
+
+    def job(key):
+        def run(due_time, tick):
+            with lock:
+                running[key] += 1
+                peaks[key] = max(peaks[key], running[key])
+                peaks["total"] = max(peaks["total"], sum(running.values()))
+            time.sleep(INTERVAL * 1.5)  # every run overruns its next tick
+            with lock:
+                running[key] -= 1
+        return run
+
+    scheduler.add("cpu", INTERVAL, job("cpu"))
+    scheduler.add("memory", INTERVAL, job("memory"))
+    threading.Timer(0.6, stop.set).start()
+    report = scheduler.run()
+    assert peaks["total"] == 2
+    assert peaks["cpu"] == 1 and peaks["memory"] == 1
+    assert report["cpu"]["runs"] >= 3 and report["memory"]["runs"] >= 3
+
+def test_unknown_policy_rejected():
+    try:
+        StatScheduler(datetime.now(), threading.Event(), missed_tick_policy="burst")
+    except ValueError:
+        return
+    raise AssertionError("ValueError not raised")
+
+
+if __name__ == "__main__":
+    test_due_times_are_anchored()
+    test_skip_jumps_past_missed_ticks()
+    test_catch_up_runs_every_missed_tick()
+    test_errors_do_not_stop_the_schedule()
+    test_coinciding_jobs_run_concurrently_without_self_overlap()
+    test_unknown_policy_rejected()
+    print("✅ Stats scheduler checks passed")
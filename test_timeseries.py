@@ -0,0 +1,191 @@
+# test_timeseries.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for the during_test CPU/memory series: sample parsing, the CSV layout, the .series round-trip and
+# appending to a mapped series
+
+import math
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from analyzers.series_store import SERIES_EXTENSION, SeriesBuffer, load_series
+from collectors.stats_generator import SAMPLE_DIR
+from collectors import timeseries_writer
+from collectors.timeseries_writer import (SERIES_FIELDS, SERIES_FILENAMES, TimeSeriesWriter, close_series_writers,
+                                          get_series_writer)
+from parsers.cpu_parser import parse_cpu_usage
+from parsers.memory_parser import parse_memory_usage
+
+START = datetime(2025, 3, 1, 12, 0, 0)
+
+def sample(name):
+    with open(os.path.join(SAMPLE_DIR, name), 'r') as f:
+        return f.read()
+
+def test_parsers_read_samples():
+    cpu = sample("cpu.txt")
+    # 'CPU: 0% usr 2% sys ... 97% idle' -> 3% busy; missing cores stay empty
+    assert parse_cpu_usage([cpu]) == [3, "", "", ""]
+    assert parse_cpu_usage([cpu, cpu]) == [3, 3, "", ""]
+    # The 'free' table (KiB) wins over /proc/meminfo
+    assert parse_memory_usage([sample("memory.txt")]) == {"free_mb": 600, "available_mb": 763}
+
+def write_series(folder, ticks=3):
+    cpu_path = os.path.join(folder, SERIES_FILENAMES["cpu"])
+    mem_path = os.path.join(folder, SERIES_FILENAMES["memory"])
+    cpu_writer = TimeSeriesWriter(cpu_path, SERIES_FIELDS["cpu"])
+    mem_writer = TimeSeriesWriter(mem_path, SERIES_FIELDS["memory"])
+    cpu_row = parse_cpu_usage([sample("cpu.txt")])
+    mem_row = parse_memory_usage([sample("memory.txt")])
+    for tick in range(ticks):
+        ts = START + timedelta(seconds=60 * tick)
+        cpu_writer.append([ts] + cpu_row)
+        mem_writer.append({"timestamp": ts, **mem_row})
+    cpu_writer.close()
+    mem_writer.close()
+    return cpu_path, mem_path
+
+def test_csv_layout():
+    with tempfile.TemporaryDirectory() as tmp:
+        cpu_path, mem_path = write_series(tmp, ticks=2)
+        with open(cpu_path) as f:
+            assert f.read().splitlines() == [
+                "timestamp,cpu_0,cpu_1,cpu_2,cpu_3",
+                "2025-03-01 12:00:00,3,,,",
+                "2025-03-01 12:01:00,3,,,",
+            ]
+        with open(mem_path) as f:
+            assert f.read().splitlines() == [
+                "timestamp,free_mb,available_mb",
+                "2025-03-01 12:00:00,600,763",
+                "2025-03-01 12:01:00,600,763",
+            ]
+
+def check_cpu(buf, ticks):
+    assert buf.columns == SERIES_FIELDS["cpu"][1:]
+    epochs = [int((START + timedelta(seconds=60 * tick)).timestamp()) for tick in range(ticks)]
+    assert list(buf.epoch) == epochs
+    assert list(buf.column("cpu_0")) == [3.0] * ticks
+    assert all(math.isnan(v) for v in buf.column("cpu_3"))
+
+def test_series_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        cpu_path, mem_path = write_series(tmp, ticks=3)
+        check_cpu(SeriesBuffer.from_csv(cpu_path), 3)
+
+        # First load parses the CSV and writes the sibling .series file
+        check_cpu(load_series(cpu_path), 3)
+        cached = os.path.splitext(cpu_path)[0] + SERIES_EXTENSION
+        assert os.path.exists(cached)
+        check_cpu(SeriesBuffer.load(cached, use_mmap=False), 3)
+        mapped = load_series(cpu_path)
+        assert mapped._mmap is not None
+        check_cpu(mapped, 3)
+
+        mem = load_series(mem_path)
+        assert mem.columns == ["free_mb", "available_mb"]
+        assert list(mem.column("free_mb")) == [600.0] * 3
+        assert list(mem.column("available_mb")) == [763.0] * 3
+
+        # Appending to the CSV makes the cached file stale
+        writer = TimeSeriesWriter(cpu_path, SERIES_FIELDS["cpu"])
+        writer.append([START + timedelta(seconds=180), 3, "", "", ""])
+        writer.close()
+        os.utime(cpu_path, (os.path.getmtime(cached) + 1,) * 2)
+        check_cpu(load_series(cpu_path), 4)
+
+def test_mapped_series_is_writable():
+    with tempfile.TemporaryDirectory() as tmp:
+        cpu_path, _ = write_series(tmp, ticks=3)
+        load_series(cpu_path)
+        cached = os.path.splitext(cpu_path)[0] + SERIES_EXTENSION
+        mapped = SeriesBuffer.load(cached)
+        assert mapped._mmap is not None
+
+        # The first append copies the columns out of the mapping; the file is untouched until save()
+        mapped.append(int((START + timedelta(seconds=180)).timestamp()), {"cpu_0": 3})
+        assert mapped._mmap is None
+        check_cpu(mapped, 4)
+        check_cpu(SeriesBuffer.load(cached), 3)
+        mapped.save(cached)
+        check_cpu(SeriesBuffer.load(cached), 4)
+
+def test_torn_row_is_repaired_on_reopen():
+    with tempfile.TemporaryDirectory() as tmp:
+        cpu_path, _ = write_series(tmp, ticks=2)
+        # A crash mid-write leaves half a row without its newline
+        with open(cpu_path, 'a') as f:
+            f.write("2025-03-01 12:02:00,3,")
+        writer = TimeSeriesWriter(cpu_path, SERIES_FIELDS["cpu"])
+        writer.append([START + timedelta(seconds=180), 5, "", "", ""])
+        writer.close()
+        with open(cpu_path) as f:
+            assert f.read().splitlines() == [
+                "timestamp,cpu_0,cpu_1,cpu_2,cpu_3",
+                "2025-03-01 12:00:00,3,,,",
+                "2025-03-01 12:01:00,3,,,",
+                "2025-03-01 12:03:00,5,,,",
+            ]
+        assert len(SeriesBuffer.from_csv(cpu_path)) == 3
+
+        # A file torn inside its header starts over with a fresh header
+        mem_path = os.path.join(tmp, "torn_header.csv")
+        with open(mem_path, 'w') as f:
+            f.write("timestamp,free")
+        writer = TimeSeriesWriter(mem_path, SERIES_FIELDS["memory"])
+        writer.append([START, 600, 763])
+        writer.close()
+        with open(mem_path) as f:
+            assert f.read().splitlines() == ["timestamp,free_mb,available_mb", "2025-03-01 12:00:00,600,763"]
+
+def test_fsync_is_batched():
+    synced = []
+    real_fsync = timeseries_writer.os.fsync
+    timeseries_writer.os.fsync = lambda fd: synced.append(fd)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = TimeSeriesWriter(os.path.join(tmp, "cpu_usage.csv"), SERIES_FIELDS["cpu"],
+                                      fsync_every=3, fsync_interval_sec=3600)
+            assert len(synced) == 1  # the header
+            for tick in range(7):
+                writer.append([START + timedelta(seconds=60 * tick), 1, 2, 3, 4])
+            assert len(synced) == 3  # header + after rows 3 and 6
+            assert writer._pending == 1
+            # Every row is flushed (readable) even before its fsync
+            with open(writer.path) as f:
+                assert len(f.read().splitlines()) == 8
+
+            writer.fsync_interval_sec = 0
+            writer.append([START + timedelta(seconds=420), 1, 2, 3, 4])
+            assert len(synced) == 4 and writer._pending == 0
+            writer.close()
+            assert len(synced) == 5
+    finally:
+        timeseries_writer.os.fsync = real_fsync
+
+def test_close_only_the_calling_runs_writers():
+    with tempfile.TemporaryDirectory() as tmp:
+        run_a = os.path.join(tmp, "ap_stats_a")
+        run_b = os.path.join(tmp, "ap_stats_ab")
+        writer_a = get_series_writer(os.path.join(run_a, "ap", "cpu_usage.csv"), SERIES_FIELDS["cpu"])
+        writer_b = get_series_writer(os.path.join(run_b, "ap", "cpu_usage.csv"), SERIES_FIELDS["cpu"])
+        try:
+            close_series_writers(run_a)
+            assert writer_a._file.closed
+            # run_b shares run_a's name as a prefix but is another run's folder
+            assert not writer_b._file.closed
+            assert get_series_writer(writer_b.path, SERIES_FIELDS["cpu"]) is writer_b
+        finally:
+            close_series_writers(run_b)
+        assert writer_b._file.closed
+
+
+if __name__ == "__main__":
+    test_parsers_read_samples()
+    test_csv_layout()
+    test_series_round_trip()
+    test_mapped_series_is_writable()
+    test_torn_row_is_repaired_on_reopen()
+    test_fsync_is_batched()
+    test_close_only_the_calling_runs_writers()
+    print("✅ Time-series checks passed")
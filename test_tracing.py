@@ -0,0 +1,75 @@
+# test_tracing.py
+# Author: Wai Man Cheng & ChatGPT
+# Checks for utils/tracing.py: span nesting and label inheritance, summaries, trace and Prometheus output
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from utils.stats_math import percentile
+from utils.tracing import TRACER, Tracer, export_run_metrics, traced
+
+@traced("collect_stat", stat="name", device="device_name")
+def fake_collect(name, device_name="ap"):
+    with TRACER.span("execute", cmd="show clock"):
+        pass
+    return name
+
+def test_spans_nest_and_inherit_labels():
+    tracer = Tracer()
+    with tracer.span("stats_phase", phase="before_test", device="ap1"):
+        with tracer.span("collect_stat", stat="cpu"):
+            pass
+    inner = tracer.records[0]
+    assert inner["name"] == "collect_stat" and inner["parent"] == "stats_phase"
+    assert inner["attrs"] == {"phase": "before_test", "device": "ap1", "stat": "cpu"}
+
+    try:
+        with tracer.span("execute", device="ap1"):
+            raise TimeoutError()
+    except TimeoutError:
+        pass
+    summary = tracer.summary()
+    assert summary["execute"]["errors"] == 1 and summary["stats_phase"]["count"] == 1
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer(enabled=False)
+    with tracer.span("execute"):
+        pass
+    assert tracer.records == [] and tracer.summary() == {}
+
+def test_traced_decorator_and_exports():
+    TRACER.reset()
+    assert fake_collect("memory") == "memory"
+    by_labels = TRACER.summary(by_labels=True)
+    assert ("execute", ("ap", "memory", "")) in by_labels
+
+    with tempfile.TemporaryDirectory() as tmp:
+        trace_path, prom_path = export_run_metrics(tmp, os.path.join(tmp, "textfile"))
+        with open(trace_path, 'r') as f:
+            trace = json.load(f)
+        assert {e["name"] for e in trace["traceEvents"] if e["ph"] == "X"} == {"collect_stat", "execute"}
+        with open(prom_path, 'r') as f:
+            prom = f.read()
+        assert 'ap_automation_span_duration_seconds_count{span="execute",device="ap",stat="memory"} 1' in prom
+        assert 'ap_automation_span_errors_total{span="collect_stat",device="ap",stat="memory"} 0' in prom
+        assert os.path.exists(os.path.join(tmp, "textfile", "ap_automation.prom"))
+    TRACER.reset()
+
+def test_percentile_without_analyzers():
+    assert percentile([], 50) is None
+    assert percentile([4.0], 95) == 4.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert percentile([1.0, 2.0, 3.0, 4.0], 100) == 4.0
+    # The tracer sits below the analyzers: importing it must not pull them in
+    code = "import sys, utils.tracing; sys.exit(any(m.startswith('analyzers') for m in sys.modules))"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+if __name__ == "__main__":
+    test_spans_nest_and_inherit_labels()
+    test_disabled_tracer_records_nothing()
+    test_traced_decorator_and_exports()
+    test_percentile_without_analyzers()
+    print("✅ tracing checks passed")
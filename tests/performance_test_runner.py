@@ -2,6 +2,9 @@
 # Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
 # Description:
 # Controls the performance test workflow, including user prompts and stat/log orchestration
+# With headless=True in the config nothing is prompted: commands come from the
+# config or the saved registries, and the test runs for 'duration' seconds
+# instead of waiting for ENTER (see runners/campaign_runner.py).
 
 import os
 import time
@@ -10,7 +13,14 @@ from datetime import datetime
 
 from utils.log_command_manager import get_log_commands
 from utils.log_collector import collect_logs_from_testbed
-from utils.log_analyzer import run_log_analysis
+from utils.log_analyzer import analyze_log_file, prepare_log_analysis, save_log_analysis
+from collection.session_pool import SESSION_POOL
+from analyzers.log_correlator import run_log_correlation
+from analyzers.perf_delta import run_perf_delta
+from utils.tracing import TRACER, export_run_metrics
+from utils.run_catalog import start_run, finish_run
+from utils.blob_store import BLOB_STORE
+from runners.dag_executor import Result, TaskGraph, print_dag_report
 from collectors.stats_runner import (
     run_stats_collection,
     run_during_test_stats,
@@ -18,7 +28,21 @@ from collectors.stats_runner import (
 )
 
 def run_performance_test(config):
+    """
+    Run one performance test. Returns the run manifest (see utils/run_catalog.py).
+    dedup_outputs turns the shared blob store on for this run only.
+    """
+    was_enabled = BLOB_STORE.enabled
+    if config.get("dedup_outputs"):
+        BLOB_STORE.enabled = True
+    try:
+        return _run_performance_test(config)
+    finally:
+        BLOB_STORE.enabled = was_enabled
+
+def _run_performance_test(config):
     print("\n🔧 [Performance Test Started]")
+    TRACER.reset()
 
     print("🧾 Test Parameters:")
     for key, val in config.items():
@@ -31,8 +55,12 @@ def run_performance_test(config):
     time_offset = ap_epoch - local_epoch
     print(f"📡 Time offset recorded: AP is {round(time_offset, 2)} seconds ahead.")
 
+    headless = config.get("headless", False)
+    testbed_path = config.get("testbed_path", "testbed.yaml")
     device_id = config.get("device_id") or input("Enter device ID/name: ").strip()
-    log_commands = get_log_commands(device_id)
+    log_commands = config.get("log_commands")
+    if log_commands is None:
+        log_commands = get_log_commands(device_id, interactive=not headless)
     config.update({
         "device_id": device_id,
         "log_commands": log_commands,
@@ -40,12 +68,23 @@ def run_performance_test(config):
     })
 
     # Step 1: Gather all stat commands up front
-    gather_all_stat_commands(testbed_path="testbed.yaml", device_name=device_id)
-
-    # Step 2: Run pre-test stat collection
-    run_stats_collection("before_test", testbed_path="testbed.yaml", device_name=device_id, mock=config.get("mock", False))
-
-    input("\n📥 Press ENTER to start the test. Please connect the client and start traffic.")
+    gather_all_stat_commands(testbed_path=testbed_path, device_name=device_id, interactive=not headless,
+                             commands=config.get("stat_commands"))
+
+    # Step 2: Run pre-test stat collection (all phases of this run share one stats folder)
+    stats_dir = config.get("stats_dir") or datetime.now().strftime("ap_stats_%Y%m%d_%H%M%S")
+    run_path = os.path.join("run_logs", stats_dir)
+    pre_test = TaskGraph("pre_test", device=device_id)
+    pre_test.add("catalog_start", start_run, run_path, config, device_id)
+    pre_test.add("before_test_stats", run_stats_collection, "before_test", testbed_path=testbed_path,
+                 device_name=device_id, mock=config.get("mock", False), timestamp_dir=stats_dir)
+    catalog_run = pre_test.run()["catalog_start"]
+    print_dag_report(pre_test)
+
+    if headless:
+        print(f"\n⏱️ Headless run: test window of {config.get('duration', 0)}s starts now.")
+    else:
+        input("\n📥 Press ENTER to start the test. Please connect the client and start traffic.")
     start_time = datetime.now()
 
     # Step 3: Start background stats collection during the test
@@ -55,42 +94,77 @@ def run_performance_test(config):
         kwargs={
             "start_time": start_time,
             "stop_event": stop_event,
-            "testbed_path": "testbed.yaml",
+            "testbed_path": testbed_path,
             "device_name": device_id,
-            "mock": config.get("mock", False)
+            "mock": config.get("mock", False),
+            "timestamp_dir": stats_dir
         },
         daemon=True
     )
     stats_thread.start()
 
     # Step 4: Wait for user to stop test
-    user_input = input("📤 Press ENTER to stop the test once traffic ends (or type 'q' to terminate without collecting stats/logs): ")
+    if headless:
+        time.sleep(config.get("duration", 0))
+        user_input = ""
+    else:
+        user_input = input("📤 Press ENTER to stop the test once traffic ends (or type 'q' to terminate without collecting stats/logs): ")
     end_time = datetime.now()
 
     if user_input.strip().lower() == 'q':
         print("❌ Test manually terminated by user. Skipping stats and log collection.")
         stop_event.set()
         stats_thread.join()
-        return
+        SESSION_POOL.release(testbed_path, device_id)
+        export_run_metrics(run_path, config.get("metrics_textfile_dir"))
+        finish_run(run_path, catalog_run, status="aborted", ended_at=end_time)
+        return catalog_run
 
     stop_event.set()
     stats_thread.join()
 
-    # Step 5: Run post-test stats
-    run_stats_collection("after_test", testbed_path="testbed.yaml", device_name=device_id, mock=config.get("mock", False))
-
-    # Step 6: Log collection and analysis
-    print("\n📥 Collecting post-test logs...")
-    log_dir = collect_logs_from_testbed(
-        testbed_path="testbed.yaml",
-        device_name=device_id,
-        commands=config["log_commands"],
-        mock=config.get("mock", False),
-        start_time=start_time,
-        end_time=end_time
-    )
-
-    print("\n🧐 Analyzing collected logs...")
-    run_log_analysis(log_dir)
+    # Steps 5-6: post-test stats and logs run side by side; each log file is
+    # analyzed as soon as it is saved, correlation once all of them are in
+    print("\n📥 Collecting post-test stats and logs...")
+    log_window = {
+        "start_time": start_time,
+        "end_time": end_time,
+        "margin_sec": config.get("log_window_margin_sec", 30),
+        "time_offset_sec": config.get("log_time_offset", 0),
+    }
+    patterns, window = prepare_log_analysis(**log_window)
+    post_test = TaskGraph("post_test", max_workers=config.get("post_test_workers", 4), device=device_id)
+    post_test.add("after_test_stats", run_stats_collection, "after_test", testbed_path=testbed_path,
+                  device_name=device_id, mock=config.get("mock", False), timestamp_dir=stats_dir)
+    post_test.add("perf_delta", run_perf_delta, run_path, window_sec=(end_time - start_time).total_seconds(),
+                  after=["after_test_stats"])
+
+    log_files = post_test.group("log_files")
+
+    def analyze_on_arrival(path):
+        name = f"analyze:{os.path.basename(path)}"
+        if name not in post_test.tasks:
+            post_test.add(name, analyze_log_file, path, patterns, window, group=log_files)
+
+    post_test.add("collect_logs", collect_logs_from_testbed,
+                  testbed_path=testbed_path,
+                  device_name=device_id,
+                  commands=config["log_commands"],
+                  mock=config.get("mock", False),
+                  start_time=start_time,
+                  end_time=end_time,
+                  compression=config.get("log_compression"),
+                  on_file=analyze_on_arrival)
+    post_test.add("log_analysis", save_log_analysis, Result("collect_logs"), Result(log_files))
+    post_test.add("log_correlation", run_log_correlation, Result("collect_logs"), **log_window)
+    log_dir = post_test.run()["collect_logs"]
+    print_dag_report(post_test)
+
+    # Step 7: Tear down this device's pooled session (other runs in the process keep theirs)
+    SESSION_POOL.release(testbed_path, device_id)
+    export_run_metrics(run_path, config.get("metrics_textfile_dir"))
+    finish_run(run_path, catalog_run, status="partial" if post_test.failed else "completed",
+               log_dir=log_dir, ended_at=end_time)
 
     print("\n✅ [Performance Test Completed]")
+    return catalog_run
@@ -0,0 +1,312 @@
+# blob_store.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Optional content-addressed store for collected outputs.
+# With the store enabled, an output is saved once as a gzip blob named after
+# its SHA-256 (run_logs/blobs/ab/abcdef....gz) and the per-run file becomes a
+# one-line reference to it:
+#
+#   #APBLOB1 {"sha256": "...", "bytes": N, "blob": "../../blobs/ab/ab....gz", "prefix": "# Timestamp: ...\n\n"}
+#
+# 'prefix' keeps per-run headers (the collection timestamp) out of the blob, so
+# byte-identical outputs across runs share one blob. Writing the same content
+# to a file that already references it is skipped entirely. Small outputs
+# (under min_bytes) are written as plain files; a reference would not save
+# anything.
+#
+# Readers go through open_text()/open_binary() here or utils/log_store's
+# open_log_text()/open_log_binary(), which handle plain files and references alike.
+#
+# Enable with AP_BLOB_STORE=1 (or dedup_outputs in the test config).
+#
+# Usage:
+#   python -m utils.blob_store stats
+#   python -m utils.blob_store pack run_logs/ap_stats_*      (convert existing outputs to references)
+#   python -m utils.blob_store gc                            (drop old blobs no reference points to)
+#   python -m utils.blob_store cat run_logs/ap_stats_x/version/version.txt
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+
+REF_MAGIC = b"#APBLOB1 "
+# References are one short line; anything bigger is a plain file
+REF_MAX_BYTES = 4096
+DEFAULT_BLOB_DIR = os.path.join("run_logs", "blobs")
+BLOB_EXTENSION = ".gz"
+MIN_BLOB_BYTES = 512
+# gc leaves younger blobs alone: a writer may have put() one and not yet written its reference
+DEFAULT_GC_GRACE_SEC = 3600
+COMPRESS_LEVEL = 6
+ENCODING = "utf-8"
+# Files that are appended to in place must stay plain: raw tick output, anything
+# in a logs_* folder (incremental pulls append with LogWriter(append=True)) and
+# anything with an index (<file>.idx) or cursor (cursors.json) sidecar
+PACK_EXCLUDE_SUFFIXES = ("_raw.txt",)
+PACK_EXCLUDE_DIR_PREFIX = "logs_"
+INDEX_SIDECAR_EXTENSION = ".idx"
+CURSOR_SIDECAR = "cursors.json"
+
+
+def read_reference(path):
+    """
+    The reference dict stored in path, or None if path is a plain file.
+    """
+    try:
+        if os.path.getsize(path) > REF_MAX_BYTES:
+            return None
+        with open(path, 'rb') as f:
+            head = f.read(REF_MAX_BYTES)
+    except OSError:
+        return None
+    if not head.startswith(REF_MAGIC):
+        return None
+    try:
+        ref = json.loads(head[len(REF_MAGIC):].decode(ENCODING))
+        ref["blob_path"] = os.path.normpath(os.path.join(os.path.dirname(path), ref["blob"]))
+    except (ValueError, KeyError, TypeError):
+        # A plain file that merely starts with the magic, or a truncated reference
+        return None
+    return ref
+
+
+def is_appended_in_place(path):
+    """
+    True for files a collector keeps appending to, which pack must leave plain.
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    return (
+        path.endswith(PACK_EXCLUDE_SUFFIXES)
+        or os.path.basename(folder).startswith(PACK_EXCLUDE_DIR_PREFIX)
+        or os.path.exists(path + INDEX_SIDECAR_EXTENSION)
+        or os.path.exists(os.path.join(folder, CURSOR_SIDECAR))
+    )
+
+
+def open_reference_binary(ref):
+    prefix = ref.get("prefix", "").encode(ENCODING)
+    if not prefix:
+        return gzip.open(ref["blob_path"], 'rb')
+    with gzip.open(ref["blob_path"], 'rb') as f:
+        return io.BytesIO(prefix + f.read())
+
+
+def open_binary(path):
+    """
+    Binary stream over a plain file or the content a reference points to.
+    """
+    ref = read_reference(path)
+    return open(path, 'rb') if ref is None else open_reference_binary(ref)
+
+
+def open_text(path):
+    """
+    Text stream over a plain file or the content a reference points to.
+    """
+    ref = read_reference(path)
+    if ref is None:
+        return open(path, 'r')
+    return io.TextIOWrapper(open_reference_binary(ref), encoding=ENCODING, errors="replace")
+
+
+def read_text(path):
+    with open_text(path) as f:
+        return f.read()
+
+
+def _atomic_write_bytes(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class BlobStore:
+    def __init__(self, root=DEFAULT_BLOB_DIR, enabled=False, min_bytes=MIN_BLOB_BYTES):
+        self.root = root
+        self.enabled = enabled
+        self.min_bytes = min_bytes
+        self._lock = threading.Lock()
+        self.counters = {"plain": 0, "blobs_written": 0, "blob_hits": 0, "unchanged": 0,
+                         "bytes_in": 0, "bytes_stored": 0}
+
+    def _count(self, **deltas):
+        with self._lock:
+            for key, value in deltas.items():
+                self.counters[key] += value
+
+    def blob_path(self, digest):
+        return os.path.join(self.root, digest[:2], digest + BLOB_EXTENSION)
+
+    def put(self, data):
+        """
+        Store bytes under their SHA-256 (once). Returns (digest, blob_path).
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            try:
+                # Reused blobs count as new for gc's grace period
+                os.utime(path)
+            except OSError:
+                pass
+            self._count(blob_hits=1)
+            return digest, path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = gzip.compress(data, compresslevel=COMPRESS_LEVEL, mtime=0)
+        _atomic_write_bytes(path, compressed)
+        self._count(blobs_written=1, bytes_stored=len(compressed))
+        return digest, path
+
+    def write_text(self, path, text, prefix=""):
+        """
+        Write prefix + text to path: as a reference to the blob of text when the
+        store is enabled and text is at least min_bytes, else as a plain file.
+        Returns path.
+        """
+        data = text.encode(ENCODING)
+        if not self.enabled or len(data) < self.min_bytes:
+            with open(path, 'w') as f:
+                f.write(prefix + text)
+            self._count(plain=1)
+            return path
+
+        self._count(bytes_in=len(data))
+        digest, blob = self.put(data)
+        ref = REF_MAGIC + json.dumps({
+            "sha256": digest,
+            "bytes": len(data),
+            "blob": os.path.relpath(blob, os.path.dirname(path) or "."),
+            "prefix": prefix,
+        }).encode(ENCODING) + b"\n"
+        try:
+            with open(path, 'rb') as f:
+                if f.read(len(ref) + 1) == ref:
+                    self._count(unchanged=1)
+                    return path
+        except OSError:
+            pass
+        _atomic_write_bytes(path, ref)
+        return path
+
+    def pack_file(self, path):
+        """
+        Convert an existing plain output into a reference. Returns True if converted.
+        """
+        if is_appended_in_place(path) or read_reference(path) is not None:
+            return False
+        with open(path, 'rb') as f:
+            data = f.read()
+        try:
+            text = data.decode(ENCODING)
+        except UnicodeDecodeError:
+            return False
+        if len(data) < self.min_bytes:
+            return False
+        stat = os.stat(path)
+        was_enabled, self.enabled = self.enabled, True
+        try:
+            self.write_text(path, text)
+        finally:
+            self.enabled = was_enabled
+        # Keep the original time: it stands in for the snapshot time of header-less files
+        os.utime(path, (stat.st_atime, stat.st_mtime))
+        return True
+
+    def stats(self):
+        """
+        Blob count and sizes on disk, plus this process's write counters.
+        """
+        blobs = 0
+        size = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith(BLOB_EXTENSION):
+                    blobs += 1
+                    size += os.path.getsize(os.path.join(dirpath, filename))
+        return {"root": self.root, "blobs": blobs, "blob_bytes": size, **self.counters}
+
+    def gc(self, scan_root, grace_sec=DEFAULT_GC_GRACE_SEC, now=None):
+        """
+        Delete blobs no reference under scan_root points to. Returns (removed, bytes_freed).
+        Blobs stored or reused in the last grace_sec seconds are kept even if
+        unreferenced, since a running collector writes the blob before its
+        reference; with grace_sec=0 only run gc while nothing is collecting.
+        """
+        cutoff = (time.time() if now is None else now) - grace_sec
+        live = set()
+        for path in _iter_files(scan_root, skip=self.root):
+            ref = read_reference(path)
+            if ref is not None:
+                live.add(os.path.abspath(ref["blob_path"]))
+        removed = 0
+        freed = 0
+        for path in _iter_files(self.root):
+            if path.endswith(BLOB_EXTENSION) and os.path.abspath(path) not in live:
+                if os.path.getmtime(path) > cutoff:
+                    continue
+                freed += os.path.getsize(path)
+                os.remove(path)
+                removed += 1
+        return removed, freed
+
+
+def _iter_files(root, skip=None):
+    skip = os.path.abspath(skip) if skip else None
+    for dirpath, dirnames, filenames in os.walk(root):
+        if skip:
+            dirnames[:] = [d for d in dirnames if os.path.abspath(os.path.join(dirpath, d)) != skip]
+        for filename in filenames:
+            yield os.path.join(dirpath, filename)
+
+
+# Shared store used by the collectors and mock generators
+BLOB_STORE = BlobStore(enabled=os.environ.get("AP_BLOB_STORE", "0") == "1")
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    parser = argparse.ArgumentParser(description="Content-addressed store for collected outputs")
+    parser.add_argument("--root", default=DEFAULT_BLOB_DIR, help="Blob folder")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Blob count and size")
+    pack_parser = sub.add_parser("pack", help="Convert existing .txt outputs into references")
+    pack_parser.add_argument("paths", nargs="+", help="Run folders or files")
+    gc_parser = sub.add_parser("gc", help="Delete blobs nothing references")
+    gc_parser.add_argument("--scan-root", default="run_logs", help="Folder holding the references")
+    gc_parser.add_argument("--grace", type=float, default=DEFAULT_GC_GRACE_SEC,
+                           help="Keep unreferenced blobs younger than this many seconds (0: only when idle)")
+    cat_parser = sub.add_parser("cat", help="Print a file, following its reference")
+    cat_parser.add_argument("path")
+    args = parser.parse_args()
+
+    store = BlobStore(root=args.root, enabled=True)
+    if args.command == "stats":
+        stats = store.stats()
+        print(f"🗃️ {stats['blobs']} blob(s), {stats['blob_bytes'] / (1024 * 1024):.1f} MB in {stats['root']}")
+    elif args.command == "pack":
+        packed = 0
+        before = 0
+        for target in args.paths:
+            files = [target] if os.path.isfile(target) else _iter_files(target, skip=store.root)
+            for path in files:
+                if path.endswith(".txt"):
+                    size = os.path.getsize(path)
+                    if store.pack_file(path):
+                        packed += 1
+                        before += size
+        stats = store.stats()
+        print(f"🗃️ Packed {packed} file(s) ({before / (1024 * 1024):.1f} MB): {stats['blobs_written']} new blob(s), "
+              f"{stats['blob_hits']} duplicate(s), {stats['bytes_stored'] / (1024 * 1024):.1f} MB stored")
+    elif args.command == "gc":
+        removed, freed = store.gc(args.scan_root, grace_sec=args.grace)
+        print(f"🧹 Removed {removed} unreferenced blob(s), {freed / (1024 * 1024):.1f} MB freed")
+    else:
+        with open_text(args.path) as f:
+            sys.stdout.write(f.read())
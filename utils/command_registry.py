@@ -0,0 +1,152 @@
+# command_registry.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Shared backend for the YAML command registries
+# (collectors/stats_command_registry.yaml, utils/log_command_registry.yaml).
+#   - Reads are cached per process and re-parsed only when the file's
+#     mtime/size/inode change, so repeated lookups cost one stat() call.
+#   - Changes are read-modify-write under an exclusive lock on a sidecar
+#     <registry>.lock file (fcntl, where available) plus a thread lock, and the
+#     file is replaced atomically, so concurrent runners never lose each
+#     other's edits or read a half-written file.
+#   - device_stat_commands() returns every stat command list of a device in
+#     one lookup.
+
+import copy
+import os
+import threading
+from contextlib import contextmanager
+
+import yaml
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+STATS_REGISTRY_FILE = "collectors/stats_command_registry.yaml"
+LOG_REGISTRY_FILE = "utils/log_command_registry.yaml"
+LOCK_SUFFIX = ".lock"
+# libyaml's loader is several times faster where PyYAML was built with it
+_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def _file_key(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class CommandRegistry:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._key = None
+        self._data = {}
+
+    def _parse(self):
+        try:
+            with open(self.path, 'r') as f:
+                return yaml.load(f, Loader=_LOADER) or {}
+        except FileNotFoundError:
+            return {}
+
+    def _current(self):
+        """
+        The parsed registry, re-read only if the file changed since the last read.
+        """
+        with self._lock:
+            key = _file_key(self.path)
+            if key is None:
+                self._key, self._data = None, {}
+            elif key != self._key:
+                data = self._parse()
+                # A writer may have replaced the file while it was parsed; keep the key of what was read
+                self._key, self._data = (key if _file_key(self.path) == key else None), data
+            return self._data
+
+    def read(self):
+        """
+        A copy of the whole registry.
+        """
+        return copy.deepcopy(self._current())
+
+    def get(self, key, default=None):
+        value = self._current().get(key, default)
+        return copy.deepcopy(value)
+
+    def device_stat_commands(self, device_name, stat_names):
+        """
+        {stat_name: [cmds]} for every stat with saved commands, in one lookup.
+        """
+        data = self._current()
+        return {
+            name: list(data[f"{device_name}_{name}"])
+            for name in stat_names
+            if data.get(f"{device_name}_{name}")
+        }
+
+    @contextmanager
+    def _file_lock(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path + LOCK_SUFFIX, 'a') as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _write(self, data):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            yaml.dump(data, f, Dumper=_DUMPER)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._key, self._data = _file_key(self.path), data
+
+    def update(self, change):
+        """
+        Apply change(data) to the latest on-disk registry under the lock and
+        write it back atomically. Returns what change returned.
+        """
+        with self._file_lock():
+            data = copy.deepcopy(self._current())
+            result = change(data)
+            self._write(data)
+            return result
+
+    def set(self, key, value):
+        def change(data):
+            data[key] = value
+        self.update(change)
+
+    def delete(self, key):
+        return self.update(lambda data: data.pop(key, None) is not None)
+
+    def replace(self, data):
+        self.update(lambda current: (current.clear(), current.update(data)))
+
+
+_REGISTRIES = {}
+_REGISTRIES_LOCK = threading.Lock()
+
+
+def get_registry(path):
+    """
+    The process-wide registry object for path (one cache per file).
+    """
+    key = os.path.abspath(path)
+    with _REGISTRIES_LOCK:
+        if key not in _REGISTRIES:
+            _REGISTRIES[key] = CommandRegistry(path)
+        return _REGISTRIES[key]
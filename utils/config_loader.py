@@ -59,7 +59,8 @@ def load_test_config():
     for k, v in config.items():
         print(f"{k}: {v}")
 
-    save_config_file(config)
+    # Kept out of the saved files; lets the run catalog link the run to its config
+    config["config_file"] = save_config_file(config)
     return config
 
 def save_config_file(config, folder="run_logs"):
@@ -79,3 +80,4 @@ def save_config_file(config, folder="run_logs"):
         yaml.dump(config, yf)
 
     print(f"\n📝 Config saved to:\n - {json_path}\n - {yaml_path}")
+    return json_path
@@ -4,38 +4,139 @@
 # -------------
 # Scans log files generated during testing and searches for known error patterns
 # defined in a YAML config. Summarizes findings per log file and outputs to CSV.
+# Plain, .gz and .zst captures (utils/log_store.py) are read transparently.
+# Given a test window, only records inside it are scanned, located through a
+# per-file timestamp index (utils/log_index.py).
 
 import os
 import re
+import glob
+import locale
 import yaml
 import csv
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from utils.log_index import iter_window_lines, window_epochs
+from utils.log_store import compression_of, iter_range_lines, member_ranges, open_log_text
+from utils.tracing import traced
+
+LOG_EXTENSIONS = (".log", ".txt", ".log.gz", ".txt.gz", ".log.zst", ".txt.zst")
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
 
 # Load log pattern definitions from YAML
 def load_patterns(yaml_path="utils/log_patterns.yaml"):
     with open(yaml_path, 'r') as f:
         return yaml.safe_load(f)
 
+REGEX_METACHARS = set(".^$*+?{}[]\\|()")
+
+def _is_literal(regex):
+    return regex.isascii() and not any(ch in REGEX_METACHARS for ch in regex)
+
+class PatternMatcher:
+    """
+    Pattern set compiled once and applied to each line in a single pass.
+    Plain-substring patterns are checked on the lowercased line behind one
+    combined literal gate; real regexes sit behind one combined regex gate.
+    match_line() returns the indexes (into self.entries) of every hit.
+    """
+    def __init__(self, patterns):
+        self.entries = [
+            (category, regex)
+            for category, regex_list in (patterns or {}).items()
+            for regex in (regex_list or [])
+        ]
+        self.literals = []
+        self.regexes = []
+        for idx, (_, regex) in enumerate(self.entries):
+            compiled = re.compile(regex, re.IGNORECASE)
+            if _is_literal(regex):
+                self.literals.append((idx, regex.lower(), compiled))
+            else:
+                self.regexes.append((idx, compiled))
+
+        self.literal_gate = None
+        if self.literals:
+            self.literal_gate = re.compile("|".join(re.escape(lit) for _, lit, _ in self.literals))
+        self.regex_gate = None
+        if self.regexes:
+            try:
+                self.regex_gate = re.compile(
+                    "|".join(f"(?:{compiled.pattern})" for _, compiled in self.regexes), re.IGNORECASE
+                )
+            except re.error:
+                self.regex_gate = None
+            if self.regex_gate and self.regex_gate.groups != sum(c.groups for _, c in self.regexes):
+                self.regex_gate = None
+            if any(re.search(r"\\\d|\(\?P=", c.pattern) for _, c in self.regexes):
+                # Backreferences get renumbered inside the combined gate
+                self.regex_gate = None
+
+    def match_line(self, line):
+        hits = []
+        if self.literals:
+            if line.isascii():
+                lowered = line.lower()
+                if self.literal_gate.search(lowered):
+                    hits.extend(idx for idx, lit, _ in self.literals if lit in lowered)
+            else:
+                # Unicode case folding differs from str.lower(); defer to the regex engine
+                hits.extend(idx for idx, _, compiled in self.literals if compiled.search(line))
+        if self.regexes and (self.regex_gate is None or self.regex_gate.search(line)):
+            hits.extend(idx for idx, compiled in self.regexes if compiled.search(line))
+        return hits
+
+    def scan_lines(self, lines):
+        """
+        Scan an iterable of lines and return one list of stripped lines per entry.
+        """
+        found = [[] for _ in self.entries]
+        for line in lines:
+            for idx in self.match_line(line):
+                found[idx].append(line.strip())
+        return found
+
+    def build_matches(self, found):
+        # Same ordering as the original per-pattern rescans: pattern order, then line order
+        matches = []
+        for (category, regex), lines in zip(self.entries, found):
+            for line in lines:
+                matches.append({
+                    "category": category,
+                    "pattern": regex,
+                    "line": line
+                })
+        return matches
+
+_MATCHER_CACHE = {}
+
+def get_matcher(patterns):
+    if isinstance(patterns, PatternMatcher):
+        return patterns
+    key = tuple((category, tuple(regex_list or [])) for category, regex_list in (patterns or {}).items())
+    if key not in _MATCHER_CACHE:
+        _MATCHER_CACHE[key] = PatternMatcher(patterns)
+    return _MATCHER_CACHE[key]
+
 # Search a log file for patterns and return matched results
-def analyze_log_file(filepath, patterns):
+def analyze_log_file(filepath, patterns, window=None):
+    """
+    window: optional (start_epoch, end_epoch) on the device clock; only records
+    inside it are scanned.
+    """
+    matcher = get_matcher(patterns)
     summary = {
         "filename": os.path.basename(filepath),
         "matches": []
     }
 
-    with open(filepath, 'r') as f:
-        lines = f.readlines()
+    if window:
+        found = matcher.scan_lines(iter_window_lines(filepath, *window))
+    else:
+        with open_log_text(filepath) as f:
+            found = matcher.scan_lines(f)
 
-    for category, regex_list in patterns.items():
-        for regex in regex_list:
-            pattern = re.compile(regex, re.IGNORECASE)
-            for line in lines:
-                if pattern.search(line):
-                    summary["matches"].append({
-                        "category": category,
-                        "pattern": regex,
-                        "line": line.strip()
-                    })
+    summary["matches"] = matcher.build_matches(found)
     return summary
 
 # Write results to CSV
@@ -50,28 +151,220 @@ def write_summary_to_csv(summary_list, output_path):
                 writer.writerow(row)
 
 # Main analyzer function
-def run_log_analysis(log_dir, pattern_yaml="utils/log_patterns.yaml"):
+def _resolve_window(start_time, end_time, margin_sec, time_offset_sec):
+    if start_time is None or end_time is None:
+        return None
+    window = window_epochs(start_time, end_time, margin_sec, time_offset_sec)
+    print(f"🕒 Restricting analysis to device time "
+          f"{datetime.fromtimestamp(window[0])} - {datetime.fromtimestamp(window[1])} "
+          f"(margin {margin_sec}s, offset {time_offset_sec:+}s)")
+    return window
+
+@traced("log_analysis")
+def run_log_analysis(log_dir, pattern_yaml="utils/log_patterns.yaml", start_time=None, end_time=None,
+                     margin_sec=0, time_offset_sec=0):
+    """
+    start_time/end_time: optional test window (local clock). With both set, only
+    log records inside the window, widened by margin_sec and shifted by the
+    device clock offset time_offset_sec, are analyzed.
+    """
     print(f"🔍 Analyzing logs in {log_dir} using {pattern_yaml}...")
-    patterns = load_patterns(pattern_yaml)
+    patterns, window = prepare_log_analysis(pattern_yaml, start_time, end_time, margin_sec, time_offset_sec)
     summary = []
 
     for file in os.listdir(log_dir):
-        if file.endswith(".log") or file.endswith(".txt"):
+        if file.endswith(LOG_EXTENSIONS):
             full_path = os.path.join(log_dir, file)
-            file_summary = analyze_log_file(full_path, patterns)
+            file_summary = analyze_log_file(full_path, patterns, window)
             summary.append(file_summary)
 
+    return save_log_analysis(log_dir, summary)
+
+def prepare_log_analysis(pattern_yaml="utils/log_patterns.yaml", start_time=None, end_time=None,
+                         margin_sec=0, time_offset_sec=0):
+    """
+    (matcher, window) for analyze_log_file, for callers that analyze files one
+    at a time as they are collected.
+    """
+    return get_matcher(load_patterns(pattern_yaml)), _resolve_window(start_time, end_time, margin_sec,
+                                                                     time_offset_sec)
+
+def save_log_analysis(log_dir, summary):
+    """
+    Write the per-file summaries as log_analysis_summary_<timestamp>.csv in log_dir.
+    """
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_csv = os.path.join(log_dir, f"log_analysis_summary_{timestamp}.csv")
     write_summary_to_csv(summary, output_csv)
     print(f"✅ Summary written to {output_csv}")
+    return output_csv
+
+# ---------------------------------------------------------------------------
+# Parallel analysis: files (and byte ranges of large files) sharded across processes
+# ---------------------------------------------------------------------------
+
+def split_file_ranges(filepath, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """
+    Split a file into (start, end) byte ranges of roughly chunk_bytes,
+    with every boundary moved forward to the start of the next line.
+    Compressed logs are split on their indexed member boundaries instead.
+    """
+    if compression_of(filepath):
+        return member_ranges(filepath, chunk_bytes)
+    size = os.path.getsize(filepath)
+    if size <= chunk_bytes:
+        return [(0, None)]
+
+    boundaries = [0]
+    with open(filepath, 'rb') as f:
+        target = chunk_bytes
+        while target < size:
+            f.seek(target)
+            f.readline()
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > boundaries[-1]:
+                boundaries.append(pos)
+            target = max(pos, target) + chunk_bytes
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+def _iter_range_lines(filepath, start, end):
+    # Decode the same way text mode would, including universal newlines
+    encoding = locale.getpreferredencoding(False)
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        pos = start
+        while pos < end:
+            raw = f.readline()
+            if not raw:
+                break
+            pos += len(raw)
+            line = raw.decode(encoding)
+            if "\r" in line:
+                parts = line.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+                yield from (part + "\n" for part in parts[:-1])
+                if parts[-1]:
+                    yield parts[-1]
+            else:
+                yield line
+
+def _analyze_unit(filepath, start, end, patterns, window=None):
+    matcher = get_matcher(patterns)
+    if window:
+        return matcher.scan_lines(iter_window_lines(filepath, *window))
+    if end is None:
+        with open_log_text(filepath) as f:
+            return matcher.scan_lines(f)
+    if compression_of(filepath):
+        return matcher.scan_lines(iter_range_lines(filepath, start, end))
+    return matcher.scan_lines(_iter_range_lines(filepath, start, end))
+
+def _expand_log_dirs(log_dirs):
+    if isinstance(log_dirs, str):
+        log_dirs = [log_dirs]
+    expanded = []
+    for entry in log_dirs:
+        matches = glob.glob(entry) if glob.has_magic(entry) else [entry]
+        expanded.extend(path for path in matches if os.path.isdir(path))
+    return sorted(set(expanded))
+
+def write_merged_summary_to_csv(dir_summaries, output_path):
+    with open(output_path, 'w', newline='') as csvfile:
+        fieldnames = ["log_dir", "filename", "category", "pattern", "line"]
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        for log_dir, summary_list in dir_summaries:
+            for entry in summary_list:
+                for match in entry["matches"]:
+                    writer.writerow({"log_dir": log_dir, "filename": entry["filename"], **match})
+
+def run_log_analysis_parallel(log_dirs, pattern_yaml="utils/log_patterns.yaml", workers=None,
+                              chunk_bytes=DEFAULT_CHUNK_BYTES, output_dir="run_logs", start_time=None,
+                              end_time=None, margin_sec=0, time_offset_sec=0):
+    """
+    Analyze one or more log directories (paths or glob patterns) on a process pool.
+    Writes a per-directory summary CSV into each directory plus one merged CSV
+    under output_dir. Results are merged in sorted directory/file order, so the
+    output does not depend on worker scheduling.
+    With a test window each file is one work unit that reads only the window.
+    """
+    dirs = _expand_log_dirs(log_dirs)
+    if not dirs:
+        print(f"⚠️ No log directories matched {log_dirs}.")
+        return None
+
+    patterns = load_patterns(pattern_yaml)
+    matcher = get_matcher(patterns)
+    window = _resolve_window(start_time, end_time, margin_sec, time_offset_sec)
+    plan = []
+    for log_dir in dirs:
+        files = sorted(f for f in os.listdir(log_dir) if f.endswith(LOG_EXTENSIONS))
+        for file in files:
+            full_path = os.path.join(log_dir, file)
+            ranges = [(0, None)] if window else split_file_ranges(full_path, chunk_bytes)
+            plan.append((log_dir, file, full_path, ranges))
+
+    total_units = sum(len(ranges) for *_, ranges in plan)
+    print(f"🔍 Analyzing {len(plan)} file(s) in {len(dirs)} director(ies) "
+          f"as {total_units} work unit(s) using {pattern_yaml}...")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            [pool.submit(_analyze_unit, full_path, start, end, patterns, window) for start, end in ranges]
+            for _, _, full_path, ranges in plan
+        ]
+
+        per_dir = {log_dir: [] for log_dir in dirs}
+        for (log_dir, file, _, _), unit_futures in zip(plan, futures):
+            found = [[] for _ in matcher.entries]
+            for future in unit_futures:
+                for idx, lines in enumerate(future.result()):
+                    found[idx].extend(lines)
+            per_dir[log_dir].append({"filename": file, "matches": matcher.build_matches(found)})
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    outputs = {}
+    for log_dir in dirs:
+        output_csv = os.path.join(log_dir, f"log_analysis_summary_{timestamp}.csv")
+        write_summary_to_csv(per_dir[log_dir], output_csv)
+        outputs[log_dir] = output_csv
+
+    os.makedirs(output_dir, exist_ok=True)
+    merged_csv = os.path.join(output_dir, f"log_analysis_merged_{timestamp}.csv")
+    write_merged_summary_to_csv([(log_dir, per_dir[log_dir]) for log_dir in dirs], merged_csv)
+    print(f"✅ Per-directory summaries written for {len(dirs)} director(ies).")
+    print(f"✅ Merged summary written to {merged_csv}")
+    return {"merged": merged_csv, "per_dir": outputs}
 
 # Run as script
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
-    parser.add_argument("log_dir", help="Directory containing logs to analyze")
+    parser.add_argument("log_dirs", nargs='+', help="Log directories (or glob patterns, e.g. 'run_logs/logs_*') to analyze")
     parser.add_argument("--patterns", default="utils/log_patterns.yaml", help="Path to YAML file with regex patterns")
+    parser.add_argument("--parallel", action="store_true", help="Analyze on a process pool (implied for multiple directories)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for parallel mode (default: CPU count)")
+    parser.add_argument("--chunk-mb", type=int, default=DEFAULT_CHUNK_BYTES // (1024 * 1024),
+                        help="Split files larger than this many MB into byte ranges")
+    parser.add_argument("--output-dir", default="run_logs", help="Where the merged summary CSV is written")
+    parser.add_argument("--start", default=None, help="Test start (local), e.g. '2025-04-11 17:15:30'")
+    parser.add_argument("--end", default=None, help="Test end (local)")
+    parser.add_argument("--margin", type=float, default=0, help="Seconds added on both sides of the window")
+    parser.add_argument("--offset", type=float, default=0, help="Seconds the device clock is ahead of local time")
     args = parser.parse_args()
 
-    run_log_analysis(args.log_dir, args.patterns)
+    window_kwargs = {
+        "start_time": datetime.strptime(args.start, "%Y-%m-%d %H:%M:%S") if args.start else None,
+        "end_time": datetime.strptime(args.end, "%Y-%m-%d %H:%M:%S") if args.end else None,
+        "margin_sec": args.margin,
+        "time_offset_sec": args.offset,
+    }
+    single_dir = len(args.log_dirs) == 1 and not glob.has_magic(args.log_dirs[0])
+    if args.parallel or not single_dir:
+        run_log_analysis_parallel(args.log_dirs, args.patterns, workers=args.workers,
+                                  chunk_bytes=args.chunk_mb * 1024 * 1024, output_dir=args.output_dir,
+                                  **window_kwargs)
+    else:
+        run_log_analysis(args.log_dirs[0], args.patterns, **window_kwargs)
@@ -4,62 +4,155 @@
 # -------------
 # Collects logs from an AP using pyATS-based SSH session defined in testbed.yaml.
 # Executes user-defined log commands and saves outputs for post-test analysis.
+# With stream=True (implied by compression) each command's output is written to
+# disk chunk by chunk as it arrives, optionally gzip/zstd compressed with a
+# sidecar index (see utils/log_store.py).
+# With incremental_dir set, pulls append only new lines to one log per command
+# under run_logs/<incremental_dir>/logs_<device>/, tracked by per-command cursors
+# (see utils/log_cursor.py), so periodic pulls during a soak test stay cheap.
 
 import os
-import socket
 from datetime import datetime
-from genie.testbed import load
 from time import time
-from utils.log_generator import generate_mock_logs
+from collection.health_probe import HEALTH_PROBE, device_endpoint
+from collection.session_pool import SESSION_POOL
+from utils.log_cursor import LogCursor, load_cursors, save_cursors
+from utils.log_generator import generate_mock_logs, generate_mock_log_lines
+from utils.blob_store import BLOB_STORE
+from utils.log_store import LogWriter, log_filename
+from utils.tracing import TRACER, traced
 
 
-def is_port_open(ip, port=22, timeout=5):
+def _stream_logs(testbed_path, device_name, commands, log_dir, compression=None, on_file=None):
+    for i, cmd in enumerate(commands):
+        print(f"▶️ Streaming: {cmd}")
+        writer = LogWriter(log_filename(log_dir, i + 1, cmd), compression=compression)
+        try:
+            SESSION_POOL.stream_command(testbed_path, device_name, cmd, writer.write)
+        except Exception as e:
+            writer.write(f"\n[ERROR] Failed to run '{cmd}': {str(e)}")
+        finally:
+            writer.close()
+        print(f"✅ Streamed {writer.text_bytes} bytes ({writer.lines} lines) to {writer.path}")
+        if on_file:
+            on_file(writer.path)
+
+def _fetch_log_outputs(testbed_path, device_name, commands, mock=False, start_time=None, end_time=None,
+                       exec_mode=None):
+    """
+    Full outputs of every command (None for a command that failed).
+    Falls back to sorted mock log lines in mock mode when the device is unreachable.
+    """
+    device = SESSION_POOL.get_device(testbed_path, device_name, mock=mock)
+    ip, port = device_endpoint(device)
+    if mock and not (ip and HEALTH_PROBE.is_reachable(ip, port)):
+        print(f"⚠️ [MOCK MODE] SSH port {ip}:{port} unreachable. Generating simulated log buffer.")
+        end_time = end_time or datetime.now()
+        start_time = start_time or end_time
+        return [
+            "\n".join(generate_mock_log_lines(start_time, end_time, sort=True))
+            for _ in commands
+        ]
+
+    def on_error(cmd, e):
+        print(f"❌ [ERROR] Failed to run '{cmd}': {str(e)}")
+        return None
+
+    return SESSION_POOL.run_commands(testbed_path, device_name, commands, mode=exec_mode, on_error=on_error)
+
+def collect_logs_incremental(testbed_path, device_name, commands, run_dir, mock=False, start_time=None,
+                             end_time=None, exec_mode=None, compression=None, on_file=None):
+    """
+    Pull logs and append only lines not stored by earlier pulls of the same run.
+    Returns the per-run device log folder.
+    """
+    log_dir = os.path.join("run_logs", run_dir, f"logs_{device_name}")
+    os.makedirs(log_dir, exist_ok=True)
+
     try:
-        with socket.create_connection((ip, port), timeout=timeout):
-            return True
-    except Exception:
-        return False
+        outputs = _fetch_log_outputs(testbed_path, device_name, commands, mock, start_time, end_time, exec_mode)
+    except Exception as e:
+        print(f"❌ [ERROR] Incremental log pull from {device_name} failed: {str(e)}")
+        return log_dir
+
+    cursors = load_cursors(log_dir)
+    for i, (cmd, output) in enumerate(zip(commands, outputs)):
+        if output is None:
+            continue
+        lines = output.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        if lines and not lines[-1]:
+            lines.pop()
+        cursor = cursors.setdefault(cmd, LogCursor())
+        new = cursor.new_lines(lines)
+        with TRACER.span("write", cmd=cmd), \
+                LogWriter(log_filename(log_dir, i + 1, cmd), compression=compression, append=True) as writer:
+            if new:
+                writer.write("\n".join(new) + "\n")
+        cursor.advance(new, fetched=len(lines))
+        print(f"✅ {cmd}: {len(new)} new of {len(lines)} fetched line(s) "
+              f"(pull {cursor.pulls}, {cursor.lines} stored) -> {writer.path}")
+        if on_file:
+            on_file(writer.path)
+    save_cursors(log_dir, cursors)
+    return log_dir
+
+@traced("collect_logs", device="device_name")
+def collect_logs_from_testbed(testbed_path, device_name, commands, mock=False, start_time=None, end_time=None,
+                              exec_mode=None, stream=False, compression=None, incremental_dir=None, on_file=None):
+    """
+    Collect every log command into a new run_logs/logs_<device>_<timestamp>/ and
+    return it. on_file(path) is called as each log file is saved, so analysis
+    can start before the remaining commands finish.
+    """
+    if incremental_dir:
+        return collect_logs_incremental(testbed_path, device_name, commands, incremental_dir, mock=mock,
+                                        start_time=start_time, end_time=end_time, exec_mode=exec_mode,
+                                        compression=compression, on_file=on_file)
 
-def collect_logs_from_testbed(testbed_path, device_name, commands, mock=False, start_time=None, end_time=None):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     log_dir = f"run_logs/logs_{device_name}_{timestamp}"
     os.makedirs(log_dir, exist_ok=True)
 
     try:
-        testbed = load(testbed_path)
-        device = testbed.devices[device_name]
-        ip = device.connections.get("ssh", {}).get("ip", "")
+        device = SESSION_POOL.get_device(testbed_path, device_name, mock=mock)
+        ip, port = device_endpoint(device)
 
-        if mock and not is_port_open(ip, timeout=5):
-            print(f"⚠️ [MOCK MODE] SSH port {ip}:22 unreachable. Skipping real connect.")
+        if mock and not (ip and HEALTH_PROBE.is_reachable(ip, port)):
+            print(f"⚠️ [MOCK MODE] SSH port {ip}:{port} unreachable. Skipping real connect.")
             raise Exception("Mock mode SSH check failed")
 
-        print(f"🔌 Attempting SSH connection to device: {device_name} ...")
-        device.connect(log_stdout=False, learn_hostname=True)
-        print(f"✅ Connected successfully.")
-
-        for i, cmd in enumerate(commands):
-            print(f"▶️ Running: {cmd}")
-            try:
-                output = device.execute(cmd)
-            except Exception as e:
-                output = f"[ERROR] Failed to run '{cmd}': {str(e)}"
+        print(f"🔌 Acquiring pooled SSH session to device: {device_name} ...")
+        # The session is held for the whole collection: a failed connect ends it here, and
+        # the commands below reuse this connection without other collectors interleaving
+        with SESSION_POOL.session(testbed_path, device_name):
+            print(f"✅ Connected successfully.")
 
-            safe_cmd = cmd.replace(" ", "_").replace("/", "_").replace("|", "_")[:30]
-            filename = os.path.join(log_dir, f"log_{i+1}_{safe_cmd}.txt")
+            if stream or compression:
+                _stream_logs(testbed_path, device_name, commands, log_dir, compression, on_file)
+            else:
+                print(f"▶️ Running {len(commands)} command(s) (mode: {exec_mode or SESSION_POOL.exec_mode})")
+                outputs = SESSION_POOL.run_commands(
+                    testbed_path, device_name, commands, mode=exec_mode,
+                    on_error=lambda cmd, e: f"[ERROR] Failed to run '{cmd}': {str(e)}"
+                )
 
-            with open(filename, 'w') as f:
-                f.write(output)
-            print(f"✅ Saved output to {filename}")
+                for i, (cmd, output) in enumerate(zip(commands, outputs)):
+                    filename = log_filename(log_dir, i + 1, cmd)
+                    with TRACER.span("write", cmd=cmd):
+                        BLOB_STORE.write_text(filename, output)
+                    print(f"✅ Saved output to {filename}")
+                    if on_file:
+                        on_file(filename)
 
-        device.disconnect()
         print("📁 All logs saved.")
 
     except Exception as e:
         if mock:
             print(f"⚠️ [MOCK MODE] SSH connection to {device_name} bypassed due to: {str(e)}")
             print("🔁 Generating simulated log outputs...")
-            generate_mock_logs(log_dir, commands, start_time=start_time, end_time=end_time)
+            with TRACER.span("write", mock=True):
+                generate_mock_logs(log_dir, commands, start_time=start_time, end_time=end_time,
+                                   compression=compression, on_file=on_file)
             print("📁 [MOCK] All simulated logs saved.")
         else:
             print(f"❌ [ERROR] SSH connection failed to {device_name}: {str(e)}")
@@ -72,6 +165,13 @@ if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument("--mock", action="store_true", help="Run in mock mode without real AP")
+    parser.add_argument("--exec-mode", choices=["sequential", "batch", "pipeline"], default=None,
+                        help="Command execution mode (default: sequential)")
+    parser.add_argument("--stream", action="store_true", help="Write output to disk as it arrives")
+    parser.add_argument("--compression", choices=["gzip", "zstd"], default=None,
+                        help="Compress captured logs (implies --stream)")
+    parser.add_argument("--incremental", default=None, metavar="RUN_DIR",
+                        help="Append only new lines to run_logs/RUN_DIR/logs_<device>/")
     args = parser.parse_args()
 
     yaml_path = "testbed.yaml"
@@ -81,4 +181,7 @@ if __name__ == "__main__":
         "show logging | include ERROR",
         "show platform crash"
     ]
-    collect_logs_from_testbed(yaml_path, ap_name, log_cmds, mock=args.mock)
+    collect_logs_from_testbed(yaml_path, ap_name, log_cmds, mock=args.mock, exec_mode=args.exec_mode,
+                              stream=args.stream, compression=args.compression,
+                              incremental_dir=args.incremental)
+    SESSION_POOL.close_all()
@@ -4,40 +4,42 @@
 # -------------
 # Utility to manage vendor-specific logging commands for collecting AP logs.
 # Loads existing commands, allows user to confirm, edit, add, or delete commands.
-# Commands are saved into log_command_registry.yaml
+# Commands are saved into log_command_registry.yaml (locked, atomic updates
+# through utils/command_registry.py).
 
-import yaml
-import os
+from utils.command_registry import LOG_REGISTRY_FILE, get_registry
 
-REGISTRY_FILE = "utils/log_command_registry.yaml"
+REGISTRY_FILE = LOG_REGISTRY_FILE
 
 
 def load_registry():
-    if not os.path.exists(REGISTRY_FILE):
-        return {}
-    with open(REGISTRY_FILE, 'r') as file:
-        return yaml.safe_load(file) or {}
+    return get_registry(REGISTRY_FILE).read()
 
 
 def save_registry(registry):
-    os.makedirs(os.path.dirname(REGISTRY_FILE), exist_ok=True)
-    with open(REGISTRY_FILE, 'w') as file:
-        yaml.safe_dump(registry, file)
+    get_registry(REGISTRY_FILE).replace(registry)
 
 
-def get_log_commands(device_id):
-    registry = load_registry()
+def get_log_commands(device_id, interactive=True):
+    registry = get_registry(REGISTRY_FILE)
+    saved = registry.get(device_id)
 
-    if device_id in registry:
+    if not interactive:
+        # Headless runs take the saved commands as they are
+        commands = (saved or {}).get('commands') or []
+        if not commands:
+            print(f"⚠️ No saved log commands for {device_id}. Proceeding without log collection.")
+        return commands
+
+    if saved is not None:
         print(f"📘 Found saved log commands for {device_id}:")
-        for i, cmd in enumerate(registry[device_id]['commands']):
+        for i, cmd in enumerate(saved['commands']):
             print(f"  {i+1}. {cmd}")
         choice = input("Do you want to (K)eep, (E)dit, or (D)elete these commands? [K/e/d]: ").strip().lower()
         if choice == 'k' or choice == '':
-            return registry[device_id]['commands']
+            return saved['commands']
         elif choice == 'd':
-            del registry[device_id]
-            save_registry(registry)
+            registry.delete(device_id)
         elif choice == 'e':
             print("✏️  Editing log commands...")
 
@@ -50,8 +52,7 @@ def get_log_commands(device_id):
             commands.append(cmd)
     
     if commands:
-        registry[device_id] = {"commands": commands}
-        save_registry(registry)
+        registry.set(device_id, {"commands": commands})
         print(f"✅ Commands saved for {device_id}.")
         return commands
     else:
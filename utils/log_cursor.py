@@ -0,0 +1,163 @@
+# log_cursor.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Per-device / per-command cursors for incremental log pulls.
+# A device returns its whole log buffer on every fetch; the cursor remembers
+# where the previous fetch ended so only the new lines are kept:
+#   1. tail match  - hashes of the last few stored lines are located in the new
+#                    fetch and everything after them is new. Where the buffer
+#                    only grew, the tail sits exactly where the previous fetch
+#                    ended; otherwise the earliest match wins, so lines that
+#                    repeat the tail are stored again rather than lost
+#   2. time cutoff - if the tail is gone (buffer wrapped or cleared), lines newer
+#                    than the last stored timestamp are new, and lines sharing that
+#                    timestamp are kept once they outnumber the copies already stored
+# Timestamps are compared as epochs, the year inferred from the pull time like
+# utils/log_index.py does, so a buffer spanning New Year keeps working.
+# Cursors for one device log folder are kept together in a small JSON file.
+
+import hashlib
+import json
+import os
+from collections import Counter
+from datetime import datetime
+
+from utils.log_index import MONTHS, parse_log_epoch
+
+TAIL_LINES = 8
+CURSOR_FILENAME = "cursors.json"
+
+
+def line_hash(line):
+    return hashlib.blake2b(line.rstrip("\r\n").encode("utf-8", errors="replace"), digest_size=8).hexdigest()
+
+
+def _legacy_time_epoch(last_time):
+    # Cursors written before epochs were stored kept (month, day, "HH:MM:SS[.fff]")
+    month, day, clock = last_time
+    name = next(m for m, i in MONTHS.items() if i == month)
+    return parse_log_epoch(f"{name} {day} {clock}")
+
+
+class LogCursor:
+    def __init__(self, last_time=None, boundary_hashes=None, tail_hashes=None, lines=0, pulls=0, fetch_end=None):
+        """
+        last_time: epoch of the newest stored timestamp.
+        fetch_end: line count of the previous fetch, where the stored tail ended.
+        """
+        if isinstance(last_time, (list, tuple)):
+            last_time = _legacy_time_epoch(last_time)
+        self.last_time = last_time
+        self.boundary_hashes = list(boundary_hashes or [])
+        self.tail_hashes = list(tail_hashes or [])
+        self.lines = lines
+        self.pulls = pulls
+        self.fetch_end = fetch_end
+
+    def to_dict(self):
+        return {
+            "last_time": self.last_time,
+            "boundary_hashes": self.boundary_hashes,
+            "tail_hashes": self.tail_hashes,
+            "lines": self.lines,
+            "pulls": self.pulls,
+            "fetch_end": self.fetch_end,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**(data or {}))
+
+    def _tail_match(self, hashes):
+        tail = self.tail_hashes
+        k = len(tail)
+        # Buffer only grew: the tail is where the previous fetch ended
+        end = self.fetch_end
+        if end is not None and k <= end <= len(hashes) and hashes[end - k:end] == tail:
+            return end
+        # Buffer wrapped: take the earliest match (a repeat is re-stored, never dropped)
+        for end in range(k, len(hashes) + 1):
+            if hashes[end - 1] == tail[-1] and hashes[end - k:end] == tail:
+                return end
+        return None
+
+    def _time_cutoff(self, lines, hashes, reference):
+        stored = Counter(self.boundary_hashes)
+        seen = Counter()
+        new = []
+        current = None
+        for line, h in zip(lines, hashes):
+            # Continuation lines without a timestamp inherit the previous one
+            epoch = parse_log_epoch(line, reference)
+            current = epoch if epoch is not None else current
+            if current is None:
+                # Header lines before the first timestamp can't be placed; skip them
+                continue
+            if current > self.last_time:
+                new.append(line)
+            elif current == self.last_time:
+                seen[h] += 1
+                if seen[h] > stored[h]:
+                    new.append(line)
+        return new
+
+    def new_lines(self, lines, reference=None):
+        """
+        Lines of a full fetch that were not stored by earlier pulls.
+        reference: pull time the timestamps' year is inferred from (default now).
+        """
+        if not self.tail_hashes and self.last_time is None:
+            return list(lines)
+        hashes = [line_hash(line) for line in lines]
+        if self.tail_hashes:
+            end = self._tail_match(hashes)
+            if end is not None:
+                return list(lines[end:])
+        if self.last_time is not None:
+            return self._time_cutoff(lines, hashes, reference or datetime.now())
+        return list(lines)
+
+    def advance(self, new_lines, fetched=None, reference=None):
+        """
+        Move the cursor past lines that were just stored.
+        fetched: line count of the fetch they came from.
+        """
+        self.pulls += 1
+        if fetched is not None:
+            self.fetch_end = fetched
+        if not new_lines:
+            return
+        reference = reference or datetime.now()
+        self.lines += len(new_lines)
+        hashes = [line_hash(line) for line in new_lines]
+        self.tail_hashes = (self.tail_hashes + hashes)[-TAIL_LINES:]
+        epochs = []
+        current = None
+        for line in new_lines:
+            epoch = parse_log_epoch(line, reference)
+            current = epoch if epoch is not None else current
+            epochs.append(current)
+        latest = max((e for e in epochs if e is not None), default=None)
+        if latest is None:
+            return
+        if latest != self.last_time:
+            self.last_time = latest
+            self.boundary_hashes = []
+        self.boundary_hashes += [h for h, epoch in zip(hashes, epochs) if epoch == latest]
+
+
+def load_cursors(log_dir):
+    path = os.path.join(log_dir, CURSOR_FILENAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return {cmd: LogCursor.from_dict(data) for cmd, data in json.load(f).items()}
+
+
+def save_cursors(log_dir, cursors):
+    path = os.path.join(log_dir, CURSOR_FILENAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({cmd: cursor.to_dict() for cmd, cursor in cursors.items()}, f, indent=2)
+    os.replace(tmp_path, path)
@@ -8,12 +8,68 @@
 import os
 import random
 from datetime import datetime, timedelta
+from utils.blob_store import BLOB_STORE
+from utils.log_store import LogWriter, log_filename
 
-def generate_mock_logs(output_dir, commands, start_time=None, end_time=None):
+# Correlated log templates by root cause
+LOG_TEMPLATES = {
+    "kernel_crash": [
+        "ap-kernel: Kernel panic - not syncing: Fatal exception",
+        "ap-interface: wlan0 (2.4G) changed state to down",
+        "ap-interface: wlan0 (2.4G) changed state to up",
+        "ap-interface: wlan1 (5G) changed state to down",
+        "ap-interface: wlan1 (5G) changed state to up"
+    ],
+    "hostapd_crash": [
+        "ap-daemon: Process 'hostapd' crashed due to signal 11",
+        "ap-interface: wlan0 (2.4G) changed state to down",
+        "ap-interface: wlan1 (5G) changed state to down",
+        "ap-interface: wlan2 (6G) changed state to down",
+        "ap-driver: Restarting wireless driver stack"
+    ],
+    "memory_cpu_issue": [
+        "ap-memory: High memory usage detected: 95%",
+        "ap-cpu: CPU core 0 usage: 98%",
+        "ap-cpu: CPU core 1 usage: 92%",
+        "ap-interface: eth0 changed state to down",
+        "ap-interface: eth0 changed state to up"
+    ]
+}
+
+def generate_mock_log_lines(start_time, end_time, total_lines=20, sort=False, rng=None):
+    """
+    Returns total_lines random syslog lines between start_time and end_time.
+    sort=True orders them by time, like a real device log buffer.
+    rng: optional random.Random to draw from (default: the module's global generator).
+    """
+    rng = rng or random
+    # Flatten all log lines
+    all_messages = []
+    for group in LOG_TEMPLATES.values():
+        all_messages.extend(group)
+
+    duration_sec = int((end_time - start_time).total_seconds())
+    entries = []
+    for _ in range(total_lines):
+        rand_offset = rng.randint(0, duration_sec)
+        message = rng.choice(all_messages)
+        entries.append((rand_offset, message))
+    if sort:
+        entries.sort(key=lambda entry: entry[0])
+    return [
+        f"{(start_time + timedelta(seconds=offset)).strftime('%b %d %H:%M:%S')} {message}"
+        for offset, message in entries
+    ]
+
+def generate_mock_logs(output_dir, commands, start_time=None, end_time=None, compression=None,
+                       total_lines=20, seed=None, on_file=None):
     """
     Generates dummy logs with timestamps between start_time and end_time.
-    Saves logs per command to files in output_dir.
+    Saves logs per command to files in output_dir (gzip/zstd if compression is set).
+    seed makes the output reproducible without touching the global random state.
+    on_file(path) is called as each file is saved. Returns the saved paths.
     """
+    rng = random.Random(seed) if seed is not None else random
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
@@ -22,54 +78,22 @@ def generate_mock_logs(output_dir, commands, start_time=None, end_time=None):
     if not end_time:
         end_time = start_time + timedelta(seconds=60)
 
-    # Correlated log templates by root cause
-    log_templates = {
-        "kernel_crash": [
-            "ap-kernel: Kernel panic - not syncing: Fatal exception",
-            "ap-interface: wlan0 (2.4G) changed state to down",
-            "ap-interface: wlan0 (2.4G) changed state to up",
-            "ap-interface: wlan1 (5G) changed state to down",
-            "ap-interface: wlan1 (5G) changed state to up"
-        ],
-        "hostapd_crash": [
-            "ap-daemon: Process 'hostapd' crashed due to signal 11",
-            "ap-interface: wlan0 (2.4G) changed state to down",
-            "ap-interface: wlan1 (5G) changed state to down",
-            "ap-interface: wlan2 (6G) changed state to down",
-            "ap-driver: Restarting wireless driver stack"
-        ],
-        "memory_cpu_issue": [
-            "ap-memory: High memory usage detected: 95%",
-            "ap-cpu: CPU core 0 usage: 98%",
-            "ap-cpu: CPU core 1 usage: 92%",
-            "ap-interface: eth0 changed state to down",
-            "ap-interface: eth0 changed state to up"
-        ]
-    }
-
-    # Flatten all log lines
-    all_messages = []
-    for group in log_templates.values():
-        all_messages.extend(group)
-
-    total_lines = 20
-    duration_sec = int((end_time - start_time).total_seconds())
-
+    paths = []
     for i, cmd in enumerate(commands):
-        safe_cmd = cmd.replace(" ", "_").replace("/", "_").replace("|", "_")[:30]
-        filename = os.path.join(output_dir, f"log_{i+1}_{safe_cmd}.txt")
-        lines = []
-
-        for _ in range(total_lines):
-            rand_offset = random.randint(0, duration_sec)
-            log_time = (start_time + timedelta(seconds=rand_offset)).strftime("%b %d %H:%M:%S")
-            message = random.choice(all_messages)
-            lines.append(f"{log_time} {message}")
+        lines = generate_mock_log_lines(start_time, end_time, total_lines=total_lines, rng=rng)
 
-        with open(filename, 'w') as f:
-            f.write("\n".join(lines))
+        if compression is None:
+            path = BLOB_STORE.write_text(log_filename(output_dir, i + 1, cmd), "\n".join(lines))
+        else:
+            with LogWriter(log_filename(output_dir, i + 1, cmd), compression=compression) as writer:
+                writer.write("\n".join(lines))
+            path = writer.path
 
-        print(f"✅ [MOCK] Saved generated log to {filename}")
+        print(f"✅ [MOCK] Saved generated log to {path}")
+        paths.append(path)
+        if on_file:
+            on_file(path)
+    return paths
 
 # Run standalone
 if __name__ == "__main__":
@@ -78,9 +102,11 @@ if __name__ == "__main__":
     parser.add_argument("output_dir", help="Directory to write simulated log files")
     parser.add_argument("--duration", type=int, default=60, help="Duration of test in seconds")
     parser.add_argument("--commands", nargs='+', default=["show logging"], help="Command list to simulate")
+    parser.add_argument("--lines", type=int, default=20, help="Lines per command")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible output")
     args = parser.parse_args()
 
     start = datetime.now()
     end = start + timedelta(seconds=args.duration)
 
-    generate_mock_logs(args.output_dir, args.commands, start, end)
+    generate_mock_logs(args.output_dir, args.commands, start, end, total_lines=args.lines, seed=args.seed)
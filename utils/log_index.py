@@ -0,0 +1,273 @@
+# log_index.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Timestamp index for captured logs, used to analyze only a time window.
+# Each log record (a timestamped syslog line plus any continuation lines) is
+# indexed once as (epoch, text offset). The index is cached in memory and in a
+# '<log>.tsidx' sidecar next to the log, and window queries are answered with a
+# binary search over the sorted epochs, so only the byte ranges inside the
+# window are read back. Works for plain, .gz and .zst logs (utils/log_store.py).
+#
+# Syslog timestamps carry no year; it is taken from the log file's modification
+# time, stepping back a year for dates that would lie in the future.
+
+import json
+import os
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+
+from utils.log_store import iter_text_range, open_log_binary
+
+INDEX_EXTENSION = ".tsidx"
+INDEX_VERSION = 1
+MONTHS = {m: i for i, m in enumerate(
+    ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1)}
+# Syslog style, optionally Cisco '*' prefixed: "Apr 11 10:00:05" / "*Apr 11 10:00:05.123:"
+LOG_TIME_RE = re.compile(r"^\*?([A-Z][a-z]{2})\s+(\d{1,2})\s+(\d{2}):(\d{2}):(\d{2})(\.\d+)?")
+LOG_TIME_BYTES_RE = re.compile(LOG_TIME_RE.pattern.encode())
+
+_INDEX_CACHE = {}
+
+
+def log_time_key(line):
+    """
+    Sortable (month, day, 'HH:MM:SS[.fff]') key of a syslog line, or None.
+    """
+    m = LOG_TIME_RE.match(line)
+    if not m or m.group(1) not in MONTHS:
+        return None
+    return (MONTHS[m.group(1)], int(m.group(2)), f"{m.group(3)}:{m.group(4)}:{m.group(5)}{m.group(6) or ''}")
+
+
+def _match_to_datetime(groups, reference):
+    month = MONTHS.get(groups[0].decode() if isinstance(groups[0], bytes) else groups[0])
+    if month is None:
+        return None
+    day, hour, minute, second = (int(g) for g in groups[1:5])
+    try:
+        ts = datetime(reference.year, month, day, hour, minute, second)
+    except ValueError:
+        return None
+    if ts > reference + timedelta(days=1):
+        ts = ts.replace(year=reference.year - 1)
+    return ts
+
+
+def parse_log_time(line, reference=None):
+    """
+    datetime of a syslog line's timestamp (year inferred from reference,
+    default now), or None if the line has no timestamp.
+    """
+    m = LOG_TIME_RE.match(line)
+    if not m:
+        return None
+    return _match_to_datetime(m.groups(), reference or datetime.now())
+
+
+def parse_log_epoch(line, reference=None):
+    """
+    Epoch seconds (with any fractional part) of a syslog line's timestamp,
+    year inferred from reference (default now), or None.
+    """
+    m = LOG_TIME_RE.match(line)
+    if not m:
+        return None
+    ts = _match_to_datetime(m.groups(), reference or datetime.now())
+    if ts is None:
+        return None
+    return ts.timestamp() + float(m.group(6) or 0)
+
+
+class TimestampIndex:
+    def __init__(self, epochs, offsets, text_size, time_sorted):
+        """
+        epochs/offsets: one entry per record in file order.
+        text_size: total text bytes, closing the last record.
+        """
+        self.epochs = epochs
+        self.offsets = offsets
+        self.text_size = text_size
+        self.time_sorted = time_sorted
+        self._order = None
+
+    def __len__(self):
+        return len(self.epochs)
+
+    @classmethod
+    def build(cls, path):
+        reference = datetime.fromtimestamp(os.path.getmtime(path))
+        epochs = array("q")
+        offsets = array("q")
+        pos = 0
+        with open_log_binary(path) as f:
+            for raw in f:
+                m = LOG_TIME_BYTES_RE.match(raw)
+                if m:
+                    ts = _match_to_datetime(m.groups(), reference)
+                    if ts is not None:
+                        epochs.append(int(ts.timestamp()))
+                        offsets.append(pos)
+                pos += len(raw)
+        time_sorted = all(epochs[i] <= epochs[i + 1] for i in range(len(epochs) - 1))
+        return cls(epochs, offsets, pos, time_sorted)
+
+    def record_end(self, i):
+        return self.offsets[i + 1] if i + 1 < len(self.offsets) else self.text_size
+
+    def time_order(self):
+        """
+        Record numbers sorted by epoch (stable, so ties keep file order).
+        """
+        if self._order is None:
+            self._order = sorted(range(len(self.epochs)), key=self.epochs.__getitem__)
+        return self._order
+
+    def query(self, start_epoch, end_epoch):
+        """
+        Text byte ranges [(start, end), ...] in file order holding every record
+        with start_epoch <= epoch <= end_epoch.
+        """
+        if self.time_sorted:
+            lo = bisect_left(self.epochs, start_epoch)
+            hi = bisect_right(self.epochs, end_epoch)
+            return [(self.offsets[lo], self.record_end(hi - 1))] if hi > lo else []
+
+        # Out-of-order file: binary search over a sorted view, then read the hits in file order
+        order = self.time_order()
+        sorted_epochs = [self.epochs[i] for i in order]
+        lo = bisect_left(sorted_epochs, start_epoch)
+        hi = bisect_right(sorted_epochs, end_epoch)
+        ranges = []
+        for i in sorted(order[lo:hi]):
+            start, end = self.offsets[i], self.record_end(i)
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+        return ranges
+
+    def save(self, path, source_path):
+        header = json.dumps({
+            "version": INDEX_VERSION,
+            "source_size": os.path.getsize(source_path),
+            "source_mtime": os.path.getmtime(source_path),
+            "records": len(self.epochs),
+            "text_size": self.text_size,
+            "time_sorted": self.time_sorted,
+        })
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(header.encode() + b"\n")
+            self.epochs.tofile(f)
+            self.offsets.tofile(f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, source_path):
+        """
+        Load a sidecar index, or None if it is missing or does not match the log.
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            try:
+                meta = json.loads(f.readline())
+            except ValueError:
+                return None
+            if (meta.get("version") != INDEX_VERSION
+                    or meta["source_size"] != os.path.getsize(source_path)
+                    or meta["source_mtime"] != os.path.getmtime(source_path)):
+                return None
+            epochs = array("q")
+            offsets = array("q")
+            epochs.fromfile(f, meta["records"])
+            offsets.fromfile(f, meta["records"])
+        return cls(epochs, offsets, meta["text_size"], meta["time_sorted"])
+
+
+def get_index(path, persist=True):
+    """
+    Timestamp index of a log file: memory cache, then sidecar, then a fresh build.
+    """
+    key = (os.path.abspath(path), os.path.getsize(path), os.path.getmtime(path))
+    index = _INDEX_CACHE.get(key)
+    if index is not None:
+        return index
+    sidecar = path + INDEX_EXTENSION
+    index = TimestampIndex.load(sidecar, path)
+    if index is None:
+        index = TimestampIndex.build(path)
+        if persist:
+            try:
+                index.save(sidecar, path)
+            except OSError:
+                pass
+    _INDEX_CACHE[key] = index
+    return index
+
+
+def window_epochs(start_time, end_time, margin_sec=0, time_offset_sec=0):
+    """
+    Epoch window on the device clock for a test run on the local clock.
+    time_offset_sec: how far the device clock is ahead of the local clock.
+    """
+    shift = timedelta(seconds=time_offset_sec)
+    margin = timedelta(seconds=margin_sec)
+    start = start_time + shift - margin
+    end = end_time + shift + margin
+    # Syslog timestamps have whole-second resolution
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def iter_window_lines(path, start_epoch, end_epoch):
+    """
+    Stream the lines of every record inside [start_epoch, end_epoch], with
+    their untimestamped continuation lines. A file without any timestamps
+    (e.g. 'show platform crash') cannot be windowed and is streamed whole;
+    untimestamped lines ahead of the first record go with that record.
+    """
+    index = get_index(path)
+    if not len(index):
+        yield from iter_text_range(path, 0, index.text_size)
+        return
+    for start, end in index.query(start_epoch, end_epoch):
+        if start == index.offsets[0]:
+            start = 0
+        yield from iter_text_range(path, start, end)
+
+
+def iter_timed_lines(path, start_epoch=None, end_epoch=None):
+    """
+    Stream (epoch, line) in time order, optionally limited to a window.
+    Continuation lines carry their record's epoch; lines before the first
+    timestamp are skipped. Out-of-order files are read record by record.
+    """
+    index = get_index(path)
+    if not len(index):
+        return
+    lo = index.epochs[0] if index.time_sorted else min(index.epochs)
+    hi = index.epochs[-1] if index.time_sorted else max(index.epochs)
+    start_epoch = lo if start_epoch is None else start_epoch
+    end_epoch = hi if end_epoch is None else end_epoch
+
+    if index.time_sorted:
+        reference = datetime.fromtimestamp(os.path.getmtime(path))
+        current = None
+        for start, end in index.query(start_epoch, end_epoch):
+            for line in iter_text_range(path, start, end):
+                m = LOG_TIME_RE.match(line)
+                ts = _match_to_datetime(m.groups(), reference) if m else None
+                if ts is not None:
+                    current = int(ts.timestamp())
+                if current is not None:
+                    yield current, line
+        return
+
+    for i in index.time_order():
+        epoch = index.epochs[i]
+        if start_epoch <= epoch <= end_epoch:
+            for line in iter_text_range(path, index.offsets[i], index.record_end(i)):
+                yield epoch, line
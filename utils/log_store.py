@@ -0,0 +1,333 @@
+# log_store.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Streaming on-disk storage for captured device logs.
+# LogWriter writes output to disk as it arrives, either as plain text or
+# compressed (gzip, or zstd when the 'zstandard' package is installed).
+# Compressed logs are cut into independent members/frames of roughly
+# chunk_bytes of text, always on a line boundary, and a small JSON sidecar
+# index (<file>.idx) records where each member starts:
+#
+#   {"format": "gzip", "members": [[compressed_offset, text_offset, first_line], ...],
+#    "text_bytes": N, "lines": N}
+#
+# Readers open any of the three formats transparently (open_log_text) and can
+# stream an individual run of members (iter_range_lines), which is what lets the
+# parallel log analyzer split a compressed file across workers. Plain logs saved
+# as blob store references (utils/blob_store) read back like plain logs.
+
+import gzip
+import io
+import json
+import locale
+import os
+import zlib
+from bisect import bisect_right
+
+from utils.blob_store import open_reference_binary, read_reference
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ENCODING = "utf-8"
+DEFAULT_MEMBER_BYTES = 4 * 1024 * 1024
+COMPRESSION_EXTENSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"}
+INDEX_EXTENSION = ".idx"
+
+
+def compression_of(path):
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return None
+
+
+def _require_zstd():
+    if zstandard is None:
+        raise RuntimeError("❌ zstd compression requires the 'zstandard' package (pip install zstandard)")
+
+
+class LogWriter:
+    def __init__(self, path, compression=None, member_bytes=DEFAULT_MEMBER_BYTES, append=False):
+        """
+        path: output file without the compression extension; the extension for
+        the chosen compression is appended (see self.path).
+        compression: None | 'gzip' | 'zstd'.
+        member_bytes: text bytes per independently decompressible member.
+        append: add to an existing file. Compressed files get new members and
+        their index is extended; for plain files text_bytes/lines only count
+        what this writer appended.
+        """
+        if compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError(f"❌ Unknown compression '{compression}'. Expected one of {list(COMPRESSION_EXTENSIONS)}")
+        if compression == "zstd":
+            _require_zstd()
+        self.path = path + COMPRESSION_EXTENSIONS[compression]
+        self.compression = compression
+        self.member_bytes = member_bytes
+        self.text_bytes = 0
+        self.lines = 0
+        self.members = []
+        self._member_text = 0
+        self._compressor = None
+        if append and compression is not None and os.path.exists(self.path):
+            index = read_index(self.path) or _scan_index(self.path, compression)
+            self.members = index["members"]
+            self.text_bytes = index["text_bytes"]
+            self.lines = index["lines"]
+        self._file = open(self.path, 'ab' if append else 'wb')
+
+    def _start_member(self):
+        self.members.append([self._file.tell(), self.text_bytes, self.lines])
+        self._member_text = 0
+        if self.compression == "gzip":
+            self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        else:
+            self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def _finish_member(self):
+        if self._compressor is None:
+            return
+        if self.compression == "gzip":
+            self._file.write(self._compressor.flush())
+        else:
+            self._file.write(self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH))
+        self._compressor = None
+
+    def _write_bytes(self, data):
+        if not data:
+            return
+        if self.compression is None:
+            self._file.write(data)
+        else:
+            if self._compressor is None:
+                self._start_member()
+            self._file.write(self._compressor.compress(data))
+            self._member_text += len(data)
+        self.text_bytes += len(data)
+        self.lines += data.count(b"\n")
+
+    def write(self, text):
+        """
+        Append a chunk of output. Members are closed at the last line break once
+        they hold member_bytes of text, so no line ever spans two members.
+        """
+        data = text.encode(ENCODING, errors="replace") if isinstance(text, str) else text
+        if self.compression is not None and self._member_text + len(data) >= self.member_bytes:
+            cut = data.rfind(b"\n")
+            if cut >= 0:
+                self._write_bytes(data[:cut + 1])
+                self._finish_member()
+                data = data[cut + 1:]
+        self._write_bytes(data)
+
+    def close(self):
+        if self._file.closed:
+            return self.path
+        self._finish_member()
+        self._file.close()
+        if self.compression is not None:
+            write_index(self.path, {
+                "format": self.compression,
+                "members": self.members,
+                "text_bytes": self.text_bytes,
+                "lines": self.lines,
+            })
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _scan_index(path, compression):
+    # Index lost or stale: rebuild totals by decompressing once, as a single member
+    text_bytes = 0
+    lines = 0
+    with _open_compressed_binary(path, compression) as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            text_bytes += len(block)
+            lines += block.count(b"\n")
+    return {"format": compression, "members": [[0, 0, 0]] if text_bytes else [],
+            "text_bytes": text_bytes, "lines": lines}
+
+
+def write_index(path, index):
+    tmp_path = path + INDEX_EXTENSION + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, path + INDEX_EXTENSION)
+
+
+def read_index(path):
+    """
+    Sidecar index of a compressed log, or None if it is missing or stale.
+    """
+    index_path = path + INDEX_EXTENSION
+    if not os.path.exists(index_path) or os.path.getmtime(index_path) < os.path.getmtime(path):
+        return None
+    with open(index_path, 'r') as f:
+        return json.load(f)
+
+
+class _BoundedReader(io.RawIOBase):
+    # Exposes [start, end) of a binary file as its own stream
+    def __init__(self, f, start, end):
+        self._f = f
+        self._f.seek(start)
+        self._remaining = None if end is None else end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        size = len(b) if self._remaining is None else min(len(b), self._remaining)
+        if size <= 0:
+            return 0
+        data = self._f.read(size)
+        b[:len(data)] = data
+        if self._remaining is not None:
+            self._remaining -= len(data)
+        return len(data)
+
+    def close(self):
+        self._f.close()
+        super().close()
+
+
+class _ClosingGzipFile(gzip.GzipFile):
+    # GzipFile leaves a passed-in fileobj open; this one owns it
+    def close(self):
+        fileobj = self.fileobj
+        try:
+            super().close()
+        finally:
+            if fileobj is not None:
+                fileobj.close()
+
+
+def _open_compressed_binary(path, compression, start=0, end=None):
+    raw = io.BufferedReader(_BoundedReader(open(path, 'rb'), start, end))
+    if compression == "gzip":
+        return _ClosingGzipFile(fileobj=raw, mode='rb')
+    _require_zstd()
+    return zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+
+
+def _open_compressed_text(path, compression, start=0, end=None):
+    stream = _open_compressed_binary(path, compression, start, end)
+    return io.TextIOWrapper(stream, encoding=ENCODING, errors="replace")
+
+
+def open_log_text(path):
+    """
+    Open a plain, .gz or .zst log for line-by-line text reading.
+    """
+    compression = compression_of(path)
+    if compression is None:
+        ref = read_reference(path)
+        if ref is not None:
+            return io.TextIOWrapper(open_reference_binary(ref), encoding=ENCODING, errors="replace")
+        return open(path, 'r')
+    return _open_compressed_text(path, compression)
+
+
+def open_log_binary(path):
+    """
+    Binary stream over the (decompressed) text of a plain, .gz or .zst log.
+    Byte offsets in this stream are the text offsets used by indexes.
+    """
+    compression = compression_of(path)
+    if compression is None:
+        ref = read_reference(path)
+        return open(path, 'rb') if ref is None else open_reference_binary(ref)
+    return _open_compressed_binary(path, compression)
+
+
+def text_encoding(path):
+    # Plain logs are read the way text mode would; compressed ones and blobs are written as UTF-8
+    if compression_of(path) or read_reference(path) is not None:
+        return ENCODING
+    return locale.getpreferredencoding(False)
+
+
+def iter_text_range(path, start, end):
+    """
+    Stream the lines stored at text offsets [start, end) of any log format.
+    Compressed logs start decompressing at the indexed member holding start.
+    """
+    compression = compression_of(path)
+    if compression is None:
+        f = open_log_binary(path)
+        f.seek(start)
+        pos = start
+    else:
+        index = read_index(path)
+        members = index["members"] if index else []
+        i = bisect_right([m[1] for m in members], start) - 1
+        offset, pos = (members[i][0], members[i][1]) if i >= 0 else (0, 0)
+        f = _open_compressed_binary(path, compression, offset)
+        while pos < start:
+            skipped = len(f.read(min(start - pos, 1024 * 1024)))
+            if not skipped:
+                break
+            pos += skipped
+
+    encoding = text_encoding(path)
+    with f:
+        while pos < end:
+            raw = f.readline()
+            if not raw:
+                break
+            pos += len(raw)
+            line = raw.decode(encoding, errors="replace")
+            if "\r" in line:
+                parts = line.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+                yield from (part + "\n" for part in parts[:-1])
+                if parts[-1]:
+                    yield parts[-1]
+            else:
+                yield line
+
+
+def member_ranges(path, chunk_bytes):
+    """
+    Group the members of an indexed compressed log into (start, end) compressed
+    byte ranges holding roughly chunk_bytes of text each.
+    Returns [(0, None)] when the file has no usable index.
+    """
+    index = read_index(path)
+    if not index or not index.get("members"):
+        return [(0, None)]
+    members = index["members"]
+    size = os.path.getsize(path)
+    ranges = []
+    start_offset, start_text = members[0][0], members[0][1]
+    for offset, text_offset, _ in members[1:]:
+        if text_offset - start_text >= chunk_bytes:
+            ranges.append((start_offset, offset))
+            start_offset, start_text = offset, text_offset
+    ranges.append((start_offset, size))
+    return ranges
+
+
+def iter_range_lines(path, start, end):
+    """
+    Stream the text lines of the compressed members stored in [start, end).
+    """
+    with _open_compressed_text(path, compression_of(path), start, end) as f:
+        yield from f
+
+
+def log_filename(log_dir, index, cmd):
+    """
+    Base name used for a captured command (without compression extension).
+    """
+    safe_cmd = cmd.replace(" ", "_").replace("/", "_").replace("|", "_")[:30]
+    return os.path.join(log_dir, f"log_{index}_{safe_cmd}.txt")
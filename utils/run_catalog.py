@@ -0,0 +1,836 @@
+# run_catalog.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# SQLite catalog of the test runs under run_logs/.
+# Each run is one row in 'runs' (keyed by its stats folder name) with:
+#   run_params  - the run's TEST_SCHEMAS parameters (radio_band, bandwidth, nss...)
+#   run_devices - every device the run collected from
+#   run_files   - the files it produced, tagged with kind (stat, log, perf_delta...) and phase
+#   run_metrics - headline numbers: throughput, retry rate, CPU/memory, log matches, incidents
+# All filter columns are indexed, so queries stay in the millisecond range with
+# tens of thousands of runs.
+#
+# The performance runner records runs as they execute: it keeps a run.json
+# manifest in the stats folder (config, device, start/end, log folder) and
+# indexes it when the run ends. scan() rebuilds the catalog from run_logs/:
+# manifests are read as-is, and older runs without one are pieced together by
+# pairing <test_type>_config_*.json, ap_stats_* and logs_<device>_* folders
+# by timestamp.
+#
+# Usage:
+#   python -m utils.run_catalog scan [--rebuild]
+#   python -m utils.run_catalog query radio_band=6G bandwidth=80MHz traffic_type=UDP direction=DL --device ap1 --since 30d
+#   python -m utils.run_catalog query "nss>=2" --metric "tx_mbps>500" --format csv
+#   python -m utils.run_catalog show ap_stats_20250411_171530
+
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+from utils.test_schemas import TEST_SCHEMAS
+
+DEFAULT_ROOT = "run_logs"
+CATALOG_FILENAME = "run_catalog.sqlite"
+MANIFEST_FILENAME = "run.json"
+RUN_TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+STATS_DIR_RE = re.compile(r"^ap_stats_(\d{8}_\d{6})$")
+LOG_DIR_RE = re.compile(r"^logs_(.+)_(\d{8}_\d{6})$")
+CONFIG_RE = re.compile(r"^(.+)_config_(\d{8}_\d{6})\.json$")
+FILTER_RE = re.compile(r"^\s*(\w+)\s*(>=|<=|!=|=|>|<)\s*(.*?)\s*$")
+SQL_OPS = ("=", "!=", ">", ">=", "<", "<=")
+PHASES = ("before_test", "during_test", "after_test")
+# Files written next to the data that are not run outputs themselves
+SKIPPED_SUFFIXES = (".idx", ".tsidx", ".series", ".tmp")
+SKIPPED_FILES = {MANIFEST_FILENAME, "cursors.json"}
+# Longest gap between a config file and its stats folder (and between the stats
+# folder and its log folder) when pairing runs that have no manifest
+PAIR_WINDOW_SEC = 6 * 3600
+UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+TABLE_METRICS = ("tx_mbps", "rx_mbps", "tx_retry_pct", "incidents")
+SQL_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL UNIQUE,
+    test_type TEXT,
+    status TEXT,
+    started_at REAL,
+    ended_at REAL,
+    mock INTEGER,
+    stats_dir TEXT,
+    log_dir TEXT,
+    config_path TEXT,
+    source TEXT,
+    source_mtime REAL
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started_at);
+CREATE INDEX IF NOT EXISTS runs_type ON runs (test_type, started_at);
+CREATE TABLE IF NOT EXISTS run_params (
+    run INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT COLLATE NOCASE,
+    num REAL,
+    PRIMARY KEY (run, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS params_value ON run_params (key, value, run);
+CREATE INDEX IF NOT EXISTS params_num ON run_params (key, num, run);
+CREATE TABLE IF NOT EXISTS run_devices (
+    device TEXT NOT NULL COLLATE NOCASE,
+    run INTEGER NOT NULL,
+    PRIMARY KEY (device, run)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS devices_run ON run_devices (run);
+CREATE TABLE IF NOT EXISTS run_files (
+    run INTEGER NOT NULL,
+    device TEXT,
+    kind TEXT,
+    phase TEXT,
+    path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_run ON run_files (run);
+CREATE INDEX IF NOT EXISTS files_kind ON run_files (kind, phase);
+CREATE TABLE IF NOT EXISTS run_metrics (
+    run INTEGER NOT NULL,
+    device TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run, device, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS metrics_value ON run_metrics (name, value, run);
+"""
+# Child rows point at runs.id (integer keys keep the filter intersections cheap)
+RUN_COLUMNS = ("run_id", "test_type", "status", "started_at", "ended_at", "mock", "stats_dir", "log_dir",
+               "config_path", "source", "source_mtime")
+CHILD_TABLES = ("run_params", "run_devices", "run_files", "run_metrics")
+
+
+def _to_number(value):
+    if isinstance(value, bool):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _epoch(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return parse_time(value)
+
+
+def _stamp_epoch(stamp):
+    return datetime.strptime(stamp, RUN_TIMESTAMP_FORMAT).timestamp()
+
+
+def parse_time(text):
+    """
+    Absolute ('2025-04-11', '2025-04-11 17:15', '20250411_171530') or relative
+    to now ('30d', '12h', '90m', '2w') time as epoch seconds.
+    """
+    text = str(text).strip()
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([smhdw])", text)
+    if m:
+        return time.time() - float(m.group(1)) * UNIT_SECONDS[m.group(2)]
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", RUN_TIMESTAMP_FORMAT):
+        try:
+            return datetime.strptime(text, fmt).timestamp()
+        except ValueError:
+            continue
+    raise ValueError(f"❌ Unrecognized time '{text}' (use e.g. 2025-04-11, '2025-04-11 17:15' or 30d / 12h)")
+
+
+def parse_filter(text):
+    """
+    'radio_band=6G' / 'nss>=2' -> (key, op, value).
+    """
+    m = FILTER_RE.match(text)
+    if not m:
+        raise ValueError(f"❌ Bad filter '{text}'. Expected <name><op><value> with op one of = != > >= < <=")
+    return m.group(1), m.group(2), m.group(3)
+
+
+def _format_time(epoch):
+    return datetime.fromtimestamp(epoch).strftime("%Y-%m-%d %H:%M:%S") if epoch else ""
+
+
+# ---------------------------------------------------------------------------
+# Run manifests (written by the runner while a run executes)
+# ---------------------------------------------------------------------------
+
+def write_run_manifest(stats_dir, run):
+    """
+    Write (or overwrite) stats_dir/run.json. run holds run_id, test_type, status,
+    started_at/ended_at (epoch), mock, devices, config, config_path, log_dir.
+    """
+    os.makedirs(stats_dir, exist_ok=True)
+    path = os.path.join(stats_dir, MANIFEST_FILENAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(run, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+    return path
+
+
+def start_run(stats_dir, config, devices, started_at=None):
+    """
+    Manifest for a run that is starting (status 'running', so runs that crash
+    are still found by a rescan). Returns the manifest dict for finish_run().
+    """
+    config = {k: v for k, v in config.items() if k != "log_commands"}
+    run = {
+        "run_id": os.path.basename(os.path.normpath(stats_dir)),
+        "test_type": config.get("test_type"),
+        "status": "running",
+        "started_at": _epoch(started_at) or time.time(),
+        "ended_at": None,
+        "mock": bool(config.get("mock", False)),
+        "devices": [devices] if isinstance(devices, str) else list(devices),
+        "config": config,
+        "config_path": config.get("config_file"),
+        "log_dir": None,
+    }
+    write_run_manifest(stats_dir, run)
+    return run
+
+
+def finish_run(stats_dir, run, status="completed", log_dir=None, ended_at=None, root=DEFAULT_ROOT):
+    """
+    Close the manifest and index the run. Catalog errors are reported, never
+    raised: a locked or broken catalog must not fail a finished test run.
+    """
+    run.update({"status": status, "ended_at": _epoch(ended_at) or time.time(), "log_dir": log_dir})
+    path = write_run_manifest(stats_dir, run)
+    try:
+        with RunCatalog(root=root) as catalog:
+            catalog.index_manifest(path)
+        print(f"🗂️ Run {run['run_id']} recorded in {catalog.path}")
+    except (sqlite3.Error, OSError, ValueError) as e:
+        print(f"⚠️ Could not record run {run['run_id']} in the run catalog: {e}")
+    return path
+
+
+# ---------------------------------------------------------------------------
+# What a run folder holds
+# ---------------------------------------------------------------------------
+
+def _file_phase(filename, kind):
+    for phase in PHASES:
+        if phase in filename:
+            return phase
+    if kind in ("cpu", "memory") and (filename.endswith("_usage.csv") or filename.endswith("_raw.txt")):
+        return "during_test"
+    return None
+
+
+def _stats_file_kind(rel_parts):
+    filename = rel_parts[-1]
+    if filename.startswith("perf_delta_"):
+        return "perf_delta"
+    if filename.endswith(".prom"):
+        return "metrics"
+    if filename == "trace.json":
+        return "trace"
+    return rel_parts[-2] if len(rel_parts) > 1 else "stats"
+
+
+def _log_file_kind(filename):
+    if filename.startswith("log_analysis_summary_"):
+        return "log_summary"
+    if filename.startswith("log_incidents_"):
+        return "incidents"
+    return "log"
+
+
+def _walk_files(folder):
+    for dirpath, dirnames, filenames in os.walk(folder):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename in SKIPPED_FILES or filename.endswith(SKIPPED_SUFFIXES):
+                continue
+            yield os.path.join(dirpath, filename)
+
+
+def fanout_devices(stats_dir):
+    """
+    Device subfolders of a fan-out stats folder (run_logs/<dir>/<device>/<stat>/...).
+    """
+    devices = []
+    for entry in sorted(os.listdir(stats_dir)) if os.path.isdir(stats_dir) else []:
+        sub = os.path.join(stats_dir, entry)
+        if os.path.isdir(sub) and any(os.path.isdir(os.path.join(sub, s)) for s in os.listdir(sub)):
+            devices.append(entry)
+    return devices
+
+
+def collect_run_files(stats_dir, log_dir, device=None):
+    """
+    [(device, kind, phase, path)] for everything the run produced.
+    """
+    files = []
+    fanout = set(fanout_devices(stats_dir)) if stats_dir else set()
+    if stats_dir and os.path.isdir(stats_dir):
+        for path in _walk_files(stats_dir):
+            parts = os.path.relpath(path, stats_dir).split(os.sep)
+            file_device = parts[0] if len(parts) > 2 and parts[0] in fanout else device
+            kind = _stats_file_kind(parts)
+            files.append((file_device, kind, _file_phase(parts[-1], kind), path))
+    if log_dir and os.path.isdir(log_dir):
+        for path in _walk_files(log_dir):
+            kind = _log_file_kind(os.path.basename(path))
+            files.append((device, kind, None, path))
+    return files
+
+
+def _latest(files, kind):
+    """
+    {device: newest path} of one file kind (names carry a sortable timestamp).
+    """
+    latest = {}
+    for device, file_kind, _, path in files:
+        if file_kind == kind and (device not in latest or os.path.basename(path) > os.path.basename(latest[device])):
+            latest[device] = path
+    return latest
+
+
+def _csv_rows(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def _series_metrics(path, name):
+    from analyzers.series_store import load_series, summarize
+    summary = summarize(load_series(path))
+    if name == "cpu":
+        p95 = [s["p95"] for s in summary.values() if s["p95"] is not None]
+        peak = [s["max"] for s in summary.values() if s["max"] is not None]
+        return {"cpu_p95": max(p95) if p95 else None, "cpu_max": max(peak) if peak else None}
+    free = summary.get("free_mb", {})
+    return {"mem_free_min_mb": free.get("min")}
+
+
+def extract_run_metrics(files, started_at=None, ended_at=None):
+    """
+    [(device, name, value)] headline metrics from the run's output files.
+    Unreadable files are skipped; metrics come from whatever could be read.
+    """
+    metrics = []
+    if started_at and ended_at:
+        metrics.append(("", "duration_sec", round(ended_at - started_at, 3)))
+    readers = {
+        "perf_delta": _perf_delta_metrics,
+        "log_summary": lambda path: {"log_matches": len(_csv_rows(path))},
+        "incidents": lambda path: {"incidents": len(_csv_rows(path))},
+    }
+    for kind, reader in readers.items():
+        for device, path in _latest(files, kind).items():
+            try:
+                values = reader(path)
+            except (OSError, ValueError, csv.Error) as e:
+                print(f"⚠️ Skipping metrics from {path}: {e}")
+                continue
+            metrics += [(device or "", name, value) for name, value in values.items() if value is not None]
+    for device, kind, _, path in files:
+        if kind in ("cpu", "memory") and path.endswith("_usage.csv"):
+            try:
+                values = _series_metrics(path, kind)
+            except (OSError, ValueError, csv.Error) as e:
+                print(f"⚠️ Skipping metrics from {path}: {e}")
+                continue
+            metrics += [(device or "", name, value) for name, value in values.items() if value is not None]
+    return metrics
+
+
+def _perf_delta_metrics(path):
+    rows = _csv_rows(path)
+    aggregate = next((row for row in rows if row.get("mac") == "ALL"), None)
+    if aggregate is None:
+        return {}
+    values = {name: _to_number(aggregate.get(name)) for name in ("tx_mbps", "rx_mbps", "tx_retry_pct")}
+    values["clients"] = len(rows) - 1
+    return values
+
+
+def _run_params(test_type, config):
+    keys = TEST_SCHEMAS.get(test_type)
+    if keys is None:
+        keys = [k for k, v in config.items() if isinstance(v, (str, int, float, bool))]
+    params = []
+    for key in keys:
+        if key in config and config[key] is not None:
+            value = config[key]
+            params.append((key, str(value), _to_number(value)))
+    return params
+
+
+# ---------------------------------------------------------------------------
+# Catalog
+# ---------------------------------------------------------------------------
+
+class RunCatalog:
+    def __init__(self, path=None, root=DEFAULT_ROOT):
+        """
+        path: SQLite file, default <root>/run_catalog.sqlite. root is the
+        run_logs folder the catalog describes.
+        """
+        self.root = root
+        self.path = path or os.path.join(root, CATALOG_FILENAME)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # -- writing -------------------------------------------------------------
+
+    def _delete_runs(self, run_ids):
+        run_ids = list(run_ids)
+        for i in range(0, len(run_ids), SQL_BATCH):
+            batch = run_ids[i:i + SQL_BATCH]
+            marks = ",".join("?" * len(batch))
+            for table in CHILD_TABLES:
+                self.conn.execute(f"DELETE FROM {table} WHERE run IN (SELECT id FROM runs WHERE run_id IN ({marks}))",
+                                  batch)
+            self.conn.execute(f"DELETE FROM runs WHERE run_id IN ({marks})", batch)
+
+    def _rel(self, path):
+        return os.path.relpath(path, self.root) if path else None
+
+    def _abs(self, path):
+        return os.path.join(self.root, path) if path else path
+
+    def record_run(self, run, files=None, metrics=None, commit=True):
+        """
+        Insert or replace one run. run: run_id, test_type, status, started_at,
+        ended_at, mock, devices, config, config_path, stats_dir, log_dir, source,
+        source_mtime. Files and metrics are read from stats_dir/log_dir unless
+        given ([(device, kind, phase, path)] / [(device, name, value)]).
+        """
+        run_id = run["run_id"]
+        started_at = _epoch(run.get("started_at"))
+        ended_at = _epoch(run.get("ended_at"))
+        devices = [d for d in run.get("devices") or [] if d]
+        stats_dir = run.get("stats_dir")
+        log_dir = run.get("log_dir")
+        if files is None:
+            files = collect_run_files(stats_dir, log_dir, devices[0] if len(devices) == 1 else None)
+        devices = sorted(set(devices) | {f[0] for f in files if f[0]})
+        if metrics is None:
+            metrics = extract_run_metrics(files, started_at, ended_at)
+
+        self._delete_runs([run_id])
+        row = {
+            **{column: run.get(column) for column in RUN_COLUMNS},
+            "started_at": started_at,
+            "ended_at": ended_at,
+            "mock": int(bool(run.get("mock"))) if run.get("mock") is not None else None,
+            "stats_dir": self._rel(stats_dir),
+            "log_dir": self._rel(log_dir),
+            "config_path": self._rel(run.get("config_path")),
+        }
+        key = self.conn.execute(
+            f"INSERT INTO runs ({','.join(RUN_COLUMNS)}) VALUES ({','.join('?' * len(RUN_COLUMNS))})",
+            [row[column] for column in RUN_COLUMNS]
+        ).lastrowid
+        self.conn.executemany("INSERT INTO run_params VALUES (?, ?, ?, ?)",
+                              [(key, *param) for param in _run_params(run.get("test_type"), run.get("config") or {})])
+        self.conn.executemany("INSERT INTO run_devices VALUES (?, ?)", [(device, key) for device in devices])
+        self.conn.executemany("INSERT INTO run_files VALUES (?, ?, ?, ?, ?)",
+                              [(key, device, kind, phase, self._rel(path)) for device, kind, phase, path in files])
+        self.conn.executemany("INSERT OR REPLACE INTO run_metrics VALUES (?, ?, ?, ?)",
+                              [(key, device, name, value) for device, name, value in metrics])
+        if commit:
+            self.conn.commit()
+        return run_id
+
+    def index_manifest(self, manifest_path, commit=True):
+        with open(manifest_path, 'r') as f:
+            run = json.load(f)
+        run.update({
+            "stats_dir": os.path.dirname(manifest_path),
+            "source": "manifest",
+            "source_mtime": os.path.getmtime(manifest_path),
+        })
+        config_path = run.get("config_path")
+        if config_path and not os.path.exists(config_path):
+            run["config_path"] = None
+        return self.record_run(run, commit=commit)
+
+    def scan(self, rebuild=False):
+        """
+        Bring the catalog in line with the run folders under root. Unchanged runs
+        are skipped unless rebuild is set; runs whose folders are gone are dropped.
+        Returns {"indexed", "skipped", "removed"}.
+        """
+        started = time.perf_counter()
+        candidates = _discover_runs(self.root)
+        known = {} if rebuild else {
+            row["run_id"]: (row["source"], row["source_mtime"])
+            for row in self.conn.execute("SELECT run_id, source, source_mtime FROM runs")
+        }
+        if rebuild:
+            for table in ("runs",) + CHILD_TABLES:
+                self.conn.execute(f"DELETE FROM {table}")
+
+        counts = {"indexed": 0, "skipped": 0, "removed": 0}
+        for run in candidates:
+            if known.get(run["run_id"]) == (run["source"], run["source_mtime"]):
+                counts["skipped"] += 1
+                continue
+            try:
+                if run["source"] == "manifest":
+                    self.index_manifest(run["manifest"], commit=False)
+                else:
+                    self.record_run(run, commit=False)
+                counts["indexed"] += 1
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Skipping run {run['run_id']}: {e}")
+        gone = set(known) - {run["run_id"] for run in candidates}
+        self._delete_runs(gone)
+        counts["removed"] = len(gone)
+        self.conn.commit()
+        print(f"🗂️ Catalog {self.path}: {counts['indexed']} run(s) indexed, {counts['skipped']} unchanged, "
+              f"{counts['removed']} removed in {time.perf_counter() - started:.2f}s")
+        return counts
+
+    # -- reading -------------------------------------------------------------
+
+    def query(self, params=None, devices=None, test_type=None, since=None, until=None, metrics=None,
+              status=None, limit=100):
+        """
+        Runs matching every filter, newest first.
+        params / metrics: [(name, op, value)], e.g. [("radio_band", "=", "6G"), ("nss", ">=", "2")];
+        numeric values compare numerically. devices: run collected from any of them.
+        since / until: epoch, datetime or parse_time() text.
+        Returns [{run columns..., "devices", "params", "metrics"}].
+        """
+        for _, op, _ in list(params or []) + list(metrics or []):
+            if op not in SQL_OPS:
+                raise ValueError(f"❌ Unsupported operator '{op}'. Expected one of {' '.join(SQL_OPS)}")
+        # Parameter filters are point lookups per candidate run, so with the default
+        # LIMIT the newest-first scan stops early. Devices and metric thresholds
+        # (usually the selective filters) are index range scans that drive the
+        # scan when given.
+        where, args = [], []
+        for key, op, value in params or []:
+            num = _to_number(value)
+            column = "num" if num is not None and op != "!=" else "value"
+            where.append(f"EXISTS (SELECT 1 FROM run_params p WHERE p.run = r.id AND p.key = ? AND p.{column} {op} ?)")
+            args += [key, num if column == "num" else str(value)]
+        for name, op, value in metrics or []:
+            where.append(f"r.id IN (SELECT run FROM run_metrics WHERE name = ? AND value {op} ?)")
+            args += [name, _to_number(value)]
+        if devices:
+            devices = [devices] if isinstance(devices, str) else list(devices)
+            where.append(f"r.id IN (SELECT run FROM run_devices WHERE device IN ({','.join('?' * len(devices))}))")
+            args += devices
+        if test_type:
+            where.append("r.test_type = ?")
+            args.append(test_type)
+        if status:
+            where.append("r.status = ?")
+            args.append(status)
+        if since is not None:
+            where.append("r.started_at >= ?")
+            args.append(_epoch(since))
+        if until is not None:
+            where.append("r.started_at <= ?")
+            args.append(_epoch(until))
+
+        sql = "SELECT r.* FROM runs r"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY r.started_at DESC, r.run_id DESC"
+        if limit:
+            sql += " LIMIT ?"
+            args.append(int(limit))
+        runs = [dict(row) for row in self.conn.execute(sql, args)]
+        self._attach_details(runs)
+        return runs
+
+    def _attach_details(self, runs):
+        by_id = {}
+        for run in runs:
+            for column in ("stats_dir", "log_dir", "config_path"):
+                run[column] = self._abs(run[column])
+            run.update({"devices": [], "params": {}, "metrics": {}})
+            by_id[run.pop("id")] = run
+        ids = list(by_id)
+        for i in range(0, len(ids), SQL_BATCH):
+            batch = ids[i:i + SQL_BATCH]
+            marks = ",".join("?" * len(batch))
+            for key, device in self.conn.execute(
+                    f"SELECT run, device FROM run_devices WHERE run IN ({marks}) ORDER BY device", batch):
+                by_id[key]["devices"].append(device)
+            for key, name, value in self.conn.execute(
+                    f"SELECT run, key, value FROM run_params WHERE run IN ({marks})", batch):
+                by_id[key]["params"][name] = value
+            for key, device, name, value in self.conn.execute(
+                    f"SELECT run, device, name, value FROM run_metrics WHERE run IN ({marks})", batch):
+                label = f"{device}:{name}" if device and len(by_id[key]["devices"]) > 1 else name
+                by_id[key]["metrics"][label] = value
+
+    def get_run(self, run_id):
+        """
+        One run with its details and file list, or None.
+        """
+        row = self.conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        run = dict(row)
+        key = run["id"]
+        self._attach_details([run])
+        run["files"] = [
+            {"device": device, "kind": kind, "phase": phase, "path": self._abs(path)}
+            for device, kind, phase, path in self.conn.execute(
+                "SELECT device, kind, phase, path FROM run_files WHERE run = ? ORDER BY path", (key,))
+        ]
+        return run
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+
+# ---------------------------------------------------------------------------
+# Discovering runs on disk
+# ---------------------------------------------------------------------------
+
+def _dir_mtime(path):
+    # Files land in stat subfolders, so the newest of the folder and its children
+    mtimes = [os.path.getmtime(path)]
+    with os.scandir(path) as entries:
+        mtimes += [e.stat().st_mtime for e in entries if e.is_dir()]
+    return max(mtimes)
+
+
+def _load_config(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Unreadable config {path}: {e}")
+        return {}
+
+
+def _discover_runs(root):
+    """
+    Candidate runs under root: one per run.json manifest, plus runs paired by
+    timestamp from config files, ap_stats_* and logs_<device>_* folders that no
+    manifest accounts for.
+    """
+    if not os.path.isdir(root):
+        return []
+    runs = []
+    claimed = set()
+    configs, stats, logs = [], [], []
+    with os.scandir(root) as entries:
+        entries = sorted(entries, key=lambda e: e.name)
+    for entry in entries:
+        if entry.is_dir():
+            manifest = os.path.join(entry.path, MANIFEST_FILENAME)
+            if os.path.exists(manifest):
+                runs.append({"run_id": entry.name, "source": "manifest", "manifest": manifest,
+                             "source_mtime": os.path.getmtime(manifest)})
+                continue
+            m = STATS_DIR_RE.match(entry.name)
+            if m:
+                stats.append((_stamp_epoch(m.group(1)), entry.path))
+                continue
+            m = LOG_DIR_RE.match(entry.name)
+            if m:
+                logs.append((_stamp_epoch(m.group(2)), m.group(1), entry.path))
+        elif entry.is_file():
+            m = CONFIG_RE.match(entry.name)
+            if m:
+                configs.append((_stamp_epoch(m.group(2)), m.group(1), entry.path))
+
+    # Manifests name their config and log folder; keep those out of the pairing
+    for run in runs:
+        try:
+            with open(run["manifest"], 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for path in (manifest.get("config_path"), manifest.get("log_dir")):
+            if path:
+                claimed.add(os.path.abspath(path))
+    configs = [c for c in configs if os.path.abspath(c[2]) not in claimed]
+    logs = [l for l in logs if os.path.abspath(l[2]) not in claimed]
+
+    used_configs, used_logs = set(), set()
+    for idx, (stats_epoch, stats_dir) in enumerate(stats):
+        next_stats = stats[idx + 1][0] if idx + 1 < len(stats) else stats_epoch + PAIR_WINDOW_SEC
+        config = next((c for c in reversed(configs)
+                       if c[2] not in used_configs and stats_epoch - PAIR_WINDOW_SEC <= c[0] <= stats_epoch), None)
+        log = next((l for l in logs
+                    if l[2] not in used_logs and stats_epoch <= l[0] < min(next_stats, stats_epoch + PAIR_WINDOW_SEC)),
+                   None)
+        run = {
+            "run_id": os.path.basename(stats_dir),
+            "status": "completed" if log else "unknown",
+            "started_at": stats_epoch,
+            "ended_at": log[0] if log else None,
+            "stats_dir": stats_dir,
+            "devices": [],
+            "source": "scan",
+        }
+        mtimes = [_dir_mtime(stats_dir)]
+        if config:
+            used_configs.add(config[2])
+            run.update({"test_type": config[1], "config": _load_config(config[2]), "config_path": config[2]})
+            run["mock"] = run["config"].get("mock")
+            mtimes.append(os.path.getmtime(config[2]))
+        if log:
+            used_logs.add(log[2])
+            run.update({"log_dir": log[2], "devices": [log[1]]})
+            mtimes.append(_dir_mtime(log[2]))
+        elif config and run["config"].get("device_id"):
+            run["devices"] = [run["config"]["device_id"]]
+        run["source_mtime"] = max(mtimes)
+        runs.append(run)
+
+    # Config-only runs (e.g. security/roaming) and log folders collected on their own
+    for epoch, test_type, path in configs:
+        if path not in used_configs:
+            config = _load_config(path)
+            runs.append({
+                "run_id": os.path.splitext(os.path.basename(path))[0], "test_type": test_type, "status": "unknown",
+                "started_at": epoch, "config": config, "config_path": path, "mock": config.get("mock"),
+                "devices": [config["device_id"]] if config.get("device_id") else [],
+                "source": "scan", "source_mtime": os.path.getmtime(path),
+            })
+    for epoch, device, path in logs:
+        if path not in used_logs:
+            runs.append({
+                "run_id": os.path.basename(path), "status": "unknown", "started_at": epoch, "log_dir": path,
+                "devices": [device], "source": "scan", "source_mtime": _dir_mtime(path),
+            })
+    return runs
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+
+def _metric_text(value):
+    return "" if value is None else f"{value:g}"
+
+
+def print_runs(runs, fmt="table", out=None):
+    out = out or sys.stdout
+    if fmt == "json":
+        json.dump(runs, out, indent=2, default=str)
+        out.write("\n")
+        return
+    if fmt == "csv":
+        param_keys = sorted({k for run in runs for k in run["params"]})
+        metric_keys = sorted({k for run in runs for k in run["metrics"]})
+        writer = csv.writer(out)
+        writer.writerow(["run_id", "started", "ended", "test_type", "devices", "status", "mock",
+                         "stats_dir", "log_dir", "config_path"] + param_keys + metric_keys)
+        for run in runs:
+            writer.writerow([run["run_id"], _format_time(run["started_at"]), _format_time(run["ended_at"]),
+                             run["test_type"], " ".join(run["devices"]), run["status"], run["mock"],
+                             run["stats_dir"], run["log_dir"], run["config_path"]]
+                            + [run["params"].get(k, "") for k in param_keys]
+                            + [run["metrics"].get(k, "") for k in metric_keys])
+        return
+    if not runs:
+        print("🔍 No matching runs.", file=out)
+        return
+    print(f"{'run_id':<34} {'started':<19} {'type':<12} {'devices':<16} {'status':<10} "
+          + " ".join(f"{m:>12}" for m in TABLE_METRICS), file=out)
+    for run in runs:
+        print(f"{run['run_id']:<34} {_format_time(run['started_at']):<19} {run['test_type'] or '':<12} "
+              f"{','.join(run['devices'])[:16]:<16} {run['status'] or '':<10} "
+              + " ".join(f"{_metric_text(run['metrics'].get(m)):>12}" for m in TABLE_METRICS), file=out)
+    print(f"🗂️ {len(runs)} run(s)", file=out)
+
+
+def print_run(run):
+    print(f"\n🗂️ Run {run['run_id']} ({run['test_type'] or 'unknown type'}, {run['status']})")
+    print(f"  started: {_format_time(run['started_at'])}  ended: {_format_time(run['ended_at'])}  "
+          f"mock: {bool(run['mock'])}  source: {run['source']}")
+    print(f"  devices: {', '.join(run['devices']) or '-'}")
+    for label in ("stats_dir", "log_dir", "config_path"):
+        print(f"  {label}: {run[label] or '-'}")
+    if run["params"]:
+        print("  params: " + ", ".join(f"{k}={v}" for k, v in sorted(run["params"].items())))
+    if run["metrics"]:
+        print("  metrics: " + ", ".join(f"{k}={_metric_text(v)}" for k, v in sorted(run["metrics"].items())))
+    print(f"  files ({len(run['files'])}):")
+    for f in run["files"]:
+        print(f"    [{f['kind']}{'/' + f['phase'] if f['phase'] else ''}] {f['path']}")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Index and query the test runs under run_logs/")
+    parser.add_argument("--root", default=DEFAULT_ROOT, help="run_logs folder the catalog describes")
+    parser.add_argument("--db", default=None, help="Catalog file (default <root>/run_catalog.sqlite)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    scan_parser = sub.add_parser("scan", help="Index new and changed run folders")
+    scan_parser.add_argument("--rebuild", action="store_true", help="Drop the catalog contents and re-index everything")
+
+    query_parser = sub.add_parser("query", help="Find runs by parameters, device, time and metrics")
+    query_parser.add_argument("filters", nargs="*", help="Test parameter filters, e.g. radio_band=6G nss>=2")
+    query_parser.add_argument("--metric", action="append", default=[], help="Metric filter, e.g. 'tx_mbps>500'")
+    query_parser.add_argument("--device", action="append", help="Device name (repeatable: any of them)")
+    query_parser.add_argument("--test-type", default=None)
+    query_parser.add_argument("--status", default=None, help="completed | aborted | running | unknown")
+    query_parser.add_argument("--since", default=None, help="e.g. 30d, 12h, 2025-04-01")
+    query_parser.add_argument("--until", default=None)
+    query_parser.add_argument("--limit", type=int, default=100, help="0 for no limit")
+    query_parser.add_argument("--format", choices=("table", "json", "csv"), default="table")
+
+    show_parser = sub.add_parser("show", help="Details and files of one run")
+    show_parser.add_argument("run_id")
+    args = parser.parse_args()
+
+    with RunCatalog(args.db, root=args.root) as catalog:
+        if args.command == "scan":
+            catalog.scan(rebuild=args.rebuild)
+        elif args.command == "query":
+            t0 = time.perf_counter()
+            runs = catalog.query(
+                params=[parse_filter(f) for f in args.filters],
+                metrics=[parse_filter(m) for m in args.metric],
+                devices=args.device,
+                test_type=args.test_type,
+                status=args.status,
+                since=args.since,
+                until=args.until,
+                limit=args.limit,
+            )
+            print_runs(runs, args.format)
+            if args.format == "table":
+                print(f"⏱️ Query took {(time.perf_counter() - t0) * 1000:.1f} ms over {catalog.count()} run(s)")
+        else:
+            run = catalog.get_run(args.run_id)
+            if run is None:
+                print(f"❌ Run '{args.run_id}' is not in the catalog. Try 'scan' first.")
+                sys.exit(1)
+            print_run(run)
@@ -0,0 +1,19 @@
+# stats_math.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Small numeric helpers shared by the analyzers and the tracing exporter.
+
+import math
+
+
+def percentile(sorted_values, q):
+    """
+    Linear-interpolated percentile (0-100) of already sorted values.
+    """
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * q / 100.0
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
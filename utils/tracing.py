@@ -0,0 +1,291 @@
+# tracing.py
+# Author(s): Wai Man Cheng, ChatGPT (OpenAI 4.0 AI Assistant)
+# Description:
+# -------------
+# Low-overhead timing spans for a test run.
+# Code is wrapped in TRACER.span("execute", device=..., cmd=...) blocks or
+# @traced(...) functions; spans nest per thread and inherit the device / stat /
+# phase attributes of the span they run in. Each finished span costs two clock
+# reads and one append. At the end of a run:
+#   - write_trace()      JSON trace (Chrome trace-event format, opens in
+#                        Perfetto / chrome://tracing) plus the summary table
+#   - write_prometheus() node_exporter textfile with a duration summary and an
+#                        error counter per span / device / stat / phase
+#   - print_trace_summary() count, total, p50, p95 and max per span name
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from array import array
+
+from utils.stats_math import percentile
+
+LABEL_KEYS = ("device", "stat", "phase")
+DEFAULT_MAX_SPANS = 200000
+TRACE_FILENAME = "trace.json"
+PROM_FILENAME = "ap_automation.prom"
+PROM_METRIC = "ap_automation_span_duration_seconds"
+PROM_ERRORS = "ap_automation_span_errors_total"
+PROM_QUANTILES = (50, 95, 99)
+
+
+class Span:
+    __slots__ = ("tracer", "name", "attrs", "start", "wall_start", "parent")
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.parent = None
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        if stack:
+            self.parent = stack[-1].name
+            inherited = {k: v for k, v in stack[-1].attrs.items() if k in LABEL_KEYS}
+            self.attrs = {**inherited, **self.attrs}
+        stack.append(self)
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        self.tracer._stack().pop()
+        self.tracer._record(self, duration, None if exc_type is None else exc_type.__name__)
+        return False
+
+
+class _NoopSpan:
+    attrs = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class Tracer:
+    def __init__(self, enabled=True, max_spans=DEFAULT_MAX_SPANS):
+        """
+        max_spans: span records kept for the trace file; later spans still count
+        towards the summaries and metrics.
+        """
+        self.enabled = enabled
+        self.max_spans = max_spans
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.records = []
+            self.dropped = 0
+            self._durations = {}
+            self._errors = {}
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name, **attrs):
+        """
+        Context manager timing the enclosed block. None-valued attributes are dropped.
+        """
+        if not self.enabled:
+            return _NOOP
+        return Span(self, name, {k: v for k, v in attrs.items() if v is not None})
+
+    def _record(self, span, duration, error):
+        labels = tuple(str(span.attrs.get(k, "")) for k in LABEL_KEYS)
+        key = (span.name, labels)
+        with self._lock:
+            durations = self._durations.get(key)
+            if durations is None:
+                durations = self._durations[key] = array("d")
+            durations.append(duration)
+            if error:
+                self._errors[key] = self._errors.get(key, 0) + 1
+            if len(self.records) < self.max_spans:
+                self.records.append({
+                    "name": span.name,
+                    "start": span.wall_start,
+                    "duration": duration,
+                    "thread": threading.current_thread().name,
+                    "parent": span.parent,
+                    "attrs": {k: str(v) for k, v in span.attrs.items()},
+                    "error": error,
+                })
+            else:
+                self.dropped += 1
+
+    def summary(self, by_labels=False):
+        """
+        {name: {count, errors, total, p50, p95, max}}, or keyed by
+        (name, (device, stat, phase)) with by_labels=True.
+        """
+        with self._lock:
+            items = [(key, list(durations), self._errors.get(key, 0)) for key, durations in self._durations.items()]
+        merged = {}
+        for (name, labels), values, errors in items:
+            key = (name, labels) if by_labels else name
+            entry = merged.setdefault(key, {"values": [], "errors": 0})
+            entry["values"].extend(values)
+            entry["errors"] += errors
+        result = {}
+        for key, entry in merged.items():
+            values = sorted(entry["values"])
+            result[key] = {
+                "count": len(values),
+                "errors": entry["errors"],
+                "total": sum(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "max": values[-1],
+            }
+        return result
+
+    def write_trace(self, path):
+        """
+        Write the spans as a Chrome trace-event JSON file with the summary attached.
+        """
+        with self._lock:
+            records = list(self.records)
+            dropped = self.dropped
+        threads = {}
+        events = []
+        for rec in records:
+            tid = threads.setdefault(rec["thread"], len(threads) + 1)
+            events.append({
+                "name": rec["name"],
+                "ph": "X",
+                "ts": round((rec["start"] - self.started) * 1e6),
+                "dur": round(rec["duration"] * 1e6),
+                "pid": os.getpid(),
+                "tid": tid,
+                "args": {**rec["attrs"], **({"error": rec["error"]} if rec["error"] else {})},
+            })
+        events += [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+            for name, tid in threads.items()
+        ]
+        trace = {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "started": self.started,
+            "dropped_spans": dropped,
+            "summary": self.summary(),
+        }
+        _atomic_write(path, json.dumps(trace, indent=1))
+        return path
+
+    def prometheus_text(self):
+        lines = [
+            f"# HELP {PROM_METRIC} Time spent per instrumented step of an AP test run.",
+            f"# TYPE {PROM_METRIC} summary",
+        ]
+        with self._lock:
+            snapshot = {key: (sorted(values), self._errors.get(key, 0)) for key, values in self._durations.items()}
+        for (name, labels), (values, _) in sorted(snapshot.items()):
+            label_text = _prom_labels(name, labels)
+            for q in PROM_QUANTILES:
+                lines.append(f'{PROM_METRIC}{{{label_text},quantile="{q / 100}"}} {percentile(values, q):.6f}')
+            lines.append(f"{PROM_METRIC}_sum{{{label_text}}} {sum(values):.6f}")
+            lines.append(f"{PROM_METRIC}_count{{{label_text}}} {len(values)}")
+        lines += [
+            f"# HELP {PROM_ERRORS} Instrumented steps that raised.",
+            f"# TYPE {PROM_ERRORS} counter",
+        ]
+        for (name, labels), (_, errors) in sorted(snapshot.items()):
+            lines.append(f"{PROM_ERRORS}{{{_prom_labels(name, labels)}}} {errors}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """
+        Write a node_exporter textfile (written to a temp file, then renamed, so
+        the collector never reads a partial file).
+        """
+        _atomic_write(path, self.prometheus_text())
+        return path
+
+
+def _prom_escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _prom_labels(name, labels):
+    pairs = [("span", name)] + [(k, v) for k, v in zip(LABEL_KEYS, labels) if v]
+    return ",".join(f'{k}="{_prom_escape(v)}"' for k, v in pairs)
+
+
+def _atomic_write(path, text):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def traced(name, **arg_attrs):
+    """
+    Decorator running the function inside a span. arg_attrs maps span
+    attributes to parameter names, e.g. @traced("collect_stat", stat="name").
+    """
+    def decorate(fn):
+        signature = inspect.signature(fn) if arg_attrs else None
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return fn(*args, **kwargs)
+            attrs = {}
+            if signature is not None:
+                bound = signature.bind_partial(*args, **kwargs)
+                bound.apply_defaults()
+                attrs = {attr: bound.arguments.get(param) for attr, param in arg_attrs.items()}
+            with TRACER.span(name, **attrs):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def print_trace_summary(summary=None):
+    summary = TRACER.summary() if summary is None else summary
+    if not summary:
+        return
+    print("\n⏱️ Run timing summary (seconds):")
+    print(f"  {'span':<22} {'count':>6} {'errors':>6} {'total':>9} {'p50':>8} {'p95':>8} {'max':>8}")
+    for name, s in sorted(summary.items(), key=lambda item: -item[1]["total"]):
+        print(f"  {name:<22} {s['count']:>6} {s['errors']:>6} {s['total']:>9.3f} "
+              f"{s['p50']:>8.3f} {s['p95']:>8.3f} {s['max']:>8.3f}")
+
+
+def export_run_metrics(run_dir, textfile_dir=None):
+    """
+    Write trace.json and the Prometheus textfile into run_dir (and the textfile
+    also into textfile_dir, e.g. node_exporter's --collector.textfile.directory,
+    default $AP_METRICS_TEXTFILE_DIR), then print the summary.
+    Returns (trace_path, prom_path).
+    """
+    textfile_dir = textfile_dir or os.environ.get("AP_METRICS_TEXTFILE_DIR")
+    trace_path = TRACER.write_trace(os.path.join(run_dir, TRACE_FILENAME))
+    prom_path = TRACER.write_prometheus(os.path.join(run_dir, PROM_FILENAME))
+    if textfile_dir:
+        TRACER.write_prometheus(os.path.join(textfile_dir, PROM_FILENAME))
+    print_trace_summary()
+    print(f"📄 Run trace written to {trace_path}, metrics to {prom_path}")
+    return trace_path, prom_path
+
+
+# Shared tracer used by every instrumented module in this process
+TRACER = Tracer(enabled=os.environ.get("AP_TRACE", "1") != "0")